@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+AVL旋转动画基准：对比旋转阶段每帧重建整帧快照与复用帧模板（只重建移动节点）的整帧耗时
+
+用法：
+    python benchmarks/bench_avl_rotation.py [节点数] [帧数]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.adapters import AVLAdapter
+from structures.avl import AVLModel
+
+LAYOUT = (640, 200, 130, 72, 120)
+
+
+def make_rotating_tree(size: int) -> AVLModel:
+    """升序插入 size 个值后再插入一个更大的值，最后一次插入触发 RR 旋转"""
+    model = AVLModel()
+    model.set_active(True)
+    model.insert_values(range(size))
+    value = size
+    while True:
+        model.insert(value)
+        if model.has_pending_rotation():
+            return model
+        model.complete_insert_animation()
+        value += 1
+
+
+def render_frames(model: AVLModel, frames: int, reuse: bool) -> float:
+    """旋转阶段逐帧生成整帧快照，返回平均单帧耗时；reuse=False 时每帧丢弃帧模板"""
+    p3 = model._phase_breaks[2]
+    total = 0.0
+    for i in range(frames):
+        model.update_insert_animation(p3 + (1.0 - p3) * (i + 1) / (frames + 1))
+        if not reuse:
+            AVLAdapter._frame_cache = (None, None, None, None)
+        start = time.perf_counter()
+        AVLAdapter.to_snapshot(model)
+        total += time.perf_counter() - start
+    return total / frames
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    model = make_rotating_tree(size)
+    rotation_type = model._rotation_plan['type']
+    # 进入旋转阶段（模型在此执行真实旋转）
+    model.update_insert_animation(model._phase_breaks[2])
+
+    start = time.perf_counter()
+    _, _, _, moving = AVLAdapter._rotation_layouts(model._rotation_keyframes, *LAYOUT)
+    setup = time.perf_counter() - start
+    AVLAdapter.to_snapshot(model)  # 首帧建立帧模板
+
+    rebuilt = render_frames(model, frames, reuse=False)
+    reused = render_frames(model, frames, reuse=True)
+
+    print(f"节点数={size + 1} 旋转类型={rotation_type} 位置变化的节点={len(moving)} 帧数={frames}")
+    print(f"关键帧布局（每次插入一次）        {setup * 1000:8.2f} ms")
+    print(f"每帧重建整帧快照                  {rebuilt * 1000:8.2f} ms/帧")
+    print(f"复用帧模板的整帧快照              {reused * 1000:8.2f} ms/帧")
+
+
+if __name__ == "__main__":
+    main()
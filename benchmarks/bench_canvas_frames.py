@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+画布帧耗时基准：对比光栅视口与 OpenGL 视口在大场景动画下的重绘耗时。
+
+用法：
+    python benchmarks/bench_canvas_frames.py [节点数] [帧数]
+
+每一帧都像动画计时器那样重新生成快照（节点位置微移）、render_snapshot 并强制同步重绘视口，
+输出两种视口的平均/中位/P95 帧耗时。没有 GPU 时可设置 LIBGL_ALWAYS_SOFTWARE=1 测软件 OpenGL。
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt, QCoreApplication
+
+from canvas import Canvas
+from controllers.adapters import StructureSnapshot, NodeSnapshot, EdgeSnapshot
+
+
+def build_tree_snapshot(count: int, offset: float) -> StructureSnapshot:
+    """按完全二叉树排布 count 个方框节点，offset 模拟动画中的位移"""
+    snapshot = StructureSnapshot(kind="BST")
+    positions = {}
+    for i in range(count):
+        level = (i + 1).bit_length() - 1
+        index_in_level = i + 1 - (1 << level)
+        span = 90.0 * (1 << max(0, 10 - level))
+        x = 640 + (index_in_level - ((1 << level) - 1) / 2.0) * span + offset
+        y = 120 + level * 110
+        positions[i] = (x, y)
+        snapshot.nodes.append(NodeSnapshot(id=f"node_{i}", value=str(i), x=x, y=y,
+                                           node_type="box", width=72, height=48, color="#4C78A8"))
+        if i > 0:
+            px, py = positions[(i - 1) // 2]
+            edge = EdgeSnapshot(from_id=f"node_{(i - 1) // 2}", to_id=f"node_{i}", color="#2E86AB")
+            edge.from_x, edge.from_y, edge.to_x, edge.to_y = px, py + 24, x, y - 24
+            snapshot.edges.append(edge)
+    return snapshot
+
+
+def run(canvas: Canvas, count: int, frames: int):
+    timings = []
+    for frame in range(frames):
+        snapshot = build_tree_snapshot(count, offset=(frame % 20) * 2.0)
+        start = time.perf_counter()
+        canvas.render_snapshot(snapshot)
+        canvas.view.viewport().repaint()
+        QCoreApplication.processEvents()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    timings.sort()
+    return {
+        "mean": statistics.mean(timings),
+        "median": statistics.median(timings),
+        "p95": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv)
+    canvas = Canvas()
+    canvas.view.resize(1280, 720)
+    canvas.view.show()
+    app.processEvents()
+
+    results = {"raster": run(canvas, count, frames)}
+    if canvas.set_opengl_enabled(True):
+        app.processEvents()
+        results["opengl"] = run(canvas, count, frames)
+    else:
+        print("OpenGL 不可用，仅测试光栅视口")
+
+    print(f"节点数={count} 帧数={frames}")
+    print(f"{'视口':<8}{'平均(ms)':>12}{'中位(ms)':>12}{'P95(ms)':>12}")
+    for name, stats in results.items():
+        print(f"{name:<8}{stats['mean']:>12.2f}{stats['median']:>12.2f}{stats['p95']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+DSL解析基准：生成覆盖全部命令类型的长脚本，测量 parse_script 的吞吐，
+以及从磁盘流式解析同一脚本时的首条命令延迟与峰值内存
+
+用法：
+    python benchmarks/bench_dsl_parser.py [行数]    # 默认 100000 行
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.dsl_parser import DSLParser, DSLFileReader
+
+TEMPLATES = [
+    "create arraylist with {a}, {b}, {c}",
+    "insert {a} at {i} in arraylist",
+    "delete at {i} from arraylist",
+    "create linkedlist with {a},{b}",
+    "insert {a} at {i} in linkedlist",
+    "delete at {i} from linkedlist",
+    "create stack with {a},{b},{c}",
+    "push {a} to stack",
+    "pop from stack",
+    "build binarytree with {a},{b},#,{c}",
+    "insert {a} as left of {b} in binarytree",
+    "delete {a} from binarytree",
+    "build bst with {a},{b},{c}",
+    "insert {a} in bst",
+    "search {a} in bst",
+    "delete {a} from bst",
+    "insert {a} in avl",
+    "clear avl",
+    "build huffman with a:{a}, b:{b}, c:{c}",
+    "# 注释行",
+]
+
+
+def make_script(lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(lines):
+        template = rng.choice(TEMPLATES)
+        out.append(template.format(a=rng.randint(1, 999), b=rng.randint(1, 999),
+                                   c=rng.randint(1, 999), i=rng.randint(0, 20)))
+    return "\n".join(out)
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    script = make_script(lines)
+    parser = DSLParser()
+
+    start = time.perf_counter()
+    commands = parser.parse_script(script)
+    elapsed = time.perf_counter() - start
+
+    print(f"行数={lines} 命令数={len(commands)} 诊断数={len(parser.diagnostics)}")
+    print(f"耗时 {elapsed * 1000:.1f} ms，{lines / elapsed:,.0f} 行/秒")
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.dsl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(script)
+    reader = DSLFileReader(path)
+    tracemalloc.start()
+    start = time.perf_counter()
+    stream = parser.iter_commands(reader)
+    next(stream)
+    first = time.perf_counter() - start
+    count = 1 + sum(1 for _ in stream)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    os.remove(path)
+    print(f"流式: 文件 {reader.total_bytes / 1024:.0f} KB 命令数={count} 首条 {first * 1000:.2f} ms "
+          f"总计 {elapsed * 1000:.1f} ms 峰值内存 {peak / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+DSL预演基准：多结构脚本分别用单进程与进程池校验，对比最慢单结构段的模拟耗时
+
+用法：
+    python benchmarks/bench_dsl_validator.py [每个结构的命令数] [进程数]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.dsl_validator import DSLValidator, simulate_segment
+
+
+def make_script(per_structure: int) -> str:
+    # AVL 插入与链表头插的模拟代价最高，各占一段
+    return "\n".join([
+        f"for i in 1..{per_structure} {{ insert $i in avl }}",
+        f"for i in 1..{per_structure} {{ insert $i at 0 in linkedlist }}",
+        f"for i in 1..{per_structure} {{ insert $i at 0 in arraylist }}",
+        f"for i in 1..{per_structure} {{ push $i to stack; pop from stack }}",
+    ])
+
+
+def main():
+    per_structure = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    script = make_script(per_structure)
+
+    validator = DSLValidator(max_workers=1)
+    serial = validator.validate_script(script)
+
+    # 单独计时每一段，最慢的一段是并行模拟部分的理论下限
+    segments = {}
+    for cmd in validator.parser.iter_commands(script.split("\n")):
+        segments.setdefault(cmd.structure, []).append(validator._pack(cmd))
+    timings = {}
+    for key, cmds in segments.items():
+        start = time.perf_counter()
+        simulate_segment(key, cmds)
+        timings[key] = time.perf_counter() - start
+    largest_key = max(timings, key=timings.get)
+    largest = timings[largest_key]
+
+    parallel = DSLValidator(max_workers=workers).validate_script(script)
+
+    print(f"命令数={serial.command_count} 各段={serial.segment_sizes} CPU={os.cpu_count()}")
+    print(f"单进程   {serial.elapsed * 1000:8.1f} ms")
+    print(f"进程池x{parallel.workers} {parallel.elapsed * 1000:8.1f} ms")
+    print(f"各段模拟合计 {sum(timings.values()) * 1000:8.1f} ms，最慢段({largest_key}) {largest * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+哈夫曼构建动画基准：逐帧快照耗时（几何计划复用）与直接跳到任意一轮的耗时
+
+用法：
+    python benchmarks/bench_huffman_schedule.py [字符数] [每阶段帧数]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.adapters import HuffmanTreeAdapter
+from structures.huffman import PHASES, HuffmanTreeModel
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    freq_map = {f"c{i}": (i * 37) % 101 + 1 for i in range(size)}
+
+    model = HuffmanTreeModel()
+    model.set_active(True)
+    start = time.perf_counter()
+    model.build(freq_map)
+    build = time.perf_counter() - start
+
+    model.start_animation()
+    start = time.perf_counter()
+    HuffmanTreeAdapter.to_snapshot(model)
+    first = time.perf_counter() - start
+
+    # 播放全部轮次的每个阶段
+    count = 0
+    start = time.perf_counter()
+    while model._animation_state != "done":
+        for i in range(frames):
+            model.update_animation(i / (frames - 1))
+            HuffmanTreeAdapter.to_snapshot(model)
+            count += 1
+        model.finish_phase()
+    per_frame = (time.perf_counter() - start) / count
+
+    # 随机跳转：每次直接定位，不重放之前的轮次
+    rounds = model._total_rounds
+    seeks = 0
+    start = time.perf_counter()
+    for k in range(rounds - 1, -1, -1):
+        for phase in PHASES:
+            model.seek(k, phase)
+            seeks += 1
+    per_seek = (time.perf_counter() - start) / seeks
+
+    print(f"字符数={size} 轮数={rounds} 帧数={count}")
+    print(f"构建时间表     {build * 1000:8.2f} ms")
+    print(f"首帧（含几何计划） {first * 1000:8.2f} ms")
+    print(f"平均每帧       {per_frame * 1000:8.3f} ms")
+    print(f"跳转到任意阶段 {per_seek * 1e6:8.2f} µs/次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+LLM流式响应基准：用本地替身服务器按 SSE 逐 token 推送回复，对比流式与非流式的等待时间。
+
+用法：
+    python benchmarks/bench_llm_streaming.py [每个token的间隔毫秒] [回复末尾的多余token数]
+    python benchmarks/bench_llm_streaming.py --serve [端口]    # 只启动替身服务器
+
+替身服务器兼容 OpenRouter 的 /chat/completions：请求体带 "stream": true 时返回 text/event-stream，
+否则等全部 token 生成完再返回普通 JSON。只启动服务器时，设置
+OPENROUTER_BASE_URL=http://127.0.0.1:<端口> 和任意 OPENROUTER_API_KEY 即可让程序连到它。
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.llm_cache import LLMResponseCache
+from controllers.llm_service import LLMService
+
+REPLY_ACTION = {"structure_type": "BST", "operation": "insert", "parameters": {"value": "25"}}
+
+
+def reply_tokens(trailing: int):
+    """把回复切成小段模拟 token；动作 JSON 之后还有一段说明文字（流式模式不必等它）"""
+    text = json.dumps(REPLY_ACTION, ensure_ascii=False)
+    tokens = [text[i:i + 4] for i in range(0, len(text), 4)]
+    tokens += [" 已完成。"] * trailing
+    return tokens
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    token_interval = 0.03
+    trailing_tokens = 40
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        tokens = reply_tokens(self.trailing_tokens)
+        if not payload.get("stream"):
+            time.sleep(self.token_interval * len(tokens))
+            body = json.dumps({"choices": [{"message": {"content": "".join(tokens)}}]}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            self._write_chunk(b": stub processing\n\n")
+            for token in tokens:
+                time.sleep(self.token_interval)
+                event = {"choices": [{"delta": {"content": token}}]}
+                self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端拿到完整动作后提前断开
+            pass
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_server(port: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(service: LLMService, stream: bool):
+    service.stream_responses = stream
+    service.cache.clear()
+    first_delta = []
+    start = time.perf_counter()
+    action = service.request_action(
+        "在BST中插入25",
+        on_delta=lambda _text: first_delta or first_delta.append(time.perf_counter() - start),
+    )
+    total = time.perf_counter() - start
+    assert action == REPLY_ACTION, action
+    return (first_delta[0] * 1000.0 if first_delta else None), total * 1000.0
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+        server = start_server(port)
+        print(f"替身服务器已启动: http://127.0.0.1:{server.server_address[1]}  (Ctrl+C 退出)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    StubHandler.token_interval = (float(sys.argv[1]) if len(sys.argv) > 1 else 30.0) / 1000.0
+    StubHandler.trailing_tokens = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    server = start_server()
+    service = LLMService(cache=LLMResponseCache(path=os.path.join(tempfile.mkdtemp(), "cache.json")))
+    service.api_key = "stub"
+    service.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        first, streamed = measure(service, stream=True)
+        _, blocking = measure(service, stream=False)
+    finally:
+        service.close()
+        server.shutdown()
+
+    print(f"token间隔={StubHandler.token_interval * 1000:.0f}ms 末尾多余token={StubHandler.trailing_tokens}")
+    print(f"{'模式':<10}{'首段文本(ms)':>14}{'拿到动作(ms)':>14}")
+    print(f"{'流式':<10}{first:>14.1f}{streamed:>14.1f}")
+    print(f"{'非流式':<10}{'-':>14}{blocking:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
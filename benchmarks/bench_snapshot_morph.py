@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+快照过渡基准：顺序表头部插入动画，对比每帧重新布局与过渡引擎插值的单帧耗时
+
+用法：
+    python benchmarks/bench_snapshot_morph.py [元素数] [帧数]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.adapters import SequentialListAdapter
+from controllers.morph import SnapshotMorph, np
+from structures.sequential_list import SequentialListModel
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    model = SequentialListModel()
+    model.set_active(True)
+    model.build(range(size))
+    model.insert_at(0, -1)
+
+    # 旧做法：每一帧按进度重新布局整张表
+    start = time.perf_counter()
+    for i in range(frames):
+        SequentialListAdapter._keyframe(model, i / (frames - 1), 100, 200, 88, 56)
+    relayout = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    morph = SnapshotMorph(
+        SequentialListAdapter._keyframe(model, 0.0, 100, 200, 88, 56),
+        SequentialListAdapter._keyframe(model, 1.0, 100, 200, 88, 56),
+    )
+    setup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(frames):
+        morph.frame(i / (frames - 1))
+    interpolated = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    for i in range(frames):
+        morph.positions(i / (frames - 1))
+    lerp = (time.perf_counter() - start) / frames
+
+    print(f"元素数={size} 过渡元素={morph.element_count} 帧数={frames} numpy={'是' if np is not None else '否'}")
+    print(f"每帧重新布局   {relayout * 1000:8.2f} ms/帧")
+    print(f"过渡引擎       {interpolated * 1000:8.2f} ms/帧（一次性准备 {setup * 1000:.1f} ms）")
+    print(f"其中向量插值   {lerp * 1000:8.3f} ms/帧")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+后台快照基准：大 BST 上模拟遍历动画按节拍刷新，对比 GUI 线程内直接布局与“取模型副本 + 后台生成”的每拍占用，
+以及节拍之间处理小事件（模拟鼠标/键盘输入）的最长等待
+遍历不改变树结构：副本只在第一拍完整复制结构，之后各拍复用，只复制动画状态；
+节拍间小事件的等待主要来自与工作线程争用 GIL（约一个切换间隔，与节点数无关）
+
+用法：
+    python benchmarks/bench_snapshot_worker.py [节点数] [节拍数] [节拍间隔ms]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.adapters import BSTAdapter
+from controllers.snapshot_worker import SnapshotProducer
+from structures.bst import BSTModel
+
+
+def run_events(deadline: float) -> float:
+    """节拍剩余时间里不断处理小事件，返回单个事件的最长耗时"""
+    worst = 0.0
+    while True:
+        start = time.perf_counter()
+        if start >= deadline:
+            return worst
+        sum(range(2000))
+        worst = max(worst, time.perf_counter() - start)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    interval = (int(sys.argv[3]) if len(sys.argv) > 3 else 16) / 1000.0
+    values = list(range(size))
+    random.Random(0).shuffle(values)
+    model = BSTModel()
+    model.set_active(True)
+    model.insert_values(values)
+    model.start_traversal("inorder")
+
+    # 旧做法：每拍在 GUI 线程里布局并冻结
+    inline = []
+    for i in range(ticks):
+        model.update_traversal_animation(i / ticks)
+        start = time.perf_counter()
+        BSTAdapter.to_snapshot(model).freeze()
+        inline.append(time.perf_counter() - start)
+
+    # 新做法：每拍只取模型副本并提交，GUI 线程按节拍取帧
+    producer = SnapshotProducer(lambda: None)
+    busy = []
+    event_worst = 0.0
+    shown = 0
+    begin = time.perf_counter()
+    for i in range(ticks):
+        tick_start = time.perf_counter()
+        model.update_traversal_animation(i / ticks)
+        producer.submit("BST", BSTAdapter, model.snapshot_copy())
+        if producer.take() is not None:
+            shown += 1
+        busy.append(time.perf_counter() - tick_start)
+        event_worst = max(event_worst, run_events(tick_start + interval))
+    while producer._running:
+        time.sleep(0.001)
+    if producer.take() is not None:
+        shown += 1
+    elapsed = time.perf_counter() - begin
+    producer.close()
+
+    print(f"节点数={size} 节拍数={ticks} 节拍间隔={interval * 1000:.0f} ms")
+    # 直接布局时输入事件要等整帧布局结束
+    print(f"GUI线程内布局     平均 {sum(inline) / ticks * 1000:8.2f} ms/拍，最长 {max(inline) * 1000:8.2f} ms")
+    # 第一拍包含结构的完整复制，之后结构不变，各拍只复制动画状态
+    rest = busy[1:] or busy
+    print(f"取副本+后台生成   首拍 {busy[0] * 1000:8.2f} ms，其余平均 {sum(rest) / len(rest) * 1000:8.2f} ms/拍，"
+          f"最长 {max(rest) * 1000:8.2f} ms，节拍间小事件最长 {event_worst * 1000:.2f} ms")
+    print(f"后台共显示 {shown} 帧，丢弃过期帧 {producer.dropped}，用时 {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
-from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsLineItem, QGraphicsRectItem
-from PyQt5.QtGui import QBrush, QPen, QColor, QFont, QPainter
-from PyQt5.QtCore import Qt, QPointF, QTimer, QObject, QRectF
-from controllers.adapters import center_snapshot
+from array import array
+from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsLineItem, QGraphicsRectItem, QGraphicsItem, QWidget, QOpenGLWidget
+from PyQt5.QtGui import QBrush, QPen, QColor, QFont, QPainter, QSurfaceFormat, QOpenGLContext, QOffscreenSurface, QTransform
+from PyQt5.QtCore import Qt, QPointF, QTimer, QObject, QRectF, QEvent, pyqtSignal
+from PyQt5 import sip
+from controllers.adapters import center_offset
 
 NODE_RADIUS = 22
 BOX_NODE_WIDTH = 72
@@ -10,6 +12,309 @@ BOX_NODE_HEIGHT = 48
 DEFAULT_NODE_COLOR = QColor("#4C78A8")
 DEFAULT_TEXT_COLOR = Qt.white
 
+# 细节层次（LOD）：元素过多或缩放过小时，只画形状不画文字
+LOD_ELEMENT_THRESHOLD = 400      # 节点+方框总数超过该值进入简化模式
+LOD_SCALE_THRESHOLD = 0.6        # 视图缩放小于该值时不再绘制任何文字
+LOD_GLYPH_CELL = 600             # 远处元素按该边长的网格聚合为汇总标记
+LOD_GLYPH_RING = 3               # 汇总标记只在视口周围若干个视口范围内生成
+LOD_GLYPH_COLOR = QColor("#CBD5E1")
+LOD_GLYPH_TEXT_COLOR = QColor("#475569")
+
+# 视口裁剪：大快照只为“视口 + 边距”内的元素创建图元
+SPATIAL_CELL_SIZE = 512          # 空间索引网格边长
+CULL_MARGIN = 400                # 视口四周额外预先创建图元的范围
+
+# 视图缩放（Ctrl+滚轮）
+ZOOM_MIN = 0.1
+ZOOM_MAX = 4.0
+ZOOM_STEP = 1.15
+
+
+class SpatialGrid:
+    """均匀网格空间索引：元素按包围盒登记到覆盖的网格单元，按矩形查询"""
+
+    def __init__(self, cell_size: float = SPATIAL_CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self._cells = {}
+
+    def _cell_range(self, rect: QRectF):
+        size = self.cell_size
+        return (int(rect.left() // size), int(rect.right() // size),
+                int(rect.top() // size), int(rect.bottom() // size))
+
+    def clear(self):
+        self._cells.clear()
+
+    def insert(self, key, rect: QRectF):
+        x0, x1, y0, y1 = self._cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self._cells.setdefault((cx, cy), []).append((key, rect))
+
+    def query(self, rect: QRectF) -> dict:
+        """返回与 rect 相交的元素 {key: 包围盒}"""
+        found = {}
+        x0, x1, y0, y1 = self._cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for key, item_rect in self._cells.get((cx, cy), ()):
+                    if key not in found and item_rect.intersects(rect):
+                        found[key] = item_rect
+        return found
+
+# 这些结构的节点与边合并到一个自绘图元中批量绘制
+BATCH_RENDER_KINDS = ("BinaryTree", "BST", "AVL")
+
+TEXT_SIZE_CACHE_LIMIT = 8192     # 文字尺寸缓存上限，超过后整体清空
+
+
+class ResourcePool:
+    """绘制资源池：按键复用 QFont/QColor/QPen/QBrush，并缓存文字尺寸
+
+    每帧渲染都会为大量元素设置相同的字体与颜色，这里统一驻留，避免重复构造和解析十六进制颜色。
+    """
+
+    def __init__(self):
+        self._fonts = {}
+        self._colors = {}
+        self._pens = {}
+        self._brushes = {}
+        self._text_sizes = {}
+        self._measure_item = None
+
+    def font(self, family: str, size: int, weight=QFont.Normal) -> QFont:
+        key = (family, size, weight)
+        font = self._fonts.get(key)
+        if font is None:
+            font = QFont(family, size)
+            font.setWeight(weight)
+            self._fonts[key] = font
+        return font
+
+    def color(self, value) -> QColor:
+        if isinstance(value, QColor):
+            return value
+        color = self._colors.get(value)
+        if color is None:
+            color = QColor(value)
+            self._colors[value] = color
+        return color
+
+    def pen(self, color, width=1) -> QPen:
+        key = (color if not isinstance(color, QColor) else color.rgba(), width)
+        pen = self._pens.get(key)
+        if pen is None:
+            pen = QPen(self.color(color), width)
+            self._pens[key] = pen
+        return pen
+
+    def brush(self, color) -> QBrush:
+        key = color if not isinstance(color, QColor) else color.rgba()
+        brush = self._brushes.get(key)
+        if brush is None:
+            brush = QBrush(self.color(color))
+            self._brushes[key] = brush
+        return brush
+
+    def text_size(self, text: str, family: str, size: int, weight=QFont.Normal):
+        """文字包围盒尺寸 (宽, 高)，与 QGraphicsTextItem.boundingRect 一致"""
+        key = (text, family, size, weight)
+        cached = self._text_sizes.get(key)
+        if cached is None:
+            if self._measure_item is None:
+                self._measure_item = QGraphicsTextItem()
+            if len(self._text_sizes) >= TEXT_SIZE_CACHE_LIMIT:
+                self._text_sizes.clear()
+            self._measure_item.setFont(self.font(family, size, weight))
+            self._measure_item.setPlainText(text)
+            rect = self._measure_item.boundingRect()
+            cached = (rect.width(), rect.height())
+            self._text_sizes[key] = cached
+        return cached
+
+
+class TreeBatchItem(QGraphicsItem):
+    """整棵树的节点与边由一个图元在一次 paint() 中绘制
+
+    快照只在 set_elements 时转换为扁平的坐标数组与画刷/画笔列表，并登记到空间索引；
+    绘制时只查询与 exposedRect 相交的节点和边。节点数超过 LOD_ELEMENT_THRESHOLD 且缩得
+    过小时，与画布的细节层次一致，按网格画汇总标记代替逐个节点。
+    """
+
+    SHAPE_CIRCLE = 0
+    SHAPE_BOX = 1
+
+    def __init__(self, pool: "ResourcePool"):
+        super().__init__()
+        self._pool = pool
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        # 节点：每个节点 4 个浮点数 (中心x, 中心y, 宽, 高)
+        self._node_geom = array("d")
+        self._node_shapes = array("b")
+        self._node_ids = []
+        self._node_texts = []
+        self._node_brushes = []
+        self._node_pens = []
+        self._node_text_pens = []
+        self._node_sub_labels = []
+        # 边：每条边 4 个浮点数 (x1, y1, x2, y2)
+        self._edge_geom = array("d")
+        self._edge_pens = []
+        self._bounds = QRectF()
+        # 空间索引：("node", i) / ("edge", i) -> 包围盒；汇总网格 {cell: [包围盒, 节点数]}
+        self._grid = SpatialGrid()
+        self._glyph_cells = {}
+
+    def set_elements(self, nodes, edges):
+        """把节点/边快照一次性转换为扁平数组"""
+        self.prepareGeometryChange()
+        pool = self._pool
+        geom = array("d")
+        shapes = array("b")
+        self._node_ids = []
+        self._node_texts = []
+        self._node_brushes = []
+        self._node_pens = []
+        self._node_text_pens = []
+        self._node_sub_labels = []
+        grid = SpatialGrid()
+        glyph_cells = {}
+        bounds = QRectF()
+        for node in nodes:
+            is_box = node.node_type == "box"
+            if is_box:
+                w = float(node.width or BOX_NODE_WIDTH)
+                h = float(node.height or BOX_NODE_HEIGHT)
+            else:
+                w = h = float(node.width or NODE_RADIUS * 2)
+            geom.extend((float(node.x), float(node.y), w, h))
+            shapes.append(self.SHAPE_BOX if is_box else self.SHAPE_CIRCLE)
+            self._node_ids.append(node.id)
+            self._node_texts.append(str(node.value))
+            self._node_brushes.append(pool.brush(node.color))
+            border_color = getattr(node, "border_color", None)
+            if is_box:
+                border_width = getattr(node, "border_width", 2)
+                self._node_pens.append(pool.pen(border_color or Qt.black, border_width))
+                self._node_text_pens.append(pool.pen(DEFAULT_TEXT_COLOR))
+            else:
+                border_width = getattr(node, "border_width", 0)
+                self._node_pens.append(pool.pen(border_color, border_width or 2) if border_color else pool.pen(Qt.transparent, 0))
+                self._node_text_pens.append(pool.pen(getattr(node, "text_color", "#FFFFFF")))
+            sub_label = getattr(node, "sub_label", None)
+            self._node_sub_labels.append(
+                (sub_label, pool.pen(getattr(node, "sub_label_color", "#1f4e79"))) if sub_label else None)
+            # 方框节点两侧连接点各外扩 10px；圆形节点下方可能有子标签
+            node_rect = QRectF(node.x - w / 2 - 12, node.y - h / 2 - 2, w + 24, h + 28)
+            grid.insert(("node", len(shapes) - 1), node_rect)
+            cell = (int(node.x // LOD_GLYPH_CELL), int(node.y // LOD_GLYPH_CELL))
+            entry = glyph_cells.get(cell)
+            if entry is None:
+                glyph_cells[cell] = [QRectF(node_rect), 1]
+            else:
+                entry[0] = entry[0].united(node_rect)
+                entry[1] += 1
+            bounds = bounds.united(node_rect)
+        edge_geom = array("d")
+        self._edge_pens = []
+        for edge in edges:
+            if not all(hasattr(edge, k) for k in ("from_x", "from_y", "to_x", "to_y")):
+                continue
+            edge_rect = QRectF(QPointF(edge.from_x, edge.from_y), QPointF(edge.to_x, edge.to_y)).normalized().adjusted(-2, -2, 2, 2)
+            grid.insert(("edge", len(self._edge_pens)), edge_rect)
+            edge_geom.extend((float(edge.from_x), float(edge.from_y), float(edge.to_x), float(edge.to_y)))
+            self._edge_pens.append(pool.pen(edge.color, 3))
+            bounds = bounds.united(edge_rect)
+        self._node_geom = geom
+        self._node_shapes = shapes
+        self._edge_geom = edge_geom
+        self._grid = grid
+        self._glyph_cells = glyph_cells
+        self._bounds = bounds
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return self._bounds
+
+    def paint(self, painter, option, widget=None):
+        exposed = option.exposedRect if not option.exposedRect.isNull() else self._bounds
+        show_labels = option.levelOfDetailFromTransform(painter.worldTransform()) >= LOD_SCALE_THRESHOLD
+        pool = self._pool
+        if not show_labels and len(self._node_ids) > LOD_ELEMENT_THRESHOLD:
+            self._paint_glyphs(painter, exposed)
+            return
+        visible = self._grid.query(exposed)
+        node_indices = sorted(i for kind, i in visible if kind == "node")
+        edge_indices = sorted(i for kind, i in visible if kind == "edge")
+        geom = self._node_geom
+        label_font = pool.font("Segoe UI", 12, QFont.DemiBold)
+        sub_font = pool.font("Segoe UI", 10, QFont.Medium)
+        connector_pen = pool.pen(Qt.black, 1)
+        left_brush = pool.brush("#FF6B6B")
+        right_brush = pool.brush("#4ECDC4")
+
+        for i in node_indices:
+            cx, cy, w, h = geom[4 * i], geom[4 * i + 1], geom[4 * i + 2], geom[4 * i + 3]
+            rect = QRectF(cx - w / 2, cy - h / 2, w, h)
+            painter.setBrush(self._node_brushes[i])
+            painter.setPen(self._node_pens[i])
+            if self._node_shapes[i] == self.SHAPE_BOX:
+                painter.drawRect(rect)
+                if not show_labels:
+                    continue
+                painter.setPen(connector_pen)
+                painter.setBrush(left_brush)
+                painter.drawRect(QRectF(cx - w / 2 - 10, cy - 10, 20, 20))
+                painter.setBrush(right_brush)
+                painter.drawRect(QRectF(cx + w / 2 - 10, cy - 10, 20, 20))
+            else:
+                painter.drawEllipse(rect)
+                if not show_labels:
+                    continue
+            painter.setFont(label_font)
+            painter.setPen(self._node_text_pens[i])
+            painter.drawText(rect, Qt.AlignCenter, self._node_texts[i])
+            sub = self._node_sub_labels[i]
+            if sub is not None:
+                painter.setFont(sub_font)
+                painter.setPen(sub[1])
+                painter.drawText(QRectF(cx - w, cy + h / 2 - 2, w * 2, 24), Qt.AlignHCenter | Qt.AlignTop, sub[0])
+
+        # 边绘制在节点之上，与逐图元渲染时的叠放顺序一致
+        edges = self._edge_geom
+        for i in edge_indices:
+            x1, y1, x2, y2 = edges[4 * i], edges[4 * i + 1], edges[4 * i + 2], edges[4 * i + 3]
+            painter.setPen(self._edge_pens[i])
+            painter.drawLine(QPointF(x1, y1), QPointF(x2, y2))
+
+    def _paint_glyphs(self, painter, exposed: QRectF):
+        """节点过多且缩得过小：每个网格画一个汇总标记（浅色方块 + 节点数）"""
+        pool = self._pool
+        painter.setPen(pool.pen(Qt.transparent, 0))
+        painter.setBrush(pool.brush(LOD_GLYPH_COLOR))
+        visible = [(rect, count) for rect, count in self._glyph_cells.values() if rect.intersects(exposed)]
+        for rect, _count in visible:
+            painter.drawRect(rect)
+        painter.setFont(pool.font("Segoe UI", 10))
+        painter.setPen(pool.pen(LOD_GLYPH_TEXT_COLOR))
+        for rect, count in visible:
+            painter.drawText(rect, Qt.AlignCenter, f"×{count}")
+
+
+class ContentRoot(QGraphicsItem):
+    """结构图元的公共父节点：子图元使用快照的原始坐标，视图变换只设置在这里"""
+
+    def __init__(self):
+        super().__init__()
+        self.setFlag(QGraphicsItem.ItemHasNoContents, True)
+
+    def boundingRect(self) -> QRectF:
+        return QRectF()
+
+    def paint(self, painter, option, widget=None):
+        pass
+
+
 class Animator(QObject):
     def __init__(self, scene):
         super().__init__()
@@ -62,6 +367,11 @@ class Animator(QObject):
         self.step()
 
 class Canvas(QObject):
+    # 渲染完新快照后发出 (快照, 快照坐标->场景坐标 的视图变换)
+    snapshot_rendered = pyqtSignal(object, object)
+    # 可视区域（场景坐标）变化
+    viewport_changed = pyqtSignal(QRectF)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.scene = QGraphicsScene()
@@ -76,6 +386,12 @@ class Canvas(QObject):
         self.view.setRenderHint(QPainter.Antialiasing, True)
         self.view.setRenderHint(QPainter.TextAntialiasing, True)
         self.view.setRenderHint(QPainter.SmoothPixmapTransform, True)
+        # 每帧都会整体重建图元，场景的 BSP 索引只会带来维护开销
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        # 背景为纯色样式表，缓存后滚动/重绘无需重复绘制背景
+        self.view.setCacheMode(QGraphicsView.CacheBackground)
+        self.view.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self._opengl_enabled = False
         self.view.setStyleSheet(
             """
             QGraphicsView {
@@ -123,74 +439,290 @@ class Canvas(QObject):
         self.scene.addItem(self.operation_history_label)
 
         self.animator = Animator(self.scene)
+        # 快照保持不可变：居中/平移作为视图变换设置在公共父图元上，渲染时由 Qt 统一应用
+        self._content_root = ContentRoot()
+        self.scene.addItem(self._content_root)
+        self._view_transform = QTransform()
+        # 字体/颜色/画笔/画刷及文字尺寸的共享缓存
+        self._pool = ResourcePool()
         
         # 存储当前快照
         self.current_snapshot = None
+        # 当前快照是否处于 LOD 简化模式
+        self._lod_active = False
+        # LOD 模式下的空间索引与已创建图元：{key: (细节级别, [图元])}
+        self._spatial_index = SpatialGrid()
+        self._indexed_snapshot = None
+        self._glyph_cells = {}
+        self._materialized = {}
+        # 树结构的批量绘制图元（非树结构为 None）
+        self._batch_item = None
 
         # 滚动时保持说明文字“贴”在当前可视区域的左上/右上
         try:
-            self.view.horizontalScrollBar().valueChanged.connect(lambda _v: self._layout_labels())
-            self.view.verticalScrollBar().valueChanged.connect(lambda _v: self._layout_labels())
+            self.view.horizontalScrollBar().valueChanged.connect(lambda _v: self._on_view_scrolled())
+            self.view.verticalScrollBar().valueChanged.connect(lambda _v: self._on_view_scrolled())
         except Exception:
             pass
+        # Ctrl+滚轮缩放、视口尺寸变化：可视区域改变，同样需要同步 LOD 图元
+        self._filtered_viewport = None
+        self._watch_viewport()
+        self.view.destroyed.connect(self._on_view_destroyed)
+
+    def _watch_viewport(self):
+        """在当前视口上安装事件过滤器并记住它（视图析构期间不能再向视图查询视口）"""
+        viewport = self.view.viewport()
+        viewport.installEventFilter(self)
+        self._filtered_viewport = viewport
+
+    def _on_view_destroyed(self, _obj=None):
+        viewport, self._filtered_viewport = self._filtered_viewport, None
+        if viewport is not None and not sip.isdeleted(viewport):
+            viewport.removeEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if self._filtered_viewport is not None and obj is self._filtered_viewport:
+            if event.type() == QEvent.Wheel and event.modifiers() & Qt.ControlModifier:
+                self.zoom_by(ZOOM_STEP if event.angleDelta().y() > 0 else 1 / ZOOM_STEP)
+                return True
+            if event.type() == QEvent.Resize:
+                self._on_view_transformed()
+        return super().eventFilter(obj, event)
+
+    def set_zoom(self, scale: float):
+        """设置视图缩放比例（保持视口中心不动）"""
+        scale = max(ZOOM_MIN, min(ZOOM_MAX, float(scale)))
+        center = self.view.mapToScene(self.view.viewport().rect().center())
+        self.view.setTransform(QTransform.fromScale(scale, scale))
+        self.view.centerOn(center)
+        self._on_view_transformed()
+
+    def zoom_by(self, factor: float):
+        self.set_zoom(self._view_scale() * factor)
+
+    def _on_view_transformed(self):
+        """缩放或视口尺寸改变：跨过 LOD 阈值时按新模式整帧重建，否则按新视口增量同步"""
+        snapshot = self.current_snapshot
+        if snapshot is not None and self._is_lod_active(snapshot) != self._lod_active:
+            self.render_snapshot(snapshot)
+            return
+        self._on_view_scrolled()
 
     def _snapshot_bounds(self, snapshot) -> QRectF:
         """计算快照中所有可视元素的包围盒（与 center_snapshot 的坐标约定保持一致）"""
         if snapshot is None:
             return QRectF()
-        min_x = float("inf")
-        min_y = float("inf")
-        max_x = float("-inf")
-        max_y = float("-inf")
-
-        def include_rect(x0: float, y0: float, w: float, h: float):
-            nonlocal min_x, min_y, max_x, max_y
-            min_x = min(min_x, x0)
-            min_y = min(min_y, y0)
-            max_x = max(max_x, x0 + w)
-            max_y = max(max_y, y0 + h)
-
-        def include_point(x, y):
-            if x is None or y is None:
-                return
-            include_rect(float(x), float(y), 0.0, 0.0)
-
-        for node in getattr(snapshot, "nodes", []) or []:
-            w = getattr(node, "width", None) or 40
-            h = getattr(node, "height", None) or 40
-            include_rect(float(node.x) - w / 2.0, float(node.y) - h / 2.0, float(w), float(h))
-
-        for box in getattr(snapshot, "boxes", []) or []:
-            include_rect(float(box.x), float(box.y), float(box.width), float(box.height))
-
-        for edge in getattr(snapshot, "edges", []) or []:
-            include_point(getattr(edge, "from_x", None), getattr(edge, "from_y", None))
-            include_point(getattr(edge, "to_x", None), getattr(edge, "to_y", None))
-
-        if min_x == float("inf") or min_y == float("inf"):
+        bounds = snapshot.geometry().bounds()
+        if bounds is None:
             return QRectF()
+        min_x, min_y, max_x, max_y = bounds
         return QRectF(min_x, min_y, max_x - min_x, max_y - min_y)
 
-    def _shift_snapshot(self, snapshot, dx: float, dy: float):
-        """整体平移快照元素（用于把超长链表的左边界拉回到非负区域，便于滚动）"""
-        if snapshot is None or (dx == 0 and dy == 0):
-            return snapshot
-        for node in getattr(snapshot, "nodes", []) or []:
-            node.x += dx
-            node.y += dy
-        for box in getattr(snapshot, "boxes", []) or []:
-            box.x += dx
-            box.y += dy
-        for edge in getattr(snapshot, "edges", []) or []:
-            if hasattr(edge, "from_x") and edge.from_x is not None:
-                edge.from_x += dx
-            if hasattr(edge, "to_x") and edge.to_x is not None:
-                edge.to_x += dx
-            if hasattr(edge, "from_y") and edge.from_y is not None:
-                edge.from_y += dy
-            if hasattr(edge, "to_y") and edge.to_y is not None:
-                edge.to_y += dy
-        return snapshot
+    def _add_item(self, item):
+        """把结构图元挂到公共父图元下（坐标为快照坐标，视图变换由父图元提供）"""
+        item.setParentItem(self._content_root)
+        return item
+
+    def center_on(self, scene_pos: QPointF):
+        """把主视图滚动到以 scene_pos 为中心（供概览图跳转）"""
+        self.view.centerOn(scene_pos)
+
+    def _to_content_rect(self, scene_rect: QRectF) -> QRectF:
+        """场景坐标矩形 -> 快照坐标矩形"""
+        inverse, ok = self._view_transform.inverted()
+        return inverse.mapRect(scene_rect) if ok else QRectF(scene_rect)
+
+    def _on_view_scrolled(self):
+        """滚动：标签贴边；LOD 模式下按新视口增量增删图元"""
+        self._layout_labels()
+        self.viewport_changed.emit(self._visible_scene_rect())
+        if self._lod_active:
+            self._sync_viewport_items()
+
+    def _view_scale(self) -> float:
+        """当前视图缩放比例（未缩放时为 1.0）"""
+        try:
+            return abs(self.view.transform().m11()) or 1.0
+        except Exception:
+            return 1.0
+
+    def _visible_scene_rect(self) -> QRectF:
+        """当前视口在场景坐标中的范围"""
+        try:
+            return self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        except Exception:
+            return QRectF()
+
+    def _is_lod_active(self, snapshot) -> bool:
+        """元素数量超过阈值或视图缩得足够小时启用简化渲染"""
+        count = len(getattr(snapshot, "nodes", []) or []) + len(getattr(snapshot, "boxes", []) or [])
+        return count > LOD_ELEMENT_THRESHOLD or self._view_scale() < LOD_SCALE_THRESHOLD
+
+    @staticmethod
+    def _node_rect(node) -> QRectF:
+        w = float(getattr(node, "width", None) or 40)
+        h = float(getattr(node, "height", None) or 40)
+        return QRectF(float(node.x) - w / 2.0, float(node.y) - h / 2.0, w, h)
+
+    @staticmethod
+    def _box_rect(box) -> QRectF:
+        return QRectF(float(box.x), float(box.y), float(box.width), float(box.height))
+
+    @staticmethod
+    def _edge_rect(edge) -> QRectF:
+        return QRectF(QPointF(edge.from_x, edge.from_y), QPointF(edge.to_x, edge.to_y)).normalized().adjusted(-2, -2, 2, 2)
+
+    def _render_elements(self, snapshot):
+        """渲染快照中的方框/节点/边；LOD 模式下建立空间索引，只创建视口附近的图元"""
+        nodes, edges = snapshot.nodes, snapshot.edges
+        self._batch_item = None
+        if getattr(snapshot, "kind", "") in BATCH_RENDER_KINDS and nodes:
+            # 树结构：节点与边交给一个自绘图元，它在 paint() 中自行按暴露区域裁剪
+            self._batch_item = TreeBatchItem(self._pool)
+            self._batch_item.set_elements(nodes, edges)
+            self._batch_item.setZValue(1)
+            self._add_item(self._batch_item)
+            nodes, edges = [], []
+
+        if not self._lod_active:
+            for box in snapshot.boxes:
+                self._render_box(box)
+            for node in nodes:
+                self._render_node(node)
+            for edge in edges:
+                self._render_edge(edge)
+            return
+
+        self._indexed_snapshot = snapshot
+        self._spatial_index.clear()
+        self._glyph_cells = {}
+        for i, box in enumerate(snapshot.boxes):
+            self._index_element(("box", i), self._box_rect(box))
+        for i, node in enumerate(nodes):
+            self._index_element(("node", i), self._node_rect(node))
+        for i, edge in enumerate(edges):
+            if all(hasattr(edge, k) for k in ("from_x", "from_y", "to_x", "to_y")):
+                self._spatial_index.insert(("edge", i), self._edge_rect(edge))
+        self._sync_viewport_items()
+
+    def _index_element(self, key, rect: QRectF):
+        """登记元素到空间索引，并累计到所在汇总网格"""
+        self._spatial_index.insert(key, rect)
+        cell = (int(rect.center().x() // LOD_GLYPH_CELL), int(rect.center().y() // LOD_GLYPH_CELL))
+        entry = self._glyph_cells.get(cell)
+        if entry is None:
+            self._glyph_cells[cell] = [QRectF(rect), 1]
+        else:
+            entry[0] = entry[0].united(rect)
+            entry[1] += 1
+
+    def _sync_viewport_items(self):
+        """对比当前视口需要的图元与已创建的图元，只增删差异部分"""
+        snapshot = self._indexed_snapshot
+        if snapshot is None:
+            return
+        visible = self._to_content_rect(self._visible_scene_rect())
+        if visible.isNull():
+            return
+        # 视口内：完整渲染（缩得过小时也不画文字）；边距内：只画形状
+        show_labels = self._view_scale() >= LOD_SCALE_THRESHOLD
+        region = visible.adjusted(-CULL_MARGIN, -CULL_MARGIN, CULL_MARGIN, CULL_MARGIN)
+        wanted = {}
+        for key, rect in self._spatial_index.query(region).items():
+            wanted[key] = "full" if show_labels and key[0] != "edge" and rect.intersects(visible) else "shape"
+
+        # 更远的区域：按网格聚合为汇总标记，快速平移时先看到大致轮廓
+        ring = visible.adjusted(-visible.width() * LOD_GLYPH_RING, -visible.height() * LOD_GLYPH_RING,
+                                visible.width() * LOD_GLYPH_RING, visible.height() * LOD_GLYPH_RING)
+        cx0, cx1 = int(ring.left() // LOD_GLYPH_CELL), int(ring.right() // LOD_GLYPH_CELL)
+        cy0, cy1 = int(ring.top() // LOD_GLYPH_CELL), int(ring.bottom() // LOD_GLYPH_CELL)
+        for cell, (rect, _count) in self._glyph_cells.items():
+            if cx0 <= cell[0] <= cx1 and cy0 <= cell[1] <= cy1 and not rect.intersects(region):
+                wanted[("glyph", cell)] = "glyph"
+
+        for key in [k for k, (level, _items) in self._materialized.items() if wanted.get(k) != level]:
+            _level, items = self._materialized.pop(key)
+            for item in items:
+                self.scene.removeItem(item)
+        for key, level in wanted.items():
+            if key not in self._materialized:
+                self._materialized[key] = (level, self._materialize(snapshot, key, level))
+
+    def _materialize(self, snapshot, key, level):
+        """按 key 与细节级别创建图元，返回创建出的图元列表"""
+        kind, ref = key
+        detailed = level == "full"
+        if kind == "box":
+            return self._render_box(snapshot.boxes[ref], detailed=detailed)
+        if kind == "node":
+            return self._render_node(snapshot.nodes[ref], detailed=detailed)
+        if kind == "edge":
+            return self._render_edge(snapshot.edges[ref])
+        rect, count = self._glyph_cells[ref]
+        return self._render_glyph(rect, count)
+
+    def _render_glyph(self, rect: QRectF, count: int):
+        """远处元素的汇总标记：一个浅色方块 + 元素个数"""
+        glyph = QGraphicsRectItem(0, 0, rect.width(), rect.height())
+        glyph.setBrush(self._pool.brush(LOD_GLYPH_COLOR))
+        glyph.setPen(self._pool.pen(Qt.transparent, 0))
+        glyph.setPos(rect.x(), rect.y())
+        self._add_item(glyph)
+        text = f"×{count}"
+        label = QGraphicsTextItem(text)
+        label.setDefaultTextColor(LOD_GLYPH_TEXT_COLOR)
+        label.setFont(self._pool.font("Segoe UI", 10))
+        label_width, label_height = self._pool.text_size(text, "Segoe UI", 10)
+        label.setPos(rect.center().x() - label_width / 2, rect.center().y() - label_height / 2)
+        self._add_item(label)
+        return [glyph, label]
+
+    @staticmethod
+    def opengl_available() -> bool:
+        """探测当前进程能否创建 OpenGL 上下文（无 GPU 且未启用软件渲染时返回 False）"""
+        try:
+            context = QOpenGLContext()
+            if not context.create():
+                return False
+            surface = QOffscreenSurface()
+            surface.setFormat(context.format())
+            surface.create()
+            ok = context.makeCurrent(surface)
+            context.doneCurrent()
+            return bool(ok)
+        except Exception:
+            return False
+
+    def is_opengl_enabled(self) -> bool:
+        return self._opengl_enabled
+
+    def set_opengl_enabled(self, enabled: bool) -> bool:
+        """切换 QOpenGLWidget / 光栅视口；无法创建 OpenGL 上下文时保持光栅并返回 False"""
+        enabled = bool(enabled)
+        if enabled == self._opengl_enabled:
+            return True
+        if enabled:
+            if not self.opengl_available():
+                return False
+            fmt = QSurfaceFormat()
+            fmt.setSamples(4)  # 多重采样抗锯齿，替代光栅下的 Antialiasing 开销
+            viewport = QOpenGLWidget()
+            viewport.setFormat(fmt)
+            self.view.setViewport(viewport)
+            # QOpenGLWidget 每帧整体交换缓冲，局部更新反而需要额外的区域计算
+            self.view.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        else:
+            self.view.setViewport(QWidget())
+            # 光栅视口只重绘脏区域
+            self.view.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        # 新视口不会继承旧视口上的事件过滤器：重新安装，否则 Ctrl+滚轮缩放与尺寸同步失效
+        self._watch_viewport()
+        self.view.setCacheMode(QGraphicsView.CacheBackground)
+        self.view.resetCachedContent()
+        self._opengl_enabled = enabled
+        if self.current_snapshot is not None:
+            self.view.viewport().update()
+        return True
 
     # animator proxies
     def animator_play(self): self.animator.play()
@@ -250,21 +782,24 @@ class Canvas(QObject):
         if not snapshot:
             return
 
-        # 按真实视口尺寸居中，并整体上移一点
+        # 按真实视口尺寸居中，并整体上移一点；居中与“拉回非负区域”合并为一次平移
         canvas_w = self.view.viewport().width() or self.view.width() or 1280
         canvas_h = self.view.viewport().height() or self.view.height() or 720
-        snapshot = center_snapshot(snapshot, canvas_w, canvas_h, margin=40, bias_y=-160)
-        # 若内容过宽导致左边界变成负数，拉回到非负区域，便于滚动查看
         bounds = self._snapshot_bounds(snapshot)
+        center_dx, center_dy = center_offset(
+            None if bounds.isNull() else (bounds.left(), bounds.top(), bounds.right(), bounds.bottom()),
+            canvas_w, canvas_h, margin=40, bias_y=-160)
+        bounds.translate(center_dx, center_dy)
+        # 若内容过宽导致左边界变成负数，拉回到非负区域，便于滚动查看
+        dx = 0.0
+        dy = 0.0
         if not bounds.isNull():
-            dx = 0.0
-            dy = 0.0
             if bounds.left() < 20:
                 dx = 20 - bounds.left()
             if bounds.top() < 20:
                 dy = 20 - bounds.top()
-            if dx or dy:
-                snapshot = self._shift_snapshot(snapshot, dx, dy)
+        self._view_transform = QTransform.fromTranslate(center_dx + dx, center_dy + dy)
+        self._content_root.setTransform(self._view_transform)
         
         # 清除现有内容
         self.clear_scene()
@@ -294,23 +829,19 @@ class Canvas(QObject):
         # 说明文字按需求布局：结构提示左上；步骤/比较/历史依次占据右上
         self._layout_labels()
         
-        # 渲染方框（用于数组等）
-        for box in snapshot.boxes:
-            self._render_box(box)
-        
-        # 渲染节点
-        for node in snapshot.nodes:
-            self._render_node(node)
-        
-        # 渲染边
-        for edge in snapshot.edges:
-            self._render_edge(edge)
+        # 渲染方框（用于数组等）、节点和边；元素过多时按视口做细节层次
+        self._lod_active = self._is_lod_active(snapshot)
+        self._render_elements(snapshot)
 
         # 动态调整 sceneRect：至少覆盖视口；同时覆盖所有内容范围，以支持滚动条
         try:
             items_rect = self.scene.itemsBoundingRect()
         except Exception:
             items_rect = QRectF()
+        # 裁剪模式下场景里只有视口附近的图元，需要用快照包围盒保证滚动范围覆盖全部内容
+        if self._lod_active and not bounds.isNull():
+            content_rect = bounds.translated(dx, dy)  # bounds 已包含居中平移
+            items_rect = items_rect.united(content_rect) if not items_rect.isNull() else content_rect
         pad = 60
         if not items_rect.isNull():
             items_rect = items_rect.adjusted(-pad, -pad, pad, pad)
@@ -330,140 +861,144 @@ class Canvas(QObject):
         
         # 存储当前快照
         self.current_snapshot = snapshot
+        self.snapshot_rendered.emit(snapshot, QTransform(self._view_transform))
+        self.viewport_changed.emit(self._visible_scene_rect())
 
-    def _render_box(self, box):
-        """渲染方框"""
+    def _render_box(self, box, detailed=True):
+        """渲染方框（detailed=False 时只画方框，不创建文字）"""
         # 创建方框
         rect = QGraphicsRectItem(0, 0, box.width, box.height)
-        rect.setBrush(QBrush(QColor(box.color)))
+        rect.setBrush(self._pool.brush(box.color))
         # 支持可选边框样式（用于更简洁的组件，比如链表节点）
         border_color = getattr(box, "border_color", None)
         border_width = getattr(box, "border_width", 1)
         if border_color is not None:
-            rect.setPen(QPen(QColor(border_color), border_width))
+            rect.setPen(self._pool.pen(border_color, border_width))
         else:
-            rect.setPen(QPen(Qt.black, 1))
+            rect.setPen(self._pool.pen(Qt.black, 1))
         rect.setPos(box.x, box.y)
+        if not detailed:
+            self._add_item(rect)
+            return [rect]
         
         # 创建文本标签
         label = QGraphicsTextItem(box.value)
         # 使用text_color参数，如果没有则使用默认颜色
         text_color = getattr(box, 'text_color', '#000000')
-        label.setDefaultTextColor(QColor(text_color))
+        label.setDefaultTextColor(self._pool.color(text_color))
         # 下标（index_）字号更小；特定徽章（top/栈底/root）缩小以避免拥挤
-        font = QFont("Segoe UI", 13)
+        font_size = 13
         box_id = getattr(box, "id", "")
         if box_id.startswith("index_"):
-            font.setPointSize(7)
+            font_size = 7
         elif box_id.startswith("balance_"):
-            font.setPointSize(9)
+            font_size = 9
         elif box_id in ("top_indicator", "bottom_indicator", "root_pointer"):
-            font.setPointSize(11)
+            font_size = 11
         elif box_id.startswith("code_badge_"):
             # Huffman 叶子编码徽章：缩小字号，避免二进制溢出方框
-            font.setPointSize(10)
-        font.setWeight(QFont.Medium)
-        label.setFont(font)
-        # 居中显示文本
-        label_width = label.boundingRect().width()
-        label_height = label.boundingRect().height()
+            font_size = 10
+        label.setFont(self._pool.font("Segoe UI", font_size, QFont.Medium))
+        # 居中显示文本（尺寸按 文本+字体 缓存，不必每帧重新测量）
+        label_width, label_height = self._pool.text_size(box.value, "Segoe UI", font_size, QFont.Medium)
         label.setPos(box.x + (box.width - label_width)/2, 
                     box.y + (box.height - label_height)/2)
         
         # 添加到场景
-        self.scene.addItem(rect)
-        self.scene.addItem(label)
+        self._add_item(rect)
+        self._add_item(label)
+        return [rect, label]
 
-    def _render_node(self, node):
+    def _render_node(self, node, detailed=True):
         """渲染节点"""
         if node.node_type == "box":
-            self._render_box_node(node)
-        else:
-            self._render_circle_node(node)
+            return self._render_box_node(node, detailed)
+        return self._render_circle_node(node, detailed)
 
-    def _render_circle_node(self, node):
-        """渲染圆形节点"""
+    def _render_circle_node(self, node, detailed=True):
+        """渲染圆形节点（detailed=False 时不创建文字）"""
         diameter = node.width or NODE_RADIUS * 2
         radius = diameter / 2
         circle = QGraphicsEllipseItem(0, 0, diameter, diameter)
-        circle.setBrush(QBrush(QColor(node.color)))
+        circle.setBrush(self._pool.brush(node.color))
         border_color = getattr(node, 'border_color', None)
         border_width = getattr(node, 'border_width', 0)
         if border_color:
-            circle.setPen(QPen(QColor(border_color), border_width or 2))
+            circle.setPen(self._pool.pen(border_color, border_width or 2))
         else:
-            pen = QPen(Qt.transparent, 0)
-            circle.setPen(pen)
+            circle.setPen(self._pool.pen(Qt.transparent, 0))
         circle.setPos(node.x - radius, node.y - radius)
+        if not detailed:
+            self._add_item(circle)
+            return [circle]
         
         label = QGraphicsTextItem(node.value)
-        font = QFont("Segoe UI", 12)
-        font.setWeight(QFont.DemiBold)
-        label.setFont(font)
+        label.setFont(self._pool.font("Segoe UI", 12, QFont.DemiBold))
         value_color = getattr(node, 'text_color', '#FFFFFF')
-        label.setDefaultTextColor(QColor(value_color))
-        label_width = label.boundingRect().width()
-        label_height = label.boundingRect().height()
+        label.setDefaultTextColor(self._pool.color(value_color))
+        label_width, label_height = self._pool.text_size(node.value, "Segoe UI", 12, QFont.DemiBold)
         label.setPos(node.x - label_width/2, node.y - label_height/2)
         
-        self.scene.addItem(circle)
-        self.scene.addItem(label)
+        self._add_item(circle)
+        self._add_item(label)
+        items = [circle, label]
         
         sub_label = getattr(node, 'sub_label', None)
         if sub_label:
             sub_item = QGraphicsTextItem(sub_label)
-            sub_font = QFont("Segoe UI", 10)
-            sub_font.setWeight(QFont.Medium)
-            sub_item.setFont(sub_font)
+            sub_item.setFont(self._pool.font("Segoe UI", 10, QFont.Medium))
             sub_color = getattr(node, 'sub_label_color', '#1f4e79')
-            sub_item.setDefaultTextColor(QColor(sub_color))
-            sub_width = sub_item.boundingRect().width()
+            sub_item.setDefaultTextColor(self._pool.color(sub_color))
+            sub_width, _sub_height = self._pool.text_size(sub_label, "Segoe UI", 10, QFont.Medium)
             sub_item.setPos(node.x - sub_width/2, node.y + radius - 2)
-            self.scene.addItem(sub_item)
+            self._add_item(sub_item)
+            items.append(sub_item)
+        return items
 
-    def _render_box_node(self, node):
-        """渲染方框节点（用于二叉树）"""
+    def _render_box_node(self, node, detailed=True):
+        """渲染方框节点（用于二叉树；detailed=False 时省略连接点与文字）"""
         # 主方框
         main_box = QGraphicsRectItem(0, 0, node.width or BOX_NODE_WIDTH, node.height or BOX_NODE_HEIGHT)
-        main_box.setBrush(QBrush(QColor(node.color)))
+        main_box.setBrush(self._pool.brush(node.color))
         
         # 支持边框颜色（用于失衡节点高亮）
         border_color = getattr(node, 'border_color', None)
         border_width = getattr(node, 'border_width', 2)
         if border_color:
-            main_box.setPen(QPen(QColor(border_color), border_width))
+            main_box.setPen(self._pool.pen(border_color, border_width))
         else:
-            main_box.setPen(QPen(Qt.black, border_width))
+            main_box.setPen(self._pool.pen(Qt.black, border_width))
         
         main_box.setPos(node.x - (node.width or BOX_NODE_WIDTH)/2, node.y - (node.height or BOX_NODE_HEIGHT)/2)
+        if not detailed:
+            self._add_item(main_box)
+            return [main_box]
         
         # 左连接点
         left_box = QGraphicsRectItem(0, 0, 20, 20)
-        left_box.setBrush(QBrush(QColor("#FF6B6B")))
-        left_box.setPen(QPen(Qt.black, 1))
+        left_box.setBrush(self._pool.brush("#FF6B6B"))
+        left_box.setPen(self._pool.pen(Qt.black, 1))
         left_box.setPos(node.x - (node.width or BOX_NODE_WIDTH)/2 - 10, node.y - 10)
         
         # 右连接点
         right_box = QGraphicsRectItem(0, 0, 20, 20)
-        right_box.setBrush(QBrush(QColor("#4ECDC4")))
-        right_box.setPen(QPen(Qt.black, 1))
+        right_box.setBrush(self._pool.brush("#4ECDC4"))
+        right_box.setPen(self._pool.pen(Qt.black, 1))
         right_box.setPos(node.x + (node.width or BOX_NODE_WIDTH)/2 - 10, node.y - 10)
         
         # 文本标签
         label = QGraphicsTextItem(node.value)
-        font = QFont("Segoe UI", 12)
-        font.setWeight(QFont.DemiBold)
-        label.setFont(font)
-        label.setDefaultTextColor(DEFAULT_TEXT_COLOR)
-        label_width = label.boundingRect().width()
-        label_height = label.boundingRect().height()
+        label.setFont(self._pool.font("Segoe UI", 12, QFont.DemiBold))
+        label.setDefaultTextColor(self._pool.color(DEFAULT_TEXT_COLOR))
+        label_width, label_height = self._pool.text_size(node.value, "Segoe UI", 12, QFont.DemiBold)
         label.setPos(node.x - label_width/2, node.y - label_height/2)
         
         # 添加到场景
-        self.scene.addItem(main_box)
-        self.scene.addItem(left_box)
-        self.scene.addItem(right_box)
-        self.scene.addItem(label)
+        self._add_item(main_box)
+        self._add_item(left_box)
+        self._add_item(right_box)
+        self._add_item(label)
+        return [main_box, left_box, right_box, label]
 
     def _render_edge(self, edge):
         """渲染边"""
@@ -471,15 +1006,22 @@ class Canvas(QObject):
         # 简化实现，假设边包含坐标信息
         if hasattr(edge, 'from_x') and hasattr(edge, 'from_y') and hasattr(edge, 'to_x') and hasattr(edge, 'to_y'):
             line = QGraphicsLineItem(edge.from_x, edge.from_y, edge.to_x, edge.to_y)
-            line.setPen(QPen(QColor(edge.color), 3))
-            self.scene.addItem(line)
+            line.setPen(self._pool.pen(edge.color, 3))
+            self._add_item(line)
+            return [line]
+        return []
 
     def clear_scene(self):
         """清除场景中的所有项目（除了提示标签、比较信息标签、步骤说明标签和操作历史标签）"""
-        items = self.scene.items()
-        for item in items:
-            if item != self.hint_label and item != self.comparison_label and item != self.step_details_label and item != self.operation_history_label:
+        for item in self._content_root.childItems():
+            self.scene.removeItem(item)
+        keep = (self.hint_label, self.comparison_label, self.step_details_label,
+                self.operation_history_label, self._content_root)
+        for item in self.scene.items():
+            if item.parentItem() is None and item not in keep:
                 self.scene.removeItem(item)
+        self._materialized = {}
+        self._batch_item = None
 
     # 保留原有的工具方法，用于向后兼容
     def add_node(self, text: str, pos: QPointF, color=DEFAULT_NODE_COLOR):
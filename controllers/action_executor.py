@@ -3,7 +3,25 @@
 动作执行器模块
 负责将JSON格式的动作转换为控制器方法调用
 """
-from typing import Dict, Any, Tuple
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# 各结构支持的操作及其必需参数（与下方 _execute_* 保持一致）
+ACTION_SCHEMA: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "SequentialList": {"create": ("values",), "insert": ("position", "value"), "delete": ("position",)},
+    "LinkedList": {"create": ("values",), "insert": ("position", "value"), "delete": ("position",)},
+    "Stack": {"create": (), "push": ("value",), "pop": ()},
+    "BinaryTree": {
+        "create": ("values",), "build": ("values",), "build_level": ("values",),
+        "build_level_order": ("values",), "level_build": ("values",),
+        "insert": ("value", "parent_value", "position"), "delete": ("value",),
+    },
+    "BST": {"create": ("values",), "build": ("values",), "insert": ("value",),
+            "search": ("value",), "delete": ("value",)},
+    "AVL": {"create": ("values",), "insert": ("value",), "clear": ()},
+    "HuffmanTree": {"build": ("frequencies",)},
+}
 
 
 class ActionExecutor:
@@ -34,6 +52,10 @@ class ActionExecutor:
             (成功标志, 消息文本)
         """
         try:
+            # 只有一步的计划 {"actions": [动作]} 按单个动作执行
+            plan = self.plan_actions(action)
+            if len(plan) == 1 and isinstance(plan[0], dict):
+                action = plan[0]
             structure_type = action.get("structure_type")
             operation = action.get("operation")
             parameters = action.get("parameters", {})
@@ -68,6 +90,97 @@ class ActionExecutor:
         except Exception as e:
             return False, f"执行失败: {str(e)}"
     
+    # ========== 多步动作计划 ==========
+    @staticmethod
+    def plan_actions(result: Any) -> List[Dict[str, Any]]:
+        """
+        把 LLM 返回的结果统一成动作列表
+        支持：单个动作对象、{"actions": [...]}、直接的动作数组
+        """
+        if isinstance(result, dict) and "actions" in result:
+            result = result.get("actions")
+        if isinstance(result, dict):
+            return [result]
+        if isinstance(result, list):
+            return list(result)
+        return []
+
+    @staticmethod
+    def validate_action(action: Any) -> Optional[str]:
+        """检查单个动作的结构、操作与必需参数；合法返回 None，否则返回错误说明"""
+        if not isinstance(action, dict):
+            return "动作必须是JSON对象"
+        structure_type = action.get("structure_type")
+        operation = action.get("operation")
+        if not structure_type or not operation:
+            return "缺少structure_type或operation"
+        operations = ACTION_SCHEMA.get(structure_type)
+        if operations is None:
+            return f"不支持的数据结构类型: {structure_type}"
+        if operation not in operations:
+            return f"{structure_type} 不支持的操作: {operation}"
+        params = action.get("parameters", {})
+        if not isinstance(params, dict):
+            return "parameters 必须是JSON对象"
+        missing = [name for name in operations[operation] if params.get(name) in (None, "")]
+        if missing:
+            return f"{structure_type}.{operation} 缺少参数: {', '.join(missing)}"
+        if "values" in operations[operation] and not isinstance(params["values"], list):
+            return "values 必须是数组"
+        if structure_type in ("SequentialList", "LinkedList") and "position" in operations[operation]:
+            try:
+                if int(params["position"]) < 0:
+                    return "position 不能为负数"
+            except (TypeError, ValueError):
+                return f"position 必须是整数: {params['position']}"
+        if structure_type == "BinaryTree" and operation == "insert" and params["position"] not in ("left", "right"):
+            return "二叉树插入的 position 只能是 left 或 right"
+        return None
+
+    def validate_plan(self, actions: List[Dict[str, Any]]) -> List[str]:
+        """执行前整体校验计划，返回所有错误（带步骤序号）；空列表表示可以执行"""
+        if not actions:
+            return ["动作计划为空"]
+        errors = []
+        for index, action in enumerate(actions, 1):
+            error = self.validate_action(action)
+            if error:
+                errors.append(f"第 {index} 步: {error}")
+        return errors
+
+    def execute_plan(
+        self,
+        result: Any,
+        progress_callback=None,
+        finished_callback=None,
+    ) -> Tuple[bool, str]:
+        """
+        执行一次 LLM 请求得到的动作计划：先整体校验，任何一步不合法都不执行；
+        合法后交给顺序执行器逐步执行（等待每一步动画结束再执行下一步）
+
+        Args:
+            result: 单个动作或 {"actions": [...]}
+            progress_callback: (序号, 总数, 成功标志, 描述) 每步执行后回调
+            finished_callback: (成功数, 失败数, 描述列表) 全部结束后回调
+
+        Returns:
+            (是否已开始执行, 消息文本)
+        """
+        actions = self.plan_actions(result)
+        errors = self.validate_plan(actions)
+        if errors:
+            return False, "动作计划校验失败，未执行任何步骤：\n" + "\n".join(errors)
+
+        steps = [
+            (json.dumps(action, ensure_ascii=False), lambda action=action: self.execute_action(action))
+            for action in actions
+        ]
+        try:
+            self.controller.dsl_executor.execute_steps_sequential(steps, progress_callback, finished_callback)
+        except RuntimeError as e:
+            return False, str(e)
+        return True, f"已开始按顺序执行 {len(actions)} 个动作"
+
     def _execute_sequential_list(self, operation: str, params: Dict) -> Tuple[bool, str]:
         """执行顺序表操作"""
         if operation == "create":
@@ -4,8 +4,77 @@
 """
 import copy
 import math
+from array import array
 from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+
+from structures.base import TrackedObject
+
+try:
+    import numpy as np  # 可选：有 numpy 时几何运算在数组视图上整体完成
+except ImportError:
+    np = None
+
+class FrozenSnapshotError(AttributeError):
+    """修改已冻结的快照时抛出"""
+
+
+class _Freezable:
+    """
+    快照类型的“构建后冻结”支持：适配器构建期间可以自由赋值（包括动态属性），
+    freeze() 之后只读，多个消费者可以直接共享同一份快照而无需防御性拷贝。
+    冻结是把实例的类换成只读子类实现的：构建期间的赋值仍是普通数据类的速度。
+    """
+    _frozen = False
+
+    def _set_frozen(self, frozen: bool):
+        if frozen != self._frozen:
+            cls = _frozen_variant(type(self)) if frozen else type(self)._mutable_class
+            object.__setattr__(self, "__class__", cls)
+
+    def _thawed(self):
+        """未冻结时返回自身，冻结时返回一份可修改的浅拷贝"""
+        if not self._frozen:
+            return self
+        clone = self._mutable_class.__new__(self._mutable_class)
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+
+_FROZEN_VARIANTS: Dict[type, type] = {}
+
+
+def _frozen_variant(cls: type) -> type:
+    """cls 的只读子类（同名，按类缓存）；isinstance 判断与字段都不变"""
+    variant = _FROZEN_VARIANTS.get(cls)
+    if variant is not None:
+        return variant
+
+    def __setattr__(self, name, value):
+        raise FrozenSnapshotError(f"{cls.__name__} 已冻结，不能修改 {name}（需要修改请先 mutable_copy()）")
+
+    def __delattr__(self, name):
+        raise FrozenSnapshotError(f"{cls.__name__} 已冻结，不能删除 {name}")
+
+    def __eq__(self, other):
+        # 数据类生成的 __eq__ 要求两边类完全相同：冻结与未冻结的同值实例也应相等
+        if not isinstance(other, cls):
+            return NotImplemented
+        return all(getattr(self, f.name) == getattr(other, f.name) for f in fields(cls))
+
+    variant = type(cls.__name__, (cls,), {
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "_frozen": True,
+        "_mutable_class": cls,
+        "__setattr__": __setattr__,
+        "__delattr__": __delattr__,
+        "__eq__": __eq__,
+        "__hash__": None,
+    })
+    _FROZEN_VARIANTS[cls] = variant
+    return variant
+
 
 # 简单的Node类用于适配器
 class Node:
@@ -20,7 +89,7 @@ class Node:
         self.right = right
 
 @dataclass
-class NodeSnapshot:
+class NodeSnapshot(_Freezable):
     """节点快照"""
     id: str
     value: str
@@ -37,7 +106,7 @@ class NodeSnapshot:
     sub_label_color: str = "#1f4e79"
 
 @dataclass
-class EdgeSnapshot:
+class EdgeSnapshot(_Freezable):
     """边快照"""
     from_id: str
     to_id: str
@@ -45,7 +114,7 @@ class EdgeSnapshot:
     arrow_type: str = "line"  # "line" 或 "arrow"
 
 @dataclass
-class BoxSnapshot:
+class BoxSnapshot(_Freezable):
     """方框快照（用于数组等）"""
     id: str
     value: str
@@ -57,7 +126,7 @@ class BoxSnapshot:
     text_color: str = "#000000"  # 文字颜色，默认为黑色
 
 @dataclass
-class StructureSnapshot:
+class StructureSnapshot(_Freezable):
     """数据结构快照"""
     nodes: List[NodeSnapshot] = None
     edges: List[EdgeSnapshot] = None
@@ -65,6 +134,7 @@ class StructureSnapshot:
     hint_text: str = ""
     step_details: List[str] = None  # 添加详细步骤说明
     operation_history: List[str] = None  # 添加操作历史记录
+    kind: str = ""  # 数据结构类型（如 "BST"），画布据此选择渲染方式
     
     def __post_init__(self):
         if self.nodes is None:
@@ -77,6 +147,128 @@ class StructureSnapshot:
             self.step_details = []
         if self.operation_history is None:
             self.operation_history = []
+        self._geometry = None
+
+    @property
+    def is_frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> "StructureSnapshot":
+        """冻结快照及其所有元素；列表字段转为元组，几何数组预先收集并随快照共享（冻结后不会过期）"""
+        if self._frozen:
+            return self
+        for item in (*self.nodes, *self.edges, *self.boxes):
+            item._set_frozen(True)
+        for name in ("nodes", "edges", "boxes", "step_details", "operation_history"):
+            object.__setattr__(self, name, tuple(getattr(self, name)))
+        self.geometry()
+        self._set_frozen(True)
+        return self
+
+    def mutable_copy(self) -> "StructureSnapshot":
+        """写时复制：返回一份可修改的深拷贝（原快照保持不变）"""
+        clone = copy.deepcopy(self)
+        for item in (*clone.nodes, *clone.edges, *clone.boxes):
+            item._set_frozen(False)
+        for name in ("nodes", "edges", "boxes", "step_details", "operation_history"):
+            object.__setattr__(clone, name, list(getattr(clone, name)))
+        object.__setattr__(clone, "_geometry", None)
+        clone._set_frozen(False)
+        return clone
+
+    def geometry(self) -> "SnapshotGeometry":
+        """
+        快照几何的连续数组（包围盒等整体运算用）。元素字段始终是唯一的数据来源：
+        冻结的快照只收集一次并缓存，未冻结的快照每次按当前字段重新收集，不会过期
+        """
+        if self._geometry is not None:
+            return self._geometry
+        geometry = SnapshotGeometry(self)
+        if self._frozen:
+            object.__setattr__(self, "_geometry", geometry)
+        return geometry
+
+    def translate(self, dx: float, dy: float) -> "StructureSnapshot":
+        """整体平移所有元素（冻结的快照不可平移；只需显示位置时用视图变换代替）"""
+        if self._frozen:
+            raise FrozenSnapshotError("StructureSnapshot 已冻结，不能平移（需要修改请先 mutable_copy()）")
+        if dx == 0 and dy == 0:
+            return self
+        # 未冻结的快照里可能有共享的冻结元素（如过渡引擎的静止元素）：写时复制
+        nodes, boxes, edges = self.nodes, self.boxes, self.edges
+        for i, node in enumerate(nodes):
+            if node._frozen:
+                node = nodes[i] = node._thawed()
+            node.x += dx
+            node.y += dy
+        for i, box in enumerate(boxes):
+            if box._frozen:
+                box = boxes[i] = box._thawed()
+            box.x += dx
+            box.y += dy
+        for i, edge in enumerate(edges):
+            if edge._frozen:
+                edge = edges[i] = edge._thawed()
+            if getattr(edge, "from_x", None) is not None:
+                edge.from_x += dx
+            if getattr(edge, "to_x", None) is not None:
+                edge.to_x += dx
+            if getattr(edge, "from_y", None) is not None:
+                edge.from_y += dy
+            if getattr(edge, "to_y", None) is not None:
+                edge.to_y += dy
+        return self
+
+
+class SnapshotGeometry:
+    """
+    快照几何的扁平数组表示：
+    - rects：每个节点/方框 4 个数 (x0, y0, x1, y1)
+    - points：每个边端点 2 个数 (x, y)
+    约定与 center_snapshot 一致：NodeSnapshot 的 x,y 为中心，BoxSnapshot 的 x,y 为左上角。
+    只读：由快照元素收集而来，包围盒在数组上整体完成；安装了 numpy 时直接在缓冲区上做向量运算。
+    """
+
+    def __init__(self, snapshot: "StructureSnapshot"):
+        rects = array("d")
+        points = array("d")
+        for node in snapshot.nodes:
+            width = node.width if node.width is not None else 40
+            height = node.height if node.height is not None else 40
+            rects.extend((node.x - width / 2, node.y - height / 2, node.x + width / 2, node.y + height / 2))
+        for box in snapshot.boxes:
+            rects.extend((box.x, box.y, box.x + box.width, box.y + box.height))
+        for edge in snapshot.edges:
+            for x_attr, y_attr in (("from_x", "from_y"), ("to_x", "to_y")):
+                x = getattr(edge, x_attr, None)
+                y = getattr(edge, y_attr, None)
+                if x is not None and y is not None:
+                    points.extend((x, y))
+        self.rects = rects
+        self.points = points
+
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """返回 (min_x, min_y, max_x, max_y)；没有可视元素时返回 None"""
+        if not self.rects and not self.points:
+            return None
+        if np is not None:
+            xs = []
+            ys = []
+            if self.rects:
+                r = np.frombuffer(self.rects, dtype=np.float64).reshape(-1, 4)
+                xs += [r[:, 0].min(), r[:, 2].max()]
+                ys += [r[:, 1].min(), r[:, 3].max()]
+            if self.points:
+                p = np.frombuffer(self.points, dtype=np.float64).reshape(-1, 2)
+                xs += [p[:, 0].min(), p[:, 0].max()]
+                ys += [p[:, 1].min(), p[:, 1].max()]
+            return float(min(xs)), float(min(ys)), float(max(xs)), float(max(ys))
+        rects, points = self.rects, self.points
+        min_x = min(min(rects[0::4], default=math.inf), min(points[0::2], default=math.inf))
+        min_y = min(min(rects[1::4], default=math.inf), min(points[1::2], default=math.inf))
+        max_x = max(max(rects[2::4], default=-math.inf), max(points[0::2], default=-math.inf))
+        max_y = max(max(rects[3::4], default=-math.inf), max(points[1::2], default=-math.inf))
+        return min_x, min_y, max_x, max_y
 
 
 def _fmt_int(value) -> str:
@@ -93,60 +285,23 @@ def _fmt_int(value) -> str:
         return str(value)
 
 
-def center_snapshot(snapshot: StructureSnapshot,
-                    canvas_width: float = 1280,
-                    canvas_height: float = 720,
-                    margin: float = 40,
-                    bias_x: float = 0.0,
-                    bias_y: float = 0.0) -> StructureSnapshot:
+def center_offset(bounds: Optional[Tuple[float, float, float, float]],
+                  canvas_width: float = 1280,
+                  canvas_height: float = 720,
+                  margin: float = 40,
+                  bias_x: float = 0.0,
+                  bias_y: float = 0.0) -> Tuple[float, float]:
     """
-    调整快照内所有元素的位置，使其在指定画布范围内居中显示。
+    根据内容包围盒 (min_x, min_y, max_x, max_y) 计算居中所需的平移量。
     bias_x / bias_y 用于整体偏移（负值上移/左移）。
-    仅修改传入的 snapshot 并返回引用，方便链式调用。
     """
-    if snapshot is None:
-        return snapshot
-
-    min_x = float('inf')
-    min_y = float('inf')
-    max_x = float('-inf')
-    max_y = float('-inf')
-
-    def _include_rect(x0: float, y0: float, w: float, h: float):
-        nonlocal min_x, min_y, max_x, max_y
-        min_x = min(min_x, x0)
-        min_y = min(min_y, y0)
-        max_x = max(max_x, x0 + w)
-        max_y = max(max_y, y0 + h)
-
-    def _include_point(x: Optional[float], y: Optional[float]):
-        if x is None or y is None:
-            return
-        _include_rect(x, y, 0, 0)
-
-    # 记录节点和方框的范围
-    # 约定：NodeSnapshot 的 x,y 为节点中心坐标（无论 circle 还是 box）；BoxSnapshot 的 x,y 为左上角
-    for node in snapshot.nodes:
-        width = node.width if node.width is not None else 40
-        height = node.height if node.height is not None else 40
-        _include_rect(node.x - width / 2, node.y - height / 2, width, height)
-
-    for box in snapshot.boxes:
-        _include_rect(box.x, box.y, box.width, box.height)
-
-    # 边只包含线段坐标，按端点纳入边界
-    for edge in snapshot.edges:
-        _include_point(getattr(edge, "from_x", None), getattr(edge, "from_y", None))
-        _include_point(getattr(edge, "to_x", None), getattr(edge, "to_y", None))
-
-    if min_x == float('inf') or min_y == float('inf'):
-        # 没有任何可视元素，直接返回
-        return snapshot
-
+    if bounds is None:
+        return 0.0, 0.0
+    min_x, min_y, max_x, max_y = bounds
     content_width = max_x - min_x
     content_height = max_y - min_y
     if content_width == 0 and content_height == 0:
-        return snapshot
+        return 0.0, 0.0
 
     canvas_center_x = canvas_width / 2.0 + bias_x
     canvas_center_y = canvas_height / 2.0 + bias_y
@@ -169,81 +324,162 @@ def center_snapshot(snapshot: StructureSnapshot,
 
     offset_x = _clamp_offset(offset_x, min_x, max_x, margin, canvas_width - margin)
     offset_y = _clamp_offset(offset_y, min_y, max_y, margin, canvas_height - margin)
+    return offset_x, offset_y
 
-    for node in snapshot.nodes:
-        node.x += offset_x
-        node.y += offset_y
-
-    for box in snapshot.boxes:
-        box.x += offset_x
-        box.y += offset_y
 
-    for edge in snapshot.edges:
-        if hasattr(edge, "from_x") and edge.from_x is not None:
-            edge.from_x += offset_x
-        if hasattr(edge, "to_x") and edge.to_x is not None:
-            edge.to_x += offset_x
-        if hasattr(edge, "from_y") and edge.from_y is not None:
-            edge.from_y += offset_y
-        if hasattr(edge, "to_y") and edge.to_y is not None:
-            edge.to_y += offset_y
-
-    return snapshot
+def center_snapshot(snapshot: StructureSnapshot,
+                    canvas_width: float = 1280,
+                    canvas_height: float = 720,
+                    margin: float = 40,
+                    bias_x: float = 0.0,
+                    bias_y: float = 0.0) -> StructureSnapshot:
+    """
+    调整快照内所有元素的位置，使其在指定画布范围内居中显示。
+    bias_x / bias_y 用于整体偏移（负值上移/左移）。
+    未冻结的 snapshot 直接修改并返回引用；已冻结的快照写时复制，返回居中后的新快照。
+    只需要显示位置时，优先用 center_offset 得到平移量并在渲染时应用。
+    """
+    if snapshot is None:
+        return snapshot
+    if snapshot.is_frozen:
+        snapshot = snapshot.mutable_copy()
+    # 约定：NodeSnapshot 的 x,y 为节点中心坐标（无论 circle 还是 box）；BoxSnapshot 的 x,y 为左上角
+    offset_x, offset_y = center_offset(snapshot.geometry().bounds(), canvas_width, canvas_height,
+                                       margin, bias_x, bias_y)
+    return snapshot.translate(offset_x, offset_y)
 
 class SequentialListAdapter:
     """顺序表适配器"""
     
+    # 当前动画的过渡缓存：(动画签名, SnapshotMorph)，同一次插入/删除的各帧共用
+    _morph_cache = (None, None)
+    
+    # 自动换行布局参数（水平间距保持不变；通过 row_gap 增大行距）
+    CANVAS_WIDTH = 1200  # 画布宽度
+    ROW_GAP = 80  # 行间距（仅影响垂直方向，提升清晰度）
+    
+    @staticmethod
+    def _slot_position(index, start_x, y, box_width, box_height):
+        """第 index 个槽位的左上角坐标（自动换行）"""
+        elements_per_row = max(1, SequentialListAdapter.CANVAS_WIDTH // box_width)  # 每行最多元素数量
+        row = index // elements_per_row
+        col = index % elements_per_row
+        return start_x + col * box_width, y + 100 + row * (box_height + SequentialListAdapter.ROW_GAP)
+    
     @staticmethod
     def to_snapshot(sequential_list, start_x=100, y=200, box_width=88, box_height=56) -> StructureSnapshot:
         """将顺序表转换为快照"""
+        animation_state = getattr(sequential_list, '_animation_state', None)
+        if animation_state not in ('inserting', 'deleting'):
+            return SequentialListAdapter._keyframe(sequential_list, 0.0, start_x, y, box_width, box_height)
+        
+        # 插入/删除动画：两端关键帧只在动画开始时布局一次，中间帧由过渡引擎插值
+        # 签名只看内容（元素标识已能区分不同的表），后台线程每帧拿到的模型副本也能命中
+        list_uids = tuple(sequential_list.data.iter_uids())
+        key = (
+            animation_state,
+            getattr(sequential_list, '_insert_position', 0), getattr(sequential_list, '_delete_position', 0),
+            getattr(sequential_list, '_new_uid', None), getattr(sequential_list, '_new_value', None),
+            list_uids, start_x, y, box_width, box_height,
+        )
+        cached_key, morph = SequentialListAdapter._morph_cache
+        if cached_key != key:
+            from .morph import SnapshotMorph
+            morph = SnapshotMorph(
+                SequentialListAdapter._keyframe(sequential_list, 0.0, start_x, y, box_width, box_height),
+                SequentialListAdapter._keyframe(sequential_list, 1.0, start_x, y, box_width, box_height),
+                easing="linear",  # 与逐帧布局时的匀速移动一致
+            )
+            SequentialListAdapter._morph_cache = (key, morph)
+        
+        animation_progress = getattr(sequential_list, '_animation_progress', 0.0)
+        snapshot = morph.frame(animation_progress)
+        
+        # 按阶段显隐的提示（移动箭头、被删除元素）不参与插值，逐帧追加
+        list_size = len(list_uids)
+        def slot(i):
+            return SequentialListAdapter._slot_position(i, start_x, y, box_width, box_height)
+        if animation_state == 'inserting':
+            insert_position = getattr(sequential_list, '_insert_position', 0)
+            if getattr(sequential_list, '_new_value', None) is not None and animation_progress < 0.8:
+                # 添加移动箭头（动画快结束时隐藏箭头）
+                for i in range(insert_position, list_size):
+                    original_x, original_y = slot(i)
+                    snapshot.boxes.append(BoxSnapshot(
+                        id=f"arrow_{i}",
+                        value="→",
+                        x=original_x + box_width // 2,
+                        y=original_y + box_height + 10,
+                        width=20,
+                        height=20,
+                        color="#FFA500"
+                    ))
+        elif getattr(sequential_list, '_deleted_value', None) is not None:
+            delete_position = getattr(sequential_list, '_delete_position', 0)
+            if animation_progress < 0.7:  # 动画前70%显示被删除元素
+                delete_x, delete_y = slot(delete_position)
+                snapshot.boxes.append(BoxSnapshot(
+                    id="deleted_element",
+                    value=str(sequential_list._deleted_value),
+                    x=delete_x,
+                    y=delete_y,
+                    width=box_width,
+                    height=box_height,
+                    color="#FF0000",  # 红色表示被删除的元素
+                    text_color="#FFFFFF"
+                ))
+            if animation_progress < 0.8:
+                for i in range(delete_position + 1, list_size):
+                    original_x, original_y = slot(i)
+                    snapshot.boxes.append(BoxSnapshot(
+                        id=f"arrow_{i}",
+                        value="←",
+                        x=original_x - box_width // 2,
+                        y=original_y + box_height + 10,
+                        width=20,
+                        height=20,
+                        color="#FFA500"
+                    ))
+        return snapshot
+    
+    @staticmethod
+    def _keyframe(sequential_list, phase, start_x, y, box_width, box_height) -> StructureSnapshot:
+        """
+        布局一帧：phase=0 为动画起点，phase=1 为动画终点（静止状态下两者相同）
+        元素 id 取自元素标识，同一元素在两端关键帧中 id 一致，过渡引擎据此配对
+        """
         snapshot = StructureSnapshot() # ← 创建：创建 StructureSnapshot 实例
         list_size = sequential_list.length()
         snapshot.hint_text = f"顺序表 (长度: {list_size}, 容量: {sequential_list.get_capacity()})"
-        
-        # 动态数量绘制：根据实际元素数量绘制
-        array_start_x = start_x
-        array_start_y = y + 100  # 数组在标题下方
+        def slot(i):
+            return SequentialListAdapter._slot_position(i, start_x, y, box_width, box_height)
         
         # 获取顺序表内容
         list_data = list(sequential_list.to_list())  # 转换为列表用于索引
+        list_uids = list(sequential_list.data.iter_uids())
         
         # 检查是否在动画中
         animation_state = getattr(sequential_list, '_animation_state', None)
         insert_position = getattr(sequential_list, '_insert_position', 0) if animation_state == 'inserting' else -1
         delete_position = getattr(sequential_list, '_delete_position', 0) if animation_state == 'deleting' else -1
         
-        # 自动换行布局参数（水平间距保持不变；通过 row_gap 增大行距）
-        canvas_width = 1200  # 画布宽度
-        elements_per_row = max(1, canvas_width // box_width)  # 每行最多元素数量
-        row_gap = 80  # 行间距（仅影响垂直方向，提升清晰度）
-        
         # 动态绘制元素（只绘制实际存在的元素）
         for i in range(list_size):
-            # 计算元素位置（自动换行）
-            row = i // elements_per_row
-            col = i % elements_per_row
-            
-            element_x = array_start_x + col * box_width
-            element_y = array_start_y + row * (box_height + row_gap)
-            
-            # 确定方框的值和颜色
+            element_x, element_y = slot(i)
+            box_id = f"array_box_{list_uids[i]}"
             value = str(list_data[i])  # 顺序表按索引顺序显示
             
-            # 如果在插入动画中，且该位置需要后移，则隐藏原位置
-            if animation_state == 'inserting' and i >= insert_position:
-                # 隐藏需要后移的元素（在原位置显示为空白）
-                value = ""
-                color = "#E0E0E0"  # 浅灰色
-            # 如果在删除动画中，且该位置需要前移，则隐藏原位置
-            elif animation_state == 'deleting' and i > delete_position:
-                # 隐藏需要前移的元素（在原位置显示为空白）
+            # 插入动画中需要后移、删除动画中需要前移的元素：原位置显示为空白槽位，元素本身在下面单独绘制
+            if (animation_state == 'inserting' and i >= insert_position) or \
+                    (animation_state == 'deleting' and i > delete_position):
                 value = ""
                 color = "#E0E0E0"  # 浅灰色
+                box_id = f"array_slot_{i}"
             else:
                 color = "#4C78A8"  # 蓝色
             
-            box = BoxSnapshot(
-                id=f"array_box_{i}",
+            snapshot.boxes.append(BoxSnapshot(
+                id=box_id,
                 value=value,
                 x=element_x,
                 y=element_y,
@@ -252,18 +488,12 @@ class SequentialListAdapter:
                 color=color,
                 # 元素值（非下标）统一白字，提高对比度
                 text_color="#FFFFFF"
-            )
-            snapshot.boxes.append(box)
+            ))
         
         # 添加位置索引标签（只显示实际元素的索引）
         for i in range(list_size):
-            row = i // elements_per_row
-            col = i % elements_per_row
-            
-            element_x = array_start_x + col * box_width
-            element_y = array_start_y + row * (box_height + row_gap)
-            
-            index_label = BoxSnapshot(
+            element_x, element_y = slot(i)
+            snapshot.boxes.append(BoxSnapshot(
                 id=f"index_{i}",
                 value=str(i),
                 x=element_x,
@@ -272,177 +502,40 @@ class SequentialListAdapter:
                 height=20,
                 color="#F0F0F0",
                 text_color="#111827"
-            )
-            snapshot.boxes.append(index_label)
+            ))
         
-        # 移除长度红色徽章（不再绘制 length_indicator）
-        
-        # 如果正在插入动画，显示新节点平滑移动到目标位置和元素后移效果
-        animation_state = getattr(sequential_list, '_animation_state', None)
+        # 插入：新元素从屏幕正上方落到目标位置，并推动后续元素右移
         if animation_state == 'inserting':
             new_value = getattr(sequential_list, '_new_value', None)
-            animation_progress = getattr(sequential_list, '_animation_progress', 0.0)
-            insert_position = getattr(sequential_list, '_insert_position', 0)
             if new_value is not None:
-                # 计算目标位置（插入位置）- 适应换行布局
-                target_row = insert_position // elements_per_row
-                target_col = insert_position % elements_per_row
-                target_x = array_start_x + target_col * box_width
-                target_y = array_start_y + target_row * (box_height + 30)
-                
-                # 设置目标位置到顺序表对象
-                sequential_list.set_animation_target(target_x, target_y)
-                
-                # 计算起始位置（屏幕正上方）
-                start_x = target_x
-                start_y = 50  # 屏幕正上方
-                
-                # 使用线性插值计算当前位置
-                current_x = start_x + (target_x - start_x) * animation_progress
-                current_y = start_y + (target_y - start_y) * animation_progress
-                
-                # 显示新节点
-                new_node = BoxSnapshot(
-                    id="new_node",
+                target_x, target_y = slot(insert_position)
+                new_uid = getattr(sequential_list, '_new_uid', None)
+                snapshot.boxes.append(BoxSnapshot(
+                    # 与插入完成后的方框同一个 id
+                    id=f"array_box_{new_uid}" if new_uid is not None else "new_node",
                     value=str(new_value),
-                    x=current_x,
-                    y=current_y,
+                    x=target_x,
+                    y=50 + (target_y - 50) * phase,  # 起点在屏幕正上方
                     width=box_width,
                     height=box_height,
                     color="#FF6B6B",  # 红色表示正在移动的节点
                     text_color="#FFFFFF"
-                )
-                snapshot.boxes.append(new_node)
-                
-                # 显示需要后移的元素（插入位置及之后的元素）
+                ))
                 for i in range(insert_position, list_size):
-                    if i < len(list_data):
-                        # 计算后移后的位置（适应换行布局）
-                        original_row = i // elements_per_row
-                        original_col = i % elements_per_row
-                        original_x = array_start_x + original_col * box_width
-                        original_y = array_start_y + original_row * (box_height + 30)
-                        
-                        # 计算后移后的位置
-                        next_row = (i + 1) // elements_per_row
-                        next_col = (i + 1) % elements_per_row
-                        next_x = array_start_x + next_col * box_width
-                        next_y = array_start_y + next_row * (box_height + 30)
-                        
-                        # 使用线性插值计算当前位置
-                        shifted_x = original_x + (next_x - original_x) * animation_progress
-                        shifted_y = original_y + (next_y - original_y) * animation_progress
-                        
-                        # 创建后移的元素
-                        shifted_box = BoxSnapshot(
-                            id=f"shifted_box_{i}",
-                            value=str(list_data[i]),
-                            x=shifted_x,
-                            y=shifted_y,
-                            width=box_width,
-                            height=box_height,
-                            color="#FFA500",  # 橙色表示正在后移的元素
-                            text_color="#FFFFFF"
-                        )
-                        snapshot.boxes.append(shifted_box)
-                        
-                        # 添加移动箭头（只在动画进行中显示）
-                        if animation_progress < 0.8:  # 动画快结束时隐藏箭头
-                            arrow_x = original_x + box_width // 2
-                            arrow_y = original_y + box_height + 10
-                            arrow_box = BoxSnapshot(
-                                id=f"arrow_{i}",
-                                value="→",
-                                x=arrow_x,
-                                y=arrow_y,
-                                width=20,
-                                height=20,
-                                color="#FFA500"
-                            )
-                            snapshot.boxes.append(arrow_box)
-                
-                # 添加插入位置指示器
+                    snapshot.boxes.append(SequentialListAdapter._shifted_box(
+                        list_uids[i], list_data[i], slot(i), slot(i + 1), phase, box_width, box_height))
                 # 不在节点旁绘制“INSERT”提示，改用右下角步骤说明
                 snapshot.step_details.append("顺序表插入：新元素移动到目标位置，并推动后续元素右移")
         
-        # 如果正在删除动画，显示元素向前移动效果
+        # 删除：后续元素前移一位
         elif animation_state == 'deleting':
-            delete_position = getattr(sequential_list, '_delete_position', 0)
-            deleted_value = getattr(sequential_list, '_deleted_value', None)
-            animation_progress = getattr(sequential_list, '_animation_progress', 0.0)
-            
-            if deleted_value is not None:
-                # 计算删除位置（适应换行布局）
-                delete_row = delete_position // elements_per_row
-                delete_col = delete_position % elements_per_row
-                delete_x = array_start_x + delete_col * box_width
-                delete_y = array_start_y + delete_row * (box_height + 30)
-                
-                # 显示被删除的元素（逐渐消失）
-                # 根据动画进度调整透明度效果（通过颜色变化模拟）
-                if animation_progress < 0.7:  # 动画前70%显示被删除元素
-                    delete_box = BoxSnapshot(
-                        id="deleted_element",
-                        value=str(deleted_value),
-                        x=delete_x,
-                        y=delete_y,
-                        width=box_width,
-                        height=box_height,
-                    color="#FF0000",  # 红色表示被删除的元素
-                    text_color="#FFFFFF"
-                    )
-                    snapshot.boxes.append(delete_box)
-                
-                # 显示需要前移的元素（删除位置之后的元素）
+            if getattr(sequential_list, '_deleted_value', None) is not None:
                 for i in range(delete_position + 1, list_size):
-                    if i < len(list_data):
-                        # 计算前移后的位置（适应换行布局）
-                        # 元素从位置i移动到位置i-1
-                        original_row = i // elements_per_row
-                        original_col = i % elements_per_row
-                        original_x = array_start_x + original_col * box_width
-                        original_y = array_start_y + original_row * (box_height + 30)
-                        
-                        # 计算目标位置（i-1的位置）
-                        target_row = (i - 1) // elements_per_row
-                        target_col = (i - 1) % elements_per_row
-                        target_x = array_start_x + target_col * box_width
-                        target_y = array_start_y + target_row * (box_height + 30)
-                        
-                        # 使用线性插值计算当前位置
-                        shifted_x = original_x + (target_x - original_x) * animation_progress
-                        shifted_y = original_y + (target_y - original_y) * animation_progress
-                        
-                        # 创建前移的元素
-                        shifted_box = BoxSnapshot(
-                            id=f"shifted_box_{i}",
-                            value=str(list_data[i]),
-                            x=shifted_x,
-                            y=shifted_y,
-                            width=box_width,
-                            height=box_height,
-                            color="#FFA500",  # 橙色表示正在前移的元素
-                            text_color="#FFFFFF"
-                        )
-                        snapshot.boxes.append(shifted_box)
-                        
-                        # 添加移动箭头（只在动画进行中显示）
-                        if animation_progress < 0.8:  # 动画快结束时隐藏箭头
-                            arrow_x = original_x - box_width // 2
-                            arrow_y = original_y + box_height + 10
-                            arrow_box = BoxSnapshot(
-                                id=f"arrow_{i}",
-                                value="←",
-                                x=arrow_x,
-                                y=arrow_y,
-                                width=20,
-                                height=20,
-                                color="#FFA500"
-                            )
-                            snapshot.boxes.append(arrow_box)
-                
+                    snapshot.boxes.append(SequentialListAdapter._shifted_box(
+                        list_uids[i], list_data[i], slot(i), slot(i - 1), phase, box_width, box_height))
                 # 添加删除位置指示器
-                delete_indicator = BoxSnapshot(
+                delete_x, delete_y = slot(delete_position)
+                snapshot.boxes.append(BoxSnapshot(
                     id="delete_indicator",
                     value="DELETE",
                     x=delete_x,
@@ -450,17 +543,80 @@ class SequentialListAdapter:
                     width=box_width,
                     height=25,
                     color="#FF0000"  # 红色表示删除位置
-                )
-                snapshot.boxes.append(delete_indicator)
+                ))
         
         return snapshot
+    
+    @staticmethod
+    def _shifted_box(uid, value, origin, target, phase, box_width, box_height) -> BoxSnapshot:
+        """正在移动的元素（橙色）：phase=0 在原位置，phase=1 在新位置"""
+        return BoxSnapshot(
+            id=f"array_box_{uid}",
+            value=str(value),
+            x=origin[0] + (target[0] - origin[0]) * phase,
+            y=origin[1] + (target[1] - origin[1]) * phase,
+            width=box_width,
+            height=box_height,
+            color="#FFA500",  # 橙色表示正在移动的元素
+            text_color="#FFFFFF"
+        )
 
 class LinkedListAdapter:
     """链表适配器"""
     
+    # 插入/删除动画的分段点：段内元素集合不变、位移都是进度的线性函数，
+    # 每段只在两端各布局一次，中间帧由过渡引擎插值
+    PHASE_BREAKS = {
+        'inserting': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        'deleting': (0.0, 0.2, 0.4, 0.8, 1.0),
+    }
+    # 关键帧取在段内侧：分段点上的显隐按原来的比较符号归属相邻的段
+    KEYFRAME_INSET = 1e-6
+    # 当前段的过渡缓存：(段签名, SnapshotMorph)
+    _morph_cache = (None, None)
+    
     @staticmethod
     def to_snapshot(linked_list, start_x=100, y=200, node_spacing=150) -> StructureSnapshot:
         """将链表转换为快照"""
+        animation_state = getattr(linked_list, '_animation_state', None)
+        animation_progress = getattr(linked_list, '_animation_progress', 0.0)
+        breaks = LinkedListAdapter.PHASE_BREAKS.get(animation_state)
+        if breaks is None:
+            return LinkedListAdapter._keyframe(linked_list, animation_progress, start_x, y, node_spacing)
+        
+        progress = min(max(animation_progress, 0.0), 1.0)
+        if progress in breaks:
+            # 恰好落在分段点：显隐条件混用了 > 与 >=，直接按该进度布局
+            return LinkedListAdapter._keyframe(linked_list, progress, start_x, y, node_spacing)
+        segment = max(i for i in range(len(breaks) - 1) if breaks[i] <= progress)
+        inset = LinkedListAdapter.KEYFRAME_INSET
+        seg_start, seg_end = breaks[segment] + inset, breaks[segment + 1] - inset
+        # 签名只看内容（元素标识区分不同的表），后台线程每帧拿到的模型副本也能命中
+        items = []
+        current = linked_list.data.head
+        while current:
+            items.append((current.uid, current.val))
+            current = current.next
+        key = (
+            animation_state, segment,
+            getattr(linked_list, '_insert_position', -1), getattr(linked_list, '_delete_position', -1),
+            getattr(linked_list, '_new_uid', None), getattr(linked_list, '_new_value', None),
+            tuple(items), start_x, y, node_spacing,
+        )
+        cached_key, morph = LinkedListAdapter._morph_cache
+        if cached_key != key:
+            from .morph import SnapshotMorph
+            morph = SnapshotMorph(
+                LinkedListAdapter._keyframe(linked_list, seg_start, start_x, y, node_spacing),
+                LinkedListAdapter._keyframe(linked_list, seg_end, start_x, y, node_spacing),
+                easing="linear",
+            )
+            LinkedListAdapter._morph_cache = (key, morph)
+        return morph.frame((progress - seg_start) / (seg_end - seg_start))
+    
+    @staticmethod
+    def _keyframe(linked_list, animation_progress, start_x=100, y=200, node_spacing=150) -> StructureSnapshot:
+        """按给定进度布局一帧（插入/删除动画的分段关键帧，以及其它状态下的整帧）"""
         snapshot = StructureSnapshot()
         snapshot.hint_text = f"链表 (长度: {linked_list.size()})"
 
@@ -478,16 +634,16 @@ class LinkedListAdapter:
         
         # 获取动画状态
         animation_state = getattr(linked_list, '_animation_state', None)
-        animation_progress = getattr(linked_list, '_animation_progress', 0.0)
         
         # 补充取删除参数
         delete_position = getattr(linked_list, '_delete_position', -1) if animation_state == 'deleting' else -1
         is_deleting = animation_state == 'deleting'
         
-        # 生成节点和边快照
+        # 生成节点和边快照（节点 id 取自元素标识，在头部插入时已有节点的 id 不变）
         current = linked_list.data.head  # 访问CustomList的head
         i = 0
         prev_node_id = None
+        node_ids = []  # 位置 -> 节点 id，供插入动画的连线使用
         
         # 检查是否在插入动画中，需要调整后续节点位置
         insert_position = getattr(linked_list, '_insert_position', -1)
@@ -519,6 +675,8 @@ class LinkedListAdapter:
             return base_x
         
         while current:
+            node_id = f"node_{current.uid}"
+            node_ids.append(node_id)
             # 跳过绘制 q（>=0.4 阶段）
             if is_deleting and delete_position == i and animation_progress >= 0.4:
                 # 跳过绘制要删除的节点 q
@@ -526,7 +684,6 @@ class LinkedListAdapter:
                 i += 1
                 continue
             
-            node_id = f"node_{i}"
             
             # 计算节点位置
             if is_deleting:
@@ -667,7 +824,8 @@ class LinkedListAdapter:
                 
                 if animation_progress >= 0.8:
                     # 阶段 4：弧线改回直线
-                    edge = EdgeSnapshot(from_id="", to_id="", arrow_type="arrow")
+                    edge = EdgeSnapshot(from_id=f"{node_ids[p_idx]}_box", to_id=f"{node_ids[succ_idx]}_box",
+                                        arrow_type="arrow")
                     edge.from_x = p_right_x
                     edge.from_y = p_center_y
                     edge.to_x = succ_left_x
@@ -678,14 +836,15 @@ class LinkedListAdapter:
                     # 阶段 2-3：用两段折线模拟弧线 p→mid→succ（mid 在节点上方）
                     mid_x = (p_right_x + succ_left_x) / 2
                     mid_y = y - 60  # 弧线高度，可按需微调
-                    e1 = EdgeSnapshot(from_id="", to_id="", arrow_type="arrow")
+                    # 弧线两段带上端点 id，过渡引擎才能把它们与 succ 一起平移
+                    e1 = EdgeSnapshot(from_id=f"{node_ids[p_idx]}_box", to_id="delete_arc", arrow_type="arrow")
                     e1.from_x = p_right_x
                     e1.from_y = p_center_y
                     e1.to_x = mid_x
                     e1.to_y = mid_y
                     e1.color = "#FF8C00"  # 橙色，表示过渡
                     snapshot.edges.append(e1)
-                    e2 = EdgeSnapshot(from_id="", to_id="", arrow_type="arrow")
+                    e2 = EdgeSnapshot(from_id="delete_arc", to_id=f"{node_ids[succ_idx]}_box", arrow_type="arrow")
                     e2.from_x = mid_x
                     e2.from_y = mid_y
                     e2.to_x = succ_left_x
@@ -697,6 +856,11 @@ class LinkedListAdapter:
         if animation_state == 'building':
             build_values = getattr(linked_list, '_build_values', [])
             build_index = getattr(linked_list, '_build_index', 0)
+            build_uids = getattr(linked_list, '_build_uids', [])
+            
+            def _build_id(idx: int) -> str:
+                """构建中的节点提前使用最终的元素标识，构建完成时 id 不变"""
+                return f"node_{build_uids[idx]}" if idx < len(build_uids) else f"built_node_{idx}"
             
             # 显示已经构建完成的节点
             for i in range(build_index):
@@ -708,7 +872,7 @@ class LinkedListAdapter:
                     
                     # 创建已构建节点的方框
                     node_box = BoxSnapshot(
-                        id=f"built_node_{i}_box",
+                        id=f"{_build_id(i)}_box",
                         value="",
                         x=node_x,
                         y=y,
@@ -721,7 +885,7 @@ class LinkedListAdapter:
                     # 添加分隔线
                     separator_x = node_x + node_width * 0.7
                     separator = BoxSnapshot(
-                        id=f"built_node_{i}_separator",
+                        id=f"{_build_id(i)}_separator",
                         value="",
                         x=separator_x,
                         y=y,
@@ -733,7 +897,7 @@ class LinkedListAdapter:
                     
                     # 左边区域：显示数据值
                     data_box = BoxSnapshot(
-                        id=f"built_node_{i}_data",
+                        id=f"{_build_id(i)}_data",
                         value=str(value),
                         x=node_x + 5,
                         y=y + 5,
@@ -746,7 +910,7 @@ class LinkedListAdapter:
                     
                     # 右边区域：显示箭头
                     arrow_box = BoxSnapshot(
-                        id=f"built_node_{i}_arrow",
+                        id=f"{_build_id(i)}_arrow",
                         value="→",
                         x=separator_x + 5,
                         y=y + 5,
@@ -759,8 +923,8 @@ class LinkedListAdapter:
                     # 添加连接线
                     if i > 0:
                         edge = EdgeSnapshot(
-                            from_id=f"built_node_{i - 1}_box",
-                            to_id=f"built_node_{i}_box",
+                            from_id=f"{_build_id(i - 1)}_box",
+                            to_id=f"{_build_id(i)}_box",
                             arrow_type="arrow"
                         )
                         edge.from_x = start_x + (i - 1) * node_spacing + node_width
@@ -780,7 +944,7 @@ class LinkedListAdapter:
                 
                 # 创建新节点的方框
                 new_node_box = BoxSnapshot(
-                    id=f"building_node_{build_index}_box",
+                    id=f"{_build_id(build_index)}_box",
                     value="",
                     x=new_x,
                     y=new_y,
@@ -793,7 +957,7 @@ class LinkedListAdapter:
                 # 添加分隔线
                 separator_x = new_x + node_width * 0.7
                 separator = BoxSnapshot(
-                    id=f"building_node_{build_index}_separator",
+                    id=f"{_build_id(build_index)}_separator",
                     value="",
                     x=separator_x,
                     y=new_y,
@@ -805,7 +969,7 @@ class LinkedListAdapter:
                 
                 # 左边区域：显示数据值
                 data_box = BoxSnapshot(
-                    id=f"building_node_{build_index}_data",
+                    id=f"{_build_id(build_index)}_data",
                     value=str(new_value),
                     x=new_x + 5,
                     y=new_y + 5,
@@ -818,7 +982,7 @@ class LinkedListAdapter:
                 
                 # 右边区域：显示箭头
                 arrow_box = BoxSnapshot(
-                    id=f"building_node_{build_index}_arrow",
+                    id=f"{_build_id(build_index)}_arrow",
                     value="→",
                     x=separator_x + 5,
                     y=new_y + 5,
@@ -831,8 +995,8 @@ class LinkedListAdapter:
                 # 如果动画进度足够，显示连接线
                 if animation_progress > 0.5 and build_index > 0:
                     edge = EdgeSnapshot(
-                        from_id=f"built_node_{build_index - 1}_box",
-                        to_id=f"building_node_{build_index}_box",
+                        from_id=f"{_build_id(build_index - 1)}_box",
+                        to_id=f"{_build_id(build_index)}_box",
                         arrow_type="arrow"
                     )
                     edge.from_x = start_x + (build_index - 1) * node_spacing + node_width
@@ -845,6 +1009,9 @@ class LinkedListAdapter:
         elif animation_state == 'inserting':
             new_value = getattr(linked_list, '_new_value', None)
             insert_position = getattr(linked_list, '_insert_position', 0)
+            new_uid = getattr(linked_list, '_new_uid', None)
+            # 插入中的节点与落地后的节点共用同一个 id
+            inserting_id = f"node_{new_uid}" if new_uid is not None else "inserting_node"
             
             if new_value is not None:
                 # 计算新节点的位置（先在上方，然后移动到目标位置）
@@ -875,7 +1042,7 @@ class LinkedListAdapter:
                 
                 # 创建新节点的方框
                 new_node_box = BoxSnapshot(
-                    id="inserting_node_box",
+                    id=f"{inserting_id}_box",
                     value="",
                     x=new_x,
                     y=new_y,
@@ -888,7 +1055,7 @@ class LinkedListAdapter:
                 # 添加分隔线
                 separator_x = new_x + node_width * 0.7
                 separator = BoxSnapshot(
-                    id="inserting_node_separator",
+                    id=f"{inserting_id}_separator",
                     value="",
                     x=separator_x,
                     y=new_y,
@@ -900,7 +1067,7 @@ class LinkedListAdapter:
                 
                 # 左边区域：显示数据值
                 data_box = BoxSnapshot(
-                    id="inserting_node_data",
+                    id=f"{inserting_id}_data",
                     value=str(new_value),
                     x=new_x + 5,
                     y=new_y + 5,
@@ -913,7 +1080,7 @@ class LinkedListAdapter:
                 
                 # 右边区域：显示箭头
                 arrow_box = BoxSnapshot(
-                    id="inserting_node_arrow",
+                    id=f"{inserting_id}_arrow",
                     value="→",
                     x=separator_x + 5,
                     y=new_y + 5,
@@ -943,8 +1110,8 @@ class LinkedListAdapter:
                     # 第一阶段：新节点连接到后继节点
                     if insert_position < len(linked_list.data):
                         edge = EdgeSnapshot(
-                            from_id="inserting_node_box",
-                            to_id=f"node_{insert_position}_box",
+                            from_id=f"{inserting_id}_box",
+                            to_id=f"{node_ids[insert_position]}_box",
                             arrow_type="arrow"
                         )
                         edge.from_x = new_x + node_width
@@ -968,8 +1135,8 @@ class LinkedListAdapter:
                     # 第三阶段：前驱节点连接到新节点
                     if insert_position > 0:
                         edge = EdgeSnapshot(
-                            from_id=f"node_{insert_position - 1}_box",
-                            to_id="inserting_node_box",
+                            from_id=f"{node_ids[insert_position - 1]}_box",
+                            to_id=f"{inserting_id}_box",
                             arrow_type="arrow"
                         )
                         edge.from_x = start_x + (insert_position - 1) * node_spacing + node_width
@@ -1024,6 +1191,7 @@ class StackAdapter:
         if stack_size > 0:
             # 获取栈内容并转换为列表（从栈底到栈顶的顺序）
             stack_list = stack.data.to_array()  # 使用to_array方法获取正确的顺序
+            stack_uids = stack.data.uid_array()
             # 出栈动画中：栈顶元素由 pop_node 单独渲染，避免与静态栈顶重叠
             if animation_state == 'popping' and getattr(stack, '_pop_value', None) is not None and len(stack_list) > 0:
                 stack_list = stack_list[:-1]
@@ -1033,7 +1201,7 @@ class StackAdapter:
                 # i=0 为栈底，y 最大（靠下）；i 越大越靠上
                 stack_position_from_bottom = i
                 stack_box = BoxSnapshot(
-                    id=f"stack_box_{i}",
+                    id=f"stack_box_{stack_uids[i]}",
                     value=str(value),
                     x=stack_start_x,
                     y=bottom_element_top_y - stack_position_from_bottom * step_y,
@@ -1113,7 +1281,13 @@ class StackAdapter:
             # “一个接一个落下”的视觉逻辑：
             # - 栈底固定：第一个元素落到 bottom_element_top_y
             # - 后续元素依次落到更上方（bottom_element_top_y - k*step_y）
+            build_uids = getattr(stack, '_build_uids', [])
             total = len(build_values)
+            
+            def _build_id(idx: int, fallback: str) -> str:
+                """构建中的元素提前使用最终的元素标识"""
+                return f"stack_box_{build_uids[idx]}" if idx < len(build_uids) else fallback
+            
             if total > 0:
                 t = max(0.0, float(animation_progress) or 0.0) * total
                 k = int(t)  # 当前正在落下的元素索引
@@ -1128,7 +1302,7 @@ class StackAdapter:
                 for i in range(built_count):
                     value = build_values[i]
                     snapshot.boxes.append(BoxSnapshot(
-                        id=f"built_stack_box_{i}",
+                        id=_build_id(i, f"built_stack_box_{i}"),
                         value=str(value),
                         x=stack_start_x,
                         y=bottom_element_top_y - i * step_y,
@@ -1145,7 +1319,7 @@ class StackAdapter:
                 start_y_pos = float(target_y) - 220.0
                 current_y = start_y_pos + (target_y - start_y_pos) * local
                 snapshot.boxes.append(BoxSnapshot(
-                    id="building_node",
+                    id=_build_id(k, "building_node"),
                     value=str(cur_value),
                     x=stack_start_x,
                     y=current_y,
@@ -1164,9 +1338,6 @@ class StackAdapter:
                 target_x = stack_start_x
                 target_y = bottom_element_top_y - stack_size * step_y
                 
-                # 设置目标位置到栈对象
-                stack.set_animation_target(target_x, target_y)
-                
                 # 计算起始位置：永远从目标位置“上方”开始，保证从上往下压入
                 start_x = stack_start_x
                 start_y = float(target_y) - 220.0
@@ -1175,8 +1346,9 @@ class StackAdapter:
                 current_x = start_x + (target_x - start_x) * animation_progress
                 current_y = start_y + (target_y - start_y) * animation_progress
                 
+                new_uid = getattr(stack, '_new_uid', None)
                 new_node = BoxSnapshot(
-                    id="new_node",
+                    id=f"stack_box_{new_uid}" if new_uid is not None else "new_node",
                     value=str(new_value),
                     x=current_x,
                     y=current_y,
@@ -1204,8 +1376,9 @@ class StackAdapter:
                 current_x = start_x + (target_x - start_x) * animation_progress
                 current_y = start_y + (target_y - start_y) * animation_progress
                 
+                pop_uids = stack.data.uid_array()
                 pop_node = BoxSnapshot(
-                    id="pop_node",
+                    id=f"stack_box_{pop_uids[-1]}" if pop_uids else "pop_node",
                     value=str(pop_value),
                     x=current_x,
                     y=current_y,
@@ -1320,7 +1493,7 @@ class BinaryTreeAdapter:
             return
         
         node_x, node_y = positions[node]
-        node_id = f"node_{id(node)}"
+        node_id = f"node_{node.uid}"
         # 链式二叉树节点尺寸（与节点快照一致）
         node_w = 72
         node_h = 48
@@ -1330,7 +1503,7 @@ class BinaryTreeAdapter:
         # 添加到左子节点的边
         if node.left:
             left_x, left_y = positions[node.left]
-            left_id = f"node_{id(node.left)}"
+            left_id = f"node_{node.left.uid}"
             
             edge = EdgeSnapshot(
                 from_id=node_id,
@@ -1353,7 +1526,7 @@ class BinaryTreeAdapter:
         # 添加到右子节点的边
         if node.right:
             right_x, right_y = positions[node.right]
-            right_id = f"node_{id(node.right)}"
+            right_id = f"node_{node.right.uid}"
             
             edge = EdgeSnapshot(
                 from_id=node_id,
@@ -1376,7 +1549,7 @@ class BinaryTreeAdapter:
     @staticmethod
     def to_snapshot(binary_tree, start_x=640, y=200, level_height=110, node_width=72, min_spacing=130) -> StructureSnapshot:
         """将二叉树转换为快照 - 使用改进的布局算法"""
-        snapshot = StructureSnapshot()
+        snapshot = StructureSnapshot(kind="BinaryTree")
         snapshot.hint_text = f"二叉树 (节点数: {len(binary_tree.get_all_node_values())})"
         
         # 获取动画状态
@@ -1392,7 +1565,7 @@ class BinaryTreeAdapter:
         
         # 生成节点快照
         for node, (x, y_pos) in positions.items():
-            node_id = f"node_{id(node)}"
+            node_id = f"node_{node.uid}"
             
             # 检查是否是动画中的新节点
             is_new_node = (animation_state == 'inserting' and 
@@ -1620,12 +1793,12 @@ class BSTAdapter:
             return
         
         node_x, node_y = positions[node]
-        node_id = f"node_{id(node)}"
+        node_id = f"node_{node.uid}"
         
         # 添加到左子节点的边
         if node.left:
             left_x, left_y = positions[node.left]
-            left_id = f"node_{id(node.left)}"
+            left_id = f"node_{node.left.uid}"
             
             edge = EdgeSnapshot(
                 from_id=node_id,
@@ -1646,7 +1819,7 @@ class BSTAdapter:
         # 添加到右子节点的边
         if node.right:
             right_x, right_y = positions[node.right]
-            right_id = f"node_{id(node.right)}"
+            right_id = f"node_{node.right.uid}"
             
             edge = EdgeSnapshot(
                 from_id=node_id,
@@ -1667,7 +1840,7 @@ class BSTAdapter:
     @staticmethod
     def to_snapshot(bst, start_x=640, y=200, level_height=130, node_width=72, min_spacing=120) -> StructureSnapshot:
         """将BST转换为快照 - 使用与链式二叉树相同的布局算法"""
-        snapshot = StructureSnapshot()
+        snapshot = StructureSnapshot(kind="BST")
         snapshot.hint_text = f"二叉搜索树 (节点数: {len(bst.traverse_inorder())})"
         
         # 获取动画状态
@@ -1790,7 +1963,7 @@ class BSTAdapter:
         
         # 生成节点快照
         for node, (x, y_pos) in positions.items():
-            node_id = f"node_{id(node)}"
+            node_id = f"node_{node.uid}"
             
             # 检查是否是动画中的新节点
             is_new_node = (animation_state == 'inserting' and 
@@ -1906,7 +2079,7 @@ class BSTAdapter:
         if bst.root and animation_state != 'creating_root':
             root_edge = EdgeSnapshot(
                 from_id="root_pointer",
-                to_id=f"node_{id(bst.root)}",
+                to_id=f"node_{bst.root.uid}",
                 arrow_type="arrow"
             )
             root_edge.from_x = root_pointer_x + 30  # 从root标签中心
@@ -2090,9 +2263,111 @@ class BSTAdapter:
         
         return details
 
+class _HuffmanPlan:
+    """
+    哈夫曼构建过程的几何计划（按模型预先算好的合并时间表生成，同一次构建只生成一次）：
+    - 每一轮合并前/后的队列位置
+    - 各子树在队列、移动、回队列三种画法下相对根节点的布局（子树合并后形状不再变化，每种画法只算一次）
+    - 最终树的布局与叶子编码
+    取帧时只需按根节点位置平移这些相对坐标
+    """
+
+    # 队列视图的宽度估算参数（与 _subtree_width 的调用一致）
+    QUEUE_NODE_W = 60
+    QUEUE_MIN_SPACING = 120
+    # 各画法的 (布局函数名, 参数)
+    STYLES = {
+        "queue": ("_layout_tree", {"level_h": 105, "node_w": 72, "min_spacing": 120}),
+        "moving": ("_moving_layout", {}),
+        "return": ("_layout_tree", {"level_h": 130, "node_w": 72, "min_spacing": 130}),
+    }
+
+    def __init__(self, schedule, queue_y: float):
+        self.queue_y = queue_y
+        self._widths: Dict[Any, float] = {}
+        self._offsets: Dict[Tuple[Any, str], List[Tuple[Any, float, float]]] = {}
+        self._final = None
+        self.schedule = schedule
+        self.rounds = [
+            (self.queue_positions(r.queue_before), self.queue_positions(r.queue_after))
+            for r in schedule
+        ]
+
+    def _width(self, node) -> float:
+        width = self._widths.get(node)
+        if width is None:
+            width = HuffmanTreeAdapter._subtree_width(
+                node, node_w=self.QUEUE_NODE_W, min_spacing=self.QUEUE_MIN_SPACING)
+            self._widths[node] = width
+        return width
+
+    def queue_positions(self, nodes, canvas_w=1280, margin=60, base_gap=80, min_gap=40) -> Dict:
+        """按子树宽度在一行内铺开队列（间隙在 min_gap~base_gap 之间自适应）"""
+        if not nodes:
+            return {}
+        usable = max(200, canvas_w - 2 * margin)
+        widths = [self._width(n) for n in nodes]
+        sum_w = sum(widths)
+        gap = base_gap
+        if len(nodes) > 1:
+            gap = max(min_gap, min(base_gap, (usable - sum_w) / (len(nodes) - 1)))
+        total = sum_w + gap * (len(nodes) - 1)
+        start = margin + max(0, (usable - total) / 2)
+        pos = {}
+        cur = start
+        for n, w in zip(nodes, widths):
+            pos[n] = (cur + w / 2, self.queue_y)
+            cur += w + gap
+        return pos
+
+    def round_positions(self, round_idx: int, queue_before, queue_after):
+        """第 round_idx 轮的 (合并前, 合并后) 队列位置；队列不是时间表里的那一轮时现算"""
+        if 0 <= round_idx < len(self.rounds) and queue_before is self.schedule[round_idx].queue_before:
+            current = self.schedule[round_idx]
+            pos_before, pos_after = self.rounds[round_idx]
+            if queue_after is current.queue_after:
+                return pos_before, pos_after
+            if queue_after is current.queue_before:
+                # 父节点出现之前 queue_after 就是合并前的队列
+                return pos_before, pos_before
+            return pos_before, self.queue_positions(queue_after)
+        return self.queue_positions(queue_before), self.queue_positions(queue_after)
+
+    def offsets(self, node, style: str) -> List[Tuple[Any, float, float]]:
+        """子树各节点相对根节点的偏移 [(节点, dx, dy), ...]，按绘制顺序"""
+        key = (node, style)
+        cached = self._offsets.get(key)
+        if cached is None:
+            func_name, kwargs = self.STYLES[style]
+            layout = getattr(HuffmanTreeAdapter, func_name)(node, 0.0, 0.0, **kwargs)
+            cached = [(n, x, y) for n, (x, y) in layout.items()]
+            self._offsets[key] = cached
+        return cached
+
+    def final_layout(self, root, tree_cx: float, tree_y: float):
+        """最终树的布局与叶子编码"""
+        if self._final is None or self._final[0] is not root or self._final[1] != (tree_cx, tree_y):
+            pos = HuffmanTreeAdapter._layout_tree(root, tree_cx, tree_y, level_h=140, node_w=72, min_spacing=140)
+            codes = HuffmanTreeAdapter._collect_codes(root, "", {})
+            self._final = (root, (tree_cx, tree_y), pos, codes)
+        return self._final[2], self._final[3]
+
+    @staticmethod
+    def select_color(mix: float) -> str:
+        """选择阶段红→蓝的线性混色"""
+        c1, c2 = HuffmanTreeAdapter.RED, HuffmanTreeAdapter.BASE_BLUE
+        return "#{:02X}{:02X}{:02X}".format(*(
+            int(int(c1[i:i + 2], 16) + (int(c2[i:i + 2], 16) - int(c1[i:i + 2], 16)) * mix)
+            for i in (1, 3, 5)
+        ))
+
+
 class HuffmanTreeAdapter:
     """哈夫曼树适配器 - 全新分阶段动画"""
 
+    # 当前构建过程的几何计划：((时间表, 布局参数), _HuffmanPlan)
+    _plan_cache = (None, None)
+
     BASE_BLUE = "#1f4e79"
     BORDER = "#0B1D40"
     RED = "#FF4D4F"
@@ -2105,7 +2380,7 @@ class HuffmanTreeAdapter:
         ch = getattr(node, "char", None)
         if ch not in (None, "", "*"):
             return f"leaf_{ch}"
-        return f"node_{id(node)}"
+        return f"node_{node.uid}"
     
     @staticmethod
     def _append_circle(snapshot: StructureSnapshot, node_id: str, freq, label: str, x: float, y: float,
@@ -2199,20 +2474,20 @@ class HuffmanTreeAdapter:
             if not n:
                 return
             x, y = positions[n]
-            nid = f"final_{id(n)}"
+            nid = f"final_{n.uid}"
             # 端点锚到节点外轮廓：父节点底部中心 -> 子节点顶部中心
             rp = float((radii or {}).get(n, 36))
             if n.left:
                 lx, ly = positions[n.left]
                 rc = float((radii or {}).get(n.left, 36))
-                e = EdgeSnapshot(from_id=nid, to_id=f"final_{id(n.left)}", color="#2E86AB", arrow_type="line")
+                e = EdgeSnapshot(from_id=nid, to_id=f"final_{n.left.uid}", color="#2E86AB", arrow_type="line")
                 e.from_x, e.from_y = x, y + rp
                 e.to_x, e.to_y = lx, ly - rc
                 snapshot.edges.append(e)
             if n.right:
                 rx, ry = positions[n.right]
                 rc = float((radii or {}).get(n.right, 36))
-                e = EdgeSnapshot(from_id=nid, to_id=f"final_{id(n.right)}", color="#2E86AB", arrow_type="line")
+                e = EdgeSnapshot(from_id=nid, to_id=f"final_{n.right.uid}", color="#2E86AB", arrow_type="line")
                 e.from_x, e.from_y = x, y + rp
                 e.to_x, e.to_y = rx, ry - rc
                 snapshot.edges.append(e)
@@ -2284,6 +2559,53 @@ class HuffmanTreeAdapter:
             total += min_spacing * 0.7
         return max(node_w, total)
     
+    @staticmethod
+    def _moving_layout(node, center_x, y, node_w=60, min_spacing=110, level_h=120):
+        """移动阶段的子树布局：整棵子树跟随根节点移动（比队列中的子树更紧凑）"""
+        def calc_width(n):
+            if not n:
+                return 0
+            if not getattr(n, "left", None) and not getattr(n, "right", None):
+                return node_w
+            lw = calc_width(getattr(n, "left", None))
+            rw = calc_width(getattr(n, "right", None))
+            total = lw + rw
+            if lw > 0 and rw > 0:
+                total += min_spacing
+            return max(node_w, total)
+
+        def layout(n, cx, cy):
+            if not n:
+                return {}
+            positions = {n: (cx, cy)}
+            if not getattr(n, "left", None) and not getattr(n, "right", None):
+                return positions
+            lw = calc_width(getattr(n, "left", None))
+            rw = calc_width(getattr(n, "right", None))
+            if getattr(n, "left", None) and getattr(n, "right", None):
+                total_child_width = lw + rw + min_spacing * 1.5
+                left_center = cx - total_child_width / 2 + lw / 2
+                right_center = cx + total_child_width / 2 - rw / 2
+                positions.update(layout(getattr(n, "left", None), left_center, cy + level_h))
+                positions.update(layout(getattr(n, "right", None), right_center, cy + level_h))
+            elif getattr(n, "left", None):
+                positions.update(layout(getattr(n, "left", None), cx - min_spacing / 2, cy + level_h))
+            elif getattr(n, "right", None):
+                positions.update(layout(getattr(n, "right", None), cx + min_spacing / 2, cy + level_h))
+            return positions
+
+        return layout(node, center_x, y) if node else {}
+
+    @staticmethod
+    def _plan_for(huffman, params) -> "_HuffmanPlan":
+        """取得（必要时生成）当前构建过程的几何计划；同一次构建的所有帧、所有轮次共用"""
+        source = getattr(huffman, "_schedule", None) or huffman.root
+        cached_key, plan = HuffmanTreeAdapter._plan_cache
+        if cached_key is None or cached_key[0] is not source or cached_key[1] != params:
+            plan = _HuffmanPlan(getattr(huffman, "_schedule", None) or [], params[1])
+            HuffmanTreeAdapter._plan_cache = ((source, params), plan)
+        return plan
+
     @staticmethod
     def to_snapshot(huffman, start_x=120, queue_y=110, merge_cx=680, merge_cy=420, tree_cx=680, tree_y=640) -> StructureSnapshot:
         snapshot = StructureSnapshot()
@@ -2306,34 +2628,17 @@ class HuffmanTreeAdapter:
         else:
             snapshot.hint_text = "哈夫曼树"
 
-        def _queue_positions(nodes: List, canvas_w=1280, margin=60, base_gap=80, min_gap=40, node_w=60, min_spacing=120):
-            if not nodes:
-                return {}
-            usable = max(200, canvas_w - 2 * margin)
-            widths = [HuffmanTreeAdapter._subtree_width(n, node_w=node_w, min_spacing=min_spacing) for n in nodes]
-            sum_w = sum(widths)
-            gap = base_gap
-            if len(nodes) > 1:
-                gap = max(min_gap, min(base_gap, (usable - sum_w) / (len(nodes) - 1)))
-            total = sum_w + gap * (len(nodes) - 1)
-            start = margin + max(0, (usable - total) / 2)
-            pos = {}
-            cur = start
-            for n, w in zip(nodes, widths):
-                pos[n] = (cur + w / 2, queue_y)
-                cur += w + gap
-            return pos
-
-        pos_before = _queue_positions(queue_before)
-        pos_after = _queue_positions(queue_after)
-
-        def draw_subtree(node, cx, cy, root_color, scale=1.0, level_h=120, node_w=72, spacing=130):
-            """在队列位置绘制一棵子树（与初始节点等大）"""
-            if not node:
-                return
-            mini_pos = HuffmanTreeAdapter._layout_tree(node, cx, cy, level_h=level_h, node_w=node_w, min_spacing=spacing)
+        # 队列位置、子树布局、最终树与编码都在计划里一次算好，这里只做平移与插值
+        plan = HuffmanTreeAdapter._plan_for(
+            huffman, (start_x, queue_y, merge_cx, merge_cy, tree_cx, tree_y))
+        pos_before, pos_after = plan.round_positions(round_idx, queue_before, queue_after)
+
+        def draw_offsets(node, style, cx, cy, root_color, scale=1.0):
+            """按缓存的相对布局把子树画在 (cx, cy)"""
+            positions = {}
             radii = {}
-            for nd, (nx, ny) in mini_pos.items():
+            for nd, dx, dy in plan.offsets(node, style):
+                nx, ny = cx + dx, cy + dy
                 nid = f"hf_{HuffmanTreeAdapter._node_id(nd)}"
                 label = getattr(nd, "char", None) or "*"
                 color = root_color if nd is node else HuffmanTreeAdapter.BASE_BLUE
@@ -2341,59 +2646,7 @@ class HuffmanTreeAdapter:
                 ns = HuffmanTreeAdapter._append_circle(
                     snapshot, nid, getattr(nd, "freq", 0), label, nx, ny, color, scale=scale, text_color=text_color
                 )
-                radii[nd] = (ns.width or 72) / 2
-            HuffmanTreeAdapter._add_tree_edges_for_positions(node, mini_pos, snapshot, radii=radii)
-        
-        def draw_moving_subtree(node, cx, cy, root_color):
-            """移动阶段的子树绘制：整棵子树跟随根节点移动"""
-            if not node:
-                return
-            node_w = 60
-            min_spacing = 110
-            level_h = 120
-
-            def calc_width(n):
-                if not n:
-                    return 0
-                if not getattr(n, "left", None) and not getattr(n, "right", None):
-                    return node_w
-                lw = calc_width(getattr(n, "left", None))
-                rw = calc_width(getattr(n, "right", None))
-                total = lw + rw
-                if lw > 0 and rw > 0:
-                    total += min_spacing
-                return max(node_w, total)
-
-            def layout(n, center_x, y):
-                if not n:
-                    return {}
-                positions = {n: (center_x, y)}
-                if not getattr(n, "left", None) and not getattr(n, "right", None):
-                    return positions
-                lw = calc_width(getattr(n, "left", None))
-                rw = calc_width(getattr(n, "right", None))
-                if getattr(n, "left", None) and getattr(n, "right", None):
-                    total_child_width = lw + rw + min_spacing * 1.5
-                    left_center = center_x - total_child_width / 2 + lw / 2
-                    right_center = center_x + total_child_width / 2 - rw / 2
-                    positions.update(layout(getattr(n, "left", None), left_center, y + level_h))
-                    positions.update(layout(getattr(n, "right", None), right_center, y + level_h))
-                elif getattr(n, "left", None):
-                    left_center = center_x - min_spacing / 2
-                    positions.update(layout(getattr(n, "left", None), left_center, y + level_h))
-                elif getattr(n, "right", None):
-                    right_center = center_x + min_spacing / 2
-                    positions.update(layout(getattr(n, "right", None), right_center, y + level_h))
-                return positions
-
-            positions = layout(node, cx, cy)
-            radii = {}
-            for nd, (nx, ny) in positions.items():
-                nid = f"hf_{HuffmanTreeAdapter._node_id(nd)}"
-                label = getattr(nd, "char", None) or "*"
-                color = root_color if nd is node else HuffmanTreeAdapter.BASE_BLUE
-                text_color = "#FFD700" if getattr(nd, "char", None) else "#FFFFFF"
-                ns = HuffmanTreeAdapter._append_circle(snapshot, nid, getattr(nd, "freq", 0), label, nx, ny, color, text_color=text_color)
+                positions[nd] = (nx, ny)
                 radii[nd] = (ns.width or 72) / 2
             HuffmanTreeAdapter._add_tree_edges_for_positions(node, positions, snapshot, radii=radii)
 
@@ -2407,63 +2660,49 @@ class HuffmanTreeAdapter:
                 text_color = "#FFD700" if getattr(n, "char", None) else "#FFFFFF"
                 if getattr(n, "left", None) or getattr(n, "right", None):
                     # 内部节点：画一颗缩放的子树，根节点用当前颜色
-                    draw_subtree(n, nx, ny, color, scale=0.78, level_h=105, node_w=72, spacing=120)
+                    draw_offsets(n, "queue", nx, ny, color, scale=0.78)
                 else:
                     HuffmanTreeAdapter._append_circle(snapshot, nid, getattr(n, "freq", 0), label, nx, ny, color, scale=1.0, text_color=text_color)
 
+        def draw_pair_node(n, cx, cy, color):
+            if getattr(n, "left", None) or getattr(n, "right", None):
+                draw_offsets(n, "moving", cx, cy, color)
+            else:
+                label = getattr(n, "char", None) or "*"
+                HuffmanTreeAdapter._append_circle(snapshot, f"hf_{HuffmanTreeAdapter._node_id(n)}", n.freq, label, cx, cy, color)
+
         # 阶段渲染
         step_details = []
+        targets = [(merge_cx - 110, merge_cy), (merge_cx + 110, merge_cy)]
         if state in ("idle", "select"):
             # 选择阶段：两节点红→蓝过渡
             draw_queue(queue_before, pos_before)
+            # 前半段纯红，后半段渐变回蓝
+            t = min(1.0, max(0.0, progress))
+            color = HuffmanTreeAdapter.RED if t < 0.5 else plan.select_color((t - 0.5) / 0.5)
             for n in pair:
                 nx, ny = pos_before.get(n, (start_x, queue_y))
                 nid = f"hf_{HuffmanTreeAdapter._node_id(n)}"
                 label = getattr(n, "char", None) or "*"
-                scale = 1.08
-                # 前半段纯红，后半段渐变回蓝
-                t = min(1.0, max(0.0, progress))
-                if t < 0.5:
-                    color = HuffmanTreeAdapter.RED
-                else:
-                    mix = (t - 0.5) / 0.5
-                    # 简单线性混色
-                    def _mix(c1, c2):
-                        a = int(c1[1:3], 16) + (int(c2[1:3], 16) - int(c1[1:3], 16)) * mix
-                        b = int(c1[3:5], 16) + (int(c2[3:5], 16) - int(c1[3:5], 16)) * mix
-                        d = int(c1[5:7], 16) + (int(c2[5:7], 16) - int(c1[5:7], 16)) * mix
-                        return f"#{int(a):02X}{int(b):02X}{int(d):02X}"
-                    color = _mix(HuffmanTreeAdapter.RED, HuffmanTreeAdapter.BASE_BLUE)
-                HuffmanTreeAdapter._append_circle(snapshot, nid, n.freq, label, nx, ny, color, scale=scale)
+                HuffmanTreeAdapter._append_circle(snapshot, nid, n.freq, label, nx, ny, color, scale=1.08)
             step_details.append("选择两个最小节点（红色提示后回蓝）")
 
         elif state == "move":
             # 其它节点静止，选中节点移动到合并区
             draw_queue([n for n in queue_before if n not in pair], pos_before, faded_nodes=set())
-            targets = [(merge_cx - 110, merge_cy), (merge_cx + 110, merge_cy)]
             for idx, n in enumerate(pair):
                 sx, sy = pos_before.get(n, (start_x, queue_y))
                 tx, ty = targets[min(idx, 1)]
                 cx = HuffmanTreeAdapter._lerp(sx, tx, progress)
                 cy = HuffmanTreeAdapter._lerp(sy, ty, progress)
-                if getattr(n, "left", None) or getattr(n, "right", None):
-                    draw_moving_subtree(n, cx, cy, HuffmanTreeAdapter.RED)
-                else:
-                    nid = f"hf_{HuffmanTreeAdapter._node_id(n)}"
-                    label = getattr(n, "char", None) or "*"
-                    HuffmanTreeAdapter._append_circle(snapshot, nid, n.freq, label, cx, cy, HuffmanTreeAdapter.RED)
+                draw_pair_node(n, cx, cy, HuffmanTreeAdapter.RED)
             step_details.append("节点移动到合并区")
 
         elif state == "merge":
             # 两节点已在合并区，生成父节点
-            targets = [(merge_cx - 110, merge_cy), (merge_cx + 110, merge_cy)]
             for idx, n in enumerate(pair):
                 tx, ty = targets[min(idx, 1)]
-                if getattr(n, "left", None) or getattr(n, "right", None):
-                    draw_moving_subtree(n, tx, ty, HuffmanTreeAdapter.RED)
-                else:
-                    label = getattr(n, "char", None) or "*"
-                    HuffmanTreeAdapter._append_circle(snapshot, f"hf_{HuffmanTreeAdapter._node_id(n)}", n.freq, label, tx, ty, HuffmanTreeAdapter.RED)
+                draw_pair_node(n, tx, ty, HuffmanTreeAdapter.RED)
             # 父节点淡入
             if len(pair) == 2:
                 parent_freq = pair[0].freq + pair[1].freq
@@ -2488,27 +2727,17 @@ class HuffmanTreeAdapter:
                 target = pos_after.get(parent, (start_x, queue_y))
                 px = HuffmanTreeAdapter._lerp(px0, target[0], progress)
                 py = HuffmanTreeAdapter._lerp(py0, target[1], progress)
-                # 使用布局算法让子树随父节点一起回队列，保持结构可见
-                subtree_pos = HuffmanTreeAdapter._layout_tree(parent, px, py, level_h=130, node_w=72, min_spacing=130)
-                radii = {}
-                for node, (nx, ny) in subtree_pos.items():
-                    nid = f"hf_{HuffmanTreeAdapter._node_id(node)}"
-                    label = getattr(node, "char", None) or "*"
-                    color = HuffmanTreeAdapter.GREEN if node is parent else HuffmanTreeAdapter.BASE_BLUE
-                    text_color = "#FFD700" if getattr(node, "char", None) else "#FFFFFF"
-                    ns = HuffmanTreeAdapter._append_circle(snapshot, nid, getattr(node, "freq", 0), label, nx, ny, color, text_color=text_color)
-                    radii[node] = (ns.width or 72) / 2
-                HuffmanTreeAdapter._add_tree_edges_for_positions(parent, subtree_pos, snapshot, radii=radii)
+                # 子树随父节点一起回队列，保持结构可见
+                draw_offsets(parent, "return", px, py, HuffmanTreeAdapter.GREEN)
             step_details.append("父节点携子树回到队列，等待下一轮")
 
         elif state == "done":
             # 展示最终树
             if huffman.root:
-                pos = HuffmanTreeAdapter._layout_tree(huffman.root, tree_cx, tree_y, level_h=140, node_w=72, min_spacing=140)
-                code_map = HuffmanTreeAdapter._collect_codes(huffman.root, "", {})
+                pos, code_map = plan.final_layout(huffman.root, tree_cx, tree_y)
                 radii = {}
                 for n, (nx, ny) in pos.items():
-                    nid = f"final_{id(n)}"
+                    nid = f"final_{n.uid}"
                     label = getattr(n, "char", None) or "*"
                     color = HuffmanTreeAdapter.GREEN if n is huffman.root else HuffmanTreeAdapter.BASE_BLUE
                     text_color = "#FFD700" if getattr(n, "char", None) else "#FFFFFF"
@@ -2525,7 +2754,7 @@ class HuffmanTreeAdapter:
                         lx, ly = pos[node.left]
                         bx, by = (x + lx) / 2, (y + ly) / 2 - 6
                         snapshot.boxes.append(BoxSnapshot(
-                            id=f"edge_label_0_{id(node.left)}",
+                            id=f"edge_label_0_{node.left.uid}",
                             value="0",
                             x=bx - 6,
                             y=by - 8,
@@ -2538,7 +2767,7 @@ class HuffmanTreeAdapter:
                         rx, ry = pos[node.right]
                         bx, by = (x + rx) / 2, (y + ry) / 2 - 6
                         snapshot.boxes.append(BoxSnapshot(
-                            id=f"edge_label_1_{id(node.right)}",
+                            id=f"edge_label_1_{node.right.uid}",
                             value="1",
                             x=bx - 6,
                             y=by - 8,
@@ -2591,11 +2820,88 @@ class HuffmanTreeAdapter:
         snapshot.step_details = step_details
         return snapshot
 
+
+class _TreeFrameTemplate:
+    """
+    树快照的帧模板：整帧元素冻结后保存，取帧时浅拷贝元素列表，只替换锚定在移动节点上的元素
+    （节点本身、其平衡因子/旋转标签、与其相连的边、根指针），每帧开销与移动节点数成正比
+    元素相对锚点节点中心的偏移在建模板时量出，不必重复布局公式
+    """
+    __slots__ = ("hint_text", "nodes", "boxes", "edges", "slots", "positions")
+
+    _LABEL_PREFIXES = ("balance_", "rotate_label_")
+
+    def __init__(self, snapshot: StructureSnapshot, positions: Dict[Any, Tuple[float, float]], root_uid, moving):
+        self.hint_text = snapshot.hint_text
+        self.positions = positions  # 节点标识 -> 建模板时的中心坐标（静止节点的坐标一直有效）
+        for item in (*snapshot.nodes, *snapshot.boxes, *snapshot.edges):
+            item._set_frozen(True)
+        self.nodes = list(snapshot.nodes)
+        self.boxes = list(snapshot.boxes)
+        self.edges = list(snapshot.edges)
+        node_ids = {f"node_{uid}": uid for uid in positions}
+        moving_ids = {f"node_{uid}": uid for uid in moving}
+        root_moving = root_uid in moving
+        # (列表名, 下标, [(x属性, y属性, 锚点标识, dx, dy), ...])
+        self.slots = []
+
+        def anchored(x_attr, y_attr, element, uid):
+            ax, ay = positions[uid]
+            return x_attr, y_attr, uid, getattr(element, x_attr) - ax, getattr(element, y_attr) - ay
+
+        for index, node in enumerate(self.nodes):
+            uid = moving_ids.get(node.id)
+            if uid is not None:
+                self.slots.append(("nodes", index, [anchored("x", "y", node, uid)]))
+        for index, box in enumerate(self.boxes):
+            if box.id == "root_pointer":
+                uid = root_uid if root_moving else None
+            else:
+                owner = next((box.id[len(p):] for p in self._LABEL_PREFIXES if box.id.startswith(p)), None)
+                uid = moving_ids.get(owner)
+            if uid is not None:
+                self.slots.append(("boxes", index, [anchored("x", "y", box, uid)]))
+        for index, edge in enumerate(self.edges):
+            from_uid = root_uid if edge.from_id == "root_pointer" and root_moving else moving_ids.get(edge.from_id)
+            to_uid = moving_ids.get(edge.to_id)
+            if from_uid is None and to_uid is None:
+                continue
+            # 另一端静止时按其固定坐标锚定
+            if from_uid is None:
+                from_uid = root_uid if edge.from_id == "root_pointer" else node_ids[edge.from_id]
+            if to_uid is None:
+                to_uid = node_ids[edge.to_id]
+            self.slots.append(("edges", index, [anchored("from_x", "from_y", edge, from_uid),
+                                                anchored("to_x", "to_y", edge, to_uid)]))
+
+    def fill(self, snapshot: StructureSnapshot, moving_positions: Dict[Any, Tuple[float, float]]):
+        """按移动节点的当前位置生成一帧（静止元素与模板共享冻结实例）"""
+        snapshot.hint_text = self.hint_text
+        lists = {"nodes": list(self.nodes), "boxes": list(self.boxes), "edges": list(self.edges)}
+        positions = self.positions
+        for name, index, anchors in self.slots:
+            target = lists[name]
+            element = target[index]._thawed()
+            for x_attr, y_attr, uid, dx, dy in anchors:
+                ax, ay = moving_positions.get(uid) or positions[uid]
+                setattr(element, x_attr, ax + dx)
+                setattr(element, y_attr, ay + dy)
+            target[index] = element
+        snapshot.nodes = lists["nodes"]
+        snapshot.boxes = lists["boxes"]
+        snapshot.edges = lists["edges"]
+
+
 class AVLAdapter:
     """AVL树适配器 - 支持平衡因子显示和旋转动画"""
     NODE_DIAMETER = 72
     NODE_RADIUS = NODE_DIAMETER / 2
-    
+
+    # 旋转布局缓存：(关键帧字典, 布局参数, 结果)，持有关键帧引用以按身份比较
+    _layout_cache = (None, None, None)
+    # 旋转帧模板：(关键帧字典, 树根, 其余键, 模板)。位置不变的节点、边、标签的快照在各帧之间共享
+    _frame_cache = (None, None, None, None)
+
     @staticmethod
     def _circle_snapshot(node_id, value, center_x, center_y, color, text_color="#FFFFFF"):
         return NodeSnapshot(
@@ -2687,6 +2993,57 @@ class AVLAdapter:
         calculate_positions(node, start_x, y, 0)
         return positions
     
+    @staticmethod
+    def _iter_preorder(node):
+        """先序遍历（与 _layout_tree 的节点顺序一致）"""
+        stack = [node] if node else []
+        while stack:
+            current = stack.pop()
+            yield current
+            if current.right:
+                stack.append(current.right)
+            if current.left:
+                stack.append(current.left)
+
+    @staticmethod
+    def _rotation_layouts(keyframes, start_x, y, level_height, node_width, min_spacing):
+        """
+        旋转关键帧的布局（按标识索引），同一次插入只计算一次并缓存在适配器上
+        （关键帧在模型与各快照副本之间共享、只读，后台线程不向其中写入）
+
+        Returns:
+            (旋转前位置, 旋转后位置, (旋转前->中间形状, 中间形状->旋转后) 两段过渡, 位置会变化的节点标识)
+            过渡只包含位置会变化的节点，节点 id 即元素标识
+        """
+        params = (start_x, y, level_height, node_width, min_spacing)
+        cached_keyframes, cached_params, cached = AVLAdapter._layout_cache
+        if cached_keyframes is keyframes and cached_params == params:
+            return cached
+        by_tree = {}
+        maps = []
+        for phase in ('pre', 'mid', 'final'):
+            tree = keyframes.get(phase)
+            if id(tree) not in by_tree:
+                layout = AVLAdapter._layout_tree(tree, *params) if tree is not None else {}
+                by_tree[id(tree)] = {n.uid: pos for n, pos in layout.items()}
+            maps.append(by_tree[id(tree)])
+        pre_map, mid_map, final_map = maps
+        frames = (StructureSnapshot(), StructureSnapshot(), StructureSnapshot())
+        moving = set()
+        for uid, final_pos in final_map.items():
+            pre_pos = pre_map.get(uid, final_pos)
+            mid_pos = mid_map.get(uid, final_pos)
+            if pre_pos != final_pos or mid_pos != final_pos:
+                moving.add(uid)
+                for frame, (x, y_pos) in zip(frames, (pre_pos, mid_pos, final_pos)):
+                    frame.nodes.append(NodeSnapshot(id=uid, value="", x=x, y=y_pos))
+        from .morph import SnapshotMorph
+        morphs = (SnapshotMorph(frames[0], frames[1], easing="linear"),
+                  SnapshotMorph(frames[1], frames[2], easing="linear"))
+        result = (pre_map, final_map, morphs, frozenset(moving))
+        AVLAdapter._layout_cache = (keyframes, params, result)
+        return result
+
     @staticmethod
     def _calculate_subtree_width(node, node_width, min_spacing):
         """计算子树宽度"""
@@ -2705,12 +3062,12 @@ class AVLAdapter:
             return
         
         node_x, node_y = positions[node]
-        node_id = f"node_{id(node)}"
+        node_id = f"node_{node.uid}"
         
         # 添加到左子节点的边
         if node.left:
             left_x, left_y = positions[node.left]
-            left_id = f"node_{id(node.left)}"
+            left_id = f"node_{node.left.uid}"
             
             edge = EdgeSnapshot(
                 from_id=node_id,
@@ -2731,7 +3088,7 @@ class AVLAdapter:
         # 添加到右子节点的边
         if node.right:
             right_x, right_y = positions[node.right]
-            right_id = f"node_{id(node.right)}"
+            right_id = f"node_{node.right.uid}"
             
             edge = EdgeSnapshot(
                 from_id=node_id,
@@ -2752,23 +3109,14 @@ class AVLAdapter:
     @staticmethod
     def to_snapshot(avl, start_x=640, y=200, level_height=130, node_width=72, min_spacing=120) -> StructureSnapshot:
         """将AVL树转换为快照 - 支持平衡因子显示和旋转动画"""
-        snapshot = StructureSnapshot()
-        snapshot.hint_text = f"AVL平衡二叉树 (节点数: {len(avl.traverse_inorder())})"
+        snapshot = StructureSnapshot(kind="AVL")
+        snapshot.hint_text = "AVL平衡二叉树 (节点数: 0)"
         
         # 获取动画状态
         animation_state = getattr(avl, '_animation_state', None)
         animation_progress = getattr(avl, '_animation_progress', 0.0)
         phase_breaks = getattr(avl, '_phase_breaks', (0.25, 0.5, 0.75, 1.0))
         
-        # 在旋转阶段触发真实旋转以保持算法与动画同步
-        if animation_state == 'inserting':
-            rotation_phase = phase_breaks[2] if len(phase_breaks) >= 3 else 0.75
-            has_pending_rotation = getattr(avl, 'has_pending_rotation', None)
-            apply_rotation = getattr(avl, 'apply_pending_rotation', None)
-            if callable(has_pending_rotation) and callable(apply_rotation):
-                if has_pending_rotation() and animation_progress >= rotation_phase:
-                    apply_rotation()
-        
         # 添加比较信息
         comparison_detail = None
         if animation_state == 'inserting' and hasattr(avl, '_insert_comparison_result') and avl._insert_comparison_result:
@@ -2801,123 +3149,7 @@ class AVLAdapter:
         if not avl.root:
             return snapshot
         
-        # 使用改进的布局算法
-        positions = AVLAdapter._layout_tree(
-            avl.root, start_x, y, level_height, node_width, min_spacing)
-        # 旋转阶段插值：使用未旋转影子树位置与当前树位置进行插值
         rotation_progress = getattr(avl, '_rotation_anim_progress', 0.0)
-        shadow_root = getattr(avl, '_shadow_after_insert', None)
-
-        def _clone_simple(node):
-            if not node:
-                return None
-            nn = type("TmpNode", (), {})()
-            nn.value = getattr(node, "value", None)
-            nn.left = _clone_simple(getattr(node, "left", None))
-            nn.right = _clone_simple(getattr(node, "right", None))
-            return nn
-
-        def _rotate_left_at(root_node, target_val):
-            if not root_node:
-                return root_node
-            if root_node.value == target_val:
-                x = root_node
-                y = x.right
-                if not y:
-                    return x
-                x.right = y.left
-                y.left = x
-                return y
-            if target_val < root_node.value:
-                root_node.left = _rotate_left_at(root_node.left, target_val)
-            else:
-                root_node.right = _rotate_left_at(root_node.right, target_val)
-            return root_node
-
-        def _rotate_right_at(root_node, target_val):
-            if not root_node:
-                return root_node
-            if root_node.value == target_val:
-                y = root_node
-                x = y.left
-                if not x:
-                    return y
-                y.left = x.right
-                x.right = y
-                return x
-            if target_val < root_node.value:
-                root_node.left = _rotate_right_at(root_node.left, target_val)
-            else:
-                root_node.right = _rotate_right_at(root_node.right, target_val)
-            return root_node
-
-        def _layout_snapshot(root_node):
-            if not root_node:
-                return {}
-            return AVLAdapter._layout_tree(
-                root_node, start_x, y, level_height, node_width, min_spacing
-            )
-
-        # 预布局（旋转前）
-        pre_positions = {}
-        if shadow_root is not None:
-            pre_positions = _layout_snapshot(shadow_root)
-
-        # 中间布局（两段动画）
-        mid_positions = {}
-        if shadow_root is not None and rotation_type:
-            cloned_root = _clone_simple(shadow_root)
-            if rotation_type == "LL":
-                mid_root = _rotate_right_at(cloned_root, rotation_nodes[0] if rotation_nodes else None)
-            elif rotation_type == "RR":
-                mid_root = _rotate_left_at(cloned_root, rotation_nodes[0] if rotation_nodes else None)
-            elif rotation_type == "LR":
-                # 先对子节点左旋
-                child_val = rotation_nodes[1] if len(rotation_nodes) > 1 else None
-                if child_val is not None:
-                    cloned_root = _rotate_left_at(cloned_root, child_val)
-                mid_root = cloned_root
-            elif rotation_type == "RL":
-                # 先对子节点右旋
-                child_val = rotation_nodes[1] if len(rotation_nodes) > 1 else None
-                if child_val is not None:
-                    cloned_root = _rotate_right_at(cloned_root, child_val)
-                mid_root = cloned_root
-            else:
-                mid_root = cloned_root
-            mid_positions = _layout_snapshot(mid_root)
-
-        # 最终布局（当前真实树）
-        final_positions = positions
-
-        def _pos_map(layout):
-            return {str(n.value): pos for n, pos in layout.items()} if layout else {}
-
-        pre_map = _pos_map(pre_positions)
-        mid_map = _pos_map(mid_positions)
-        final_map = _pos_map(final_positions)
-
-        render_positions = {}
-        for node, final_pos in final_positions.items():
-            key = str(getattr(node, "value", ""))
-            if rotation_progress <= 0.0:
-                render_positions[node] = pre_map.get(key, final_pos)
-            elif rotation_progress < 0.5 and mid_positions:
-                t = rotation_progress / 0.5
-                start_pos = pre_map.get(key, final_pos)
-                mid_pos = mid_map.get(key, final_pos)
-                rx = start_pos[0] + (mid_pos[0] - start_pos[0]) * t
-                ry = start_pos[1] + (mid_pos[1] - start_pos[1]) * t
-                render_positions[node] = (rx, ry)
-            elif rotation_progress < 1.0 and mid_positions:
-                t = (rotation_progress - 0.5) / 0.5
-                mid_pos = mid_map.get(key, final_pos)
-                end_pos = final_map.get(key, final_pos)
-                rx = mid_pos[0] + (end_pos[0] - mid_pos[0]) * t
-                ry = mid_pos[1] + (end_pos[1] - mid_pos[1]) * t
-                render_positions[node] = (rx, ry)
-            else:
-                render_positions[node] = final_pos
         rotation_active = (
             animation_state == 'inserting'
             and rotation_type is not None
@@ -2960,11 +3192,54 @@ class AVLAdapter:
             else:
                 step_details.append("旋转阶段：完成旋转")
         
+        # 旋转阶段插值：关键帧布局每次插入只计算一次，每帧只对位置变化的节点插值
+        keyframes = getattr(avl, '_rotation_keyframes', None)
+        frame_key = None
+        fallback = None
+        if keyframes and keyframes.get('pre') is not None:
+            pre_map, final_map, morphs, moving = AVLAdapter._rotation_layouts(
+                keyframes, start_x, y, level_height, node_width, min_spacing)
+            base_map = pre_map if rotation_progress <= 0.0 else final_map
+            overrides = {}
+            if 0.0 < rotation_progress < 1.0:
+                # 两段过渡：旋转前 -> 中间形状 -> 旋转后
+                first_half = rotation_progress < 0.5
+                t = rotation_progress / 0.5 if first_half else (rotation_progress - 0.5) / 0.5
+                frame = morphs[0 if first_half else 1].frame(t)
+                overrides = {n.id: (n.x, n.y) for n in frame.nodes}
+            # 旋转期间树结构与着色输入不变：命中模板时只重建移动节点及其标签和边
+            frame_key = (
+                TrackedObject.epoch, (start_x, y, level_height, node_width, min_spacing),
+                animation_state, rotation_active, rotation_type, tuple(rotation_nodes),
+                str(comparing_value), insert_comp_result, str(getattr(avl, '_current_check_node_value', None)),
+            )
+            cached_keyframes, cached_root, cached_key, template = AVLAdapter._frame_cache
+            if cached_keyframes is keyframes and cached_root is avl.root and cached_key == frame_key:
+                positions = {uid: overrides.get(uid) or base_map.get(uid) for uid in moving}
+                template.fill(snapshot, positions)
+                if step_details:
+                    snapshot.step_details = step_details
+                return snapshot
+            render_positions = {}
+            for node in AVLAdapter._iter_preorder(avl.root):
+                pos = overrides.get(node.uid) or base_map.get(node.uid)
+                if pos is None:
+                    # 关键帧之外的节点（正常不会出现）退回按真实树布局
+                    if fallback is None:
+                        fallback = {n.uid: p for n, p in AVLAdapter._layout_tree(
+                            avl.root, start_x, y, level_height, node_width, min_spacing).items()}
+                    pos = fallback[node.uid]
+                render_positions[node] = pos
+        else:
+            render_positions = AVLAdapter._layout_tree(
+                avl.root, start_x, y, level_height, node_width, min_spacing)
+        snapshot.hint_text = f"AVL平衡二叉树 (节点数: {len(render_positions)})"
+        
         # 在生成节点快照前，先收集失衡节点信息
         imbalance_nodes = set()  # 平衡因子为±2的节点集合
         imbalance_children = set()  # 失衡节点的目标子节点集合
         
-        for node in positions.keys():
+        for node in render_positions.keys():
             balance_factor = avl._get_balance_factor(node)
             # 找到失衡节点（平衡因子为±2）
             if abs(balance_factor) == 2:
@@ -2980,7 +3255,7 @@ class AVLAdapter:
         heavy_val = rotation_nodes[1] if len(rotation_nodes) > 1 else None
         grand_val = rotation_nodes[2] if len(rotation_nodes) > 2 else None
         for node, (x, y_pos) in render_positions.items():
-            node_id = f"node_{id(node)}"
+            node_id = f"node_{node.uid}"
             
             # 计算平衡因子
             balance_factor = avl._get_balance_factor(node)
@@ -3099,7 +3374,7 @@ class AVLAdapter:
         # 添加根指针箭头
         root_arrow = EdgeSnapshot(
             from_id="root_pointer",
-            to_id=f"node_{id(avl.root)}",
+            to_id=f"node_{avl.root.uid}",
             color="#FFD700",
             arrow_type="arrow"
         )
@@ -3109,4 +3384,8 @@ class AVLAdapter:
         root_arrow.to_y = root_cy
         snapshot.edges.append(root_arrow)
         
+        if frame_key is not None and fallback is None:
+            template = _TreeFrameTemplate(
+                snapshot, {n.uid: pos for n, pos in render_positions.items()}, avl.root.uid, moving)
+            AVLAdapter._frame_cache = (keyframes, avl.root, frame_key, template)
         return snapshot
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+动画轨道与共享时钟
+- 每个数据结构（或分屏中的每个窗格）一条轨道：回调、计时起点、时长、暂停与倍速各自独立，
+  在一个结构上启动动画不会打断其它结构正在播放的动画
+- 所有轨道由同一个定时器驱动：时钟按各轨道间隔的最大公约数走拍，每拍只回调已到期的轨道
+- 轨道提供与 QTimer 相同的 start/stop/isActive/interval/setInterval，按定时器写的控制器代码无需改动
+"""
+import math
+import time
+from contextlib import contextmanager
+from functools import reduce
+from typing import Callable, Dict, Hashable, Iterator, Optional
+
+# 时钟节拍下限（毫秒），与控制器的最小定时器间隔一致
+MIN_TICK_MS = 5
+
+
+def now_ms() -> float:
+    """动画计时统一使用的毫秒时间戳"""
+    return time.time() * 1000.0
+
+
+class AnimationTrack:
+    """一条动画轨道"""
+
+    def __init__(self, clock: "AnimationClock", key: Hashable, speed: float = 1.0):
+        self._clock = clock
+        self.key = key
+        self.callback: Optional[Callable[[], None]] = None
+        self.base_interval = 0  # 未按倍速换算的回调间隔（毫秒）
+        self.speed = speed
+        self.start_time = 0.0  # 计时起点（毫秒），0 表示在首次回调时开始计时
+        self.duration = 0.0
+        self.paused = False
+        self.paused_elapsed = 0.0  # 暂停时已播放的时长（毫秒）
+        self._interval = 50
+        self._active = False
+        self._next_due = 0.0
+
+    # ====== 与 QTimer 相同的接口 ======
+    def start(self, interval: Optional[int] = None):
+        if interval is not None:
+            self._interval = max(1, int(interval))
+        if self.callback is None:
+            return
+        self._active = True
+        self._next_due = now_ms() + self._interval
+        self._clock._reschedule()
+
+    def stop(self):
+        if self._active:
+            self._active = False
+            self._clock._reschedule()
+
+    def isActive(self) -> bool:
+        return self._active
+
+    def interval(self) -> int:
+        return self._interval
+
+    def setInterval(self, interval: int):
+        self._interval = max(1, int(interval))
+        if self._active:
+            self._clock._reschedule()
+
+
+class AnimationClock:
+    """
+    所有动画轨道共用的时钟
+
+    timer 为 QTimer（或接口相同的对象），由时钟负责连接、启动与停止；
+    current 是正在执行回调的轨道，控制器据此把“当前动画”的读写落到对应轨道上
+    """
+
+    def __init__(self, timer):
+        self._tracks: Dict[Hashable, AnimationTrack] = {}
+        self.current: Optional[AnimationTrack] = None
+        self._tick_ms = 0
+        self._timer = timer
+        self._timer.timeout.connect(self._on_timeout)
+
+    def track(self, key: Hashable, speed: float = 1.0) -> AnimationTrack:
+        """取得轨道，不存在时以给定倍速新建（未启动）"""
+        track = self._tracks.get(key)
+        if track is None:
+            track = AnimationTrack(self, key, speed)
+            self._tracks[key] = track
+        return track
+
+    def get(self, key: Hashable) -> Optional[AnimationTrack]:
+        return self._tracks.get(key)
+
+    def remove(self, key: Hashable):
+        """停止并丢弃轨道"""
+        track = self._tracks.pop(key, None)
+        if track is not None and track._active:
+            track._active = False
+            self._reschedule()
+
+    def tracks(self) -> Iterator[AnimationTrack]:
+        return iter(list(self._tracks.values()))
+
+    def any_active(self) -> bool:
+        return any(track._active for track in self._tracks.values())
+
+    @contextmanager
+    def running(self, track: AnimationTrack):
+        """在 track 的上下文中执行（回调内对“当前动画”的读写都落到该轨道）"""
+        previous, self.current = self.current, track
+        try:
+            yield track
+        finally:
+            self.current = previous
+
+    def _reschedule(self):
+        """按活动轨道的间隔调整节拍；没有活动轨道时停表"""
+        intervals = [track._interval for track in self._tracks.values() if track._active]
+        if not intervals:
+            self._tick_ms = 0
+            self._timer.stop()
+            return
+        tick = max(MIN_TICK_MS, reduce(math.gcd, intervals))
+        if tick != self._tick_ms or not self._timer.isActive():
+            self._tick_ms = tick
+            self._timer.start(tick)
+
+    def _on_timeout(self):
+        self.tick(now_ms())
+
+    def tick(self, now: float):
+        """推进一拍：回调所有到期的轨道（允许半拍的误差，避免定时器抖动导致丢拍）"""
+        slack = self._tick_ms / 2
+        for track in list(self._tracks.values()):
+            if not track._active or now + slack < track._next_due:
+                continue
+            track._next_due = now + track._interval
+            with self.running(track):
+                try:
+                    track.callback()
+                except Exception as e:
+                    # 一条轨道出错不影响其它轨道
+                    track.stop()
+                    print(f"动画轨道 {track.key} 回调出错: {e}")
+
+
+def track_property(attr: str, doc: str) -> property:
+    """控制器上的兼容属性：读写落到当前操作所属的轨道（宿主需提供 _track()）"""
+    def getter(host):
+        return getattr(host._track(), attr)
+
+    def setter(host, value):
+        setattr(host._track(), attr, value)
+
+    return property(getter, setter, doc=doc)
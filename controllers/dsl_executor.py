@@ -3,11 +3,17 @@
 DSL执行器模块
 负责执行解析后的DSL命令,调用MainController的相应方法
 """
-from typing import List, Tuple
+import itertools
+from collections import deque
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple
 from PyQt5.QtCore import QTimer
 from .dsl_parser import ParsedCommand, CommandType
 
 
+# 顺序执行时保留的结果消息条数（流式执行超大脚本时内存保持恒定）
+SEQUENTIAL_MESSAGE_LIMIT = 1000
+
+
 class DSLExecutor:
     """DSL执行器类"""
     
@@ -19,12 +25,14 @@ class DSLExecutor:
             controller: MainController实例
         """
         self.controller = controller
-        self._sequential_queue: List[ParsedCommand] = []
+        # 步骤迭代器，元素为 (显示文本, 执行函数)，执行函数返回 (成功标志, 消息)
+        # 按需逐个取出，因此可以是惰性生成的（如从文件流式解析）
+        self._sequential_queue: Optional[Iterator[Tuple[str, Callable[[], Tuple[bool, str]]]]] = None
         self._seq_total = 0
         self._seq_index = 0
         self._seq_success = 0
         self._seq_fail = 0
-        self._seq_messages: List[str] = []
+        self._seq_messages: Deque[str] = deque(maxlen=SEQUENTIAL_MESSAGE_LIMIT)
         self._seq_progress_callback = None
         self._seq_finished_callback = None
         self._sequential_running = False
@@ -175,6 +183,12 @@ class DSLExecutor:
                 self.controller.build_huffman_tree(freq_str)
                 return True, f"正在构建哈夫曼树: {freq_str}"
             
+            elif command.type == CommandType.BULK_LOAD:
+                # 快速模式下合并后的净效果：直接载入，不播放动画
+                values = command.args['values']
+                self.controller.bulk_load_structure(command.structure, values)
+                return True, f"已载入 {len(values)} 个值（合并 {command.args.get('merged', 1)} 条命令）"
+            
             else:
                 return False, "未知的命令类型"
                 
@@ -211,26 +225,49 @@ class DSLExecutor:
 
     def execute_script_sequential(
         self,
-        commands: List[ParsedCommand],
+        commands: Iterable[ParsedCommand],
+        progress_callback=None,
+        finished_callback=None,
+    ) -> bool:
+        """按顺序执行命令，等待动画完成后再运行下一条；commands 可以是惰性迭代器"""
+        steps = (
+            (cmd.original_text, lambda cmd=cmd: self.execute(cmd))
+            for cmd in commands if cmd.type != CommandType.UNKNOWN
+        )
+        total = len(commands) if isinstance(commands, list) else 0
+        return self.execute_steps_sequential(steps, progress_callback, finished_callback, total=total)
+
+    def execute_steps_sequential(
+        self,
+        steps: Iterable[Tuple[str, Callable[[], Tuple[bool, str]]]],
         progress_callback=None,
         finished_callback=None,
+        total: Optional[int] = None,
     ) -> bool:
-        """按顺序执行命令，等待动画完成后再运行下一条"""
+        """
+        按顺序执行任意步骤（DSL命令、LLM动作计划等），等待动画完成后再运行下一步
+
+        Args:
+            steps: [(显示文本, 执行函数)] 或其惰性迭代器，执行函数返回 (成功标志, 消息)；
+                   每次只取下一步，不会预先展开整个序列
+            total: 总步数；steps 为列表时取其长度，未知时为 0
+        """
         if self._sequential_running:
             raise RuntimeError("已有DSL批量执行任务正在进行")
 
-        actionable = [cmd for cmd in commands if cmd.type != CommandType.UNKNOWN]
-        if not actionable:
+        iterator = iter(steps)
+        first = next(iterator, None)
+        if first is None:
             if finished_callback:
                 finished_callback(0, 0, [])
             return False
 
-        self._sequential_queue = actionable
-        self._seq_total = len(actionable)
+        self._sequential_queue = itertools.chain([first], iterator)
+        self._seq_total = len(steps) if isinstance(steps, (list, tuple)) else (total or 0)
         self._seq_index = 0
         self._seq_success = 0
         self._seq_fail = 0
-        self._seq_messages = []
+        self._seq_messages = deque(maxlen=SEQUENTIAL_MESSAGE_LIMIT)
         self._seq_progress_callback = progress_callback
         self._seq_finished_callback = finished_callback
         self._sequential_running = True
@@ -245,19 +282,29 @@ class DSLExecutor:
             QTimer.singleShot(150, self._process_next_command)
             return
 
-        if not self._sequential_queue:
+        try:
+            step = next(self._sequential_queue, None)
+        except Exception as e:
+            # 惰性来源本身出错（如读文件失败）：记为失败并结束
+            self._seq_fail += 1
+            self._seq_messages.append(f"✗ 读取后续命令失败: {e}")
+            step = None
+        if step is None:
             self._finish_sequential_execution()
             return
 
-        cmd = self._sequential_queue.pop(0)
+        label, run = step
         self._seq_index += 1
-        success, message = self.execute(cmd)
+        try:
+            success, message = run()
+        except Exception as e:
+            success, message = False, str(e)
         if success:
             self._seq_success += 1
-            entry = f"✓ 命令 {self._seq_index}: {cmd.original_text}"
+            entry = f"✓ 命令 {self._seq_index}: {label}"
         else:
             self._seq_fail += 1
-            entry = f"✗ 命令 {self._seq_index}: {cmd.original_text} - {message}"
+            entry = f"✗ 命令 {self._seq_index}: {label} - {message}"
         self._seq_messages.append(entry)
 
         if self._seq_progress_callback:
@@ -281,7 +328,7 @@ class DSLExecutor:
                 self._seq_fail,
                 list(self._seq_messages),
             )
-        self._sequential_queue = []
+        self._sequential_queue = None
         self._seq_progress_callback = None
         self._seq_finished_callback = None
 
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+DSL命令合并优化器（快速模式）
+位于解析器与执行器之间，把同一结构上连续的一段命令折叠成净效果：
+- 快速模式下中间状态不可见：N 次 push 合并为一次栈载入，N 次 BST 插入合并为一次批量载入
+- 后面的 create/build/clear 覆盖前面的工作时，前面的命令直接丢弃
+- 本地模拟各结构状态，逐条流式处理，不缓存整段命令
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from structures.avl import AVLModel
+from structures.bst import BSTModel
+from .dsl_parser import CommandType, ParsedCommand
+
+# 会清空并重建结构的命令：之前在该结构上的工作全部被覆盖
+# 注意 create bst 是在现有树上逐个插入，不属于此类
+RESET_COMMANDS = {
+    CommandType.CREATE_ARRAYLIST, CommandType.CREATE_LINKEDLIST, CommandType.CREATE_STACK,
+    CommandType.CREATE_BINARYTREE, CommandType.BUILD_BINARYTREE,
+    CommandType.BUILD_BST, CommandType.CREATE_AVL, CommandType.BUILD_AVL, CommandType.CLEAR_AVL,
+    CommandType.BUILD_HUFFMAN,
+}
+
+LINEAR_STRUCTURES = ("SequentialList", "LinkedList", "Stack")
+TREE_MODELS = {"BST": BSTModel, "AVL": AVLModel}
+
+# 不模拟的结构（二叉树、哈夫曼树）只做覆盖消除，最多缓存的命令数
+MAX_PENDING_COMMANDS = 1000
+
+
+@dataclass
+class OptimizeStats:
+    """优化统计：输入/输出命令数"""
+    input_count: int = 0
+    output_count: int = 0
+
+    @property
+    def eliminated(self) -> int:
+        return self.input_count - self.output_count
+
+
+def _format_value(value) -> str:
+    """模型里的数值（BST/AVL 存 float）转回命令里的写法，整数不带 .0"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _level_order(root) -> List[str]:
+    """树的层序值（按此顺序重新插入可还原同一形状）"""
+    values = []
+    queue = deque([root] if root is not None else [])
+    while queue:
+        node = queue.popleft()
+        values.append(_format_value(node.value))
+        if node.left is not None:
+            queue.append(node.left)
+        if node.right is not None:
+            queue.append(node.right)
+    return values
+
+
+class DSLOptimizer:
+    """
+    命令合并优化器
+
+    initial_states 为各结构执行前的内容 {结构: 值列表}（线性结构按顺序，树按层序）；
+    没有给出的结构在遇到 create/build 之前视为状态未知，其命令原样执行
+    """
+
+    def __init__(self, initial_states: Optional[Dict[str, List[str]]] = None):
+        self.stats = OptimizeStats()
+        # 结构 -> 模拟状态（线性结构为列表，树为无动画的模型实例）
+        self._states: Dict[str, Any] = {}
+        for key, values in (initial_states or {}).items():
+            state = self._new_state(key, values)
+            if state is not None:
+                self._states[key] = state
+        self._run_structure: Optional[str] = None
+        # 当前这一段里已折叠进模拟状态的命令
+        self._folded_count = 0
+        self._folded_first: Optional[ParsedCommand] = None
+        self._folded_last_line = 0
+        # 不模拟的结构：自最近一次覆盖以来的原始命令
+        self._pending: List[ParsedCommand] = []
+
+    def optimize(self, commands: Iterable[ParsedCommand]) -> Iterator[ParsedCommand]:
+        """逐条读入命令，产出合并后的命令（注释/空行直接丢弃）"""
+        for cmd in commands:
+            if cmd.type == CommandType.UNKNOWN:
+                continue
+            self.stats.input_count += 1
+            if cmd.structure != self._run_structure:
+                yield from self._emit(self._flush())
+                self._run_structure = cmd.structure
+            yield from self._emit(self._feed(cmd))
+        yield from self._emit(self._flush())
+
+    def _emit(self, commands: List[ParsedCommand]) -> List[ParsedCommand]:
+        self.stats.output_count += len(commands)
+        return commands
+
+    @staticmethod
+    def _new_state(key: str, values: List[str]):
+        if key in LINEAR_STRUCTURES:
+            return [str(v) for v in values if v is not None and str(v) != ""]
+        if key in TREE_MODELS:
+            model = TREE_MODELS[key]()
+            model.set_active(True)
+            try:
+                model.insert_values(values)
+            except (TypeError, RecursionError):
+                # 数值与文本混插无法比较，或模型在极端形状下递归过深：状态视为未知
+                return None
+            return model
+        return None
+
+    def _feed(self, cmd: ParsedCommand) -> List[ParsedCommand]:
+        key = cmd.structure
+        if key not in LINEAR_STRUCTURES and key not in TREE_MODELS:
+            return self._feed_unsimulated(cmd)
+
+        created = cmd.type in RESET_COMMANDS and self._states.get(key) is None
+        if created:
+            self._states[key] = self._new_state(key, [])
+        state = self._states.get(key)
+        if state is None:
+            return [cmd]
+        try:
+            folded = self._apply(state, cmd)
+        except (TypeError, RecursionError):
+            # 模型里同样会比较失败（或递归过深）：先落地已折叠的部分，原样执行这条，此后状态未知
+            out = self._flush() + [cmd]
+            self._states.pop(key, None)
+            return out
+        if not folded:
+            if created:
+                self._states.pop(key, None)
+            # 有可见反馈（如删除不存在的值、越界位置、搜索）的命令原样执行
+            return self._flush() + [cmd]
+        if self._folded_count == 0:
+            self._folded_first = cmd
+        self._folded_count += 1
+        self._folded_last_line = cmd.line
+        return []
+
+    @staticmethod
+    def _apply(state, cmd: ParsedCommand) -> bool:
+        """在模拟状态上执行一条命令；返回 False 表示不能折叠（状态未改变）"""
+        t = cmd.type
+        args = cmd.args
+
+        if isinstance(state, list):
+            if t in (CommandType.CREATE_ARRAYLIST, CommandType.CREATE_LINKEDLIST, CommandType.CREATE_STACK):
+                state[:] = [v for v in args.get('values') or [] if v != ""]
+            elif t == CommandType.INSERT_ARRAYLIST:
+                # 顺序表把越界位置夹到有效范围
+                state.insert(max(0, min(args['position'], len(state))), args['value'])
+            elif t == CommandType.INSERT_LINKEDLIST:
+                if not 0 <= args['position'] <= len(state):
+                    return False
+                state.insert(args['position'], args['value'])
+            elif t in (CommandType.DELETE_AT_ARRAYLIST, CommandType.DELETE_AT_LINKEDLIST):
+                if not 0 <= args['position'] < len(state):
+                    return False
+                state.pop(args['position'])
+            elif t == CommandType.PUSH_STACK:
+                state.append(args['value'])
+            elif t == CommandType.POP_STACK:
+                if state:
+                    state.pop()
+            else:
+                return False
+            return True
+
+        if t in (CommandType.BUILD_BST, CommandType.CREATE_AVL, CommandType.BUILD_AVL):
+            if not args['values']:
+                return False  # 空列表只会弹出提示，不清空
+            state.clear()
+            state.insert_values(args['values'])
+        elif t == CommandType.CREATE_BST:
+            state.insert_values([v for v in args['values'] if v])
+        elif t in (CommandType.INSERT_BST, CommandType.INSERT_AVL):
+            state.insert_values([args['value']])
+        elif t == CommandType.DELETE_BST:
+            return state.remove_value(args['value'])
+        elif t == CommandType.CLEAR_AVL:
+            state.clear()
+        else:
+            return False
+        return True
+
+    def _feed_unsimulated(self, cmd: ParsedCommand) -> List[ParsedCommand]:
+        if cmd.type in RESET_COMMANDS:
+            self._pending = [cmd]
+            return []
+        self._pending.append(cmd)
+        if len(self._pending) >= MAX_PENDING_COMMANDS:
+            return self._flush()
+        return []
+
+    def _flush(self) -> List[ParsedCommand]:
+        """落地当前这一段：未模拟结构输出缓存的原始命令，模拟结构输出净效果"""
+        if self._pending:
+            out, self._pending = self._pending, []
+            return out
+        if self._folded_count == 0:
+            return []
+        count, first = self._folded_count, self._folded_first
+        self._folded_count, self._folded_first = 0, None
+        if count == 1:
+            return [first]
+        state = self._states[first.structure]
+        values = list(state) if isinstance(state, list) else _level_order(state.root)
+        return [ParsedCommand(
+            type=CommandType.BULK_LOAD,
+            structure=first.structure,
+            args={'values': values, 'merged': count},
+            original_text=f"[合并 {count} 条命令] 载入 {len(values)} 个值",
+            line=self._folded_last_line,
+        )]
@@ -3,8 +3,10 @@
 DSL解析器模块
 负责将DSL命令文本解析为结构化的命令对象
 """
+import os
+import random
 import re
-from typing import Optional, List, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -48,6 +50,9 @@ class CommandType(Enum):
     # 哈夫曼树操作
     BUILD_HUFFMAN = "build_huffman"
     
+    # 批量载入（只由快速模式的合并优化器生成，没有对应的DSL写法）
+    BULK_LOAD = "bulk_load"
+    
     # 未知命令
     UNKNOWN = "unknown"
 
@@ -59,340 +64,479 @@ class ParsedCommand:
     structure: str
     args: dict
     original_text: str
+    line: int = 0  # 脚本中的行号（从1开始），单条解析时为0
+
+
+@dataclass
+class DSLDiagnostic:
+    """解析诊断信息：行号、列号（均从1开始）与错误说明"""
+    line: int
+    column: int
+    message: str
+    text: str = ""
+
+    def __str__(self) -> str:
+        return f"第 {self.line} 行第 {self.column} 列: {self.message}"
+
+
+class DSLSyntaxError(ValueError):
+    """单条命令解析失败，附带诊断信息"""
+
+    def __init__(self, diagnostic: DSLDiagnostic):
+        super().__init__(diagnostic.message)
+        self.diagnostic = diagnostic
+
+
+# ====== 语法模板元素 ======
+# 字面量直接写小写字符串；参数槽用下面的元组表示
+_VALUE = "value"      # 单个值：\w+
+_INT = "int"          # 非负整数
+_SIDE = "side"        # left / right
+_REST = "rest"        # 本行剩余的原始文本（with 之后的值列表/频率映射）
+
+_WORD_RE = re.compile(r"\w+$")
+_TOKEN_RE = re.compile(r"\S+")
+
+
+def _slot(kind: str, name: str):
+    return (kind, name)
+
+
+# 值生成器：range(a, b[, step]) 与 Python 一致（不含终点），random(n[, seed]) 生成 n 个随机整数
+_GENERATOR_RE = re.compile(r"(range|random)\s*\((.*)\)$", re.IGNORECASE)
+RANDOM_VALUE_RANGE = (1, 999)
+# 单条 create/build 命令展开后的值个数上限（结构本身要一次性持有这些值）
+MAX_GENERATED_VALUES = 100000
+
+
+def _split_top_level(raw: str) -> List[str]:
+    """按逗号切分，但不切开括号内的逗号"""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(raw):
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(raw[start:i])
+            start = i + 1
+    parts.append(raw[start:])
+    return parts
+
+
+def _generate_values(name: str, arg_text: str) -> List[str]:
+    try:
+        params = [int(a) for a in arg_text.split(',')]
+    except ValueError:
+        raise ValueError(f"{name}() 的参数必须是整数: {arg_text.strip()}")
+    if name == "range":
+        if not 2 <= len(params) <= 3 or (len(params) == 3 and params[2] == 0):
+            raise ValueError("用法: range(起点, 终点[, 非零步长])")
+        count = len(range(*params))
+    else:
+        if not 1 <= len(params) <= 2 or params[0] < 0:
+            raise ValueError("用法: random(个数[, 种子])")
+        count = params[0]
+    if count > MAX_GENERATED_VALUES:
+        raise ValueError(f"{name}() 生成的值超过上限 {MAX_GENERATED_VALUES}")
+    if name == "range":
+        return [str(v) for v in range(*params)]
+    rng = random.Random(params[1] if len(params) > 1 else None)
+    return [str(rng.randint(*RANDOM_VALUE_RANGE)) for _ in range(count)]
+
+
+def _values_list(raw: str) -> List[str]:
+    if '#' in raw:
+        raw = _strip_comment(raw)
+    if '(' not in raw:
+        return [v.strip() for v in raw.split(',')]
+    values = []
+    for item in _split_top_level(raw):
+        item = item.strip()
+        generator = _GENERATOR_RE.match(item)
+        if generator:
+            values.extend(_generate_values(generator.group(1).lower(), generator.group(2)))
+        else:
+            values.append(item)
+        if len(values) > MAX_GENERATED_VALUES:
+            raise ValueError(f"值个数超过上限 {MAX_GENERATED_VALUES}")
+    return values
+
+
+def _values_list_non_empty(raw: str) -> List[str]:
+    return [v for v in _values_list(raw) if v != ""]
+
+
+# 循环语法：repeat N { ... } 与 for 变量 in 起点..终点 { ... }（包含终点），循环体可单行也可多行
+_REPEAT_RE = re.compile(r"repeat\s+(\S+?)\s*\{(.*)$", re.IGNORECASE)
+_FOR_RE = re.compile(r"for\s+([A-Za-z_]\w*)\s+in\s+(\S+?)\.\.(\S+?)\s*\{(.*)$", re.IGNORECASE)
+_VAR_RE = re.compile(r"\$([A-Za-z_]\w*)")
+# 循环头、'}' 行与值列表允许行尾注释：'#' 须位于行首，或前有空白且空白前不是逗号。
+# 这样二叉树值列表里作为空位的 '#'（如 "1, #, 3"、"1, 2, #"）不会被当成注释截掉
+_TRAILING_COMMENT_RE = re.compile(r"(?:^|(?<=[^,\s])\s+)#.*$")
+# 多行循环体最多缓存的行数（展开是惰性的，缓存的只有循环体本身）
+MAX_BLOCK_LINES = 10000
+# 保留的诊断条数上限（超大脚本里同一个错误可能在循环中反复出现）
+MAX_DIAGNOSTICS = 200
+
+
+def _strip_comment(text: str) -> str:
+    return _TRAILING_COMMENT_RE.sub("", text.strip()).strip()
+
+
+def _split_statements(body: str) -> List[str]:
+    """单行循环体按分号切分语句，不切开内层花括号中的分号"""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(body):
+        if ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+        elif ch == ';' and depth == 0:
+            parts.append(body[start:i])
+            start = i + 1
+    parts.append(body[start:])
+    return [part for part in parts if part.strip()]
+
+
+class DSLFileReader:
+    """按行从磁盘读取DSL脚本（不整体载入内存），记录已读字节数用于进度显示"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self._file = open(path, 'rb')
+
+    @property
+    def progress(self) -> float:
+        """已读比例（0~1）"""
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for raw in self._file:
+                encoding = 'utf-8-sig' if self.bytes_read == 0 else 'utf-8'
+                self.bytes_read += len(raw)
+                # 非法字节替换掉，交给解析器报成该行的语法错误
+                yield raw.decode(encoding, errors='replace')
+        finally:
+            self.close()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
 
 
 class DSLParser:
-    """DSL解析器类"""
-    
-    # 定义命令模式
-    PATTERNS = {
+    """DSL解析器类：分词后按 (动词, 结构关键字) 查分派表，一次匹配完成分类与参数提取"""
+
+    # 语法规则：(命令类型, 数据结构, 模板, 剩余文本转换函数)
+    # 结构关键字位于第二个词（create/build/clear）或最后一个词（insert/delete/push/...）
+    RULES = [
         # 顺序表
-        CommandType.CREATE_ARRAYLIST: re.compile(
-            r'create\s+arraylist\s+with\s+(.+)$',
-            re.IGNORECASE
-        ),
-        CommandType.INSERT_ARRAYLIST: re.compile(
-            r'insert\s+(\w+)\s+at\s+(\d+)\s+in\s+arraylist$',
-            re.IGNORECASE
-        ),
-        CommandType.DELETE_AT_ARRAYLIST: re.compile(
-            r'delete\s+at\s+(\d+)\s+from\s+arraylist$',
-            re.IGNORECASE
-        ),
-        
+        (CommandType.CREATE_ARRAYLIST, "SequentialList",
+         ("create", "arraylist", "with", _slot(_REST, "values")), _values_list),
+        (CommandType.INSERT_ARRAYLIST, "SequentialList",
+         ("insert", _slot(_VALUE, "value"), "at", _slot(_INT, "position"), "in", "arraylist"), None),
+        (CommandType.DELETE_AT_ARRAYLIST, "SequentialList",
+         ("delete", "at", _slot(_INT, "position"), "from", "arraylist"), None),
+
         # 链表
-        CommandType.CREATE_LINKEDLIST: re.compile(
-            r'create\s+linkedlist\s+with\s+(.+)$',
-            re.IGNORECASE
-        ),
-        CommandType.INSERT_LINKEDLIST: re.compile(
-            r'insert\s+(\w+)\s+at\s+(\d+)\s+in\s+linkedlist$',
-            re.IGNORECASE
-        ),
-        CommandType.DELETE_AT_LINKEDLIST: re.compile(
-            r'delete\s+at\s+(\d+)\s+from\s+linkedlist$',
-            re.IGNORECASE
-        ),
-        
-        # 栈
-        CommandType.CREATE_STACK: re.compile(
-            r'create\s+stack(?:\s+with\s+(.+))?$',
-            re.IGNORECASE
-        ),
-        CommandType.PUSH_STACK: re.compile(
-            r'push\s+(\w+)\s+to\s+stack$',
-            re.IGNORECASE
-        ),
-        CommandType.POP_STACK: re.compile(
-            r'pop\s+from\s+stack$',
-            re.IGNORECASE
-        ),
-        
+        (CommandType.CREATE_LINKEDLIST, "LinkedList",
+         ("create", "linkedlist", "with", _slot(_REST, "values")), _values_list),
+        (CommandType.INSERT_LINKEDLIST, "LinkedList",
+         ("insert", _slot(_VALUE, "value"), "at", _slot(_INT, "position"), "in", "linkedlist"), None),
+        (CommandType.DELETE_AT_LINKEDLIST, "LinkedList",
+         ("delete", "at", _slot(_INT, "position"), "from", "linkedlist"), None),
+
+        # 栈（with 部分可选）
+        (CommandType.CREATE_STACK, "Stack",
+         ("create", "stack", "with", _slot(_REST, "values")), _values_list_non_empty),
+        (CommandType.PUSH_STACK, "Stack",
+         ("push", _slot(_VALUE, "value"), "to", "stack"), None),
+        (CommandType.POP_STACK, "Stack",
+         ("pop", "from", "stack"), None),
+
         # 二叉树
-        CommandType.CREATE_BINARYTREE: re.compile(
-            r'create\s+binarytree\s+with\s+(.+)$',
-            re.IGNORECASE
-        ),
-        CommandType.BUILD_BINARYTREE: re.compile(
-            r'build\s+binarytree\s+with\s+(.+)$',
-            re.IGNORECASE
-        ),
-        CommandType.INSERT_BINARYTREE: re.compile(
-            r'insert\s+(\w+)\s+as\s+(left|right)\s+of\s+(\w+)\s+in\s+binarytree$',
-            re.IGNORECASE
-        ),
-        CommandType.DELETE_BINARYTREE: re.compile(
-            r'delete\s+(\w+)\s+from\s+binarytree$',
-            re.IGNORECASE
-        ),
-        
+        (CommandType.CREATE_BINARYTREE, "BinaryTree",
+         ("create", "binarytree", "with", _slot(_REST, "values")), _values_list),
+        (CommandType.BUILD_BINARYTREE, "BinaryTree",
+         ("build", "binarytree", "with", _slot(_REST, "values")), _values_list),
+        (CommandType.INSERT_BINARYTREE, "BinaryTree",
+         ("insert", _slot(_VALUE, "value"), "as", _slot(_SIDE, "position"), "of",
+          _slot(_VALUE, "parent_value"), "in", "binarytree"), None),
+        (CommandType.DELETE_BINARYTREE, "BinaryTree",
+         ("delete", _slot(_VALUE, "value"), "from", "binarytree"), None),
+
         # BST
-        CommandType.CREATE_BST: re.compile(
-            r'create\s+bst\s+with\s+(.+)$',
-            re.IGNORECASE
-        ),
-        CommandType.BUILD_BST: re.compile(
-            r'build\s+bst\s+with\s+(.+)$',
-            re.IGNORECASE
-        ),
-        CommandType.INSERT_BST: re.compile(
-            r'insert\s+(\w+)\s+in\s+bst$',
-            re.IGNORECASE
-        ),
-        CommandType.SEARCH_BST: re.compile(
-            r'search\s+(\w+)\s+in\s+bst$',
-            re.IGNORECASE
-        ),
-        CommandType.DELETE_BST: re.compile(
-            r'delete\s+(\w+)\s+from\s+bst$',
-            re.IGNORECASE
-        ),
-        
+        (CommandType.CREATE_BST, "BST",
+         ("create", "bst", "with", _slot(_REST, "values")), _values_list),
+        (CommandType.BUILD_BST, "BST",
+         ("build", "bst", "with", _slot(_REST, "values")), _values_list),
+        (CommandType.INSERT_BST, "BST",
+         ("insert", _slot(_VALUE, "value"), "in", "bst"), None),
+        (CommandType.SEARCH_BST, "BST",
+         ("search", _slot(_VALUE, "value"), "in", "bst"), None),
+        (CommandType.DELETE_BST, "BST",
+         ("delete", _slot(_VALUE, "value"), "from", "bst"), None),
+
         # AVL树
-        CommandType.CREATE_AVL: re.compile(
-            r'create\s+avl\s+with\s+(.+)$',
-            re.IGNORECASE
-        ),
-        CommandType.BUILD_AVL: re.compile(
-            r'build\s+avl\s+with\s+(.+)$',
-            re.IGNORECASE
-        ),
-        CommandType.INSERT_AVL: re.compile(
-            r'insert\s+(\w+)\s+in\s+avl$',
-            re.IGNORECASE
-        ),
-        CommandType.CLEAR_AVL: re.compile(
-            r'clear\s+avl$',
-            re.IGNORECASE
-        ),
-        
+        (CommandType.CREATE_AVL, "AVL",
+         ("create", "avl", "with", _slot(_REST, "values")), _values_list),
+        (CommandType.BUILD_AVL, "AVL",
+         ("build", "avl", "with", _slot(_REST, "values")), _values_list),
+        (CommandType.INSERT_AVL, "AVL",
+         ("insert", _slot(_VALUE, "value"), "in", "avl"), None),
+        (CommandType.CLEAR_AVL, "AVL",
+         ("clear", "avl"), None),
+
         # 哈夫曼树
-        CommandType.BUILD_HUFFMAN: re.compile(
-            r'build\s+huffman\s+with\s+(.+)$',
-            re.IGNORECASE
-        ),
-    }
-    
-    def parse(self, command_text: str) -> ParsedCommand:
+        (CommandType.BUILD_HUFFMAN, "HuffmanTree",
+         ("build", "huffman", "with", _slot(_REST, "frequencies")), str.strip),
+    ]
+
+    # 允许省略 with 部分的命令
+    OPTIONAL_REST = {CommandType.CREATE_STACK}
+
+    def __init__(self):
+        # 分派表：(动词, 第二个词) 与 (动词, 最后一个词) 两张表，每行最多两次字典查找
+        self._head_rules = {}
+        self._tail_rules = {}
+        self._verbs = set()
+        for rule in self.RULES:
+            template = rule[2]
+            self._verbs.add(template[0])
+            if isinstance(template[1], str) and template[1] not in ("at", "from"):
+                self._head_rules[(template[0], template[1])] = rule
+            else:
+                self._tail_rules[(template[0], template[-1])] = rule
+        self.diagnostics: List[DSLDiagnostic] = []
+        self.error_count = 0
+
+    def parse(self, command_text: str, line: int = 0) -> ParsedCommand:
         """
         解析单条命令
         
         Args:
             command_text: 原始命令文本
+            line: 在脚本中的行号（用于诊断信息）
             
         Returns:
             解析后的命令对象
             
         Raises:
-            ValueError: 无法识别的命令
+            DSLSyntaxError: 无法识别的命令（ValueError 子类，附带行列诊断）
         """
-        # 去除首尾空白并转为小写
-        command_text = command_text.strip()
-        
-        # 处理注释行
-        if command_text.startswith('#'):
-            return ParsedCommand(
-                type=CommandType.UNKNOWN,
-                structure="",
-                args={},
-                original_text=command_text
-            )
-        
-        # 处理空行
-        if not command_text:
-            return ParsedCommand(
-                type=CommandType.UNKNOWN,
-                structure="",
-                args={},
-                original_text=""
-            )
-        
-        # 尝试匹配各个命令类型
-        for cmd_type, pattern in self.PATTERNS.items():
-            match = pattern.match(command_text)
-            if match:
-                args = self._extract_args(cmd_type, match, command_text)
-                structure = self._get_structure_name(cmd_type)
-                return ParsedCommand(
-                    type=cmd_type,
-                    structure=structure,
-                    args=args,
-                    original_text=command_text
-                )
-        
-        # 无法识别的命令
-        raise ValueError(f"无法识别的命令: {command_text}")
-    
-    def _extract_args(self, cmd_type: CommandType, match: re.Match, original_text: str) -> dict:
-        """提取命令参数"""
+        stripped = command_text.strip()
+
+        # 注释行与空行
+        if not stripped or stripped.startswith('#'):
+            return ParsedCommand(type=CommandType.UNKNOWN, structure="", args={},
+                                 original_text=stripped, line=line)
+
+        tokens = stripped.split()
+        verb = tokens[0].lower()
+        rule = None
+        if len(tokens) > 1:
+            rule = self._head_rules.get((verb, tokens[1].lower())) or self._tail_rules.get((verb, tokens[-1].lower()))
+        if rule is None:
+            if verb not in self._verbs:
+                self._fail(command_text, line, 0, f"未知命令 '{tokens[0]}'")
+            self._fail(command_text, line, len(tokens) - 1 if len(tokens) > 1 else 0,
+                       f"无法识别的命令: {stripped}")
+
+        cmd_type, structure, template, convert = rule
+        args = self._match_template(command_text, stripped, tokens, line, cmd_type, template, convert)
+        return ParsedCommand(type=cmd_type, structure=structure, args=args,
+                             original_text=stripped, line=line)
+
+    def _match_template(self, raw_text, stripped, tokens, line, cmd_type, template, convert) -> dict:
+        """按模板逐词匹配；失败时给出出错词所在的列"""
         args = {}
-        
-        if cmd_type == CommandType.CREATE_ARRAYLIST:
-            # create arraylist with 1,2,3
-            values_str = match.group(1).strip()
-            args['values'] = [v.strip() for v in values_str.split(',')]
-            
-        elif cmd_type == CommandType.INSERT_ARRAYLIST:
-            # insert 4 at 1 in arraylist
-            args['value'] = match.group(1).strip()
-            args['position'] = int(match.group(2))
-            
-        elif cmd_type == CommandType.DELETE_AT_ARRAYLIST:
-            # delete at 0 from arraylist
-            args['position'] = int(match.group(1))
-            
-        elif cmd_type == CommandType.CREATE_LINKEDLIST:
-            # create linkedlist with 10,20,30
-            values_str = match.group(1).strip()
-            args['values'] = [v.strip() for v in values_str.split(',')]
-            
-        elif cmd_type == CommandType.INSERT_LINKEDLIST:
-            # insert 15 at 1 in linkedlist
-            args['value'] = match.group(1).strip()
-            args['position'] = int(match.group(2))
-            
-        elif cmd_type == CommandType.DELETE_AT_LINKEDLIST:
-            # delete at 2 from linkedlist
-            args['position'] = int(match.group(1))
-            
-        elif cmd_type == CommandType.CREATE_STACK:
-            # create stack [with 1,2,3]
-            values_str = (match.group(1) or "").strip()
-            if values_str:
-                args['values'] = [v.strip() for v in values_str.split(',') if v.strip() != ""]
+        for index, expected in enumerate(template):
+            if isinstance(expected, tuple) and expected[0] == _REST:
+                if index >= len(tokens):
+                    self._fail(raw_text, line, len(tokens), f"命令不完整，缺少 {self._describe(expected)}")
+                # with 之后的原始文本（保留其中的空格）
+                try:
+                    args[expected[1]] = convert(stripped.split(None, index)[index])
+                except ValueError as e:
+                    self._fail(raw_text, line, index, str(e))
+                return args
+            if index >= len(tokens):
+                if cmd_type in self.OPTIONAL_REST and template[index] == "with" and index == len(tokens):
+                    return {}
+                self._fail(raw_text, line, len(tokens), f"命令不完整，缺少 {self._describe(expected)}")
+            token = tokens[index]
+            if isinstance(expected, str):
+                if token.lower() != expected:
+                    self._fail(raw_text, line, index, f"应为 '{expected}'，实际为 '{token}'")
+                continue
+            kind, name = expected
+            if kind == _INT:
+                if not (token.isascii() and token.isdigit()):
+                    self._fail(raw_text, line, index, f"{name} 应为非负整数，实际为 '{token}'")
+                args[name] = int(token)
+            elif kind == _SIDE:
+                side = token.lower()
+                if side not in ("left", "right"):
+                    self._fail(raw_text, line, index, f"应为 left 或 right，实际为 '{token}'")
+                args[name] = side
             else:
-                args = {}
-            
-        elif cmd_type == CommandType.PUSH_STACK:
-            # push 100 to stack
-            args['value'] = match.group(1).strip()
-            
-        elif cmd_type == CommandType.POP_STACK:
-            # pop from stack
-            args = {}
-            
-        elif cmd_type == CommandType.CREATE_BINARYTREE:
-            # create binarytree with 1,2,3,4,5
-            values_str = match.group(1).strip()
-            args['values'] = [v.strip() for v in values_str.split(',')]
-            
-        elif cmd_type == CommandType.BUILD_BINARYTREE:
-            # build binarytree with 1,2,3,4,5
-            values_str = match.group(1).strip()
-            args['values'] = [v.strip() for v in values_str.split(',')]
-            
-        elif cmd_type == CommandType.INSERT_BINARYTREE:
-            # insert 6 as left of 3 in binarytree
-            args['value'] = match.group(1).strip()
-            args['position'] = match.group(2).lower().strip()  # left or right
-            args['parent_value'] = match.group(3).strip()
-            
-        elif cmd_type == CommandType.DELETE_BINARYTREE:
-            # delete 4 from binarytree
-            args['value'] = match.group(1).strip()
-            
-        elif cmd_type == CommandType.CREATE_BST:
-            # create bst with 50,30,70,20,40,60,80
-            values_str = match.group(1).strip()
-            args['values'] = [v.strip() for v in values_str.split(',')]
-            
-        elif cmd_type == CommandType.BUILD_BST:
-            # build bst with 50,30,70,20,40,60,80
-            values_str = match.group(1).strip()
-            args['values'] = [v.strip() for v in values_str.split(',')]
-            
-        elif cmd_type == CommandType.INSERT_BST:
-            # insert 25 in bst
-            args['value'] = match.group(1).strip()
-            
-        elif cmd_type == CommandType.SEARCH_BST:
-            # search 60 in bst
-            args['value'] = match.group(1).strip()
-            
-        elif cmd_type == CommandType.DELETE_BST:
-            # delete 30 from bst
-            args['value'] = match.group(1).strip()
-            
-        elif cmd_type == CommandType.CREATE_AVL:
-            # create avl with 7,19,16,27,9,5,14,11,17,12
-            values_str = match.group(1).strip()
-            args['values'] = [v.strip() for v in values_str.split(',')]
-            
-        elif cmd_type == CommandType.BUILD_AVL:
-            # build avl with 7,19,16,27,9,5,14,11,17,12
-            values_str = match.group(1).strip()
-            args['values'] = [v.strip() for v in values_str.split(',')]
-            
-        elif cmd_type == CommandType.INSERT_AVL:
-            # insert 25 in avl
-            args['value'] = match.group(1).strip()
-            
-        elif cmd_type == CommandType.CLEAR_AVL:
-            # clear avl
-            args = {}
-            
-        elif cmd_type == CommandType.BUILD_HUFFMAN:
-            # build huffman with a:5,b:9,c:12,d:13,e:16,f:45
-            freq_str = match.group(1).strip()
-            args['frequencies'] = freq_str
-            
+                if not _WORD_RE.match(token):
+                    self._fail(raw_text, line, index, f"非法的值 '{token}'")
+                args[name] = token
+        if len(tokens) > len(template):
+            self._fail(raw_text, line, len(template), f"多余的内容 '{tokens[len(template)]}'")
         return args
-    
-    def _get_structure_name(self, cmd_type: CommandType) -> str:
-        """根据命令类型获取数据结构名称"""
-        mapping = {
-            CommandType.CREATE_ARRAYLIST: "SequentialList",
-            CommandType.INSERT_ARRAYLIST: "SequentialList",
-            CommandType.DELETE_AT_ARRAYLIST: "SequentialList",
-            
-            CommandType.CREATE_LINKEDLIST: "LinkedList",
-            CommandType.INSERT_LINKEDLIST: "LinkedList",
-            CommandType.DELETE_AT_LINKEDLIST: "LinkedList",
-            
-            CommandType.CREATE_STACK: "Stack",
-            CommandType.PUSH_STACK: "Stack",
-            CommandType.POP_STACK: "Stack",
-            
-            CommandType.CREATE_BINARYTREE: "BinaryTree",
-            CommandType.BUILD_BINARYTREE: "BinaryTree",
-            CommandType.INSERT_BINARYTREE: "BinaryTree",
-            CommandType.DELETE_BINARYTREE: "BinaryTree",
-            
-            CommandType.CREATE_BST: "BST",
-            CommandType.BUILD_BST: "BST",
-            CommandType.INSERT_BST: "BST",
-            CommandType.SEARCH_BST: "BST",
-            CommandType.DELETE_BST: "BST",
-            
-            CommandType.CREATE_AVL: "AVL",
-            CommandType.BUILD_AVL: "AVL",
-            CommandType.INSERT_AVL: "AVL",
-            CommandType.CLEAR_AVL: "AVL",
-            
-            CommandType.BUILD_HUFFMAN: "HuffmanTree",
-        }
-        return mapping.get(cmd_type, "")
-    
+
+    @staticmethod
+    def _describe(expected) -> str:
+        if isinstance(expected, str):
+            return f"'{expected}'"
+        return {_VALUE: "值", _INT: "位置", _SIDE: "left/right", _REST: "值列表"}[expected[0]]
+
+    @staticmethod
+    def _fail(raw_text: str, line: int, token_index: int, message: str):
+        """定位第 token_index 个词的列号（只在出错时计算），抛出带诊断的异常"""
+        starts = [m.start() for m in _TOKEN_RE.finditer(raw_text)]
+        if token_index < len(starts):
+            column = starts[token_index] + 1
+        else:
+            column = len(raw_text.rstrip()) + 2
+        raise DSLSyntaxError(DSLDiagnostic(line=line, column=column, message=message, text=raw_text.strip()))
+
     def parse_script(self, script_text: str) -> List[ParsedCommand]:
         """
         解析脚本(多条命令)
         
         Args:
-            script_text: 脚本文本(每行一条命令)
+            script_text: 脚本文本(每行一条命令，可包含循环)
             
         Returns:
-            解析后的命令列表
+            解析后的命令列表；出错的行跳过，诊断信息记录在 self.diagnostics
         """
-        commands = []
-        lines = script_text.strip().split('\n')
-        
-        for line_num, line in enumerate(lines, 1):
+        return list(self.iter_commands(script_text.strip().split('\n')))
+
+    def iter_commands(self, lines: Iterable[str]) -> Iterator[ParsedCommand]:
+        """
+        流式解析：逐行读取，循环按迭代惰性展开，解析出一条就产出一条（跳过注释与空行）
+
+        Args:
+            lines: 任意行迭代器（字符串列表、DSLFileReader 等）
+
+        诊断信息记录在 self.diagnostics（最多 MAX_DIAGNOSTICS 条），出错总数见 self.error_count
+        """
+        self.diagnostics = []
+        self.error_count = 0
+        yield from self._iter_statements(enumerate(lines, 1), {})
+
+    def _record(self, diagnostic: DSLDiagnostic):
+        self.error_count += 1
+        if len(self.diagnostics) < MAX_DIAGNOSTICS:
+            self.diagnostics.append(diagnostic)
+
+    def _iter_statements(self, numbered: Iterator[Tuple[int, str]], env: Dict[str, str]) -> Iterator[ParsedCommand]:
+        """numbered 为 (行号, 文本) 迭代器；env 为外层循环变量"""
+        for line_num, text in numbered:
+            stripped = text.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            if env and '$' in stripped:
+                # 只替换已知变量；内层循环自己的变量留给内层展开
+                text = stripped = _VAR_RE.sub(lambda m: env.get(m.group(1), m.group(0)), stripped)
+
+            code = _strip_comment(stripped) if '#' in stripped else stripped
+            if '{' in code or code == '}':
+                if code == '}':
+                    self._record(DSLDiagnostic(line_num, 1, "多余的 '}'", stripped))
+                    continue
+                loop = self._parse_loop_header(code, line_num)
+                if loop is not None:
+                    if loop is False:
+                        # 头部有误：诊断已记录；多行循环跳过整个循环体，单行循环不影响后续行
+                        if code.endswith('{'):
+                            self._collect_block(numbered, line_num, stripped)
+                        continue
+                    var, values, inline_body = loop
+                    if inline_body is not None:
+                        body = [(line_num, statement) for statement in _split_statements(inline_body)]
+                    else:
+                        body = self._collect_block(numbered, line_num, stripped)
+                        if body is None:
+                            continue
+                    for value in values:
+                        inner = dict(env)
+                        if var is not None:
+                            inner[var] = str(value)
+                        yield from self._iter_statements(iter(body), inner)
+                    continue
+
+            if '$' in stripped:
+                undefined = _VAR_RE.search(stripped)
+                if undefined:
+                    column = text.find(undefined.group(0)) + 1
+                    self._record(DSLDiagnostic(line_num, column, f"未定义的变量 {undefined.group(0)}", stripped))
+                    continue
             try:
-                cmd = self.parse(line)
-                if cmd.type != CommandType.UNKNOWN:
-                    commands.append(cmd)
-            except ValueError as e:
-                print(f"第 {line_num} 行解析错误: {e}")
+                yield self.parse(text, line_num)
+            except DSLSyntaxError as e:
+                self._record(e.diagnostic)
+
+    def _parse_loop_header(self, stripped: str, line_num: int):
+        """
+        解析循环头
         
-        return commands
+        Returns:
+            None 表示不是循环；False 表示是循环但头部有误（已记录诊断）；
+            否则为 (变量名或None, 迭代值range, 单行循环体或None)
+        """
+        repeat = _REPEAT_RE.match(stripped)
+        loop_for = None if repeat else _FOR_RE.match(stripped)
+        if not repeat and not loop_for:
+            return None
+        rest = (repeat.group(2) if repeat else loop_for.group(4)).strip()
+        if rest and not rest.endswith('}'):
+            self._record(DSLDiagnostic(line_num, len(stripped) + 1, "单行循环体缺少 '}'", stripped))
+            return False
+        inline_body = rest[:-1] if rest else None
+        try:
+            if repeat:
+                count = int(repeat.group(1))
+                if count < 0:
+                    raise ValueError
+                return None, range(count), inline_body
+            start, end = int(loop_for.group(2)), int(loop_for.group(3))
+        except ValueError:
+            self._record(DSLDiagnostic(line_num, 1, "循环次数/范围必须是整数", stripped))
+            return False
+        step = 1 if end >= start else -1
+        return loop_for.group(1), range(start, end + step, step), inline_body
 
+    def _collect_block(self, numbered: Iterator[Tuple[int, str]], header_line: int, header: str):
+        """读取多行循环体直到配对的 '}'；超长或未闭合时记录诊断并返回 None"""
+        body = []
+        depth = 1
+        overflow = False
+        for line_num, text in numbered:
+            code = _strip_comment(text)
+            if code == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            elif code.endswith('{'):
+                depth += 1
+            if overflow:
+                continue
+            body.append((line_num, text))
+            if len(body) > MAX_BLOCK_LINES:
+                overflow = True
+                body = []
+        else:
+            self._record(DSLDiagnostic(header_line, len(header), "循环缺少配对的 '}'", header))
+            return None
+        if overflow:
+            self._record(DSLDiagnostic(header_line, 1, f"循环体超过 {MAX_BLOCK_LINES} 行", header))
+            return None
+        return body
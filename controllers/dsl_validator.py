@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+DSL脚本校验（预演）
+在纯模型上模拟脚本，不依赖Qt、不播放动画，报告每一条会失败的命令：
+- 越界位置、空栈出栈、找不到父节点、子节点位置已被占用、删除不存在的值等
+- 各数据结构的命令序列互不影响，按结构拆段后在进程池中并行模拟，
+  总耗时取决于最长的单个结构段
+- 可给出各结构当前的内容作为起点，预演结果与在当前画面上真实执行一致
+"""
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from structures.avl import AVLModel
+from structures.binary_tree import BinaryTreeModel
+from structures.bst import BSTModel
+from .dsl_parser import CommandType, DSLDiagnostic, DSLParser, ParsedCommand
+
+# 命令总数低于此值时直接在当前进程模拟（启动子进程的开销比模拟本身还大）
+PARALLEL_MIN_COMMANDS = 5000
+# 报告中保留的问题条数上限（循环里同一行可能反复出错）
+MAX_ISSUES = 500
+
+
+@dataclass
+class ValidationIssue:
+    """一条校验问题"""
+    line: int
+    structure: str
+    message: str
+    text: str = ""
+
+    def __str__(self) -> str:
+        return f"第 {self.line} 行 [{self.structure}]: {self.message}"
+
+
+@dataclass
+class ValidationReport:
+    """校验结果"""
+    issues: List[ValidationIssue] = field(default_factory=list)
+    issue_count: int = 0
+    parse_errors: List[DSLDiagnostic] = field(default_factory=list)
+    parse_error_count: int = 0
+    command_count: int = 0
+    segment_sizes: Dict[str, int] = field(default_factory=dict)
+    workers: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.issue_count == 0 and self.parse_error_count == 0
+
+    def summary(self) -> str:
+        if self.ok:
+            return f"校验通过：{self.command_count} 条命令，用时 {self.elapsed * 1000:.0f} ms"
+        return (f"校验发现 {self.parse_error_count} 处语法错误、{self.issue_count} 条会失败的命令"
+                f"（共 {self.command_count} 条，用时 {self.elapsed * 1000:.0f} ms）")
+
+
+# ====== 各结构的模拟器：seed 载入起始内容，apply 返回错误说明，None 表示该命令可以正常执行 ======
+
+def _coerce(value):
+    """与 BST/AVL 模型一致：能转成数字的按数字比较"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class _LinearSimulator:
+    """顺序表/链表：越界的插入与删除"""
+
+    def __init__(self, clamp_insert: bool):
+        self.items: List[str] = []
+        self.clamp_insert = clamp_insert
+
+    def seed(self, values: List[str]):
+        self.items = list(values)
+
+    def apply(self, t: CommandType, args: dict) -> Optional[str]:
+        if t in (CommandType.CREATE_ARRAYLIST, CommandType.CREATE_LINKEDLIST):
+            self.items = [v for v in args['values'] if v != ""]
+        elif t in (CommandType.INSERT_ARRAYLIST, CommandType.INSERT_LINKEDLIST):
+            pos = args['position']
+            if not 0 <= pos <= len(self.items):
+                if not self.clamp_insert:
+                    return f"插入位置 {pos} 越界（当前长度 {len(self.items)}，可用 0~{len(self.items)}）"
+                # 顺序表会把位置夹到末尾，能执行但多半不是本意
+                self.items.append(args['value'])
+                return f"插入位置 {pos} 越界（当前长度 {len(self.items) - 1}），执行时会插到末尾"
+            self.items.insert(pos, args['value'])
+        elif t in (CommandType.DELETE_AT_ARRAYLIST, CommandType.DELETE_AT_LINKEDLIST):
+            pos = args['position']
+            if not 0 <= pos < len(self.items):
+                return f"删除位置 {pos} 越界（当前长度 {len(self.items)}）"
+            self.items.pop(pos)
+        return None
+
+
+class _StackSimulator:
+    def __init__(self):
+        self.size = 0
+
+    def seed(self, values: List[str]):
+        self.size = len(values)
+
+    def apply(self, t: CommandType, args: dict) -> Optional[str]:
+        if t == CommandType.CREATE_STACK:
+            self.size = len([v for v in args.get('values') or [] if v != ""])
+        elif t == CommandType.PUSH_STACK:
+            self.size += 1
+        elif t == CommandType.POP_STACK:
+            if self.size == 0:
+                return "栈为空，无法出栈"
+            self.size -= 1
+        return None
+
+
+class _BinaryTreeSimulator:
+    """二叉树：父节点不存在、子节点位置已被占用、删除不存在的节点"""
+
+    def __init__(self):
+        self.model = BinaryTreeModel()
+        self.model.set_active(True)
+
+    def seed(self, values: List[Optional[str]]):
+        """按带空位（None）的层序还原形状：空位不再展开子节点"""
+        nodes = [None if value is None else BinaryTreeModel.Node(value) for value in values]
+        if not nodes or nodes[0] is None:
+            return
+        self.model.root = nodes[0]
+        parents = deque([nodes[0]])
+        children = iter(nodes[1:])
+        while parents:
+            parent = parents.popleft()
+            for side in ("left", "right"):
+                child = next(children, None)
+                if child is not None:
+                    setattr(parent, side, child)
+                    parents.append(child)
+
+    def apply(self, t: CommandType, args: dict) -> Optional[str]:
+        model = self.model
+        if t in (CommandType.CREATE_BINARYTREE, CommandType.BUILD_BINARYTREE):
+            # 与控制器的层序构建一致：依次填入第一个空位
+            model.clear()
+            nodes = []
+            for i, value in enumerate(args['values']):
+                node = BinaryTreeModel.Node(value)
+                if i == 0:
+                    model.root = node
+                else:
+                    parent = nodes[(i - 1) // 2]
+                    if i % 2 == 1:
+                        parent.left = node
+                    else:
+                        parent.right = node
+                nodes.append(node)
+        elif t == CommandType.INSERT_BINARYTREE:
+            parent_value, side = args['parent_value'], args['position']
+            parent = model.find_node_by_value(parent_value)
+            if parent is None:
+                return f"未找到父节点 {parent_value}"
+            if parent.left is not None and parent.right is not None:
+                return f"节点 {parent_value} 已有两个子节点"
+            if getattr(parent, side) is not None:
+                return f"节点 {parent_value} 的{'左' if side == 'left' else '右'}子节点已存在"
+            setattr(parent, side, BinaryTreeModel.Node(args['value']))
+        elif t == CommandType.DELETE_BINARYTREE:
+            if not model.delete_node(args['value']):
+                return f"未找到节点 {args['value']}"
+        return None
+
+
+class _SearchTreeSimulator:
+    """BST/AVL：重复插入、删除不存在的值、空的批量构建、数字与文本混用"""
+
+    def __init__(self, model_class):
+        self.model = model_class()
+        self.model.set_active(True)
+
+    def seed(self, values: List[str]):
+        # 按层序重新插入即可还原同一形状
+        self.model.insert_values(values)
+
+    def _insert(self, value) -> Optional[str]:
+        if self.model.root is not None and self.model.find_node_by_value(_coerce(value)) is not None:
+            return f"值 {value} 已存在，插入会被忽略"
+        self.model.insert_values([value])
+        return None
+
+    def apply(self, t: CommandType, args: dict) -> Optional[str]:
+        model = self.model
+        try:
+            if t in (CommandType.BUILD_BST, CommandType.CREATE_AVL, CommandType.BUILD_AVL):
+                if not args['values']:
+                    return "没有要构建的值"
+                model.clear()
+                duplicates = []
+                for value in args['values']:
+                    if self._insert(value):
+                        duplicates.append(value)
+                if duplicates:
+                    return f"重复的值会被忽略: {', '.join(duplicates)}"
+            elif t == CommandType.CREATE_BST:
+                duplicates = [v for v in args['values'] if v and self._insert(v)]
+                if duplicates:
+                    return f"重复的值会被忽略: {', '.join(duplicates)}"
+            elif t in (CommandType.INSERT_BST, CommandType.INSERT_AVL):
+                return self._insert(args['value'])
+            elif t == CommandType.DELETE_BST:
+                if not model.remove_value(args['value']):
+                    return f"未找到节点 {args['value']}"
+            elif t == CommandType.CLEAR_AVL:
+                model.clear()
+        except TypeError:
+            return "数字与文本混用，无法比较大小"
+        return None
+
+
+class _HuffmanSimulator:
+    def apply(self, t: CommandType, args: dict) -> Optional[str]:
+        if t != CommandType.BUILD_HUFFMAN:
+            return None
+        bad = []
+        valid = 0
+        for pair in args['frequencies'].split(','):
+            key, sep, freq = pair.partition(':')
+            if not sep or not key.strip() or not freq.strip().isdigit():
+                bad.append(pair.strip())
+            else:
+                valid += 1
+        if valid == 0:
+            return "没有有效的 字符:频率 项"
+        if bad:
+            return f"无法解析的项会被跳过: {', '.join(bad)}"
+        return None
+
+
+def _make_simulator(structure: str):
+    if structure == "SequentialList":
+        return _LinearSimulator(clamp_insert=True)
+    if structure == "LinkedList":
+        return _LinearSimulator(clamp_insert=False)
+    if structure == "Stack":
+        return _StackSimulator()
+    if structure == "BinaryTree":
+        return _BinaryTreeSimulator()
+    if structure == "BST":
+        return _SearchTreeSimulator(BSTModel)
+    if structure == "AVL":
+        return _SearchTreeSimulator(AVLModel)
+    if structure == "HuffmanTree":
+        return _HuffmanSimulator()
+    raise ValueError(f"未知的数据结构: {structure}")
+
+
+# 进程间传递的紧凑命令：(行号, 命令类型值, 参数, 原文)
+SegmentCommand = Tuple[int, str, dict, str]
+
+
+def simulate_segment(
+    structure: str,
+    commands: List[SegmentCommand],
+    initial_values: Optional[List[str]] = None,
+) -> Tuple[List[ValidationIssue], int]:
+    """
+    模拟单个结构的命令序列（可在子进程中执行）
+
+    initial_values 为该结构执行前的内容（线性结构按顺序，树按层序），None 表示从空结构开始
+
+    Returns:
+        (问题列表（最多 MAX_ISSUES 条）, 问题总数)
+    """
+    simulator = _make_simulator(structure)
+    if initial_values and hasattr(simulator, "seed"):
+        simulator.seed(initial_values)
+    issues: List[ValidationIssue] = []
+    count = 0
+    for line, type_value, args, text in commands:
+        try:
+            message = simulator.apply(CommandType(type_value), args)
+        except RecursionError:
+            # 模型是递归实现的，树退化成过长的链时真实执行同样会失败
+            count += 1
+            issues.append(ValidationIssue(line, structure, "树深度过大，后续命令不再校验", text))
+            break
+        if message:
+            count += 1
+            if len(issues) < MAX_ISSUES:
+                issues.append(ValidationIssue(line, structure, message, text))
+    return issues, count
+
+
+class DSLValidator:
+    """
+    按结构拆段并行预演DSL脚本
+
+    initial_states 为各结构当前的内容 {结构: 值列表}（与 DSLOptimizer 相同，另含带空位的二叉树层序）；没有给出的结构从空开始
+    """
+
+    def __init__(self, initial_states: Optional[Dict[str, List[str]]] = None, max_workers: Optional[int] = None):
+        self.initial_states = dict(initial_states or {})
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parser = DSLParser()
+
+    def validate_script(self, script_text: str) -> ValidationReport:
+        return self.validate_lines(script_text.strip().split('\n'))
+
+    def validate_lines(self, lines: Iterable[str]) -> ValidationReport:
+        """解析任意行迭代器（编辑器文本、DSLFileReader 等）并校验"""
+        start = time.perf_counter()
+        segments: Dict[str, List[SegmentCommand]] = {}
+        command_count = 0
+        for cmd in self.parser.iter_commands(lines):
+            segments.setdefault(cmd.structure, []).append(self._pack(cmd))
+            command_count += 1
+
+        report = ValidationReport(
+            parse_errors=list(self.parser.diagnostics),
+            parse_error_count=self.parser.error_count,
+            command_count=command_count,
+            segment_sizes={key: len(cmds) for key, cmds in segments.items()},
+        )
+        results = self._simulate(segments, report)
+        for issues, count in results:
+            report.issues.extend(issues)
+            report.issue_count += count
+        report.issues.sort(key=lambda issue: issue.line)
+        del report.issues[MAX_ISSUES:]
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    @staticmethod
+    def _pack(cmd: ParsedCommand) -> SegmentCommand:
+        return cmd.line, cmd.type.value, cmd.args, cmd.original_text
+
+    def _simulate(self, segments: Dict[str, List[SegmentCommand]], report: ValidationReport):
+        workers = min(self.max_workers, len(segments))
+        if workers <= 1 or report.command_count < PARALLEL_MIN_COMMANDS:
+            report.workers = 1
+            return [simulate_segment(key, cmds, self.initial_states.get(key)) for key, cmds in segments.items()]
+        report.workers = workers
+        # 最长的段先提交，尽早开始
+        ordered = sorted(segments.items(), key=lambda item: len(item[1]), reverse=True)
+        # 调用方是 Qt 进程里的后台线程（同时还有 LLM、快照等线程）：fork 多线程进程时子进程可能
+        # 继承被持有的锁而死锁，改用 spawn。spawn 的子进程会重新导入主模块（main.py 连同 PyQt5 与界面模块），
+        # 启动并不轻，所以只在命令数达到 PARALLEL_MIN_COMMANDS 时才用进程池
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [pool.submit(simulate_segment, key, cmds, self.initial_states.get(key)) for key, cmds in ordered]
+            return [future.result() for future in futures]
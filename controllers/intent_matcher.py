@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+本地意图匹配：用规则文法把常见的中英文自然语言指令直接解析成 ActionExecutor 的 JSON 动作
+- 结构关键字 + 操作关键字 + 数值/位置抽取，全部在本地完成（微秒级）
+- 每次匹配给出置信度；低于阈值（多步指令、位置口径含糊、缺参数等）时交给 LLM
+- 统计命中率，用来观察有多少指令根本不需要请求网络
+"""
+import re
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# 结构关键字，按优先级排列：先匹配更具体的（“平衡二叉树”先于“二叉树”）
+STRUCTURE_PATTERNS: List[Tuple[str, str]] = [
+    ("AVL", r"avl|平衡二叉树|平衡树"),
+    ("BST", r"二叉搜索树|二叉查找树|二叉排序树|\bbst\b|binary\s+search\s+tree"),
+    ("HuffmanTree", r"哈夫曼|霍夫曼|huffman"),
+    ("BinaryTree", r"二叉树|binary\s+tree"),
+    ("LinkedList", r"链表|linked\s*list"),
+    ("SequentialList", r"顺序表|线性表|sequential\s*list|array\s*list|\barray\b"),
+    ("Stack", r"栈|\bstack\b"),
+]
+
+# 操作关键字（同一句话命中多个操作视为多步指令，交给 LLM）
+OPERATION_PATTERNS: List[Tuple[str, str]] = [
+    ("push", r"入栈|压入|压栈|进栈|\bpush\b"),
+    ("pop", r"出栈|弹出|弹栈|\bpop\b"),
+    ("create", r"创建|构建|建立|新建|生成|\bcreate\b|\bbuild\b|\bmake\b"),
+    ("insert", r"插入|添加|加入|\binsert\b|\badd\b"),
+    ("delete", r"删除|移除|删掉|去掉|\bdelete\b|\bremove\b"),
+    ("search", r"查找|搜索|查询|寻找|\bsearch\b|\bfind\b|look\s*up"),
+    ("clear", r"清空|重置|清除|\bclear\b|\breset\b"),
+]
+
+# 各结构支持的操作（与 ActionExecutor 保持一致）
+SUPPORTED_OPERATIONS: Dict[str, Tuple[str, ...]] = {
+    "SequentialList": ("create", "insert", "delete"),
+    "LinkedList": ("create", "insert", "delete"),
+    "Stack": ("create", "push", "pop"),
+    "BinaryTree": ("create", "insert", "delete"),
+    "BST": ("create", "insert", "search", "delete"),
+    "AVL": ("create", "insert", "clear"),
+    "HuffmanTree": ("create",),
+}
+
+# 只属于某一种结构的操作：句子里没写结构名时也能确定
+IMPLIED_STRUCTURES = {"push": "Stack", "pop": "Stack", "search": "BST"}
+
+# 英文关键字的 \b 用 ASCII 语义：否则“在BST中”里的汉字会被当成单词字符
+WORD_FLAGS = re.I | re.A
+
+_STRUCTURE_REGEXES = [(name, re.compile(p, WORD_FLAGS)) for name, p in STRUCTURE_PATTERNS]
+_OPERATION_REGEXES = [(name, re.compile(p, WORD_FLAGS)) for name, p in OPERATION_PATTERNS]
+
+# 多步指令连接词
+SEQUENCE_PATTERN = re.compile(r"然后|接着|随后|之后|并且|再把|再将|\bthen\b|after\s+that|;", WORD_FLAGS)
+
+NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+BRACKET_PATTERN = re.compile(r"\[([^\]]*)\]")
+# “第N个位置 / 位置N / 下标N / index N” 按仓库口径一律是 0-based 下标
+POSITION_PATTERN = re.compile(
+    r"第\s*(\d+)\s*个?\s*位置|(?:位置|下标|索引)\s*(?:为|是)?\s*(\d+)|\b(?:position|index|pos)\s*(\d+)", WORD_FLAGS)
+# “第N个元素/节点” 口径含糊（用户常按 1-based 说），不在本地猜
+ORDINAL_PATTERN = re.compile(r"第\s*(\d+)\s*个?\s*(?:元素|节点|数)?")
+HEAD_PATTERN = re.compile(r"头部|开头|最前|表头|\bhead\b|\bfront\b|beginning", WORD_FLAGS)
+TAIL_PATTERN = re.compile(r"尾部|末尾|最后|表尾|\btail\b|\bend\b", WORD_FLAGS)
+# 二叉树插入：“节点3的左侧/左孩子”、“left child of 3”
+CHILD_SIDE_PATTERN = re.compile(
+    r"(-?\d+)\s*(?:号)?\s*(?:节点)?\s*的\s*(左|右)|(left|right)\s+(?:child\s+)?of\s+(?:node\s+)?(-?\d+)", WORD_FLAGS)
+# “包含5个元素”、“of 5 elements”是数量而不是元素值，让 LLM 决定具体取值
+COUNT_PATTERN = re.compile(
+    r"(?<!第)(?<!第 )(?<!\d)\d+\s*个\s*(?:元素|节点|结点|数|值)"
+    r"|\b\d+\s+(?:elements?|nodes?|items?|numbers?|values?)\b", WORD_FLAGS)
+FREQUENCY_PATTERN = re.compile(r"([A-Za-z一-龥])\s*[:=]\s*(\d+)")
+
+# 置信度折扣
+IMPLICIT_STRUCTURE_PENALTY = 0.8
+AMBIGUOUS_ORDINAL_CONFIDENCE = 0.4
+SEQUENCE_CONFIDENCE = 0.3
+COUNT_PHRASE_CONFIDENCE = 0.3
+
+
+class LocalIntentMatcher:
+    """规则文法意图匹配器；resolve() 命中即返回动作，否则返回 None 由调用方回退 LLM"""
+
+    CONFIDENCE_THRESHOLD = 0.75
+
+    def __init__(self,
+                 size_lookup: Optional[Callable[[str], Optional[int]]] = None,
+                 current_structure: Optional[Callable[[], Optional[str]]] = None,
+                 threshold: Optional[float] = None):
+        """
+        Args:
+            size_lookup: 结构类型 -> 当前有效元素个数，用于“尾部”等相对位置；返回 None 表示未知
+            current_structure: 返回当前结构类型，句子没写结构名时作为兜底
+            threshold: 置信度阈值，默认 CONFIDENCE_THRESHOLD
+        """
+        self.size_lookup = size_lookup
+        self.current_structure = current_structure
+        self.threshold = self.CONFIDENCE_THRESHOLD if threshold is None else threshold
+        self.hits = 0
+        self.misses = 0
+
+    # ====== 统计 ======
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate, 3)}
+
+    # ====== 入口 ======
+    def resolve(self, text: str) -> Optional[Dict[str, Any]]:
+        """置信度达到阈值时返回动作并计为命中；否则计为未命中并返回 None"""
+        action, confidence = self.match(text)
+        if action is not None and confidence >= self.threshold:
+            self.hits += 1
+            return action
+        self.misses += 1
+        return None
+
+    def match(self, text: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        解析一句自然语言
+
+        Returns:
+            (动作字典或 None, 置信度 0~1)
+        """
+        if not isinstance(text, str):
+            return None, 0.0
+        # 全角转半角，合并空白；不改大小写（哈夫曼字符区分大小写）
+        text = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+        if not text:
+            return None, 0.0
+
+        # 先抹掉结构名再找操作：“二叉搜索树”里的“搜索”不是查找操作
+        structures, rest = self._find_structures(text)
+        if len(structures) > 1:
+            return None, 0.0
+        operations = self._find_operations(rest)
+        if len(operations) != 1:
+            return None, 0.0
+        operation = operations[0]
+
+        confidence = 1.0
+        if structures:
+            structure = structures[0]
+        elif operation in IMPLIED_STRUCTURES:
+            structure = IMPLIED_STRUCTURES[operation]
+        elif CHILD_SIDE_PATTERN.search(text):
+            structure = "BinaryTree"
+        else:
+            structure = self.current_structure() if self.current_structure else None
+            confidence *= IMPLICIT_STRUCTURE_PENALTY
+        if structure not in SUPPORTED_OPERATIONS:
+            return None, 0.0
+        if operation == "create" and structure == "HuffmanTree":
+            operation = "build"
+        elif operation not in SUPPORTED_OPERATIONS[structure]:
+            return None, 0.0
+
+        builder = getattr(self, f"_params_{operation}")
+        params, param_confidence = builder(structure, text)
+        if params is None:
+            return None, 0.0
+        confidence *= param_confidence
+        if SEQUENCE_PATTERN.search(text):
+            confidence = min(confidence, SEQUENCE_CONFIDENCE)
+        if COUNT_PATTERN.search(text):
+            confidence = min(confidence, COUNT_PHRASE_CONFIDENCE)
+        action = {"structure_type": structure, "operation": operation, "parameters": params}
+        return action, confidence
+
+    # ====== 关键字 ======
+    @staticmethod
+    def _find_structures(text: str) -> Tuple[List[str], str]:
+        """返回 (命中的结构列表, 抹掉结构名后的文本)"""
+        found = []
+        for structure, pattern in _STRUCTURE_REGEXES:
+            # 命中后把该段抹掉，避免“平衡二叉树”再命中“二叉树”
+            text, count = pattern.subn(" ", text)
+            if count:
+                found.append(structure)
+        return found, text
+
+    @staticmethod
+    def _find_operations(text: str) -> List[str]:
+        return [op for op, pattern in _OPERATION_REGEXES if pattern.search(text)]
+
+    # ====== 参数抽取 ======
+    @staticmethod
+    def _numbers(text: str, spans: Optional[List[Tuple[int, int]]] = None) -> List[str]:
+        """抽取数值字符串，跳过已被位置/父节点等占用的区间"""
+        spans = spans or []
+        values = []
+        for m in NUMBER_PATTERN.finditer(text):
+            if any(start <= m.start() < end for start, end in spans):
+                continue
+            values.append(m.group(0))
+        return values
+
+    def _position(self, structure: str, text: str, for_delete: bool = False):
+        """
+        解析位置
+
+        Returns:
+            (position 或 None, 占用区间列表, 置信度)
+        """
+        m = POSITION_PATTERN.search(text)
+        if m:
+            value = next(g for g in m.groups() if g is not None)
+            return int(value), [m.span()], 1.0
+        m = ORDINAL_PATTERN.search(text)
+        if m:
+            return int(m.group(1)), [m.span()], AMBIGUOUS_ORDINAL_CONFIDENCE
+        if HEAD_PATTERN.search(text):
+            return 0, [], 1.0
+        if TAIL_PATTERN.search(text):
+            size = self.size_lookup(structure) if self.size_lookup else None
+            if size is None:
+                return None, [], 0.0
+            if for_delete:
+                return (size - 1, [], 1.0) if size > 0 else (None, [], 0.0)
+            return size, [], 1.0
+        return None, [], 0.0
+
+    @staticmethod
+    def _params_create(structure: str, text: str):
+        bracket = BRACKET_PATTERN.search(text)
+        if bracket:
+            values = [v.strip().strip("'\"") for v in re.split(r"[,，、\s]+", bracket.group(1))]
+            values = [v for v in values if v]
+        else:
+            values = LocalIntentMatcher._numbers(text)
+        if structure == "Stack":
+            return ({"values": values} if values else {}), 1.0
+        if not values:
+            return None, 0.0
+        return {"values": values}, 1.0
+
+    @staticmethod
+    def _params_build(structure: str, text: str):
+        pairs = FREQUENCY_PATTERN.findall(text)
+        if len(pairs) < 2:
+            return None, 0.0
+        return {"frequencies": ",".join(f"{ch}:{freq}" for ch, freq in pairs)}, 1.0
+
+    def _params_insert(self, structure: str, text: str):
+        if structure == "BinaryTree":
+            m = CHILD_SIDE_PATTERN.search(text)
+            if not m:
+                return None, 0.0
+            if m.group(1) is not None:
+                parent, side = m.group(1), "left" if m.group(2) == "左" else "right"
+            else:
+                parent, side = m.group(4), m.group(3).lower()
+            values = self._numbers(text, [m.span()])
+            if len(values) != 1:
+                return None, 0.0
+            return {"value": values[0], "parent_value": parent, "position": side}, 1.0
+
+        if structure in ("SequentialList", "LinkedList"):
+            position, spans, confidence = self._position(structure, text)
+            if position is None:
+                return None, 0.0
+            values = self._numbers(text, spans)
+            if len(values) != 1:
+                return None, 0.0
+            return {"position": position, "value": values[0]}, confidence
+
+        values = self._numbers(text)
+        if len(values) != 1:
+            return None, 0.0
+        return {"value": values[0]}, 1.0
+
+    def _params_delete(self, structure: str, text: str):
+        if structure in ("SequentialList", "LinkedList"):
+            position, spans, confidence = self._position(structure, text, for_delete=True)
+            if position is None or self._numbers(text, spans):
+                # 按值删除或多出来的数字：口径不明，交给 LLM
+                return None, 0.0
+            return {"position": position}, confidence
+        values = self._numbers(text)
+        if len(values) != 1:
+            return None, 0.0
+        return {"value": values[0]}, 1.0
+
+    def _params_push(self, structure: str, text: str):
+        values = self._numbers(text)
+        if len(values) != 1:
+            return None, 0.0
+        return {"value": values[0]}, 1.0
+
+    def _params_pop(self, structure: str, text: str):
+        if self._numbers(text):
+            # “弹出3个元素”之类的多步语义
+            return None, 0.0
+        return {}, 1.0
+
+    def _params_search(self, structure: str, text: str):
+        return self._params_push(structure, text)
+
+    def _params_clear(self, structure: str, text: str):
+        return self._params_pop(structure, text)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+LLM响应缓存：自然语言 -> 动作 的持久化磁盘缓存
+键为 (模型, 归一化后的用户输入, 上下文) 的哈希；LRU 淘汰 + TTL 过期
+值为单个动作对象或多步动作数组
+"""
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .llm_stream import is_action_list
+
+
+def default_cache_path() -> str:
+    """默认缓存文件位置：可用 DSV_LLM_CACHE 环境变量覆盖"""
+    path = os.getenv("DSV_LLM_CACHE")
+    if path:
+        return path
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ds-visualizer", "llm_cache.json")
+
+
+class LLMResponseCache:
+    """线程安全的 LRU + TTL 响应缓存，写入时整体落盘"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 500, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path or default_cache_path()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    # ====== 键 ======
+    @staticmethod
+    def normalize_input(text: str) -> str:
+        """全角转半角、合并空白、英文小写，让同一句话的不同写法命中同一条缓存"""
+        text = unicodedata.normalize("NFKC", text or "")
+        text = re.sub(r"\s+", " ", text).strip()
+        return text.lower()
+
+    @classmethod
+    def make_key(cls, model: str, user_input: str, context: Optional[List[Dict[str, Any]]]) -> str:
+        material = json.dumps(
+            [model or "", cls.normalize_input(user_input), context or []],
+            ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    # ====== 读写 ======
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry["ts"] > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry["action"])
+
+    def peek(self, key: str) -> bool:
+        """是否有未过期的缓存（不计入命中统计，也不改变 LRU 顺序）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.time() - entry["ts"] <= self.ttl_seconds
+
+    def put(self, key: str, action: Any):
+        if not self._cacheable(action):
+            return
+        with self._lock:
+            self._entries[key] = {"ts": time.time(), "action": copy.deepcopy(action)}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save_locked()
+
+    @staticmethod
+    def _cacheable(action: Any) -> bool:
+        return isinstance(action, dict) or is_action_list(action)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save_locked()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ====== 持久化 ======
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        entries = data.get("entries", []) if isinstance(data, dict) else []
+        # 文件中按最近使用从旧到新排列，顺序即 LRU 顺序
+        for item in entries:
+            try:
+                key, ts, action = item["key"], float(item["ts"]), item["action"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            if now - ts <= self.ttl_seconds and self._cacheable(action):
+                self._entries[key] = {"ts": ts, "action": action}
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save_locked(self):
+        payload = {
+            "version": 1,
+            "entries": [{"key": k, "ts": v["ts"], "action": v["action"]} for k, v in self._entries.items()],
+        }
+        tmp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"警告: LLM缓存写入失败: {e}")
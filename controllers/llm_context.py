@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+LLM上下文压缩：把按时间追加的动作历史折叠成“每种结构一条当前状态”
+- 历史动作按顺序在本地重放，得到各结构的有效状态（不依赖会话长短）
+- 控制器给出的实时状态（含动画中未提交的变化）优先于重放结果
+- 只附带最近几条原始动作，整体按 token 预算裁剪，使用紧凑 JSON
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+# 附带的最近原始动作条数（帮助模型理解“刚才做了什么”）
+RECENT_ACTION_COUNT = 3
+# 上下文 token 预算（粗略估算，见 estimate_tokens）
+CONTEXT_TOKEN_BUDGET = 1200
+
+LINEAR_STRUCTURES = ("SequentialList", "LinkedList")
+TREE_STRUCTURES = ("BinaryTree", "BST", "AVL")
+
+
+def dumps_compact(obj: Any) -> str:
+    """无缩进、无多余空格的 JSON"""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略 token 估算：ASCII 约 4 字符一个 token，中文等非 ASCII 字符按一字一个 token"""
+    ascii_count = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_count + 3) // 4 + (len(text) - ascii_count)
+
+
+def _as_str_list(values) -> List[str]:
+    if isinstance(values, str):
+        values = [v for v in values.replace("，", ",").split(",")]
+    if not isinstance(values, (list, tuple)):
+        return []
+    return [str(v).strip() for v in values if v is not None and str(v).strip()]
+
+
+def _to_index(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _apply_action(states: Dict[str, Dict[str, Any]], action: Dict[str, Any]):
+    """在折叠状态上重放一条动作；不认识的动作直接忽略"""
+    st = action.get("structure_type")
+    op = action.get("operation")
+    params = action.get("parameters") or {}
+    if not st or not op or not isinstance(params, dict):
+        return
+
+    if op == "state":
+        states[st] = {k: v for k, v in params.items() if k != "note"}
+        return
+
+    if st in LINEAR_STRUCTURES or st == "Stack":
+        elements = list(states.get(st, {}).get("elements", []))
+        if op in ("create", "build"):
+            elements = _as_str_list(params.get("values"))
+        elif op == "clear":
+            elements = []
+        elif op == "push" and params.get("value") is not None:
+            elements.append(str(params["value"]))
+        elif op == "pop":
+            if elements:
+                elements.pop()
+        elif op == "insert" and params.get("value") is not None:
+            pos = max(0, min(_to_index(params.get("position"), len(elements)), len(elements)))
+            elements.insert(pos, str(params["value"]))
+        elif op == "delete":
+            pos = _to_index(params.get("position"), -1)
+            if 0 <= pos < len(elements):
+                elements.pop(pos)
+        else:
+            return
+        states[st] = {"elements": elements}
+        return
+
+    if st in TREE_STRUCTURES:
+        # 重放无法还原形状，只保留值集合（按插入顺序）
+        values = list(states.get(st, {}).get("values", []))
+        if op in ("create", "build", "build_level", "build_level_order", "level_build"):
+            values = _as_str_list(params.get("values"))
+        elif op == "clear":
+            values = []
+        elif op == "insert" and params.get("value") is not None:
+            values.append(str(params["value"]))
+        elif op == "delete":
+            target = str(params.get("value"))
+            if target in values:
+                values.remove(target)
+        else:
+            return
+        states[st] = {"values": values}
+        return
+
+    if st == "HuffmanTree" and op in ("build", "create"):
+        states[st] = {"frequencies": params.get("frequencies")}
+
+
+def fold_history(actions: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """按顺序重放动作历史，返回 {结构类型: 状态参数}"""
+    states: Dict[str, Dict[str, Any]] = {}
+    for action in actions or []:
+        if isinstance(action, dict):
+            _apply_action(states, action)
+    return states
+
+
+def _state_entry(structure_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    return {"structure_type": structure_type, "operation": "state", "parameters": params}
+
+
+def _truncate_state(entry: Dict[str, Any]) -> bool:
+    """
+    把状态里最长的列表砍掉一半，返回是否还能继续裁剪
+    - 线性结构/栈的 elements 保留尾部（最近插入/栈顶），省略数记在 omitted_xxx
+    - 树的 level_order/values 保留头部：层序的前缀仍是一棵完整的上层树，省略数记在 truncated_xxx
+    """
+    params = dict(entry["parameters"])
+    key = max((k for k, v in params.items() if isinstance(v, list)),
+              key=lambda k: len(params[k]), default=None)
+    if key is None or len(params[key]) <= 1:
+        return False
+    items = params[key]
+    keep = len(items) // 2
+    if key == "elements":
+        params["omitted_" + key] = params.get("omitted_" + key, 0) + len(items) - keep
+        params[key] = items[len(items) - keep:]
+    else:
+        kept = items[:keep]
+        while kept and kept[-1] is None:
+            kept.pop()
+        params["truncated_" + key] = params.get("truncated_" + key, 0) + len(items) - len(kept)
+        params[key] = kept
+    entry["parameters"] = params
+    return True
+
+
+def build_compact_context(
+    history: List[Dict[str, Any]],
+    live_states: Dict[str, Dict[str, Any]],
+    current_key: Optional[str],
+    budget: int = CONTEXT_TOKEN_BUDGET,
+    recent_count: int = RECENT_ACTION_COUNT,
+) -> List[Dict[str, Any]]:
+    """
+    生成紧凑上下文数组：[最近几条原始动作..., 其它结构的 state..., 当前结构的 state]
+
+    Args:
+        history: 完整动作历史（按时间顺序）
+        live_states: 控制器给出的实时状态 {结构类型: 状态参数}，优先于重放结果；
+            空的实时状态同样覆盖历史，只有历史里也没有该结构时才省略（当前结构除外）
+        current_key: 当前结构类型，其 state 放在最后
+        budget: token 预算；超出时依次丢弃最近动作、其它结构状态，最后截断当前结构的长列表
+    """
+    states = fold_history(history)
+    for key, params in live_states.items():
+        if params is None:
+            continue
+        if key == current_key or key in states or any(params.values()):
+            states[key] = params
+
+    recent = [a for a in (history or [])[-recent_count:] if a.get("operation") != "state"] if recent_count else []
+    others = [_state_entry(k, v) for k, v in states.items() if k != current_key]
+    current = [_state_entry(current_key, states[current_key])] if current_key in states else []
+
+    def cost():
+        return estimate_tokens(dumps_compact(recent + others + current))
+
+    while recent and cost() > budget:
+        recent.pop(0)
+    while others and cost() > budget:
+        others.pop(0)
+    while current and cost() > budget and _truncate_state(current[0]):
+        pass
+    return recent + others + current
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+LLM请求管线：在有界线程池上并发执行自然语言转换请求
+- 复用 LLMService 的持久 HTTP 会话（keep-alive）
+- 每个请求都有截止时间，并且可以真正取消（关闭底层连接）
+- 结果通过回调交给调用方，由调用方负责切回 GUI 线程
+"""
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError
+from typing import Any, Callable, Dict, List, Optional
+
+from .llm_service import LLMService, LLMRequestCancelled
+
+
+class LLMRequestHandle:
+    """一次请求的句柄：取消、查询状态、等待结果"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, user_input: str, deadline: float):
+        self.request_id = next(self._ids)
+        self.user_input = user_input
+        self.deadline = deadline
+        self._cancel_event = threading.Event()
+        self._response = None
+        self._lock = threading.Lock()
+        self.future: Optional[Future] = None
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        return self._cancel_event
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def cancel(self):
+        """取消请求：未开始的直接出队；进行中的关闭连接，让读取立即结束"""
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+        with self._lock:
+            response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def _attach_response(self, response):
+        with self._lock:
+            self._response = response
+        if self.cancelled:
+            response.close()
+
+    def result(self, timeout: Optional[float] = None):
+        """阻塞等待结果（动作字典）；取消时抛出 LLMRequestCancelled"""
+        try:
+            return self.future.result(timeout)
+        except CancelledError:
+            raise LLMRequestCancelled("LLM请求已取消")
+
+
+class LLMRequestPipeline:
+    """有界线程池 + 持久会话的异步请求管线"""
+
+    def __init__(self, service: LLMService, max_workers: int = 4):
+        self.service = service
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._inflight: Dict[int, LLMRequestHandle] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        user_input: str,
+        model: Optional[str] = None,
+        operations_context: Optional[List[Dict[str, Any]]] = None,
+        deadline: Optional[float] = None,
+        on_done: Optional[Callable[[LLMRequestHandle], None]] = None,
+        postprocess: Optional[Callable[[Optional[Dict[str, Any]]], Any]] = None,
+        on_delta: Optional[Callable[[LLMRequestHandle, str], None]] = None,
+    ) -> LLMRequestHandle:
+        """
+        提交一次转换请求（立即返回句柄）
+
+        Args:
+            deadline: 相对截止时间（秒），默认 LLMService.DEFAULT_DEADLINE
+            on_done: 请求结束（成功/失败/取消）后在工作线程中回调
+            postprocess: 在工作线程中对动作做的后处理（如位置归一化）
+            on_delta: 流式响应每到一段文本在工作线程中回调 (句柄, 目前为止的完整文本)
+        """
+        seconds = deadline if deadline is not None else self.service.DEFAULT_DEADLINE
+        handle = LLMRequestHandle(user_input, time.monotonic() + seconds)
+
+        def run():
+            if handle.cancelled:
+                raise LLMRequestCancelled("LLM请求已取消")
+            action = self.service.request_action(
+                user_input, model, operations_context,
+                cancel_event=handle.cancel_event,
+                deadline=handle.deadline,
+                on_response=handle._attach_response,
+                on_delta=(lambda text: on_delta(handle, text)) if on_delta is not None else None,
+            )
+            return postprocess(action) if postprocess is not None else action
+
+        with self._lock:
+            self._inflight[handle.request_id] = handle
+        handle.future = self._executor.submit(run)
+
+        def finished(_future):
+            with self._lock:
+                self._inflight.pop(handle.request_id, None)
+            if on_done is not None:
+                on_done(handle)
+
+        handle.future.add_done_callback(finished)
+        return handle
+
+    def complete_locally(self, user_input: str, action: Dict[str, Any]) -> LLMRequestHandle:
+        """本地已解析出动作（不发请求）：返回一个已完成的句柄，调用方按同样的流程处理"""
+        handle = LLMRequestHandle(user_input, time.monotonic())
+        handle.future = Future()
+        handle.future.set_result(action)
+        return handle
+
+    def cancel_all(self):
+        """取消所有进行中的请求"""
+        with self._lock:
+            handles = list(self._inflight.values())
+        for handle in handles:
+            handle.cancel()
+
+    def shutdown(self):
+        """取消全部请求并关闭线程池与会话"""
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
+        self.service.close()
+
@@ -5,23 +5,56 @@ LLM服务模块
 """
 import os
 import json
+import threading
+import time
 import requests
-from typing import Optional, Dict, Any, List
+import requests.adapters
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+from .llm_cache import LLMResponseCache
+from .llm_context import dumps_compact
+from .llm_stream import SSEDecoder, JSONObjectScanner, is_action_list
+
+
+class LLMRequestCancelled(Exception):
+    """请求被调用方取消"""
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """请求超过截止时间"""
 
 
 class LLMService:
     """LLM服务类，处理自然语言到JSON动作的转换，使用OpenRouter API"""
+
+    CONNECT_TIMEOUT = 10  # 建立连接的超时（秒）
+    DEFAULT_DEADLINE = 30  # 单次请求的默认截止时间（秒）
+    READ_CHUNK_SIZE = 8192
     
-    def __init__(self):
+    def __init__(self, pool_size: int = 4, cache: Optional[LLMResponseCache] = None):
         """初始化LLM服务"""
         self.api_key = os.getenv('OPENROUTER_API_KEY')
-        self.base_url = "https://openrouter.ai/api/v1"
+        # 允许通过环境变量指向本地替身服务器（调试/测试用）
+        self.base_url = os.getenv('OPENROUTER_BASE_URL', "https://openrouter.ai/api/v1").rstrip("/")
         # 默认模型，可以在环境变量中覆盖
         self.default_model = os.getenv('OPENROUTER_MODEL', 'openai/gpt-3.5-turbo')
+        # 持久会话：keep-alive 复用连接，连接池大小与并发请求数一致
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        # 响应缓存：同一模型 + 同一句话 + 相同上下文直接复用上次的动作
+        self.cache = cache if cache is not None else LLMResponseCache()
+        # 流式模式：逐 token 接收，JSON 对象一闭合就返回，不等整条回复结束
+        self.stream_responses = True
     
     def check_api_key(self) -> bool:
         """检查API密钥是否已设置"""
         return self.api_key is not None and len(self.api_key.strip()) > 0
+
+    def close(self):
+        """关闭持久会话"""
+        self._session.close()
     
     def convert_natural_language_to_action(
         self,
@@ -43,63 +76,14 @@ class LLMService:
                 "operation": "create",      # 操作类型
                 "parameters": {...}        # 操作参数
             }
+            多步请求返回有序的动作计划：{"actions": [动作1, 动作2, ...]}
             如果转换失败返回None
         """
         if not self.check_api_key():
             raise ValueError("未设置OPENROUTER_API_KEY环境变量")
         
         try:
-            # 构建prompt，附带可选的历史操作上下文
-            prompt = self._build_prompt(user_input, operations_context)
-            
-            # 使用OpenRouter API
-            model_to_use = model or self.default_model
-            url = f"{self.base_url}/chat/completions"
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://github.com/your-repo",  # 可选：用于跟踪
-                "X-Title": "Data Structure Visualizer"  # 可选：应用名称
-            }
-            
-            payload = {
-                "model": model_to_use,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": user_input
-                    }
-                ],
-                "response_format": {"type": "json_object"},  # 强制返回JSON格式
-                "temperature": 0.3  # 降低随机性，提高准确性
-            }
-            
-            # 发送HTTP请求
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()  # 如果状态码不是200会抛出异常
-            
-            result = response.json()
-            
-            # 提取响应内容
-            if "choices" in result and len(result["choices"]) > 0:
-                content = result["choices"][0]["message"]["content"].strip()
-            else:
-                raise ValueError(f"API响应格式异常: {result}")
-            
-            # 解析JSON
-            try:
-                action = json.loads(content)
-            except json.JSONDecodeError:
-                # 兜底：有时模型会输出解释文字+JSON，这里尝试抽取第一个 JSON 对象
-                action = self._extract_first_json_object(content)
-            
-            return action
-            
+            return self.request_action(user_input, model, operations_context)
         except requests.exceptions.RequestException as e:
             print(f"OpenRouter API请求错误: {e}")
             if hasattr(e, 'response') and e.response is not None:
@@ -111,12 +95,190 @@ class LLMService:
             return None
         except json.JSONDecodeError as e:
             print(f"JSON解析错误: {e}")
-            if 'content' in locals():
-                print(f"响应内容: {content}")
             return None
+        except (LLMRequestCancelled, LLMDeadlineExceeded):
+            raise
         except Exception as e:
             print(f"LLM API调用错误: {e}")
             return None
+
+    def request_action(
+        self,
+        user_input: str,
+        model: Optional[str] = None,
+        operations_context: Optional[List[Dict[str, Any]]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        deadline: Optional[float] = None,
+        on_response: Optional[Callable[[Any], None]] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        发送一次转换请求并返回动作字典（异常直接抛出，供请求管线使用）
+
+        Args:
+            cancel_event: 置位后尽快放弃请求并抛出 LLMRequestCancelled
+            deadline: time.monotonic() 形式的截止时间，超时抛出 LLMDeadlineExceeded
+            on_response: 拿到响应对象后回调，调用方可借此在取消时直接关闭连接
+            on_delta: 流式模式下每收到一段文本回调一次，参数为目前为止的完整文本
+        """
+        cache_key = LLMResponseCache.make_key(model or self.default_model, user_input, operations_context)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        if deadline is None:
+            deadline = time.monotonic() + self.DEFAULT_DEADLINE
+        url, headers, payload = self._build_request(user_input, model, operations_context, self.stream_responses)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMDeadlineExceeded("LLM请求超过截止时间")
+
+        # 以流方式读取响应体，便于在分块之间检查取消与截止时间
+        response = self._session.post(
+            url, headers=headers, json=payload, stream=True,
+            timeout=(min(self.CONNECT_TIMEOUT, remaining), remaining)
+        )
+        try:
+            if on_response is not None:
+                on_response(response)
+            response.raise_for_status()  # 如果状态码不是200会抛出异常
+            if "text/event-stream" in response.headers.get("Content-Type", ""):
+                action = self._read_stream(response, cancel_event, deadline, on_delta)
+                self.cache.put(cache_key, action)
+                return action
+            body = bytearray()
+            for chunk in response.iter_content(self.READ_CHUNK_SIZE):
+                self._check_interrupt(cancel_event, deadline)
+                body.extend(chunk)
+        except Exception:
+            # 取消时连接被直接关闭，读取端可能以任意异常结束（连接错误、分块解码错误、
+            # urllib3 协议错误、ValueError 等），只要已取消就一律按取消处理
+            if cancel_event is not None and cancel_event.is_set():
+                raise LLMRequestCancelled("LLM请求已取消") from None
+            raise
+        finally:
+            response.close()
+        if cancel_event is not None and cancel_event.is_set():
+            raise LLMRequestCancelled("LLM请求已取消")
+        action = self._parse_completion(json.loads(body.decode(response.encoding or "utf-8")))
+        self.cache.put(cache_key, action)
+        return action
+
+    @staticmethod
+    def _check_interrupt(cancel_event: Optional[threading.Event], deadline: float):
+        if cancel_event is not None and cancel_event.is_set():
+            raise LLMRequestCancelled("LLM请求已取消")
+        if time.monotonic() > deadline:
+            raise LLMDeadlineExceeded("LLM请求超过截止时间")
+
+    def _read_stream(
+        self,
+        response,
+        cancel_event: Optional[threading.Event],
+        deadline: float,
+        on_delta: Optional[Callable[[str], None]],
+    ) -> Dict[str, Any]:
+        """
+        读取 SSE 流：逐段累积 delta.content，第一个顶层 JSON 对象闭合即返回（剩余 token 不再等待，
+        连接由调用方在 finally 中关闭）
+        """
+        decoder = SSEDecoder()
+        scanner = JSONObjectScanner()
+        parts: List[str] = []
+
+        def events():
+            # chunk_size=None：分块传输时数据一到就交出来，不攒满缓冲区
+            for chunk in response.iter_content(chunk_size=None):
+                self._check_interrupt(cancel_event, deadline)
+                yield from decoder.feed(chunk)
+            # 服务端可能没发最后的空行就断开：残留的事件同样要计入
+            yield from decoder.flush()
+
+        for data in events():
+            if data.strip() == "[DONE]":
+                break
+            event = json.loads(data)
+            if "error" in event:
+                raise ValueError(f"LLM流式响应错误: {event['error']}")
+            choices = event.get("choices") or []
+            delta = (choices[0].get("delta") or {}).get("content") if choices else None
+            if not delta:
+                continue
+            parts.append(delta)
+            if on_delta is not None:
+                on_delta("".join(parts))
+            action = scanner.feed(delta)
+            if action is not None:
+                return action
+        return self._finish_stream(parts)
+
+    def _finish_stream(self, parts: List[str]) -> Dict[str, Any]:
+        """流结束仍未拿到完整对象：按整段文本兜底解析"""
+        content = "".join(parts).strip()
+        try:
+            return self._extract_first_json_object(content)
+        except json.JSONDecodeError:
+            print(f"响应内容: {content}")
+            raise
+
+    def _build_request(
+        self,
+        user_input: str,
+        model: Optional[str],
+        operations_context: Optional[List[Dict[str, Any]]],
+        stream: bool = False,
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """构建请求的 URL、请求头与请求体"""
+        # 构建prompt，附带可选的历史操作上下文
+        prompt = self._build_prompt(user_input, operations_context)
+        
+        # 使用OpenRouter API
+        model_to_use = model or self.default_model
+        url = f"{self.base_url}/chat/completions"
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://github.com/your-repo",  # 可选：用于跟踪
+            "X-Title": "Data Structure Visualizer"  # 可选：应用名称
+        }
+        
+        payload = {
+            "model": model_to_use,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": prompt
+                },
+                {
+                    "role": "user",
+                    "content": user_input
+                }
+            ],
+            "response_format": {"type": "json_object"},  # 强制返回JSON格式
+            "temperature": 0.3  # 降低随机性，提高准确性
+        }
+        if stream:
+            payload["stream"] = True
+        return url, headers, payload
+
+    def _parse_completion(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """从 chat/completions 响应中取出动作 JSON"""
+        # 提取响应内容
+        if "choices" in result and len(result["choices"]) > 0:
+            content = result["choices"][0]["message"]["content"].strip()
+        else:
+            raise ValueError(f"API响应格式异常: {result}")
+        
+        # 解析JSON
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            # 兜底：有时模型会输出解释文字+JSON，这里尝试抽取第一个 JSON 对象
+            try:
+                return self._extract_first_json_object(content)
+            except json.JSONDecodeError:
+                print(f"响应内容: {content}")
+                raise
     
     def _build_prompt(self, user_input: str, operations_context: Optional[List[Dict[str, Any]]] = None) -> str:
         """构建系统prompt"""
@@ -169,6 +331,13 @@ class LLMService:
 7. HuffmanTree (哈夫曼树):
    - build: {"structure_type": "HuffmanTree", "operation": "build", "parameters": {"frequencies": "a:5,b:9,c:12"}}
 
+多步请求：
+- 用户一句话包含多个先后步骤（如“先…然后…再…”）时，返回 {"actions": [动作1, 动作2, ...]}，按执行顺序排列，每个动作格式同上
+- 后面步骤的位置、节点是否存在等，按前面步骤执行之后的状态推断
+- 只有一步时直接返回单个动作对象
+- 例：“先建一个BST 50,30,70，然后删除30，再搜索70” ->
+  {"actions": [{"structure_type": "BST", "operation": "create", "parameters": {"values": ["50","30","70"]}}, {"structure_type": "BST", "operation": "delete", "parameters": {"value": "30"}}, {"structure_type": "BST", "operation": "search", "parameters": {"value": "70"}}]}
+
 注意事项：
 - 所有数值都以字符串形式提供（如 "5" 而不是 5）
 - position参数是整数（数组索引从0开始）
@@ -186,8 +355,13 @@ class LLMService:
   - 例：“删除第4个位置的元素” -> position=4
 
 上下文推断规则（非常重要）：
-- 你会收到“已经执行过的操作历史”（JSON数组，按先后顺序）。你必须按顺序应用这些操作来推断当前状态，不要只看最后一次 create。
-- 操作历史末尾可能包含一条 operation="state" 的记录（例如 LinkedList 的 parameters.elements），它表示当前结构的“有效状态”（可能包含动画中尚未提交的插入/删除变化）。若存在，优先以 state 为准推断“最后一个位置/末尾”等相对位置。
+- 你会收到当前上下文（JSON数组）：开头可能有最近执行过的几条动作，之后是每种数据结构一条 operation="state" 的记录，表示该结构当前的“有效状态”（已包含动画中尚未提交的变化）。
+  - SequentialList / LinkedList / Stack：parameters.elements，线性表从前到后，栈从栈底到栈顶
+  - BinaryTree / BST / AVL：parameters.level_order 为层序序列（null 表示空位），pending_insert 表示正在插入、尚未落地的值；values 表示只知道包含哪些值
+  - HuffmanTree：parameters.frequencies
+  - omitted_xxx 表示该列表因篇幅被省略的前部元素个数
+  - truncated_xxx 表示该列表因篇幅被省略的尾部元素个数（树的层序只保留了上面几层）
+- 数组最后一条 state 是用户当前选中的结构。推断“最后一个位置/末尾”、节点是否存在等，一律以 state 为准。
 
 示例：
 用户输入："创建一个包含数据元素[5,3,7,2,4]的二叉搜索树"
@@ -200,11 +374,11 @@ class LLMService:
         # 如果提供了上下文操作历史，将其追加到 prompt，帮助模型在已有操作基础上继续
         if operations_context:
             try:
-                context_json = json.dumps(operations_context, ensure_ascii=False, indent=2)
+                context_json = dumps_compact(operations_context)
             except Exception:
                 context_json = str(operations_context)
             context_block = (
-                "\n\n以下是已经执行过的操作历史（JSON数组，按先后顺序），请基于这些操作后的状态继续规划下一步动作，"
+                "\n\n以下是当前上下文（JSON数组：最近动作 + 各结构当前状态），请基于这些状态继续规划下一步动作，"
                 "不要重复执行已完成的步骤，仅返回下一步的动作JSON：\n"
                 f"{context_json}\n"
             )
@@ -215,17 +389,17 @@ class LLMService:
     @staticmethod
     def _extract_first_json_object(text: str) -> Dict[str, Any]:
         """
-        从包含杂散文本的内容中提取第一个 JSON 对象。
+        从包含杂散文本的内容中提取第一个 JSON 对象（或多步计划的动作数组）。
         适配：模型输出“解释 + JSON”导致 json.loads 失败的情况。
         """
         decoder = json.JSONDecoder()
         if not isinstance(text, str):
             raise json.JSONDecodeError("content is not str", str(text), 0)
         for i, ch in enumerate(text):
-            if ch == "{":
+            if ch in "{[":
                 try:
                     obj, _end = decoder.raw_decode(text[i:])
-                    if isinstance(obj, dict):
+                    if isinstance(obj, dict) or is_action_list(obj):
                         return obj
                 except json.JSONDecodeError:
                     continue
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+LLM流式响应解析
+- SSEDecoder：把任意切分的字节块还原成 SSE 的 data 事件
+- JSONObjectScanner：在逐段到达的文本里找出第一个完整的顶层 JSON 对象或动作数组（一闭合就能拿到）
+"""
+import json
+from typing import Any, Dict, List, Optional, Union
+
+
+class SSEDecoder:
+    """增量 SSE 解码：feed(字节块) 返回本块内完整的 data 事件文本列表"""
+
+    def __init__(self):
+        self._buffer = b""
+        self._data_lines: List[str] = []
+
+    def feed(self, chunk: bytes) -> List[str]:
+        self._buffer += chunk
+        events = []
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline < 0:
+                break
+            line = self._buffer[:newline].rstrip(b"\r").decode("utf-8")
+            self._buffer = self._buffer[newline + 1:]
+            if not line:
+                # 空行结束一个事件
+                if self._data_lines:
+                    events.append("\n".join(self._data_lines))
+                    self._data_lines = []
+            elif line.startswith(":"):
+                # 注释行（如服务端的保活提示）
+                continue
+            elif line.startswith("data:"):
+                self._data_lines.append(line[5:].lstrip(" "))
+        return events
+
+    def flush(self) -> List[str]:
+        """连接结束时取出最后一个未以空行结束的事件"""
+        events = self.feed(b"\n\n") if self._buffer else []
+        if self._data_lines:
+            events.append("\n".join(self._data_lines))
+            self._data_lines = []
+        return events
+
+
+def is_action_list(value: Any) -> bool:
+    """非空且元素全是对象的数组（多步动作计划）；说明文字里的 [1, 2] 之类不算"""
+    return isinstance(value, list) and bool(value) and all(isinstance(item, dict) for item in value)
+
+
+class JSONObjectScanner:
+    """
+    逐段喂入文本，第一个顶层 JSON 对象或动作数组闭合时返回解析结果；之前的说明文字会被跳过
+    顶层数组（多步计划 [{...}, {...}]）要等整个数组闭合才返回，不会只拿到第一步
+    """
+
+    def __init__(self):
+        self._chars: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        for ch in text:
+            if self._depth == 0:
+                if ch not in "{[":
+                    continue
+                self._chars = []
+            self._chars.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        obj = json.loads("".join(self._chars))
+                    except json.JSONDecodeError:
+                        # 括号配平但不是合法 JSON（如说明文字里的括号）：继续找下一个
+                        continue
+                    if isinstance(obj, dict) or is_action_list(obj):
+                        return obj
+        return None
@@ -2,10 +2,12 @@
 """
 主控制器：协调Model、View和用户交互
 """
+import threading
+from contextlib import contextmanager
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from PyQt5.QtWidgets import QMessageBox, QDialog
-from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+from PyQt5.QtCore import Qt, QObject, pyqtSignal, QTimer
 
 from structures.sequential_list import SequentialListModel
 from structures.linked_list import LinkedListModel
@@ -20,10 +22,18 @@ from .adapters import (
     BinaryTreeAdapter, BSTAdapter, AVLAdapter, HuffmanTreeAdapter,
     StructureSnapshot, center_snapshot
 )
-from .dsl_parser import DSLParser
+from .dsl_parser import DSLParser, DSLSyntaxError, DSLFileReader
 from .dsl_executor import DSLExecutor
-from .llm_service import LLMService
+from .dsl_optimizer import DSLOptimizer
+from .dsl_validator import DSLValidator
+from .llm_service import LLMService, LLMDeadlineExceeded
+from .llm_pipeline import LLMRequestPipeline, LLMRequestHandle
+from .llm_cache import LLMResponseCache
+from .intent_matcher import LocalIntentMatcher
+from .llm_context import build_compact_context
 from .action_executor import ActionExecutor
+from .animation_tracks import AnimationClock, AnimationTrack, now_ms, track_property
+from .snapshot_worker import SnapshotProducer
 
 class _HuffNode:
     """轻量节点类，用于控制器临时维护队列和树"""
@@ -42,6 +52,19 @@ class MainController(QObject):
     operation_logged = pyqtSignal(str)  # 操作记录信号
     operation_log_cleared = pyqtSignal()  # 日志清空信号
     parent_selection_requested = pyqtSignal(str)  # 请求父节点选择
+    llm_conversion_finished = pyqtSignal(object, bool, str, object)  # (请求句柄, 成功, 消息, 动作)，在GUI线程送达
+    llm_conversion_progress = pyqtSignal(object, str)  # (请求句柄, 目前为止收到的回复文本)，流式响应逐段送达
+    _speculative_ready = pyqtSignal(object)  # 被接管的预取请求结束（内部使用，排队连接）
+    dsl_validation_finished = pyqtSignal(object)  # DSL预演结果 ValidationReport，在GUI线程送达
+    _snapshot_ready = pyqtSignal()  # 后台线程生成了新快照（内部使用，排队连接）
+    _snapshot_failed = pyqtSignal(object, str)  # 后台线程生成快照出错 (结构, 错误信息)（内部使用，排队连接）
+    
+    # 兼容属性：各动画方法按“一个全局定时器”编写，读写实际落到当前操作所属结构的轨道上
+    _animation_start_time = track_property("start_time", "当前轨道的计时起点（毫秒）")
+    _animation_duration = track_property("duration", "当前轨道的动画时长（毫秒）")
+    _animation_paused = track_property("paused", "当前轨道是否暂停")
+    _paused_elapsed = track_property("paused_elapsed", "当前轨道暂停时已播放的时长（毫秒）")
+    _current_base_interval = track_property("base_interval", "当前轨道未按倍速换算的回调间隔")
     
     def __init__(self):
         super().__init__()
@@ -83,40 +106,89 @@ class MainController(QObject):
         # 初始化DSL解析器和执行器
         self.dsl_parser = DSLParser()
         self.dsl_executor = DSLExecutor(self)
+        self._dsl_validating = False
         
         # 初始化LLM服务和动作执行器
         self.llm_service = LLMService()
+        self.llm_pipeline = LLMRequestPipeline(self.llm_service)
+        # 输入时预取：(键, 文本, 句柄)；被接管的句柄在结束后经排队信号送出结果
+        self._speculative: Optional[Tuple[str, str, LLMRequestHandle]] = None
+        self._adopted_handles = set()
+        self._delivered_handles = set()
+        self._speculative_lock = threading.Lock()
+        self._speculative_ready.connect(self._on_speculative_ready, Qt.QueuedConnection)
+        # 本地规则匹配：格式化的常见指令不必请求 LLM
+        self.intent_matcher = LocalIntentMatcher(
+            size_lookup=self._effective_size,
+            current_structure=lambda: self.current_structure_key,
+        )
         self.action_executor = ActionExecutor(self)
         self.llm_context_actions: List[Dict[str, Any]] = []  # 供LLM参考的已有操作上下文
-        self._animation_timer: Optional[QTimer] = None
-        self._animation_paused: bool = False
-        self._paused_elapsed: float = 0.0  # 毫秒
+        # 动画轨道：每个结构一条，由同一个时钟驱动，互不打断
+        self._animation_clock = AnimationClock(QTimer(self))
+        self._scoped_track_key: Optional[str] = None  # 非回调上下文中显式指定的轨道
         self.current_llm_model: Optional[str] = self.llm_service.default_model
-        # 动画倍速（0.5/1/1.5/2），影响所有统一定时器与持续时间
+        # 动画倍速（0.5/1/1.5/2）：作用于当前结构的轨道，并作为之后新建轨道的默认倍速
         self._speed_multiplier: float = 1.0
-        self._current_base_interval: int = 0  # 记录最近一次启动定时器的基准间隔
+        # 快照在后台线程生成：GUI 线程只取模型副本，生成好的帧经排队信号取回（双缓冲，过期帧丢弃）
+        self._snapshot_producer = SnapshotProducer(
+            self._snapshot_ready.emit,
+            lambda key, error: self._snapshot_failed.emit(key, str(error)),
+        )
+        self._snapshot_ready.connect(self._on_snapshot_ready, Qt.QueuedConnection)
+        self._snapshot_failed.connect(self._on_snapshot_failed, Qt.QueuedConnection)
         
         self._update_snapshot()
 
     # ========== LLM 上下文：构造更可靠的 prompt 输入 ==========
     def _build_llm_prompt_context(self) -> List[Dict[str, Any]]:
         """
-        构造传给 LLM 的上下文。
-        - 基础：self.llm_context_actions（按时间追加的动作历史）
-        - 追加：当前结构的“有效状态 state”（优先用于推断，例如链表的 elements）
+        构造传给 LLM 的紧凑上下文（见 llm_context.build_compact_context）。
+        - 动作历史（self.llm_context_actions）在本地折叠成每种结构一条 state
+        - 各结构的实时“有效状态”优先（例如链表 elements 包含动画中未提交的变化）
+        - 只附带最近几条原始动作，并按 token 预算裁剪
         """
-        base = list(getattr(self, "llm_context_actions", []) or [])
-        state_entry = self._build_llm_state_entry()
-        if state_entry:
-            base.append(state_entry)
-        return base
+        current = getattr(self, "current_structure_key", None)
+        live_states = {}
+        for key in getattr(self, "structures", {}):
+            entry = self._build_llm_state_entry(key)
+            if entry:
+                # 空结构也要给出：否则历史里的旧内容会顶替它（是否省略由 build_compact_context 决定）
+                live_states[key] = entry["parameters"]
+        return build_compact_context(list(getattr(self, "llm_context_actions", []) or []), live_states, current)
 
-    def _build_llm_state_entry(self) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _llm_value(value) -> str:
+        """模型里的数值（BST/AVL 存 float）转成上下文里的字符串，整数不带 .0"""
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    @classmethod
+    def _tree_level_order(cls, root) -> List[Optional[str]]:
+        """树的层序序列，空位为 None，去掉末尾的 None（与二叉树 create 的层序口径一致）"""
+        order: List[Optional[str]] = []
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            if node is None:
+                order.append(None)
+                continue
+            order.append(cls._llm_value(node.value))
+            queue.append(node.left)
+            queue.append(node.right)
+        while order and order[-1] is None:
+            order.pop()
+        return order
+
+    def _build_llm_state_entry(self, key: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
-        为当前结构生成一条 operation='state' 的上下文项，尽量反映“视觉上/用户认为”的当前状态。
-        目前重点覆盖 LinkedList（解决“最后一个位置”随插入/删除不更新的问题）。
+        为当前结构（或指定结构 key）生成一条 operation='state' 的上下文项，尽量反映“视觉上/用户认为”的当前状态。
+        - 线性结构/栈：elements（栈从底到顶），包含动画中未提交的插入/删除/入栈/出栈
+        - 树：level_order 层序（空位为 null），动画中尚未落地的插入放在 pending_insert
+        - 哈夫曼树：frequencies
         """
-        key = getattr(self, "current_structure_key", None)
+        key = key or getattr(self, "current_structure_key", None)
         if not key or key not in getattr(self, "structures", {}):
             return None
         try:
@@ -156,10 +228,7 @@ class MainController(QObject):
                 return {
                     "structure_type": "LinkedList",
                     "operation": "state",
-                    "parameters": {
-                        "elements": [str(x) for x in effective],
-                        "note": "当前链表有效状态（包含动画中未提交的插入/删除变化），用于推断诸如“最后一个位置”等相对位置。",
-                    },
+                    "parameters": {"elements": [str(x) for x in effective]},
                 }
             except Exception:
                 return None
@@ -192,16 +261,61 @@ class MainController(QObject):
                 return {
                     "structure_type": "SequentialList",
                     "operation": "state",
-                    "parameters": {
-                        "elements": [str(x) for x in effective],
-                        "note": "当前顺序表有效状态（包含动画中未提交的插入/删除变化），用于推断诸如“最后一个位置”等相对位置。",
-                    },
+                    "parameters": {"elements": [str(x) for x in effective]},
+                }
+            except Exception:
+                return None
+
+        # 栈：从底到顶，入栈/出栈动画中的变化同样计入
+        if key == "Stack":
+            try:
+                state = getattr(struct, "_animation_state", None)
+                if state == "building":
+                    effective = list(getattr(struct, "_build_values", []) or [])
+                else:
+                    effective = list(struct.data.to_array())
+                    if state == "pushing" and getattr(struct, "_new_value", None) is not None:
+                        effective.append(struct._new_value)
+                    elif state == "popping" and effective:
+                        effective.pop()
+                return {
+                    "structure_type": "Stack",
+                    "operation": "state",
+                    "parameters": {"elements": [str(x) for x in effective]},
                 }
             except Exception:
                 return None
 
+        # 二叉树 / BST / AVL：层序 + 未落地的插入
+        if key in ("BinaryTree", "BST", "AVL"):
+            try:
+                params: Dict[str, Any] = {"level_order": self._tree_level_order(getattr(struct, "root", None))}
+                state = getattr(struct, "_animation_state", None)
+                new_value = getattr(struct, "_new_value", None)
+                if (state in ("inserting", "creating_root") and new_value is not None
+                        and not getattr(struct, "_insert_committed", False)):
+                    params["pending_insert"] = self._llm_value(new_value)
+                return {"structure_type": key, "operation": "state", "parameters": params}
+            except Exception:
+                return None
+
+        if key == "HuffmanTree":
+            freq_map = getattr(struct, "_original_freq_map", None) or {}
+            return {
+                "structure_type": "HuffmanTree",
+                "operation": "state",
+                "parameters": {"frequencies": ",".join(f"{k}:{v}" for k, v in freq_map.items())},
+            }
+
         return None
 
+    def _effective_size(self, structure_type: str) -> Optional[int]:
+        """本地意图匹配用：线性结构的有效元素个数（含动画中未提交的变化），未知时返回 None"""
+        entry = self._build_llm_state_entry(structure_type)
+        if not entry:
+            return None
+        return len(entry["parameters"].get("elements", []))
+
     @staticmethod
     def _normalize_position_from_user_text(user_input: str, action: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
@@ -285,24 +399,102 @@ class MainController(QObject):
             self.hint_updated.emit(f"当前模式：{key}")
     
     def _update_snapshot(self):
-        """更新当前快照"""
-        if self.current_structure_key in self.structures:
-            structure = self.structures[self.current_structure_key]
-            adapter = self.adapters[self.current_structure_key]
-            snapshot = adapter.to_snapshot(structure) # ← 创建：通过适配器创建 StructureSnapshot
-            self.snapshot_updated.emit(snapshot)
+        """更新当前快照（后台轨道上的结构不在画布上，只推进模型不出帧）"""
+        if self._track_key() != self.current_structure_key:
+            return
+        key = self.current_structure_key
+        if key in self.structures:
+            # 结构未变时副本复用上次复制的结构，只复制动画状态；布局与冻结在后台线程完成，跟不上时只保留最新的请求
+            model = self.structures[key].snapshot_copy()
+            self._snapshot_producer.submit(key, self.adapters[key], model)
+
+    def _on_snapshot_ready(self):
+        """GUI 线程：交换快照缓冲并分发最新一帧（已切走的结构的帧直接丢弃）"""
+        frame = self._snapshot_producer.take()
+        if frame is not None and frame.key == self.current_structure_key:
+            # 快照已冻结：画布等消费者只读共享，显示位置由各自的视图变换决定
+            self.snapshot_updated.emit(frame.snapshot)
+
+    def _on_snapshot_failed(self, key, message: str):
+        """GUI 线程：提示后台快照生成失败（画布保留上一帧）"""
+        if key == self.current_structure_key:
+            self._show_error("生成快照失败", f"{key}: {message}")
+
+    def shutdown_snapshots(self):
+        """停止后台快照生成（程序退出时调用）"""
+        self._snapshot_producer.close()
     
     def _get_current_structure(self):
-        """获取当前数据结构"""
-        return self.structures.get(self.current_structure_key) # ← 依赖：使用数据结构实例
+        """获取当前数据结构（动画回调/批量队列中为其所属结构）"""
+        return self.structures.get(self._track_key()) # ← 依赖：使用数据结构实例
     
     def _get_current_adapter(self):
-        """获取当前适配器"""
-        return self.adapters.get(self.current_structure_key)
+        """获取当前适配器（动画回调/批量队列中为其所属结构）"""
+        return self.adapters.get(self._track_key())
+    
+    # ========== 动画轨道 ==========
+    
+    def _track_key(self) -> str:
+        """当前操作所属的轨道：时钟回调中为正在回调的轨道，其次是显式指定的结构，否则为当前结构"""
+        current = self._animation_clock.current
+        if current is not None:
+            return current.key
+        if self._scoped_track_key is not None:
+            return self._scoped_track_key
+        return self.current_structure_key
+    
+    def _track(self) -> AnimationTrack:
+        return self._animation_clock.track(self._track_key(), self._speed_multiplier)
+    
+    @contextmanager
+    def _track_scope(self, key: str):
+        """在指定结构的轨道上执行（批量构建的后续插入等不依赖用户当前看的是哪个结构）"""
+        previous, self._scoped_track_key = self._scoped_track_key, key
+        try:
+            yield
+        finally:
+            self._scoped_track_key = previous
+    
+    @property
+    def _animation_timer(self) -> Optional[AnimationTrack]:
+        """当前操作所属结构的轨道（接口与 QTimer 相同）；尚未启动过动画时为 None"""
+        track = self._animation_clock.get(self._track_key())
+        return track if track is not None and track.callback is not None else None
+    
+    @_animation_timer.setter
+    def _animation_timer(self, value):
+        # 旧代码只会把它置空，表示结束并丢弃这条轨道
+        if value is None:
+            self._animation_clock.remove(self._track_key())
+    
+    def animation_tracks(self):
+        """所有动画轨道（键为结构名）"""
+        return self._animation_clock.tracks()
+    
+    def pause_track(self, key: str) -> bool:
+        """暂停指定结构的动画，不影响其它结构"""
+        track = self._animation_clock.get(key)
+        if track is None or not track.isActive():
+            return False
+        track.paused_elapsed = now_ms() - track.start_time if track.start_time else 0.0
+        track.paused = True
+        track.stop()
+        return True
+    
+    def resume_track(self, key: str) -> bool:
+        """继续播放指定结构的动画"""
+        track = self._animation_clock.get(key)
+        if track is None or track.callback is None or track.isActive():
+            return False
+        track.start_time = now_ms() - (track.paused_elapsed or 0.0)
+        track.paused = False
+        track.paused_elapsed = 0.0
+        track.start(track.interval())
+        return True
     
     def is_busy(self) -> bool:
-        """判断是否仍有动画或批量任务在执行"""
-        if self._animation_timer and self._animation_timer.isActive():
+        """判断是否仍有动画（任一轨道）或批量任务在执行"""
+        if self._animation_clock.any_active():
             return True
         if getattr(self, "_bst_build_queue", None):
             if len(self._bst_build_queue) > 0:
@@ -318,65 +510,43 @@ class MainController(QObject):
         return False
     
     def _restart_animation_timer(self, callback, interval: int = 50):
-        """停止旧定时器并以新的回调/间隔重新启动"""
-        if self._animation_timer is None:
-            self._animation_timer = QTimer(self)
-        else:
-            self._animation_timer.stop()
-            try:
-                self._animation_timer.timeout.disconnect()
-            except TypeError:
-                pass
+        """以新的回调/间隔（重新）启动当前操作所属结构的轨道；其它结构的轨道不受影响"""
+        track = self._track()
+        track.stop()
         # 重置暂停状态
-        self._animation_paused = False
-        self._paused_elapsed = 0.0
-        self._animation_timer.timeout.connect(callback)
-        self._current_base_interval = interval
-        effective_interval = self._apply_speed_interval(interval)
-        self._animation_timer.start(effective_interval)
+        track.paused = False
+        track.paused_elapsed = 0.0
+        track.callback = callback
+        track.base_interval = interval
+        track.start(self._apply_speed_interval(interval))
 
     def _apply_speed_interval(self, base_interval: int) -> int:
-        """根据倍速调整定时器间隔（倍速大→间隔小，默认1x不变）"""
+        """根据当前轨道的倍速调整回调间隔（倍速大→间隔小，默认1x不变）"""
         base = max(1, int(base_interval))
-        speed = max(0.1, float(self._speed_multiplier))
+        speed = max(0.1, float(self._track().speed))
         return max(5, int(base / speed))
 
     def _calc_progress(self, elapsed: float) -> float:
-        """将耗时转换为进度，受倍速影响"""
-        duration = max(1.0, float(self._animation_duration))
-        speed = max(0.1, float(self._speed_multiplier))
+        """将耗时转换为进度，受当前轨道的倍速影响"""
+        track = self._track()
+        duration = max(1.0, float(track.duration))
+        speed = max(0.1, float(track.speed))
         return min((elapsed * speed) / duration, 1.0)
     
     def pause_current_animation(self):
-        """通用暂停：哈夫曼走专用逻辑，其它结构暂停统一定时器"""
+        """通用暂停：哈夫曼走专用逻辑，其它结构只暂停当前结构的轨道"""
         if self.current_structure_key == "HuffmanTree":
             self.pause_huffman_animation()
             return
-        timer = getattr(self, "_animation_timer", None)
-        if timer and timer.isActive():
-            import time
-            now = time.time() * 1000.0
-            if self._animation_start_time:
-                self._paused_elapsed = now - self._animation_start_time
-            else:
-                self._paused_elapsed = 0.0
-            self._animation_paused = True
-            timer.stop()
+        if self.pause_track(self.current_structure_key):
             self.hint_updated.emit("动画已暂停")
     
     def resume_current_animation(self):
-        """通用继续播放：哈夫曼走专用逻辑，其它结构恢复统一定时器"""
+        """通用继续播放：哈夫曼走专用逻辑，其它结构只恢复当前结构的轨道"""
         if self.current_structure_key == "HuffmanTree":
             self.resume_huffman_animation()
             return
-        timer = getattr(self, "_animation_timer", None)
-        if timer and not timer.isActive():
-            import time
-            now = time.time() * 1000.0
-            self._animation_start_time = now - (self._paused_elapsed or 0.0)
-            self._animation_paused = False
-            self._paused_elapsed = 0.0
-            timer.start(timer.interval())
+        if self.resume_track(self.current_structure_key):
             self.hint_updated.emit("动画已恢复")
     
     # ========== 顺序表操作 ==========
@@ -821,7 +991,8 @@ class MainController(QObject):
             return
         
         next_value = self._bst_build_queue.pop(0)
-        self.insert_bst(next_value)
+        with self._track_scope("BST"):
+            self.insert_bst(next_value)
     
     def _insert_next_avl_value(self):
         """插入AVL批量构建队列中的下一个值"""
@@ -830,7 +1001,8 @@ class MainController(QObject):
                 return
             
             next_value = self._avl_build_queue.pop(0)
-            self.insert_avl(next_value)
+            with self._track_scope("AVL"):
+                self.insert_avl(next_value)
         except Exception as e:
             # 异常时继续处理队列，不中断批量构建
             self._show_error("插入节点失败", str(e))
@@ -891,11 +1063,8 @@ class MainController(QObject):
             if hasattr(structure, "clear"):
                 structure.clear()
             
-            # 如果已有批量构建在进行，先停止当前动画
-            timer = getattr(self, '_animation_timer', None)
-            if timer is not None:
-                timer.stop()
-                self._animation_timer = None
+            # 如果已有批量构建在进行，先停止AVL轨道上的动画（其它结构的动画照常播放）
+            self._animation_clock.remove("AVL")
             
             # 初始化队列
             self._avl_build_queue = list(values) if isinstance(values, list) else [v.strip() for v in str(values).split(',') if v.strip()]
@@ -919,11 +1088,8 @@ class MainController(QObject):
         except Exception as e:
             self._show_error("构建失败", str(e))
             self._avl_build_queue = []  # 清空队列
-            # 清理定时器
-            timer = getattr(self, '_animation_timer', None)
-            if timer is not None:
-                timer.stop()
-                self._animation_timer = None
+            # 清理AVL轨道
+            self._animation_clock.remove("AVL")
     
     def pop_stack(self):
         """出栈"""
@@ -1645,7 +1811,29 @@ class MainController(QObject):
         """哈夫曼树动画单步执行（推动当前阶段一次更新）"""
         structure = self.structures.get("HuffmanTree")
         if structure and hasattr(structure, '_animation_state') and structure._animation_state not in ('done', None):
-            self._update_huffman_phase(structure)
+            with self._track_scope("HuffmanTree"):
+                self._update_huffman_phase(structure)
+    
+    def seek_huffman_round(self, round_number: int, phase: str = "select"):
+        """跳到哈夫曼构建的第 round_number 轮（从 1 开始）的某一阶段，直接取预先算好的时间表，不重放之前的合并"""
+        structure = self.structures.get("HuffmanTree")
+        total = getattr(structure, "_total_rounds", 0) if structure else 0
+        if not structure or total <= 0:
+            self.hint_updated.emit("请先构建至少包含两个字符的哈夫曼树")
+            return
+        round_number = max(1, min(int(round_number), total))
+        with self._track_scope("HuffmanTree"):
+            was_paused = bool(self._animation_paused)
+            try:
+                structure.seek(round_number - 1, phase)
+            except ValueError as e:
+                self._show_error("跳转失败", str(e))
+                return
+            self._start_huffman_phase(structure)
+            if was_paused:
+                # 暂停中跳转：停在新阶段的起点，等待继续播放
+                self.pause_huffman_animation()
+        self.hint_updated.emit(f"哈夫曼树：已跳到第 {round_number}/{total} 轮")
     
     # ========== 工具方法 ==========
     
@@ -1802,6 +1990,8 @@ class MainController(QObject):
             if command.type.value == "unknown":
                 return True, "跳过注释或空行"  # 注释和空行视为成功
             return self.dsl_executor.execute(command)
+        except DSLSyntaxError as e:
+            return False, f"第 {e.diagnostic.column} 列: {e.diagnostic.message}"
         except Exception as e:
             return False, str(e)
     
@@ -1811,29 +2001,170 @@ class MainController(QObject):
         sequential: bool = False,
         progress_callback=None,
         finished_callback=None,
+        fast: bool = False,
     ):
         """
         执行DSL脚本(批量命令)
         
         Args:
             script_text: 脚本文本(每行一条命令)
+            fast: 快速模式，先经 DSLOptimizer 合并中间状态不可见的命令
             
         Returns:
             (成功数, 失败数, 详细消息列表)
         """
         try:
-            commands = self.dsl_parser.parse_script(script_text)
+            optimizer = DSLOptimizer(self._dsl_optimizer_states()) if fast else None
             if sequential:
+                # 逐条解析、逐条执行：循环按需展开，不生成完整命令列表
+                commands = self.dsl_parser.iter_commands(script_text.strip().split('\n'))
+                if optimizer is not None:
+                    commands = optimizer.optimize(commands)
                 return self.dsl_executor.execute_script_sequential(
                     commands,
                     progress_callback=progress_callback,
-                    finished_callback=finished_callback,
+                    finished_callback=self._finish_with_dsl_diagnostics(finished_callback, optimizer=optimizer),
                 )
-            return self.dsl_executor.execute_script(commands)
+            commands = self.dsl_parser.parse_script(script_text)
+            if optimizer is not None:
+                commands = list(optimizer.optimize(commands))
+            success, fail, messages = self.dsl_executor.execute_script(commands)
+            parse_errors = self._report_dsl_diagnostics()
+            return success, fail + self.dsl_parser.error_count, parse_errors + messages
         except Exception as e:
             if sequential and finished_callback:
                 finished_callback(0, 1, [f"脚本解析失败: {str(e)}"])
             return 0, 1, [f"脚本解析失败: {str(e)}"]
+
+    def execute_dsl_file(self, path: str, progress_callback=None, finished_callback=None, fast: bool = False) -> bool:
+        """
+        从磁盘流式执行DSL脚本：读一行、解析一行、执行一条，内存占用与文件大小无关
+        
+        Args:
+            path: 脚本文件路径
+            progress_callback: (已执行条数, 文件已读比例0~1, 成功标志, 消息)
+            finished_callback: (成功数, 失败数, 消息列表)
+            fast: 快速模式，先经 DSLOptimizer 合并中间状态不可见的命令
+            
+        Returns:
+            是否已开始执行
+        """
+        reader = DSLFileReader(path)
+        optimizer = DSLOptimizer(self._dsl_optimizer_states()) if fast else None
+
+        def progress(current, _total, success, message):
+            if progress_callback:
+                progress_callback(current, reader.progress, success, message)
+
+        try:
+            commands = self.dsl_parser.iter_commands(reader)
+            if optimizer is not None:
+                commands = optimizer.optimize(commands)
+            return self.dsl_executor.execute_script_sequential(
+                commands,
+                progress_callback=progress,
+                finished_callback=self._finish_with_dsl_diagnostics(finished_callback, reader, optimizer),
+            )
+        except Exception:
+            reader.close()
+            raise
+
+    def validate_dsl_script(self, script_text: str) -> bool:
+        """
+        预演DSL脚本：以各结构当前内容为起点，在后台线程中用纯模型模拟（各结构并行），不改动当前状态、不播放动画
+        结果通过 dsl_validation_finished 信号送达
+
+        Returns:
+            是否已开始（已有预演在进行时返回 False）
+        """
+        if self._dsl_validating:
+            return False
+        self._dsl_validating = True
+        # 起始状态要在 GUI 线程里读取（模型可能正在被动画推进）
+        validator = DSLValidator(self._dsl_optimizer_states())
+
+        def run():
+            try:
+                report = validator.validate_script(script_text)
+            except Exception as e:
+                print(f"[DSL] 预演失败: {e}")
+                report = None
+            self._dsl_validating = False
+            self.dsl_validation_finished.emit(report)
+
+        threading.Thread(target=run, name="dsl-validate", daemon=True).start()
+        return True
+
+    def _dsl_optimizer_states(self) -> Dict[str, List[str]]:
+        """
+        快速模式与预演的起始状态：各结构当前内容（线性结构按顺序，树按层序）；动画未落地的结构不给出
+        二叉树的层序保留空位（None）才能还原形状，BST/AVL 按层序重新插入即可，去掉空位
+        """
+        states = {}
+        for key in ("SequentialList", "LinkedList", "Stack", "BinaryTree", "BST", "AVL"):
+            entry = self._build_llm_state_entry(key)
+            if not entry:
+                continue
+            params = entry["parameters"]
+            if "elements" in params:
+                states[key] = params["elements"]
+            elif "pending_insert" not in params:
+                order = params.get("level_order", [])
+                states[key] = list(order) if key == "BinaryTree" else [v for v in order if v is not None]
+        return states
+
+    def bulk_load_structure(self, key: str, values: List[str]):
+        """快速模式：不播放动画，直接把结构设置为给定内容（合并后的净效果）"""
+        try:
+            structure = self.structures.get(key)
+            if structure is None:
+                self._show_error("载入失败", f"未知的数据结构: {key}")
+                return
+            if hasattr(structure, "clear"):
+                structure.clear()
+            if hasattr(structure, "insert_values"):
+                structure.insert_values(values)
+            else:
+                structure.build(values)
+                if hasattr(structure, "complete_build_animation"):
+                    structure.complete_build_animation()
+            self._update_snapshot()
+            self._pending_llm_action = {
+                "structure_type": key,
+                "operation": "build" if key in ("BST", "AVL") else "create",
+                "parameters": {"values": list(values)},
+            }
+            self.log_operation(f"[{key}] 快速载入 {len(values)} 个值")
+        except Exception as e:
+            self._show_error("载入失败", str(e))
+
+    def _report_dsl_diagnostics(self) -> List[str]:
+        """把最近一次解析的诊断整理成结果消息，并在提示栏显示首个错误"""
+        parser = self.dsl_parser
+        if not parser.error_count:
+            return []
+        self.hint_updated.emit(f"脚本有 {parser.error_count} 处无法解析，首个错误: {parser.diagnostics[0]}")
+        return [f"✗ 解析错误 {d}: {d.text}" for d in parser.diagnostics]
+
+    def _finish_with_dsl_diagnostics(
+        self,
+        finished_callback,
+        reader: Optional[DSLFileReader] = None,
+        optimizer: Optional[DSLOptimizer] = None,
+    ):
+        """包装顺序执行的完成回调：流式解析的诊断在执行过程中才产生，结束时再并入结果"""
+        def finished(success, fail, messages):
+            if reader is not None:
+                reader.close()
+            if optimizer is not None:
+                stats = optimizer.stats
+                self.hint_updated.emit(
+                    f"快速模式：{stats.input_count} 条命令合并为 {stats.output_count} 条，消除 {stats.eliminated} 条"
+                )
+            parse_errors = self._report_dsl_diagnostics()
+            if finished_callback:
+                finished_callback(success, fail + self.dsl_parser.error_count, parse_errors + list(messages))
+        return finished
     
     # ========== AVL树操作 ==========
     
@@ -1999,6 +2330,10 @@ class MainController(QObject):
             (成功标志, 消息文本, 转换后的动作JSON)
         """
         try:
+            local_action = self._match_local_intent(user_input)
+            if local_action is not None:
+                return True, "本地解析成功", local_action
+
             # 检查API密钥
             if not self.llm_service.check_api_key():
                 return False, "未设置OPENROUTER_API_KEY环境变量，请在系统环境变量中设置", None
@@ -2028,6 +2363,170 @@ class MainController(QObject):
         except Exception as e:
             return False, f"转换失败: {str(e)}", None
     
+    def submit_natural_language_conversion(self, user_input: str) -> Tuple[Optional[LLMRequestHandle], str]:
+        """
+        异步转换自然语言（仅转换，不执行）
+        上下文在GUI线程中准备，请求交给管线线程池；结束后通过 llm_conversion_finished 信号回到GUI线程。
+        被取消的请求不会发出信号。
+
+        Returns:
+            (请求句柄, 错误消息)；无法发起请求时句柄为 None
+        """
+        local_action = self._match_local_intent(user_input)
+        if local_action is not None:
+            handle = self.llm_pipeline.complete_locally(user_input, local_action)
+            # 推迟到下一轮事件循环再发信号：调用方要先拿到并保存句柄
+            QTimer.singleShot(0, lambda: self.llm_conversion_finished.emit(handle, True, "本地解析成功", local_action))
+            return handle, ""
+
+        if not self.llm_service.check_api_key():
+            return None, "未设置OPENROUTER_API_KEY环境变量，请在系统环境变量中设置"
+        ctx_for_prompt = self._build_llm_prompt_context()
+        try:
+            preview = ctx_for_prompt[-3:] if len(ctx_for_prompt) > 3 else ctx_for_prompt
+            print(f"[LLM] context_actions={len(ctx_for_prompt)} tail_preview={preview}")
+        except Exception:
+            pass
+
+        # 输入时预取的请求（同一句话、同一上下文）直接接管，不再重复请求
+        adopted = self._adopt_speculative(user_input, ctx_for_prompt)
+        if adopted is not None:
+            return adopted, ""
+
+        def on_delta(handle: LLMRequestHandle, text: str):
+            if not handle.cancelled:
+                self.llm_conversion_progress.emit(handle, text)
+
+        handle = self.llm_pipeline.submit(
+            user_input,
+            model=self.get_llm_model(),
+            operations_context=ctx_for_prompt,
+            on_done=self._deliver_conversion,
+            postprocess=lambda action: self._normalize_position_from_user_text(user_input, action),
+            on_delta=on_delta,
+        )
+        return handle, ""
+
+    def _deliver_conversion(self, handle: LLMRequestHandle):
+        """把结束的请求结果通过 llm_conversion_finished 发出；工作线程中调用时由 Qt 排队送到GUI线程"""
+        if handle.cancelled:
+            return
+        try:
+            action = handle.result()
+        except LLMDeadlineExceeded:
+            self.llm_conversion_finished.emit(handle, False, "LLM请求超时，请稍后重试", None)
+            return
+        except Exception as e:
+            if handle.cancelled:
+                return
+            self.llm_conversion_finished.emit(handle, False, f"转换失败: {str(e)}", None)
+            return
+        if action is None:
+            self.llm_conversion_finished.emit(
+                handle, False, "LLM转换失败，请检查输入是否明确，或尝试手动输入DSL命令", None)
+            return
+        self.llm_conversion_finished.emit(handle, True, "转换成功", action)
+
+    # ========== 输入时预取（推测请求） ==========
+    def _speculative_key(self, user_input: str, ctx_for_prompt: List[Dict[str, Any]]) -> str:
+        return LLMResponseCache.make_key(self.get_llm_model(), user_input, ctx_for_prompt)
+
+    def prefetch_natural_language(self, user_input: str):
+        """
+        用户停顿输入时提前发起转换；结果不展示，只等发送时接管或写入响应缓存。
+        本地规则能解析的句子、缓存已有的句子不发请求；同一句话不重复发。
+        """
+        text = (user_input or "").strip()
+        if not text or not self.llm_service.check_api_key():
+            return
+        action, confidence = self.intent_matcher.match(text)
+        if action is not None and confidence >= self.intent_matcher.threshold:
+            return
+        ctx_for_prompt = self._build_llm_prompt_context()
+        key = self._speculative_key(text, ctx_for_prompt)
+        if self._speculative is not None and self._speculative[0] == key:
+            return
+        self.cancel_stale_prefetch(None)
+        if self.llm_service.cache.peek(key):
+            return
+
+        def on_done(handle: LLMRequestHandle):
+            # 被接管后才把结果送出；与接管时的检查竞争登记，保证只送出一次
+            if self._claim_speculative_delivery(handle):
+                self._speculative_ready.emit(handle)
+
+        def on_delta(handle: LLMRequestHandle, text_so_far: str):
+            if handle in self._adopted_handles and not handle.cancelled:
+                self.llm_conversion_progress.emit(handle, text_so_far)
+
+        handle = self.llm_pipeline.submit(
+            text,
+            model=self.get_llm_model(),
+            operations_context=ctx_for_prompt,
+            on_done=on_done,
+            postprocess=lambda act: self._normalize_position_from_user_text(text, act),
+            on_delta=on_delta,
+        )
+        self._speculative = (key, text, handle)
+        print(f"[LLM] 预取: {text}")
+
+    def cancel_stale_prefetch(self, draft: Optional[str]):
+        """草稿已不是预取时的那句话：取消未被接管的预取请求"""
+        if self._speculative is None:
+            return
+        _key, text, handle = self._speculative
+        if draft is not None and draft.strip() == text:
+            return
+        self._speculative = None
+        if handle not in self._adopted_handles:
+            handle.cancel()
+
+    def _adopt_speculative(self, user_input: str, ctx_for_prompt: List[Dict[str, Any]]) -> Optional[LLMRequestHandle]:
+        """发送时接管键相同的预取请求；进行中的等它结束，已成功的下一轮事件循环送出结果"""
+        if self._speculative is None:
+            return None
+        key, _text, handle = self._speculative
+        self._speculative = None
+        if key != self._speculative_key(user_input.strip(), ctx_for_prompt) or handle.cancelled:
+            handle.cancel()
+            return None
+        if handle.done() and handle.future.exception() is not None:
+            # 预取失败：按正常流程重新请求
+            return None
+        self._adopted_handles.add(handle)
+        if handle.done() and self._claim_speculative_delivery(handle):
+            self._speculative_ready.emit(handle)
+        print(f"[LLM] 复用预取请求: {user_input}")
+        return handle
+
+    def _claim_speculative_delivery(self, handle: LLMRequestHandle) -> bool:
+        """预取结果只送出一次：被接管且尚未送出时返回 True"""
+        with self._speculative_lock:
+            if handle not in self._adopted_handles or handle in self._delivered_handles:
+                return False
+            self._delivered_handles.add(handle)
+            return True
+
+    def _on_speculative_ready(self, handle: LLMRequestHandle):
+        """GUI线程：送出被接管的预取结果"""
+        self._adopted_handles.discard(handle)
+        self._delivered_handles.discard(handle)
+        self._deliver_conversion(handle)
+
+    def _match_local_intent(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """先走本地规则匹配；置信度不足返回 None，由调用方回退到 LLM"""
+        action = self.intent_matcher.resolve(user_input)
+        stats = self.intent_matcher.stats()
+        if action is not None:
+            print(f"[Intent] 本地命中 hit_rate={stats['hit_rate']} action={action}")
+        else:
+            print(f"[Intent] 本地未命中，回退LLM hit_rate={stats['hit_rate']}")
+        return action
+
+    def shutdown_llm(self):
+        """取消所有进行中的LLM请求并释放连接（程序退出时调用）"""
+        self.llm_pipeline.shutdown()
+
     def execute_natural_language_command(self, user_input: str) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
         """
         执行自然语言命令（完整流程：转换+执行）
@@ -2040,6 +2539,11 @@ class MainController(QObject):
             (成功标志, 消息文本, 转换后的动作JSON)
         """
         try:
+            local_action = self._match_local_intent(user_input)
+            if local_action is not None:
+                success, message = self.action_executor.execute_action(local_action)
+                return success, message, local_action
+
             # 检查API密钥
             if not self.llm_service.check_api_key():
                 return False, "未设置OPENROUTER_API_KEY环境变量，请在系统环境变量中设置", None
@@ -2061,8 +2565,11 @@ class MainController(QObject):
             if action is None:
                 return False, "LLM转换失败，请检查输入是否明确，或尝试手动输入DSL命令", None
             
-            # 执行动作（在主线程中执行，确保动画正常）
-            success, message = self.action_executor.execute_action(action)
+            # 执行动作（在主线程中执行，确保动画正常）；多步计划交给顺序执行器
+            if len(self.action_executor.plan_actions(action)) > 1:
+                success, message = self.action_executor.execute_plan(action)
+            else:
+                success, message = self.action_executor.execute_action(action)
             
             return success, message, action
             
@@ -2085,17 +2592,23 @@ class MainController(QObject):
         return self.current_llm_model or self.llm_service.default_model
 
     # ========== 动画倍速管理 ==========
-    def set_speed_multiplier(self, multiplier: float):
-        """设置全局动画倍速（影响统一定时器与进度计算）"""
+    def set_speed_multiplier(self, multiplier: float, key: Optional[str] = None):
+        """
+        设置动画倍速（影响回调间隔与进度计算）
+        作用于 key 指定结构的轨道（默认当前结构），并作为之后新建轨道的默认倍速；其它轨道保持各自的倍速
+        """
         try:
             multiplier = float(multiplier)
         except (TypeError, ValueError):
             multiplier = 1.0
         multiplier = max(0.1, multiplier)
         self._speed_multiplier = multiplier
-        timer = getattr(self, "_animation_timer", None)
-        if timer and self._current_base_interval:
-            timer.setInterval(self._apply_speed_interval(self._current_base_interval))
+        track = self._animation_clock.get(self.current_structure_key if key is None else key)
+        if track is None:
+            return
+        track.speed = multiplier
+        if track.base_interval:
+            track.setInterval(max(5, int(max(1, int(track.base_interval)) / multiplier)))
 
     # ========== LLM 上下文管理 ==========
     def load_llm_context_from_file(self, path: str) -> Tuple[bool, str, int]:
@@ -2147,3 +2660,10 @@ class MainController(QObject):
         """清空LLM上下文操作列表"""
         self.llm_context_actions = []
         self.hint_updated.emit("已清空LLM上下文操作")
+
+    def clear_llm_cache(self) -> int:
+        """清空LLM响应缓存，返回清除的条数"""
+        count = len(self.llm_service.cache)
+        self.llm_service.cache.clear()
+        self.hint_updated.emit(f"已清空LLM响应缓存（{count} 条）")
+        return count
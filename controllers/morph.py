@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+快照过渡引擎：在两个关键帧快照之间生成任意中间帧
+- 按 id 匹配前后两帧的节点/方框（边按 from_id→to_id 匹配），同一 id 重复出现时按出现次序配对
+- 构造时一次性算好每个元素的起点与位移向量、颜色渐变表；取帧时只做一次向量插值
+- 缓动曲线预先采样成查找表，取帧不再调用缓动函数
+- 全程不动、不变色、始终可见的元素只生成一次冻结实例，各帧共享；每帧只新建移动或渐隐渐显的元素
+- 只在一帧中出现的元素：仅起始帧有的在 exit_at 之前显示，仅结束帧有的从 enter_at 起显示
+适配器只需给出动画两端的布局，就能得到平滑过渡
+"""
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np  # 可选：有 numpy 时整帧插值是一次数组运算
+except ImportError:
+    np = None
+
+# 缓动查找表的采样数
+EASING_LUT_SIZE = 256
+# 颜色渐变表的级数
+COLOR_RAMP_STEPS = 32
+
+EASINGS = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: 1.0 - (1.0 - t) * (1.0 - t),
+    "ease_in_out": lambda t: t * t * (3.0 - 2.0 * t),
+}
+
+# 各类元素参与插值的几何属性（每个元素固定 4 个分量）
+_GEOMETRY_ATTRS = {
+    "nodes": ("x", "y", "width", "height"),
+    "boxes": ("x", "y", "width", "height"),
+    "edges": ("from_x", "from_y", "to_x", "to_y"),
+}
+_COLOR_ATTRS = ("color", "text_color")
+
+
+@lru_cache(maxsize=None)
+def easing_lut(name: str, size: int = EASING_LUT_SIZE) -> Tuple[float, ...]:
+    """缓动曲线在 [0,1] 上的等距采样"""
+    if name not in EASINGS:
+        raise ValueError(f"未知的缓动曲线: {name}")
+    func = EASINGS[name]
+    return tuple(func(i / (size - 1)) for i in range(size))
+
+
+def _parse_color(color) -> Optional[Tuple[int, int, int]]:
+    """只处理 #RRGGBB；其他写法（带透明度、颜色名）不做渐变"""
+    if not isinstance(color, str) or len(color) != 7 or not color.startswith("#"):
+        return None
+    try:
+        return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+    except ValueError:
+        return None
+
+
+def _color_ramp(start, end) -> Optional[Tuple[str, ...]]:
+    """两种颜色之间的渐变表；颜色相同或无法解析时返回 None"""
+    if start == end:
+        return None
+    a, b = _parse_color(start), _parse_color(end)
+    if a is None or b is None:
+        return None
+    steps = COLOR_RAMP_STEPS - 1
+    return tuple(
+        "#{:02X}{:02X}{:02X}".format(*(round(a[c] + (b[c] - a[c]) * k / steps) for c in range(3)))
+        for k in range(COLOR_RAMP_STEPS)
+    )
+
+
+def _element_key(kind: str, element):
+    if kind == "edges":
+        from_id = getattr(element, "from_id", "")
+        to_id = getattr(element, "to_id", "")
+        # 没有端点 id 的边（纯坐标的辅助线）无法配对
+        return (from_id, to_id) if from_id and to_id else None
+    return getattr(element, "id", None)
+
+
+def _geometry(kind: str, element) -> List[Optional[float]]:
+    values = []
+    for attr in _GEOMETRY_ATTRS[kind]:
+        value = getattr(element, attr, None)
+        values.append(float(value) if isinstance(value, (int, float)) else None)
+    return values
+
+
+class _Track:
+    """一个元素在过渡中的轨迹"""
+    __slots__ = ("kind", "cls", "state", "offset", "attrs", "ramps", "visible_from", "visible_to", "shared")
+
+    def __init__(self, kind, template, offset, attrs, ramps, visible_from, visible_to):
+        self.kind = kind
+        # 取帧时直接按属性字典复制出新元素（比 copy.copy 快）；冻结的模板换回可修改的类
+        self.cls = type(template)._mutable_class if getattr(template, "_frozen", False) else type(template)
+        self.state = dict(vars(template))
+        self.offset = offset  # 在几何数组中的起始下标
+        self.attrs = attrs  # 需要写回的 (下标, 属性名)
+        self.ramps = ramps  # 属性名 -> 颜色渐变表
+        self.visible_from = visible_from
+        self.visible_to = visible_to
+        # 静止的元素：各帧共享同一个冻结实例
+        self.shared = None
+        if not attrs and not ramps and visible_from <= 0.0 and visible_to >= 1.0:
+            element = self.cls.__new__(self.cls)
+            element.__dict__.update(self.state)
+            element._set_frozen(True)
+            self.shared = element
+
+
+class SnapshotMorph:
+    """
+    两个关键帧快照之间的过渡
+
+    用法：
+        morph = SnapshotMorph(start, end, easing="ease_in_out")
+        frame = morph.frame(progress)   # progress ∈ [0, 1]，返回新的可修改快照
+    """
+
+    def __init__(self, start, end, easing: str = "ease_in_out",
+                 enter_at: float = 0.5, exit_at: float = 0.5):
+        self.start = start
+        self.end = end
+        self.easing = easing
+        self._lut = easing_lut(easing)
+        self._tracks: List[_Track] = []
+        starts = array("d")
+        deltas = array("d")
+
+        for kind in ("nodes", "edges", "boxes"):
+            before: Dict[object, List] = {}
+            for element in getattr(start, kind, ()) or ():
+                key = _element_key(kind, element)
+                if key is not None:
+                    before.setdefault(key, []).append(element)
+            matched_starts = set()
+
+            for element in getattr(end, kind, ()) or ():
+                key = _element_key(kind, element)
+                candidates = before.get(key) if key is not None else None
+                origin = candidates.pop(0) if candidates else None
+                if origin is None:
+                    self._tracks.append(_Track(kind, element, 0, (), {}, enter_at, 1.0))
+                    continue
+                matched_starts.add(id(origin))
+                a, b = _geometry(kind, origin), _geometry(kind, element)
+                attrs = []
+                offset = len(starts)
+                for i, attr in enumerate(_GEOMETRY_ATTRS[kind]):
+                    if a[i] is not None and b[i] is not None:
+                        starts.append(a[i])
+                        deltas.append(b[i] - a[i])
+                        if b[i] != a[i]:
+                            attrs.append((offset + i, attr))
+                    else:
+                        starts.append(0.0)
+                        deltas.append(0.0)
+                ramps = {}
+                for attr in _COLOR_ATTRS:
+                    ramp = _color_ramp(getattr(origin, attr, None), getattr(element, attr, None))
+                    if ramp is not None:
+                        ramps[attr] = ramp
+                self._tracks.append(_Track(kind, element, offset, attrs, ramps, 0.0, 1.0))
+
+            # 只在起始帧出现的元素画在最上层（如被删除元素的残影）
+            for element in getattr(start, kind, ()) or ():
+                if id(element) not in matched_starts:
+                    self._tracks.append(_Track(kind, element, 0, (), {}, 0.0, exit_at))
+
+        # 取帧计划：连续的静止元素合并成一段，取帧时整段 extend；其余为需要逐帧生成的轨迹
+        self._plan: List[Tuple[str, object]] = []
+        for track in self._tracks:
+            if track.shared is None:
+                self._plan.append((track.kind, track))
+            elif self._plan and isinstance(self._plan[-1][1], list) and self._plan[-1][0] == track.kind:
+                self._plan[-1][1].append(track.shared)
+            else:
+                self._plan.append((track.kind, [track.shared]))
+
+        if np is not None:
+            self._starts = np.frombuffer(starts, dtype=np.float64) if starts else np.zeros(0)
+            self._deltas = np.frombuffer(deltas, dtype=np.float64) if deltas else np.zeros(0)
+        else:
+            self._starts = starts
+            self._deltas = deltas
+
+    @property
+    def element_count(self) -> int:
+        return len(self._tracks)
+
+    def eased(self, progress: float) -> float:
+        """进度经缓动查找表映射后的插值系数"""
+        lut = self._lut
+        if progress <= 0.0:
+            return lut[0]
+        if progress >= 1.0:
+            return lut[-1]
+        if self.easing == "linear":
+            # 线性过渡不查表：与逐帧手写的线性插值完全一致，不会被量化成查找表的台阶
+            return progress
+        return lut[int(progress * (len(lut) - 1) + 0.5)]
+
+    def positions(self, progress: float):
+        """整帧的几何分量（一次向量插值）"""
+        t = self.eased(progress)
+        if np is not None:
+            return self._starts + self._deltas * t
+        return [s + d * t for s, d in zip(self._starts, self._deltas)]
+
+    def frame(self, progress: float):
+        """
+        生成 progress 处的中间帧：新的未冻结快照，调用方可以继续追加元素；
+        静止的元素是各帧共享的冻结实例，需要改动时先换成副本（StructureSnapshot.translate 会自动处理）
+        """
+        if progress >= 1.0:
+            progress = 1.0
+        elif progress <= 0.0:
+            progress = 0.0
+        t = self.eased(progress)
+        values = self.positions(progress)
+        if np is not None:
+            values = values.tolist()
+        source = self.end
+        snapshot = type(source)()
+        snapshot.hint_text = source.hint_text
+        snapshot.step_details = list(source.step_details)
+        snapshot.operation_history = list(source.operation_history)
+        snapshot.kind = source.kind
+        ramp_index = int(t * (COLOR_RAMP_STEPS - 1) + 0.5)
+        out = {"nodes": snapshot.nodes, "edges": snapshot.edges, "boxes": snapshot.boxes}
+
+        for kind, track in self._plan:
+            if track.__class__ is list:
+                out[kind].extend(track)
+                continue
+            if not (track.visible_from <= progress < track.visible_to or
+                    (progress >= 1.0 and track.visible_to >= 1.0)):
+                continue
+            element = track.cls.__new__(track.cls)
+            state = element.__dict__
+            state.update(track.state)
+            for index, attr in track.attrs:
+                state[attr] = values[index]
+            for attr, ramp in track.ramps.items():
+                state[attr] = ramp[ramp_index]
+            out[kind].append(element)
+        return snapshot
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+后台快照生成
+- GUI 线程每个动画节拍只取一份模型副本（snapshot_copy：结构未变时复用上次复制的结构，只复制动画状态），
+  布局（树结构为 O(n²)）在专用工作线程里完成
+- 工作线程与 GUI 线程争用 GIL：布局期间 GUI 线程处理事件可能多等约一个切换间隔（默认 5 ms），与结构规模无关
+- 请求只有一个待处理槽位：生成跟不上时新请求直接覆盖旧请求，过期帧被丢弃而不是排队
+- 完成的帧写入后缓冲，GUI 线程取帧时与前缓冲交换；未取走的旧帧同样被新帧覆盖
+- 工作线程只在“有新帧可取”时通知一次，GUI 线程的事件队列里最多积压一条取帧通知
+不依赖 Qt：on_ready / on_error 在工作线程中调用，由控制器负责把通知转到 GUI 线程（队列连接的信号）
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, Optional
+
+
+class SnapshotFrame:
+    """一帧已生成的快照"""
+    __slots__ = ("seq", "key", "snapshot")
+
+    def __init__(self, seq: int, key: Hashable, snapshot):
+        self.seq = seq  # 请求序号，越大越新
+        self.key = key  # 所属数据结构
+        self.snapshot = snapshot  # 已冻结的快照
+
+
+class SnapshotProducer:
+    """
+    单工作线程的快照生产者（双缓冲）
+
+    用法：
+        producer = SnapshotProducer(on_ready, on_error)
+        producer.submit(key, adapter, model.snapshot_copy())   # GUI 线程
+        frame = producer.take()                                 # 收到 on_ready 通知后在 GUI 线程调用
+    """
+
+    def __init__(self, on_ready: Callable[[], None],
+                 on_error: Optional[Callable[[Hashable, Exception], None]] = None):
+        self._on_ready = on_ready
+        self._on_error = on_error  # 生成失败时调用 (key, 异常)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot")
+        self._seq = 0
+        self._pending = None  # 最新的待处理请求 (seq, key, adapter, model)
+        self._running = False  # 工作线程是否正在处理请求
+        self._back: Optional[SnapshotFrame] = None  # 已生成、尚未被取走的最新一帧
+        self._front: Optional[SnapshotFrame] = None  # 正在显示的一帧
+        self._notified = False  # 已发出通知、GUI 线程尚未取帧
+        self._closed = False
+        self.dropped = 0  # 被新请求或新帧覆盖而未显示的帧数
+
+    @property
+    def front(self) -> Optional[SnapshotFrame]:
+        return self._front
+
+    def submit(self, key: Hashable, adapter, model) -> int:
+        """提交一次生成请求（model 须为只读副本），返回请求序号"""
+        with self._lock:
+            if self._closed:
+                return -1
+            self._seq += 1
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (self._seq, key, adapter, model)
+            start = not self._running
+            self._running = True
+            seq = self._seq
+        if start:
+            self._executor.submit(self._run)
+        return seq
+
+    def _run(self):
+        """工作线程：处理请求直到待处理槽位为空"""
+        while True:
+            with self._lock:
+                request, self._pending = self._pending, None
+                if request is None or self._closed:
+                    self._running = False
+                    return
+            seq, key, adapter, model = request
+            try:
+                snapshot = adapter.to_snapshot(model).freeze()
+            except Exception as e:
+                # 一帧生成失败不影响后续帧
+                self._notify(self._on_error, key, e)
+                continue
+            with self._lock:
+                if self._back is not None:
+                    self.dropped += 1
+                self._back = SnapshotFrame(seq, key, snapshot)
+                notify = not self._notified
+                self._notified = True
+            if notify:
+                self._notify(self._on_ready)
+
+    @staticmethod
+    def _notify(callback, *args):
+        """在工作线程中调用通知回调"""
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except RuntimeError:
+            # 控制器已销毁（退出程序时）
+            pass
+
+    def take(self) -> Optional[SnapshotFrame]:
+        """
+        GUI 线程：交换前后缓冲，返回新的前缓冲帧
+        没有新帧、或新帧不比正在显示的帧新时返回 None
+        """
+        with self._lock:
+            frame, self._back = self._back, None
+            self._notified = False
+        if frame is None or (self._front is not None and frame.seq <= self._front.seq):
+            return None
+        self._front = frame
+        return frame
+
+    def cancel(self):
+        """丢弃待处理的请求与未取走的帧（如切换数据结构时）"""
+        with self._lock:
+            self._pending = None
+            self._back = None
+
+    def close(self):
+        """停止接收请求并关闭工作线程（不等待正在生成的帧）"""
+        with self._lock:
+            self._closed = True
+            self._pending = None
+        self._executor.shutdown(wait=False)
@@ -9,17 +9,27 @@ from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QGroupBox,
     QPushButton, QLabel, QLineEdit, QDockWidget, QFrame, QMessageBox,
     QHBoxLayout, QSpinBox, QDialog, QComboBox, QFileDialog, QAction,
-    QActionGroup, QTextEdit
+    QActionGroup, QTextEdit, QCheckBox
 )
 from PyQt5.QtGui import QFontDatabase, QIcon, QFont
-from PyQt5.QtCore import Qt, pyqtSlot, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSlot, QSettings, QCoreApplication
 from canvas import Canvas
 from widgets.control_panel import ControlPanel
 from controllers.main_controller import MainController
 from ui.chat_panel import ChatPanel
 from ui.operation_log_panel import OperationLogPanel
+from ui.minimap_panel import MinimapPanel
 from ui.theme_helper import ThemeHelper, ThemeMode
 
+# 超过此大小的DSL脚本不载入编辑器，直接从磁盘流式执行
+DSL_EDITOR_MAX_BYTES = 512 * 1024
+
+
+def app_settings() -> QSettings:
+    """应用设置（画布渲染方式等），按用户持久化"""
+    return QSettings("DSVisualizer", "DSVisualizer")
+
+
 '''父节点选择对话框'''
 class ParentNodeDialog(QDialog):
     def __init__(self, parent=None, available_nodes=None):
@@ -89,6 +99,16 @@ class MainWindow(QMainWindow):
             self.left_dock.setWidget(left_widget)
             self.addDockWidget(Qt.LeftDockWidgetArea, self.left_dock)
 
+            # 概览小地图：显示整份快照与当前可视区域，点击/拖动跳转
+            self.minimap_panel = MinimapPanel(self)
+            self.minimap_dock = QDockWidget("概览", self)
+            self.minimap_dock.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
+            self.minimap_dock.setWidget(self.minimap_panel)
+            self.addDockWidget(Qt.LeftDockWidgetArea, self.minimap_dock)
+            self.canvas.snapshot_rendered.connect(self.minimap_panel.set_snapshot)
+            self.canvas.viewport_changed.connect(self.minimap_panel.set_viewport_rect)
+            self.minimap_panel.navigateRequested.connect(self.canvas.center_on)
+
             # control panel
             self.ctrl_panel = ControlPanel()
             self.addDockWidget(Qt.BottomDockWidgetArea, self.ctrl_panel)
@@ -108,8 +128,10 @@ class MainWindow(QMainWindow):
             self.operation_log_dock.setMinimumHeight(200)
             self.addDockWidget(Qt.RightDockWidgetArea, self.operation_log_dock)
             
-            # LLM线程管理
-            self._llm_thread = None
+            # LLM请求句柄（请求在控制器的异步管线中执行）
+            self._llm_handle = None  # 自然语言对话框发起的请求
+            self._llm_msg_box = None
+            self._chat_llm_handle = None  # 右侧对话面板发起的请求
             self._chat_pending_text = None
             self._dsl_executing = False
             self.btn_execute_dsl = None
@@ -118,10 +140,13 @@ class MainWindow(QMainWindow):
             # 连接控制器信号
             self.controller.snapshot_updated.connect(self.canvas.render_snapshot)
             self.controller.hint_updated.connect(self.mode_label.setText)
+            self.controller.dsl_validation_finished.connect(self._on_dsl_validation_finished)
             self.controller.parent_selection_requested.connect(self._handle_parent_selection_request)
             self.controller.operation_logged.connect(self.operation_log_panel.append_record)
             self.controller.operation_log_cleared.connect(self.operation_log_panel.clear_records)
             self.operation_log_panel.clearRequested.connect(self.controller.clear_operation_logs)
+            self.controller.llm_conversion_finished.connect(self._on_llm_conversion_finished)
+            self.controller.llm_conversion_progress.connect(self._on_llm_conversion_progress)
 
             # 右侧：LLM 对话面板（常驻）
             self.chat_dock = QDockWidget("LLM 对话", self)
@@ -136,6 +161,11 @@ class MainWindow(QMainWindow):
             self.chat_panel.sendMessage.connect(self._on_chat_send)
             self.chat_panel.modelChanged.connect(self._on_chat_model_changed)
             self.controller.set_llm_model(self.chat_panel.current_model())
+            # 输入时预取（可选）：停顿后提前请求，草稿改变则取消过期的预取
+            self.chat_panel.draftPaused.connect(self.controller.prefetch_natural_language)
+            self.chat_panel.draftChanged.connect(self.controller.cancel_stale_prefetch)
+            self.chat_panel.prefetchToggled.connect(self._on_chat_prefetch_toggled)
+            self.chat_panel.set_prefetch_enabled(app_settings().value("llm/prefetch", False, type=bool))
 
             # 选择默认数据结构
             self.select_structure("SequentialList")
@@ -150,6 +180,10 @@ class MainWindow(QMainWindow):
 
             # 初始化主题菜单勾选状态
             self._update_theme_action_checks(self.theme_helper.current_mode)
+
+            # 恢复上次的画布渲染方式
+            if app_settings().value("canvas/opengl", False, type=bool):
+                self._opengl_action.setChecked(True)  # toggled 信号会切换视口
         except Exception as e:
             import traceback
             error_msg = f"MainWindow初始化失败:\n{str(e)}\n\n详细错误信息:\n{traceback.format_exc()}"
@@ -171,6 +205,7 @@ class MainWindow(QMainWindow):
             "# insert 4 at 1 in arraylist\n"
             "# push 100 to stack\n"
             "# create bst with 50,30,70\n"
+            "# for i in 1..10 { insert $i in avl }\n"
         )
         self.dsl_text_edit.setMaximumHeight(150)  # 限制高度
         gdsl.addWidget(self.dsl_text_edit)
@@ -183,15 +218,25 @@ class MainWindow(QMainWindow):
         btn_clear_dsl.clicked.connect(self._handle_clear_dsl)
         btn_load_dsl = QPushButton("从文件导入")
         btn_load_dsl.clicked.connect(self._handle_load_dsl_file)
-        for btn in (self.btn_execute_dsl, btn_clear_dsl, btn_load_dsl):
+        self.btn_validate_dsl = QPushButton("校验")
+        self.btn_validate_dsl.setToolTip("预演脚本（不执行、不改变当前数据），列出会失败的命令")
+        self.btn_validate_dsl.clicked.connect(self._handle_validate_dsl)
+        for btn in (self.btn_execute_dsl, self.btn_validate_dsl, btn_clear_dsl, btn_load_dsl):
             btn.setProperty("buttonType", "structure-secondary")
             btn.style().unpolish(btn)
             btn.style().polish(btn)
         
         dsl_btn_layout.addWidget(self.btn_execute_dsl)
+        dsl_btn_layout.addWidget(self.btn_validate_dsl)
         dsl_btn_layout.addWidget(btn_clear_dsl)
         dsl_btn_layout.addWidget(btn_load_dsl)
         gdsl.addLayout(dsl_btn_layout)
+
+        # 快速模式：合并中间状态不可见的命令，直接载入净效果
+        self.chk_dsl_fast = QCheckBox("快速模式（合并命令，跳过中间动画）")
+        self.chk_dsl_fast.setChecked(app_settings().value("dsl/fast_mode", False, type=bool))
+        self.chk_dsl_fast.toggled.connect(lambda on: app_settings().setValue("dsl/fast_mode", bool(on)))
+        gdsl.addWidget(self.chk_dsl_fast)
         
         # 添加DSL结果标签
         self.dsl_result_label = QLabel("")
@@ -314,6 +359,13 @@ class MainWindow(QMainWindow):
             act.triggered.connect(lambda checked, m=mode: self._on_theme_selected(m))
             self._theme_actions[mode] = act
 
+        # 画布渲染方式：OpenGL 视口（无 GPU 时回退到软件 OpenGL）
+        view_menu.addAction(self.minimap_dock.toggleViewAction())
+        view_menu.addSeparator()
+        self._opengl_action = QAction("OpenGL 加速渲染", self, checkable=True)
+        self._opengl_action.toggled.connect(self._on_toggle_opengl)
+        view_menu.addAction(self._opengl_action)
+
         # AI / LLM 相关菜单
         ai_menu = menubar.addMenu("AI/LLM")
         act_import_ctx = QAction("导入LLM上下文(JSON)", self)
@@ -322,6 +374,9 @@ class MainWindow(QMainWindow):
         act_clear_ctx = QAction("清空LLM上下文", self)
         act_clear_ctx.triggered.connect(self._action_clear_llm_context)
         ai_menu.addAction(act_clear_ctx)
+        act_clear_cache = QAction("清空LLM响应缓存", self)
+        act_clear_cache.triggered.connect(self._action_clear_llm_cache)
+        ai_menu.addAction(act_clear_cache)
 
     def _action_open(self):
         path, _ = QFileDialog.getOpenFileName(self, "打开工程", "", "Data Structure Vis (*.dsv);;JSON (*.json);;All Files (*)")
@@ -381,6 +436,11 @@ class MainWindow(QMainWindow):
         self.controller.clear_llm_context()
         QMessageBox.information(self, "LLM上下文", "已清空LLM上下文")
 
+    def _action_clear_llm_cache(self):
+        """清空本地缓存的自然语言转换结果"""
+        count = self.controller.clear_llm_cache()
+        QMessageBox.information(self, "LLM响应缓存", f"已清空 {count} 条缓存")
+
     def _clear_dynamic_panel(self):
         while self.dynamic_layout.count():
             item = self.dynamic_layout.takeAt(0)
@@ -626,6 +686,16 @@ class MainWindow(QMainWindow):
             lay.addWidget(b1)
             self._mark_secondary(b1)
 
+            # 跳到任意一轮合并
+            seek_layout = QHBoxLayout()
+            round_in = QSpinBox(); round_in.setRange(1, 9999); round_in.setPrefix("第 "); round_in.setSuffix(" 轮")
+            btn_seek = QPushButton("跳转")
+            btn_seek.clicked.connect(lambda: self.controller.seek_huffman_round(round_in.value()))
+            seek_layout.addWidget(round_in)
+            seek_layout.addWidget(btn_seek)
+            lay.addLayout(seek_layout)
+            self._mark_secondary(btn_seek)
+
         # 通用清空按钮：始终出现在面板底部，清空当前结构
         clear_btn = QPushButton("清空当前结构")
         clear_btn.clicked.connect(self.controller.clear_current_structure)
@@ -777,6 +847,7 @@ class MainWindow(QMainWindow):
                 sequential=True,
                 progress_callback=self._on_dsl_progress,
                 finished_callback=self._on_dsl_finished,
+                fast=self.chk_dsl_fast.isChecked(),
             )
             if started is False:
                 # 没有可执行的命令，finished_callback 已处理
@@ -786,6 +857,30 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "执行失败", f"DSL执行出错: {str(e)}")
             self.dsl_result_label.setText(f"错误: {str(e)}")
     
+    def _handle_validate_dsl(self):
+        """预演DSL脚本，结果由 _on_dsl_validation_finished 显示"""
+        script_text = self.dsl_text_edit.toPlainText().strip()
+        if not script_text:
+            QMessageBox.warning(self, "提示", "请输入DSL命令")
+            return
+        if self.controller.validate_dsl_script(script_text):
+            self.btn_validate_dsl.setEnabled(False)
+            self.dsl_result_label.setText("正在校验脚本...")
+
+    def _on_dsl_validation_finished(self, report):
+        self.btn_validate_dsl.setEnabled(True)
+        if report is None:
+            self.dsl_result_label.setText("校验失败")
+            return
+        self.dsl_result_label.setText(report.summary())
+        if report.ok:
+            return
+        lines = [str(d) for d in report.parse_errors] + [str(issue) for issue in report.issues]
+        details = "\n".join(lines[:20])
+        if len(lines) > 20:
+            details += f"\n……另有 {report.parse_error_count + report.issue_count - 20} 条"
+        QMessageBox.warning(self, "校验结果", f"{report.summary()}\n\n{details}")
+
     def _handle_clear_dsl(self):
         """清空DSL命令输入框"""
         self.dsl_text_edit.clear()
@@ -803,12 +898,41 @@ class MainWindow(QMainWindow):
             return
         
         try:
+            size = os.path.getsize(path)
+            if size > DSL_EDITOR_MAX_BYTES:
+                reply = QMessageBox.question(
+                    self, "脚本较大",
+                    f"文件大小 {size / 1024 / 1024:.1f} MB，不载入编辑器。\n是否直接从磁盘流式执行？",
+                )
+                if reply == QMessageBox.Yes:
+                    self._execute_dsl_file(path)
+                return
             with open(path, 'r', encoding='utf-8') as f:
                 content = f.read()
             self.dsl_text_edit.setPlainText(content)
             self.dsl_result_label.setText(f"已加载: {path}")
         except Exception as e:
             QMessageBox.critical(self, "加载失败", f"无法读取文件: {str(e)}")
+
+    def _execute_dsl_file(self, path: str):
+        """边读边执行大脚本文件，进度按已读字节显示"""
+        if self._dsl_executing:
+            QMessageBox.information(self, "提示", "当前已有DSL命令在执行，请稍候。")
+            return
+        self._set_dsl_running_state(True)
+        try:
+            started = self.controller.execute_dsl_file(
+                path,
+                progress_callback=self._on_dsl_file_progress,
+                finished_callback=self._on_dsl_finished,
+                fast=self.chk_dsl_fast.isChecked(),
+            )
+            if started is False:
+                self._set_dsl_running_state(False)
+        except Exception as e:
+            self._set_dsl_running_state(False)
+            QMessageBox.critical(self, "执行失败", f"DSL执行出错: {str(e)}")
+            self.dsl_result_label.setText(f"错误: {str(e)}")
     
     def _set_dsl_running_state(self, running: bool):
         self._dsl_executing = running
@@ -818,7 +942,14 @@ class MainWindow(QMainWindow):
             self.dsl_result_label.setText("DSL命令执行中...")
     
     def _on_dsl_progress(self, current: int, total: int, success: bool, message: str):
-        self.dsl_result_label.setText(f"执行进度：{current}/{total}")
+        # 循环按需展开，总条数未知时只显示已执行条数
+        if total:
+            self.dsl_result_label.setText(f"执行进度：{current}/{total}")
+        else:
+            self.dsl_result_label.setText(f"执行进度：已执行 {current} 条")
+
+    def _on_dsl_file_progress(self, current: int, fraction: float, success: bool, message: str):
+        self.dsl_result_label.setText(f"执行进度：已执行 {current} 条，文件已读 {fraction:.0%}")
     
     def _on_dsl_finished(self, success_count: int, fail_count: int, messages: list):
         self._set_dsl_running_state(False)
@@ -829,7 +960,10 @@ class MainWindow(QMainWindow):
             return
         self.dsl_result_label.setText(result_msg)
         if fail_count > 0:
-            error_details = "\n".join([msg for msg in messages if msg.startswith("✗")]) or "\n".join(messages)
+            failed = [msg for msg in messages if msg.startswith("✗")] or list(messages)
+            error_details = "\n".join(failed[:20])
+            if len(failed) > 20:
+                error_details += f"\n……另有 {len(failed) - 20} 条"
             QMessageBox.warning(self, "执行结果", f"{result_msg}\n\n失败的命令:\n{error_details}")
         else:
             if not self._suppress_finish_dialog:
@@ -847,10 +981,16 @@ class MainWindow(QMainWindow):
     
     def _execute_natural_language(self, user_input: str):
         """执行自然语言命令（异步执行）"""
-        # 如果已有线程在运行，先停止
-        if self._llm_thread and self._llm_thread.isRunning():
-            self._llm_thread.terminate()
-            self._llm_thread.wait()
+        # 如果已有请求在进行，先取消
+        if self._llm_handle is not None:
+            self._llm_handle.cancel()
+            self._llm_handle = None
+
+        handle, error = self.controller.submit_natural_language_conversion(user_input)
+        if handle is None:
+            QMessageBox.warning(self, "转换失败", error)
+            return
+        self._llm_handle = handle
         
         # 显示加载提示（带取消按钮）
         msg_box = QMessageBox(self)
@@ -860,32 +1000,39 @@ class MainWindow(QMainWindow):
         msg_box.setDefaultButton(QMessageBox.Cancel)
         cancel_button = msg_box.button(QMessageBox.Cancel)
         cancel_button.setText("取消")
+        self._llm_msg_box = msg_box
         
-        # 创建并启动工作线程
-        self._llm_thread = LLMWorkerThread(self.controller, user_input, self)
-        self._llm_thread.finished.connect(
-            lambda success, message, action: self._on_llm_finished(success, message, action, msg_box)
-        )
-        self._llm_thread.error.connect(
-            lambda error_msg: self._on_llm_error(error_msg, msg_box)
-        )
-        
-        # 连接取消按钮
+        # 连接取消按钮：真正取消请求（关闭连接），不会再收到结果
         def on_cancel():
-            if self._llm_thread and self._llm_thread.isRunning():
-                self._llm_thread.terminate()
-                self._llm_thread.wait()
+            if self._llm_handle is handle:
+                handle.cancel()
+                self._llm_handle = None
             msg_box.close()
         
         cancel_button.clicked.connect(on_cancel)
         
-        # 启动线程
-        self._llm_thread.start()
-        
-        # 显示对话框（非阻塞，线程完成后会自动关闭）
+        # 显示对话框（非阻塞，请求完成后会自动关闭）
         msg_box.show()
         msg_box.raise_()
         msg_box.activateWindow()
+
+    def _on_llm_conversion_progress(self, handle, text: str):
+        """流式响应逐段到达（GUI线程）：把已收到的文本实时显示出来"""
+        if handle is self._llm_handle and self._llm_msg_box is not None:
+            self._llm_msg_box.setText(f"正在接收LLM响应...\n\n{text[-400:]}")
+        elif handle is self._chat_llm_handle:
+            self.chat_panel.update_assistant_stream(text)
+
+    def _on_llm_conversion_finished(self, handle, success: bool, message: str, action):
+        """异步转换结束（GUI线程）：按请求句柄分发给对话框或对话面板，过期请求直接忽略"""
+        if handle is self._llm_handle:
+            self._llm_handle = None
+            msg_box, self._llm_msg_box = self._llm_msg_box, None
+            self._on_llm_finished(success, message, action, msg_box)
+        elif handle is self._chat_llm_handle:
+            self._chat_llm_handle = None
+            self.chat_panel.end_assistant_stream()
+            self._on_chat_llm_finished(success, message, action)
     
     def _on_llm_finished(self, success: bool, message: str, action, msg_box: QMessageBox):
         """处理LLM调用完成"""
@@ -893,20 +1040,35 @@ class MainWindow(QMainWindow):
         if msg_box:
             msg_box.accept()  # 使用accept()确保对话框正确关闭
         
-        # 清理线程
-        if self._llm_thread:
-            self._llm_thread.deleteLater()
-            self._llm_thread = None
-        
         if success and action:
             # 在主线程中执行操作（确保动画正常）
             try:
-                exec_success, exec_message = self.controller.action_executor.execute_action(action)
-                
-                # 显示转换后的JSON动作和执行结果
                 import json
                 action_json = json.dumps(action, ensure_ascii=False, indent=2) if action else "无"
+                executor = self.controller.action_executor
+
+                # 多步计划：整体校验后交给顺序执行器，全部结束后汇总
+                if len(executor.plan_actions(action)) > 1:
+                    def on_plan_finished(success_count, fail_count, messages):
+                        box = QMessageBox.information if fail_count == 0 else QMessageBox.warning
+                        box(
+                            self,
+                            "执行完成",
+                            f"成功 {success_count} 步，失败 {fail_count} 步\n\n" + "\n".join(messages)
+                        )
+
+                    started, plan_message = executor.execute_plan(action, finished_callback=on_plan_finished)
+                    if not started:
+                        QMessageBox.warning(
+                            self,
+                            "执行失败",
+                            f"{plan_message}\n\n转换后的动作：\n{action_json}"
+                        )
+                    return
+
+                exec_success, exec_message = executor.execute_action(action)
                 
+                # 显示转换后的JSON动作和执行结果
                 if exec_success:
                     QMessageBox.information(
                         self, 
@@ -932,19 +1094,6 @@ class MainWindow(QMainWindow):
                 f"{message}\n\n提示：您可以尝试在DSL输入框中手动输入DSL命令。"
             )
     
-    def _on_llm_error(self, error_msg: str, msg_box: QMessageBox):
-        """处理LLM调用错误"""
-        # 关闭加载提示
-        if msg_box:
-            msg_box.accept()  # 使用accept()确保对话框正确关闭
-        
-        # 清理线程
-        if self._llm_thread:
-            self._llm_thread.deleteLater()
-            self._llm_thread = None
-        
-        QMessageBox.critical(self, "错误", f"执行自然语言命令时出错: {error_msg}")
-
     # —— 右侧对话面板 发送与回调 —— #
     def _on_chat_send(self, text: str):
         """来自右侧面板的发送事件"""
@@ -954,25 +1103,22 @@ class MainWindow(QMainWindow):
         self.chat_panel.append_user(text)
         self._chat_pending_text = text
 
-        # 若已有线程在运行，则中止
-        if self._llm_thread and self._llm_thread.isRunning():
-            self._llm_thread.terminate()
-            self._llm_thread.wait()
+        # 若已有请求在进行，则取消（关闭连接，不再回调）
+        if self._chat_llm_handle is not None:
+            self._chat_llm_handle.cancel()
+            self._chat_llm_handle = None
+            self.chat_panel.end_assistant_stream()
 
         # 后台进行“仅转换”
-        self._llm_thread = LLMWorkerThread(self.controller, text, self)
-        self._llm_thread.finished.connect(self._on_chat_llm_finished)
-        self._llm_thread.error.connect(self._on_chat_llm_error)
-        self._llm_thread.start()
+        handle, error = self.controller.submit_natural_language_conversion(text)
+        if handle is None:
+            self.chat_panel.append_assistant(f"调用出错：{error}")
+            return
+        self._chat_llm_handle = handle
 
     def _on_chat_llm_finished(self, success: bool, message: str, action):
         """后台转换完成：在主线程执行并把结果写回聊天面板"""
         try:
-            # 回收线程
-            if self._llm_thread:
-                self._llm_thread.deleteLater()
-                self._llm_thread = None
-
             if success and action:
                 # 展示转换结果
                 try:
@@ -983,7 +1129,22 @@ class MainWindow(QMainWindow):
                 self.chat_panel.append_assistant(f"已理解你的意图，转换为动作：\n{action_json}\n正在执行...")
 
                 # 执行动作（必须主线程）
-                exec_success, exec_message = self.controller.action_executor.execute_action(action)
+                executor = self.controller.action_executor
+                if len(executor.plan_actions(action)) > 1:
+                    # 多步计划：逐步回报进度，结束后汇总
+                    def on_plan_progress(index, total, step_success, entry):
+                        self.chat_panel.append_assistant(f"[{index}/{total}] {entry}")
+
+                    def on_plan_finished(success_count, fail_count, _messages):
+                        self.chat_panel.append_assistant(f"计划执行完毕：成功 {success_count} 步，失败 {fail_count} 步")
+
+                    started, plan_message = executor.execute_plan(
+                        action, progress_callback=on_plan_progress, finished_callback=on_plan_finished)
+                    if not started:
+                        self.chat_panel.append_assistant(f"执行失败：{plan_message}\n你也可以尝试在左侧 DSL 面板手动输入命令。")
+                    return
+
+                exec_success, exec_message = executor.execute_action(action)
                 if exec_success:
                     self.chat_panel.append_assistant(f"执行成功：{exec_message}")
                 else:
@@ -994,17 +1155,16 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.chat_panel.append_assistant(f"处理结果时发生错误：{e}")
 
-    def _on_chat_llm_error(self, error_msg: str):
-        # 回收线程
-        if self._llm_thread:
-            self._llm_thread.deleteLater()
-            self._llm_thread = None
-        self.chat_panel.append_assistant(f"调用出错：{error_msg}")
-
     def _on_chat_model_changed(self, model: str):
         """处理模型切换"""
         self.controller.set_llm_model(model)
 
+    def _on_chat_prefetch_toggled(self, enabled: bool):
+        """开关输入时预取，并记住选择；关闭时取消尚未被接管的预取请求"""
+        app_settings().setValue("llm/prefetch", bool(enabled))
+        if not enabled:
+            self.controller.cancel_stale_prefetch(None)
+
     def _on_theme_selected(self, mode: ThemeMode):
         """菜单切换主题"""
         try:
@@ -1014,30 +1174,33 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.warning(self, "主题切换失败", str(e))
 
+    def _on_toggle_opengl(self, checked: bool):
+        """切换画布视口；GPU 不可用时记录改用软件 OpenGL（重启后生效）"""
+        settings = app_settings()
+        if self.canvas.set_opengl_enabled(checked):
+            settings.setValue("canvas/opengl", bool(checked))
+            return
+        self._opengl_action.blockSignals(True)
+        self._opengl_action.setChecked(False)
+        self._opengl_action.blockSignals(False)
+        if not settings.value("canvas/software_opengl", False, type=bool):
+            settings.setValue("canvas/software_opengl", True)
+            settings.setValue("canvas/opengl", True)
+            QMessageBox.information(self, "OpenGL 加速", "未检测到可用的 GPU OpenGL，已改用软件 OpenGL（Mesa），重启程序后生效。")
+        else:
+            settings.setValue("canvas/opengl", False)
+            settings.setValue("canvas/software_opengl", False)
+            QMessageBox.warning(self, "OpenGL 加速", "软件 OpenGL 也不可用，继续使用默认渲染。")
+
     def _update_theme_action_checks(self, mode: ThemeMode):
         for m, act in self._theme_actions.items():
             act.setChecked(m == mode)
 
-
-'''LLM调用工作线程'''
-class LLMWorkerThread(QThread):
-    """LLM调用工作线程"""
-    finished = pyqtSignal(bool, str, object)  # (success, message, action)
-    error = pyqtSignal(str)  # error_message
-    
-    def __init__(self, controller, user_input, parent=None):
-        super().__init__(parent)
-        self.controller = controller
-        self.user_input = user_input
-    
-    def run(self):
-        """在后台线程中执行LLM调用（仅转换，不执行操作）"""
-        try:
-            # 只进行LLM转换，不执行操作（操作必须在主线程中执行以支持动画）
-            success, message, action = self.controller.convert_natural_language_to_action(self.user_input)
-            self.finished.emit(success, message, action)
-        except Exception as e:
-            self.error.emit(str(e))
+    def closeEvent(self, event):
+        """退出前取消进行中的LLM请求、停止后台快照生成，避免等待网络超时"""
+        self.controller.shutdown_llm()
+        self.controller.shutdown_snapshots()
+        super().closeEvent(event)
 
 
 '''自然语言输入对话框'''
@@ -1084,6 +1247,13 @@ class NaturalLanguageDialog(QDialog):
 def main():
     try:
         print("正在初始化QApplication...", file=sys.stderr)
+        settings = app_settings()
+        if settings.value("canvas/opengl", False, type=bool):
+            QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+            if settings.value("canvas/software_opengl", False, type=bool):
+                # 无 GPU 的机器：Windows 使用 opengl32sw（Mesa），Linux 让 Mesa 走 llvmpipe
+                QCoreApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
+                os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
         app = QApplication(sys.argv)
         base_font = QFont("Segoe UI", 11)
         base_font.setWeight(QFont.Medium)
@@ -2,17 +2,21 @@
 """
 AVL树数据结构：自平衡二叉搜索树实现
 """
-from .base import BaseStructure
+from .base import BaseStructure, TrackedObject, next_uid, restore_uid
 
 class AVLModel(BaseStructure):
     """AVL树模型类"""
+
+    # 影子树与旋转关键帧插入时一次生成、之后只读
+    _SHARED_ON_COPY = ("_shadow_after_insert", "_rotation_keyframes")
     
-    class Node:
-        def __init__(self, value, left=None, right=None, height=1):
+    class Node(TrackedObject):
+        def __init__(self, value, left=None, right=None, height=1, uid=None):
             self.value = value
             self.left = left
             self.right = right
             self.height = height
+            self.uid = uid if uid is not None else next_uid()
 
     def __init__(self):
         super().__init__()
@@ -22,12 +26,15 @@ class AVLModel(BaseStructure):
         self._animation_state = None  # 动画状态：None, 'inserting', 'rotating_LL', 'rotating_RR', 'rotating_LR', 'rotating_RL'
         self._animation_progress = 0.0  # 动画进度：0.0-1.0
         self._new_value = None  # 新节点值
+        self._new_uid = None  # 新节点预先领取的标识（影子树与真实树共用）
         self._imbalance_node_value = None  # 失衡节点值
         self._rotation_type = None  # 旋转类型：'LL', 'RR', 'LR', 'RL'
         self._rotation_nodes = []  # 参与旋转的节点值列表
         # 旋转可视化辅助：插入后未旋转的影子树 & 旋转阶段插值进度
         self._shadow_after_insert = None
         self._rotation_anim_progress = 0.0
+        # 旋转关键帧 {'pre', 'mid', 'final'}：插入时一次性生成，动画每帧复用
+        self._rotation_keyframes = None
         self._insert_path = []  # 插入路径（节点值列表）
         self._current_insert_step = 0  # 当前插入步骤
         self._insert_comparison_result = None  # 插入比较结果
@@ -59,6 +66,7 @@ class AVLModel(BaseStructure):
         # 统一进入插入动画
         self._animation_state = 'inserting'
         self._new_value = v
+        self._new_uid = next_uid()
         self._animation_progress = 0.0
         
         # 计算插入路径用于比较动画
@@ -81,10 +89,11 @@ class AVLModel(BaseStructure):
         
         # 预演一次插入（影子树），推导首个失衡与旋转类型，仅用于可视化
         shadow_root = self._clone_tree(self.root)
-        shadow_root = self._shadow_insert_no_rotate(shadow_root, v)  # 使用不旋转的版本，以便分析失衡节点
+        shadow_root = self._shadow_insert_no_rotate(shadow_root, v, self._new_uid)  # 使用不旋转的版本，以便分析失衡节点
         self._rotation_plan = self._analyze_first_imbalance_and_rotation(shadow_root)
         # 记录未旋转的影子树，用于可视化插值
         self._shadow_after_insert = shadow_root
+        self._rotation_keyframes = self._build_rotation_keyframes(shadow_root, self._rotation_plan)
         self._insert_committed = False
         self._rotation_applied = False
         
@@ -159,7 +168,7 @@ class AVLModel(BaseStructure):
     def _clone_tree(self, node):
         if not node:
             return None
-        new_node = self.Node(node.value, height=node.height)
+        new_node = self.Node(node.value, height=node.height, uid=node.uid)
         new_node.left = self._clone_tree(node.left)
         new_node.right = self._clone_tree(node.right)
         return new_node
@@ -193,14 +202,14 @@ class AVLModel(BaseStructure):
                 return self._rotate_left(node)
         return node
 
-    def _shadow_insert_no_rotate(self, node, value):
+    def _shadow_insert_no_rotate(self, node, value, uid=None):
         """影子插入，只插入和更新高度，不执行旋转（用于分析失衡节点）"""
         if not node:
-            return self.Node(value)
+            return self.Node(value, uid=uid)
         if value < node.value:
-            node.left = self._shadow_insert_no_rotate(node.left, value)
+            node.left = self._shadow_insert_no_rotate(node.left, value, uid)
         elif value > node.value:
-            node.right = self._shadow_insert_no_rotate(node.right, value)
+            node.right = self._shadow_insert_no_rotate(node.right, value, uid)
         self._update_height(node)
         return node  # 不执行旋转，直接返回
 
@@ -266,11 +275,37 @@ class AVLModel(BaseStructure):
         
         return plan
 
+    def _build_rotation_keyframes(self, shadow_root, plan):
+        """
+        生成旋转动画的三个关键形状（均保留节点标识）：
+        pre 为插入后未旋转的影子树；mid 为 LR/RL 完成第一次旋转后的形状（LL/RR 即旋转结果）；
+        final 为旋转完成后的形状，与真实树执行计划旋转后的结构一致。
+        没有旋转计划时三者是同一棵影子树
+        """
+        keyframes = {'pre': shadow_root, 'mid': shadow_root, 'final': shadow_root}
+        nodes = (plan or {}).get('nodes') or []
+        if shadow_root is None or not nodes or nodes[0] is None:
+            return keyframes
+        rotation_type = plan.get('type')
+        pivot_value = nodes[0]
+        child_value = nodes[1] if len(nodes) > 1 else None
+
+        final_root = self._apply_rotation_at_node(self._clone_tree(shadow_root), pivot_value, rotation_type)
+        if rotation_type in ('LR', 'RL') and child_value is not None:
+            # 第一步只旋转子节点：LR 对左子节点左旋（同 RR），RL 对右子节点右旋（同 LL）
+            first_step = 'RR' if rotation_type == 'LR' else 'LL'
+            mid_root = self._apply_rotation_at_node(self._clone_tree(shadow_root), child_value, first_step)
+        else:
+            mid_root = final_root
+        keyframes['mid'] = mid_root
+        keyframes['final'] = final_root
+        return keyframes
+
     def _ensure_insert_committed(self):
         """确保真实树已经执行插入但尚未旋转"""
         if self._insert_committed or self._new_value is None:
             return
-        self.root = self._shadow_insert_no_rotate(self.root, self._new_value)
+        self.root = self._shadow_insert_no_rotate(self.root, self._new_value, self._new_uid)
         self._insert_committed = True
 
     def has_pending_rotation(self):
@@ -468,6 +503,17 @@ class AVLModel(BaseStructure):
         self.root = None
         self.cancel_animation()
 
+    def insert_values(self, values):
+        """不经过动画直接依次插入并平衡（快速模式批量载入用），已存在的值忽略"""
+        if not self.active:
+            return
+        for value in values:
+            try:
+                v = float(value)
+            except:
+                v = value
+            self.root = self._insert_recursive(self.root, v)
+
     def traverse_inorder(self):
         """中序遍历"""
         result = []
@@ -546,6 +592,9 @@ class AVLModel(BaseStructure):
             return
         
         # 阶段4：旋转细节动画（位置插值交由适配器处理）
+        # 进入旋转阶段时执行真实旋转，保持算法与动画同步
+        if self.has_pending_rotation():
+            self.apply_pending_rotation()
         # 计算旋转插值进度，用于可视化（0~1）
         if p4 > p3:
             self._rotation_anim_progress = max(0.0, min(1.0, (prog - p3) / (p4 - p3)))
@@ -565,11 +614,13 @@ class AVLModel(BaseStructure):
         """完成插入节点动画"""
         if self._animation_state == 'creating_root' and self._new_value is not None:
             # 创建根节点
-            self.root = self.Node(self._new_value)
+            self.root = self.Node(self._new_value, uid=self._new_uid)
             self._animation_state = None
             self._new_value = None
+            self._new_uid = None
             self._animation_progress = 0.0
             self._shadow_after_insert = None
+            self._rotation_keyframes = None
             self._rotation_anim_progress = 0.0
         elif self._animation_state == 'inserting' and self._new_value is not None:
             # 确保真实结构已经包含新节点
@@ -580,6 +631,7 @@ class AVLModel(BaseStructure):
             
             self._animation_state = None
             self._new_value = None
+            self._new_uid = None
             self._insert_path = []
             self._current_insert_step = 0
             self._insert_comparison_result = None
@@ -593,12 +645,14 @@ class AVLModel(BaseStructure):
             self._insert_committed = False
             self._rotation_applied = False
             self._shadow_after_insert = None
+            self._rotation_keyframes = None
             self._rotation_anim_progress = 0.0
 
     def cancel_animation(self):
         """取消动画"""
         self._animation_state = None
         self._new_value = None
+        self._new_uid = None
         self._imbalance_node_value = None
         self._rotation_type = None
         self._rotation_nodes = []
@@ -615,8 +669,7 @@ class AVLModel(BaseStructure):
         self._insert_committed = False
         self._rotation_applied = False
         self._shadow_after_insert = None
-        self._rotation_anim_progress = 0.0
-        self._shadow_after_insert = None
+        self._rotation_keyframes = None
         self._rotation_anim_progress = 0.0
 
     def update_animation_progress(self, progress):
@@ -632,12 +685,13 @@ class AVLModel(BaseStructure):
             "left": self._node_to_dict(node.left),
             "right": self._node_to_dict(node.right),
             "height": node.height,
+            "uid": node.uid,
         }
 
     def _dict_to_node(self, data):
         if not data:
             return None
-        node = self.Node(data.get("value"), height=data.get("height", 1))
+        node = self.Node(data.get("value"), height=data.get("height", 1), uid=restore_uid(data.get("uid")))
         node.left = self._dict_to_node(data.get("left"))
         node.right = self._dict_to_node(data.get("right"))
         return node
@@ -653,6 +707,7 @@ class AVLModel(BaseStructure):
         self._animation_state = None
         self._animation_progress = 0.0
         self._new_value = None
+        self._new_uid = None
         self._imbalance_node_value = None
         self._rotation_type = None
         self._rotation_nodes = []
@@ -667,3 +722,6 @@ class AVLModel(BaseStructure):
         self._rotation_plan = None
         self._insert_committed = False
         self._rotation_applied = False
+        self._shadow_after_insert = None
+        self._rotation_keyframes = None
+        self._rotation_anim_progress = 0.0
@@ -2,9 +2,178 @@
 """
 数据结构基类：提供纯业务逻辑，不包含UI相关代码
 """
+import copy
+import enum
+import threading
+import types
+from array import array
+from collections import ChainMap, deque
+
+
+class UidAllocator:
+    """
+    元素标识分配器：单调递增，进程内不重复
+    节点/数组元素创建时领取一次，之后插入、删除、旋转都不改变；
+    序列化时随数据保存，恢复时通过 reserve 保证之后分配的标识不会与之冲突
+    """
+
+    def __init__(self, start: int = 1):
+        self._next = start
+        self._lock = threading.Lock()
+
+    def allocate(self) -> int:
+        with self._lock:
+            uid = self._next
+            self._next += 1
+            return uid
+
+    def reserve(self, uid) -> int:
+        """登记一个已有标识（来自存档）；无效时重新分配"""
+        try:
+            uid = int(uid)
+        except (TypeError, ValueError):
+            return self.allocate()
+        if uid <= 0:
+            return self.allocate()
+        with self._lock:
+            if uid >= self._next:
+                self._next = uid + 1
+        return uid
+
+
+uid_allocator = UidAllocator()
+
+
+def next_uid() -> int:
+    """分配一个新的元素标识"""
+    return uid_allocator.allocate()
+
+
+def restore_uid(uid) -> int:
+    """恢复存档中的元素标识（缺失或无效时分配新的）"""
+    if uid is None:
+        return uid_allocator.allocate()
+    return uid_allocator.reserve(uid)
+
+
+# 复制对象图时原样引用的类型：不可变值，以及函数、类、模块等非数据对象
+_ATOMIC_TYPES = (type(None), bool, int, float, complex, str, bytes, range, type, enum.Enum,
+                 types.FunctionType, types.BuiltinFunctionType, types.MethodType, types.ModuleType)
+_PLAIN_TYPES = frozenset((type(None), bool, int, float, str))
+
+
+def _slot_names(cls):
+    """类及其基类声明的全部 __slots__"""
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend(name for name in slots if name not in ("__dict__", "__weakref__"))
+    return names
+
+
+def graph_copy(obj, share=(), memo=None):
+    """
+    深拷贝对象图（非递归实现：退化成长链的树、很长的链表都不会超出递归深度）
+    share 中的对象按引用共享，不复制也不深入；无法识别的类型交给 copy.deepcopy
+    memo 为 {id(原对象): 副本}，传入时原地补充，其中已有的对象直接取用
+    """
+    if memo is None:
+        memo = {}
+    memo.update((id(item), item) for item in share)
+    pending = []  # 已建好外壳、尚未填充内容的 (原对象, 副本)
+
+    def shell(value):
+        if isinstance(value, _ATOMIC_TYPES):
+            return value
+        key = id(value)
+        if key in memo:
+            return memo[key]
+        if isinstance(value, tuple):
+            # 元组只能一次建好；元素先取外壳，内容同样排进 pending
+            items = [shell(item) for item in value]
+            cls = type(value)
+            if cls is tuple:
+                new = tuple(items)
+            elif hasattr(value, "_fields"):
+                new = cls(*items)
+            else:
+                new = cls(items)
+            memo[key] = new
+            return new
+        if isinstance(value, array):
+            new = array(value.typecode, value)
+            memo[key] = new
+            return new
+        if isinstance(value, deque):
+            new = deque(maxlen=value.maxlen)
+        elif isinstance(value, (list, dict, set)):
+            new = type(value)()
+        elif isinstance(value, frozenset):
+            new = frozenset(shell(item) for item in value)
+            memo[key] = new
+            return new
+        elif hasattr(value, "__dict__") or _slot_names(type(value)):
+            new = type(value).__new__(type(value))
+        else:
+            new = copy.deepcopy(value)
+            memo[key] = new
+            return new
+        memo[key] = new
+        pending.append((value, new))
+        return new
+
+    result = shell(obj)
+    while pending:
+        source, target = pending.pop()
+        if isinstance(target, (list, deque)):
+            target.extend(shell(item) for item in source)
+        elif isinstance(target, dict):
+            for k, v in source.items():
+                target[shell(k)] = shell(v)
+        elif isinstance(target, set):
+            target.update(shell(item) for item in source)
+        else:
+            state = getattr(source, "__dict__", None)
+            if state is not None:
+                # 节点的属性大多是数字/字符串，按确切类型先判断，省去一次函数调用
+                target.__dict__.update({name: v if type(v) in _PLAIN_TYPES else shell(v)
+                                        for name, v in state.items()})
+            for name in _slot_names(type(source)):
+                if hasattr(source, name):
+                    object.__setattr__(target, name, shell(getattr(source, name)))
+    return result
+
+
+class TrackedObject:
+    """
+    结构数据（树/链表节点、顺序存储容器）的基类：属性被改写时推进结构纪元
+    snapshot_copy 据此判断上一次复制出的结构能否继续复用
+    """
+    __slots__ = ()
+    epoch = 0  # 任一结构对象被改写的累计次数
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        TrackedObject.epoch += 1
+
+
+class TrackedTuple(tuple, TrackedObject):
+    """由结构对象组成的只读序列（如遍历顺序）：与结构对象一样随快照副本缓存"""
+    __slots__ = ()
+
+
+def mark_structure_changed():
+    """结构对象内部就地修改（列表元素赋值等）而未改写属性时调用"""
+    TrackedObject.epoch += 1
+
 
 class BaseStructure:
     """抽象基类：提供数据结构的基本接口"""
+
+    # 生成快照副本时按引用共享的属性：一经生成就不再原地修改的预计算结果（关键帧、时间表等）
+    _SHARED_ON_COPY = ()
     
     def __init__(self):
         self.active = False
@@ -17,6 +186,32 @@ class BaseStructure:
         """获取激活状态"""
         return self.active
 
+    def snapshot_copy(self):
+        """
+        与当前状态互不影响的只读副本，供后台线程生成快照
+        _SHARED_ON_COPY 中的属性按引用共享；直接挂在模型上的结构对象（树根、链表、顺序容器）
+        只在结构纪元变化后重新复制，其余副本之间共用同一份，动画节拍里只复制进度等少量状态
+        """
+        share = [getattr(self, name) for name in self._SHARED_ON_COPY
+                 if not isinstance(getattr(self, name, None), _ATOMIC_TYPES)]
+        roots = [value for value in self.__dict__.values() if isinstance(value, TrackedObject)]
+        if not roots:
+            return graph_copy(self, share)
+        cache = self.__dict__.get("_structure_copy")
+        if cache is None or cache[0] != TrackedObject.epoch:
+            # (结构纪元, 已复制的原对象, {id(原对象): 副本})；持有原对象，保证缓存有效期间 id 不被复用
+            cache = (TrackedObject.epoch, [], {})
+            self._structure_copy = cache
+        _, sources, structure_memo = cache
+        for root in roots:
+            if id(root) not in structure_memo:
+                # 同一纪元内新挂上的结构对象（或指向结构内部的引用已在缓存中）只复制一次
+                sources.append(root)
+                graph_copy(root, memo=structure_memo)
+        # 新复制的对象写入 ChainMap 的第一层，缓存本身不被改动；副本不带缓存
+        memo = ChainMap({id(cache): None}, structure_memo)
+        return graph_copy(self, share, memo)
+
     # ===== 序列化接口 ===== #
     def to_dict(self) -> dict:
         """导出可序列化的纯数据字典。子类必须实现。"""
@@ -24,4 +219,4 @@ class BaseStructure:
 
     def from_dict(self, data: dict) -> None:
         """从字典恢复内部状态。子类必须实现。"""
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
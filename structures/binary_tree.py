@@ -2,16 +2,17 @@
 """
 二叉树数据结构：纯业务逻辑实现
 """
-from .base import BaseStructure
+from .base import BaseStructure, TrackedObject, next_uid, restore_uid
 
 class BinaryTreeModel(BaseStructure):
     """二叉树模型类"""
     
-    class Node:
-        def __init__(self, value, left=None, right=None):
+    class Node(TrackedObject):
+        def __init__(self, value, left=None, right=None, uid=None):
             self.value = value
             self.left = left
             self.right = right
+            self.uid = uid if uid is not None else next_uid()
 
     def __init__(self):
         super().__init__()
@@ -271,6 +272,7 @@ class BinaryTreeModel(BaseStructure):
             return None
         return {
             "value": node.value,
+            "uid": node.uid,
             "left": self._node_to_dict(node.left),
             "right": self._node_to_dict(node.right),
         }
@@ -278,7 +280,7 @@ class BinaryTreeModel(BaseStructure):
     def _dict_to_node(self, data):
         if not data:
             return None
-        node = BinaryTreeModel.Node(data.get("value"))
+        node = BinaryTreeModel.Node(data.get("value"), uid=restore_uid(data.get("uid")))
         node.left = self._dict_to_node(data.get("left"))
         node.right = self._dict_to_node(data.get("right"))
         return node
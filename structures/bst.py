@@ -3,16 +3,17 @@
 二叉搜索树数据结构：纯业务逻辑实现
 """
 from collections import deque
-from .base import BaseStructure
+from .base import BaseStructure, TrackedObject, TrackedTuple, next_uid, restore_uid
 
 class BSTModel(BaseStructure):
     """二叉搜索树模型类"""
     
-    class Node:
-        def __init__(self, value, left=None, right=None):
+    class Node(TrackedObject):
+        def __init__(self, value, left=None, right=None, uid=None):
             self.value = value
             self.left = left
             self.right = right
+            self.uid = uid if uid is not None else next_uid()
 
     def __init__(self):
         super().__init__()
@@ -56,20 +57,20 @@ class BSTModel(BaseStructure):
 
         # 遍历动画相关属性
         self._traversal_order = None
-        self._traversal_sequence = []
+        self._traversal_sequence = ()
         self._traversal_current_index = -1
         self._traversal_current_node = None
-        self._traversal_visited_nodes = set()
+        self._traversal_visited_count = 0  # 已访问的节点恰为遍历序列的前若干个
 
         self._reset_traversal_state()
 
     def _reset_traversal_state(self):
         """重置遍历动画状态"""
         self._traversal_order = None
-        self._traversal_sequence = []
+        self._traversal_sequence = ()
         self._traversal_current_index = -1
         self._traversal_current_node = None
-        self._traversal_visited_nodes = set()
+        self._traversal_visited_count = 0  # 已访问的节点恰为遍历序列的前若干个
 
     def insert(self, value):
         """插入节点到BST"""
@@ -126,19 +127,22 @@ class BSTModel(BaseStructure):
             return None, None
 
     def _insert_node(self, node, value):
-        """递归插入节点"""
-        if value < node.value:
-            if node.left:
-                self._insert_node(node.left, value)
-            else:
-                # 创建左孩子
-                node.left = BSTModel.Node(value)
-        elif value > node.value:
-            if node.right:
-                self._insert_node(node.right, value)
+        """沿比较路径向下插入节点（迭代实现，退化成链的大树也不会递归过深）"""
+        while True:
+            if value < node.value:
+                if node.left is None:
+                    # 创建左孩子
+                    node.left = BSTModel.Node(value)
+                    return
+                node = node.left
+            elif value > node.value:
+                if node.right is None:
+                    # 创建右孩子
+                    node.right = BSTModel.Node(value)
+                    return
+                node = node.right
             else:
-                # 创建右孩子
-                node.right = BSTModel.Node(value)
+                return
 
     def search(self, value):
         """搜索节点"""
@@ -153,16 +157,12 @@ class BSTModel(BaseStructure):
         return self._search_node(self.root, v)
 
     def _search_node(self, node, value):
-        """递归搜索节点"""
-        if not node:
-            return False
-        
-        if value == node.value:
-            return True
-        elif value < node.value:
-            return self._search_node(node.left, value)
-        else:
-            return self._search_node(node.right, value)
+        """沿比较路径查找节点"""
+        while node:
+            if value == node.value:
+                return True
+            node = node.left if value < node.value else node.right
+        return False
 
     def delete(self, value):
         """删除节点"""
@@ -209,26 +209,38 @@ class BSTModel(BaseStructure):
         # 不立即删除，等动画完成后再删除
 
     def _delete_node(self, node, value):
-        """递归删除节点"""
-        if not node:
+        """删除子树中的节点并返回新的子树根（迭代实现）"""
+        parent, target = None, node
+        while target:
+            if value < target.value:
+                parent, target = target, target.left
+            elif value > target.value:
+                parent, target = target, target.right
+            else:
+                break
+        if not target:
             return node
-        
-        if value < node.value:
-            node.left = self._delete_node(node.left, value)
-        elif value > node.value:
-            node.right = self._delete_node(node.right, value)
-        else:
-            # 找到要删除的节点
-            if not node.left:
-                return node.right
-            elif not node.right:
-                return node.left
-            
+
+        if target.left and target.right:
             # 节点有两个子节点，找到右子树的最小值
-            min_node = self._find_min(node.right)
-            node.value = min_node.value
-            node.right = self._delete_node(node.right, min_node.value)
-        
+            # 后继的值连同标识一起上移：留下的是后继元素，被删的标识随之消失
+            min_parent, min_node = target, target.right
+            while min_node.left:
+                min_parent, min_node = min_node, min_node.left
+            target.value, target.uid = min_node.value, min_node.uid
+            if min_parent is target:
+                min_parent.right = min_node.right
+            else:
+                min_parent.left = min_node.right
+            return node
+
+        child = target.left or target.right
+        if parent is None:
+            return child
+        if parent.left is target:
+            parent.left = child
+        else:
+            parent.right = child
         return node
 
     def _find_min(self, node):
@@ -262,6 +274,34 @@ class BSTModel(BaseStructure):
         self.root = None
         self._reset_traversal_state()
 
+    def insert_values(self, values):
+        """不经过动画直接依次插入（快速模式批量载入用），已存在的值忽略"""
+        if not self.active:
+            return
+        self._reset_traversal_state()
+        for value in values:
+            try:
+                v = float(value)
+            except:
+                v = value
+            if self.root is None:
+                self.root = BSTModel.Node(v)
+            else:
+                self._insert_node(self.root, v)
+
+    def remove_value(self, value) -> bool:
+        """不经过动画直接删除，返回该值是否存在"""
+        if not self.active or self.root is None:
+            return False
+        try:
+            v = float(value)
+        except:
+            v = value
+        if not self._search_node(self.root, v):
+            return False
+        self.root = self._delete_node(self.root, v)
+        return True
+
     def traverse_inorder(self):
         """中序遍历"""
         result = []
@@ -523,10 +563,10 @@ class BSTModel(BaseStructure):
         self._animation_state = 'traversing'
         self._animation_progress = 0.0
         self._traversal_order = order
-        self._traversal_sequence = sequence
+        self._traversal_sequence = TrackedTuple(sequence)
         self._traversal_current_index = -1
         self._traversal_current_node = None
-        self._traversal_visited_nodes = set()
+        self._traversal_visited_count = 0
         return True
 
     def update_traversal_animation(self, progress):
@@ -539,13 +579,9 @@ class BSTModel(BaseStructure):
             return
         idx = min(int(self._animation_progress * total), total - 1)
         if idx != self._traversal_current_index:
-            if 0 <= self._traversal_current_index < total:
-                prev_node = self._traversal_sequence[self._traversal_current_index]
-                self._traversal_visited_nodes.add(prev_node)
-            if idx - self._traversal_current_index > 1:
-                start = max(self._traversal_current_index + 1, 0)
-                for hop in range(start, idx):
-                    self._traversal_visited_nodes.add(self._traversal_sequence[hop])
+            # 离开的节点与跳过的节点都记为已访问
+            self._traversal_visited_count = max(
+                self._traversal_visited_count, idx, self._traversal_current_index + 1)
             self._traversal_current_index = idx
             self._traversal_current_node = self._traversal_sequence[idx]
 
@@ -553,11 +589,17 @@ class BSTModel(BaseStructure):
         """结束遍历动画，保留访问过节点的着色"""
         if self._animation_state == 'traversing':
             if 0 <= self._traversal_current_index < len(self._traversal_sequence):
-                self._traversal_visited_nodes.add(self._traversal_sequence[self._traversal_current_index])
+                self._traversal_visited_count = max(
+                    self._traversal_visited_count, self._traversal_current_index + 1)
         self._traversal_current_node = None
         self._animation_state = None
         self._animation_progress = 0.0
 
+    @property
+    def _traversal_visited_nodes(self):
+        """已访问（着色）的节点"""
+        return set(self._traversal_sequence[:self._traversal_visited_count])
+
     def _generate_traversal_sequence(self, order: str):
         """生成遍历顺序（节点对象列表）"""
         seq = []
@@ -671,6 +713,7 @@ class BSTModel(BaseStructure):
             return None
         return {
             "value": node.value,
+            "uid": node.uid,
             "left": self._node_to_dict(node.left),
             "right": self._node_to_dict(node.right),
         }
@@ -678,7 +721,7 @@ class BSTModel(BaseStructure):
     def _dict_to_node(self, data):
         if not data:
             return None
-        node = BSTModel.Node(data.get("value"))
+        node = BSTModel.Node(data.get("value"), uid=restore_uid(data.get("uid")))
         node.left = self._dict_to_node(data.get("left"))
         node.right = self._dict_to_node(data.get("right"))
         return node
@@ -1,24 +1,44 @@
 # -*- coding: utf-8 -*-
 """
 哈夫曼树数据结构：纯业务逻辑 + 全新动画状态机
+构建时一次性推演出全部合并轮次（每轮的队列、选中的两项、父节点），
+动画各阶段只是在这张时间表上定位，可直接跳到任意一轮的任意阶段
 """
-from typing import Dict, List, Tuple, Optional
-from .base import BaseStructure
+from typing import Dict, List, Tuple, Optional, Sequence
+from .base import BaseStructure, next_uid, restore_uid
+
+# 每一轮合并的动画阶段（按播放顺序）
+PHASES = ("select", "move", "merge", "return")
 
 
 class HuffmanTreeModel(BaseStructure):
     """哈夫曼树模型：同时承载动画状态"""
 
+    # 节点与时间表构建后不再修改，动画只是改指向，快照副本直接共享
+    _SHARED_ON_COPY = ("root", "_queue", "_queue_before", "_queue_after",
+                       "_current_pair", "_current_parent", "_schedule", "_original_freq_map")
+
     class Node:
-        def __init__(self, freq, char=None, left=None, right=None):
+        def __init__(self, freq, char=None, left=None, right=None, uid=None):
             self.freq = int(freq) if freq is not None else 0
             self.char = char
             self.left = left
             self.right = right
+            self.uid = uid if uid is not None else next_uid()
 
         def __repr__(self):
             return f"HuffNode({self.char or '*'}:{self.freq})"
 
+    class Round:
+        """一轮合并：合并前队列（按频率有序）、选中的两项、新父节点、父节点插回后的队列"""
+        __slots__ = ("queue_before", "pair", "parent", "queue_after")
+
+        def __init__(self, queue_before, pair, parent, queue_after):
+            self.queue_before = queue_before
+            self.pair = pair
+            self.parent = parent
+            self.queue_after = queue_after
+
     def __init__(self):
         super().__init__()
         self.root: Optional[HuffmanTreeModel.Node] = None
@@ -26,15 +46,16 @@ class HuffmanTreeModel(BaseStructure):
 
     # ====== 基础与动画状态 ======
     def _reset_state(self):
-        self._queue: List[HuffmanTreeModel.Node] = []
+        self._queue: Sequence[HuffmanTreeModel.Node] = []
         self._animation_state: str = "idle"  # idle/select/move/merge/return/done
         self._animation_progress: float = 0.0
-        self._current_pair: List[HuffmanTreeModel.Node] = []
+        self._current_pair: Sequence[HuffmanTreeModel.Node] = []
         self._current_parent: Optional[HuffmanTreeModel.Node] = None
-        self._queue_before: List[HuffmanTreeModel.Node] = []
-        self._queue_after: List[HuffmanTreeModel.Node] = []
+        self._queue_before: Sequence[HuffmanTreeModel.Node] = []
+        self._queue_after: Sequence[HuffmanTreeModel.Node] = []
         self._round: int = 0
         self._total_rounds: int = 0
+        self._schedule: List[HuffmanTreeModel.Round] = []  # 全部合并轮次（构建时一次算好）
         self._original_freq_map: Dict[str, int] = {}
 
     def clear(self):
@@ -53,7 +74,8 @@ class HuffmanTreeModel(BaseStructure):
         self._queue = [self.Node(v, char=k) for k, v in sorted(freq_map.items(), key=lambda x: x[1])]
         self._queue_before = list(self._queue)
         self._queue_after = list(self._queue)
-        self._total_rounds = max(0, len(self._queue) - 1)
+        self._schedule = self._plan_rounds(self._queue)
+        self._total_rounds = len(self._schedule)
         self._animation_state = "idle"
         self._animation_progress = 0.0
         # 若只有一个节点，直接成为根
@@ -71,96 +93,93 @@ class HuffmanTreeModel(BaseStructure):
             self._animation_state = "done"
             self.root = self._queue[0]
             return False
-        self._round = 0
-        self._select_pair()
-        self._animation_state = "select"
+        return self.seek(0, "select")
+
+    def _plan_rounds(self, nodes) -> List["HuffmanTreeModel.Round"]:
+        """推演全部合并轮次：每轮取队首两项合并，父节点插到同频率节点之后"""
+        rounds = []
+        queue = tuple(sorted(nodes, key=lambda n: n.freq))
+        while len(queue) >= 2:
+            a, b = queue[0], queue[1]
+            parent = self.Node(a.freq + b.freq, char=None, left=a, right=b)
+            rest = queue[2:]
+            insert_idx = len(rest)
+            for i, n in enumerate(rest):
+                if parent.freq < n.freq:
+                    insert_idx = i
+                    break
+            queue_after = rest[:insert_idx] + (parent,) + rest[insert_idx:]
+            rounds.append(self.Round(queue, (a, b), parent, queue_after))
+            queue = queue_after
+        return rounds
+
+    @property
+    def total_steps(self) -> int:
+        """动画阶段总数（轮数 × 每轮阶段数）"""
+        return len(self._schedule) * len(PHASES)
+
+    def seek(self, round_idx: int, phase: str = "select") -> bool:
+        """
+        直接定位到第 round_idx 轮（从 0 开始）的某一阶段，阶段进度归零
+        状态全部取自预先算好的时间表，不重放之前的合并；round_idx 超出轮数时定位到完成状态
+        """
+        if not self._schedule:
+            return False
+        if phase != "done" and phase not in PHASES:
+            raise ValueError(f"未知的哈夫曼动画阶段: {phase}")
         self._animation_progress = 0.0
+        if phase == "done" or round_idx >= len(self._schedule):
+            last = self._schedule[-1]
+            self.root = last.parent
+            self._round = len(self._schedule) - 1
+            self._queue = []
+            self._queue_before = []
+            self._queue_after = []
+            self._current_pair = []
+            self._current_parent = None
+            self._animation_state = "done"
+            return True
+        current = self._schedule[max(0, round_idx)]
+        self.root = None
+        self._round = max(0, round_idx)
+        self._queue = current.queue_before
+        self._queue_before = current.queue_before
+        self._current_pair = current.pair
+        if phase == "return":
+            # 合并阶段结束后父节点才出现，队列换成插回父节点后的顺序
+            self._current_parent = current.parent
+            self._queue_after = current.queue_after
+        else:
+            self._current_parent = None
+            self._queue_after = current.queue_before
+        self._animation_state = phase
         return True
 
-    def _select_pair(self):
-        """选出当前轮的最小两项并记录队列快照"""
-        self._queue.sort(key=lambda n: n.freq)
-        self._queue_before = list(self._queue)
-        self._current_pair = self._queue[:2] if len(self._queue) >= 2 else []
-        self._current_parent = None
-        self._queue_after = list(self._queue)
-
     def update_animation(self, progress: float):
         """由控制器驱动的阶段进度 [0,1]"""
         self._animation_progress = max(0.0, min(1.0, progress))
 
     def finish_phase(self):
-        """当前阶段结束后切换到下一阶段并做必要的数据更新"""
+        """当前阶段结束后切换到下一阶段（最后一个阶段结束进入下一轮或完成）"""
         state = self._animation_state
-
-        if state == "select":
-            self._animation_state = "move"
-
-        elif state == "move":
-            self._animation_state = "merge"
-
-        elif state == "merge":
-            if len(self._current_pair) != 2:
-                self._animation_state = "done"
-            else:
-                a, b = self._current_pair
-                parent = self.Node(a.freq + b.freq, char=None, left=a, right=b)
-                self._current_parent = parent
-
-                # 计算父节点加入后的目标队列
-                remaining = [n for n in self._queue_before if n not in (a, b)]
-                insert_idx = 0
-                for i, n in enumerate(remaining):
-                    if parent.freq >= n.freq:
-                        insert_idx = i + 1
-                remaining.insert(insert_idx, parent)
-                self._queue_after = remaining
-                self._animation_state = "return"
-
-        elif state == "return":
-            # 真正合并队列
-            if len(self._current_pair) == 2:
-                for n in self._current_pair:
-                    if n in self._queue:
-                        self._queue.remove(n)
-            if self._current_parent:
-                inserted = False
-                for i, n in enumerate(self._queue):
-                    if self._current_parent.freq < n.freq:
-                        self._queue.insert(i, self._current_parent)
-                        inserted = True
-                        break
-                if not inserted:
-                    self._queue.append(self._current_parent)
-
-            # 收尾或进入下一轮
-            if len(self._queue) == 1:
-                self.root = self._queue[0]
-                # 动画完成后清空队列，避免残留
-                self._queue.clear()
-                self._queue_before = []
-                self._queue_after = []
-                self._animation_state = "done"
-                self._animation_progress = 1.0
-            else:
-                self._round += 1
-                self._select_pair()
-                self._animation_state = "select"
-
-            # 仅在完成时清理；未完成需保留下一轮选择结果
-            if self._animation_state == "done":
-                self._current_pair = []
-                self._current_parent = None
-            self._queue_before = list(self._queue)
-            self._queue_after = list(self._queue)
-
-        self._animation_progress = 0.0
+        if state not in PHASES:
+            self._animation_progress = 0.0
+            return
+        index = PHASES.index(state)
+        if index + 1 < len(PHASES):
+            self.seek(self._round, PHASES[index + 1])
+        else:
+            self.seek(self._round + 1, "select")
 
     # ====== 算法与编码 ======
     def _ensure_tree_ready(self):
         """若动画未跑完，快速构建一棵树用于编码/解码"""
         if self.root:
             return
+        if self._schedule:
+            # 时间表里最后一轮的父节点就是最终的根
+            self.root = self._schedule[-1].parent
+            return
         if not self._queue:
             return
         nodes = list(self._queue)
@@ -238,6 +257,7 @@ class HuffmanTreeModel(BaseStructure):
         return {
             "freq": node.freq,
             "char": node.char,
+            "uid": node.uid,
             "left": self._node_to_dict(node.left),
             "right": self._node_to_dict(node.right),
         }
@@ -245,7 +265,7 @@ class HuffmanTreeModel(BaseStructure):
     def _dict_to_node(self, data):
         if not data:
             return None
-        node = self.Node(data.get("freq"), char=data.get("char"))
+        node = self.Node(data.get("freq"), char=data.get("char"), uid=restore_uid(data.get("uid")))
         node.left = self._dict_to_node(data.get("left"))
         node.right = self._dict_to_node(data.get("right"))
         return node
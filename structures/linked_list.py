@@ -3,24 +3,25 @@
 提供自定义链表实现，替代Python内置list
 支持多种数据结构的底层实现
 """
-from .base import BaseStructure
+from .base import BaseStructure, TrackedObject, next_uid, restore_uid
 
-class ListNode:
-    """链表节点类"""
-    def __init__(self, val):
+class ListNode(TrackedObject):
+    """链表节点类（uid 为稳定的元素标识，节点存在期间不变）"""
+    def __init__(self, val, uid=None):
         self.val = val
         self.next = None
+        self.uid = uid if uid is not None else next_uid()
 
-class CustomList:
+class CustomList(TrackedObject):
     """自定义链表类，替代Python内置list"""
     
     def __init__(self):
         self.head = None
         self.size = 0
     
-    def append(self, val):
+    def append(self, val, uid=None):
         """在链表末尾添加元素"""
-        new_node = ListNode(val)
+        new_node = ListNode(val, uid)
         if self.head is None:
             self.head = new_node
         else:
@@ -41,12 +42,12 @@ class CustomList:
             index += 1
         return -1
     
-    def insert(self, index, val):
+    def insert(self, index, val, uid=None):
         """在指定位置插入元素"""
         if index < 0 or index > self.size:
             return False
         
-        new_node = ListNode(val)
+        new_node = ListNode(val, uid)
         
         if index == 0:
             # 在头部插入
@@ -100,6 +101,13 @@ class CustomList:
             yield current.val
             current = current.next
     
+    def uids(self):
+        """按顺序产出各节点的元素标识"""
+        current = self.head
+        while current:
+            yield current.uid
+            current = current.next
+    
     def __len__(self):
         return self.size
     
@@ -129,6 +137,7 @@ class LinkedListModel(BaseStructure):
         self._animation_state = None  # 'building', 'inserting', 'deleting'
         self._animation_progress = 0.0
         self._new_value = None
+        self._new_uid = None  # 插入中的节点预先领取的标识，动画期间与落地后一致
         self._insert_position = 0
         self._delete_position = 0
         self._deleted_value = None
@@ -154,6 +163,7 @@ class LinkedListModel(BaseStructure):
         # 设置插入动画状态
         self._animation_state = 'inserting'
         self._new_value = value
+        self._new_uid = next_uid()
         self._insert_position = index
         self._animation_progress = 0.0
         
@@ -252,6 +262,7 @@ class LinkedListModel(BaseStructure):
         self._animation_state = 'building'
         self._animation_progress = 0.0
         self._build_values = list(values) if hasattr(values, '__iter__') else [values]
+        self._build_uids = [next_uid() for _ in self._build_values]
         self._build_index = 0
         
         # 清空现有数据
@@ -300,9 +311,10 @@ class LinkedListModel(BaseStructure):
         """完成构建动画"""
         if self._animation_state == 'building' and hasattr(self, '_build_values'):
             # 执行实际的构建操作
-            for value in self._build_values:
+            uids = getattr(self, '_build_uids', [])
+            for i, value in enumerate(self._build_values):
                 if value is not None:
-                    self.data.append(value)
+                    self.data.append(value, uids[i] if i < len(uids) else None)
             self._animation_state = None
     
     def complete_insert_animation(self):
@@ -313,7 +325,8 @@ class LinkedListModel(BaseStructure):
             value = self._new_value
             
             # 使用 CustomList 的 insert 方法
-            self.data.insert(index, value)
+            self.data.insert(index, value, self._new_uid)
+            self._new_uid = None
             
             self._animation_state = None
     
@@ -333,18 +346,21 @@ class LinkedListModel(BaseStructure):
         elements = list(self.data.to_array()) if hasattr(self.data, 'to_array') else list(self.data)
         return {
             "elements": elements,
+            "uids": list(self.data.uids()),
         }
 
     def from_dict(self, data: dict) -> None:
         # 清空后逐个 append 重建
         self.data = CustomList()
         elements = data.get("elements", []) or []
-        for v in elements:
-            self.data.append(v)
+        uids = data.get("uids") or []
+        for i, v in enumerate(elements):
+            self.data.append(v, restore_uid(uids[i] if i < len(uids) else None))
         # 清理动画状态
         self._animation_state = None
         self._animation_progress = 0.0
         self._new_value = None
+        self._new_uid = None
         self._insert_position = 0
         self._delete_position = 0
         self._deleted_value = None
\ No newline at end of file
@@ -3,17 +3,18 @@
 顺序表数据结构：纯业务逻辑实现
 使用数组式顺序存储，完全避免使用Python内置list
 """
-from .base import BaseStructure
+from .base import BaseStructure, TrackedObject, mark_structure_changed, next_uid, restore_uid
 
 class SequentialListModel(BaseStructure):
     """顺序表模型类 - 数组式顺序存储"""
     
-    class SequentialArray:
+    class SequentialArray(TrackedObject):
         """自写数组式顺序表，提供按位访问/插入/删除，完全避免使用list"""
         
         def __init__(self, capacity=100):
             self.capacity = capacity  # 数组容量
             self.data = [None] * capacity  # 固定大小数组
+            self.uids = [None] * capacity  # 各槽位元素的标识，随元素一起移动
             self.size = 0  # 当前元素个数
         
         def _is_valid_position(self, pos):
@@ -29,12 +30,15 @@ class SequentialListModel(BaseStructure):
             # 创建新的更大数组
             new_capacity = self.capacity * 2
             new_data = [None] * new_capacity
+            new_uids = [None] * new_capacity
             
             # 复制现有数据
             for i in range(self.size):
                 new_data[i] = self.data[i]
+                new_uids[i] = self.uids[i]
             
             self.data = new_data
+            self.uids = new_uids
             self.capacity = new_capacity
         
         def get(self, pos):
@@ -43,14 +47,21 @@ class SequentialListModel(BaseStructure):
                 return None
             return self.data[pos]
         
+        def uid_at(self, pos):
+            """获取指定位置元素的标识"""
+            if not self._is_valid_position(pos):
+                return None
+            return self.uids[pos]
+        
         def set(self, pos, value):
             """设置指定位置的元素"""
             if not self._is_valid_position(pos):
                 return False
             self.data[pos] = value
+            mark_structure_changed()
             return True
         
-        def insert_at(self, pos, value):
+        def insert_at(self, pos, value, uid=None):
             """在指定位置插入元素"""
             if value is None:
                 return False
@@ -68,9 +79,11 @@ class SequentialListModel(BaseStructure):
             # 将pos及之后的元素向后移动一位
             for i in range(self.size, pos, -1):
                 self.data[i] = self.data[i - 1]
+                self.uids[i] = self.uids[i - 1]
             
             # 在pos位置插入新元素
             self.data[pos] = value
+            self.uids[pos] = uid if uid is not None else next_uid()
             self.size += 1
             return True
         
@@ -85,15 +98,17 @@ class SequentialListModel(BaseStructure):
             # 将pos之后的元素向前移动一位
             for i in range(pos, self.size - 1):
                 self.data[i] = self.data[i + 1]
+                self.uids[i] = self.uids[i + 1]
             
             # 清空最后一个位置
             self.data[self.size - 1] = None
+            self.uids[self.size - 1] = None
             self.size -= 1
             return deleted_value
         
-        def append(self, value):
+        def append(self, value, uid=None):
             """在尾部添加元素"""
-            return self.insert_at(self.size, value)
+            return self.insert_at(self.size, value, uid)
         
         def __len__(self):
             return self.size
@@ -104,6 +119,11 @@ class SequentialListModel(BaseStructure):
             for i in range(self.size):
                 yield self.data[i]
         
+        def iter_uids(self):
+            """按顺序产出各元素的标识"""
+            for i in range(self.size):
+                yield self.uids[i]
+        
         def __iter__(self):
             """支持迭代"""
             for i in range(self.size):
@@ -124,6 +144,7 @@ class SequentialListModel(BaseStructure):
         # 动画相关属性
         self._animation_state = None  # 动画状态：None, 'inserting', 'deleting'
         self._new_value = None  # 新值（用于动画显示）
+        self._new_uid = None  # 新元素预先领取的标识（动画中与落地后一致）
         self._animation_progress = 0.0  # 动画进度：0.0-1.0
         self._start_x = 0  # 动画起始x坐标
         self._start_y = 0  # 动画起始y坐标
@@ -152,6 +173,7 @@ class SequentialListModel(BaseStructure):
         # 设置动画状态
         self._animation_state = 'inserting'
         self._new_value = value
+        self._new_uid = next_uid()
         self._insert_position = pos
         self._animation_progress = 0.0
         
@@ -199,9 +221,10 @@ class SequentialListModel(BaseStructure):
     def complete_insert_animation(self):
         """完成插入动画"""
         if self._animation_state == 'inserting' and self._new_value is not None:
-            self.data.insert_at(self._insert_position, self._new_value)
+            self.data.insert_at(self._insert_position, self._new_value, self._new_uid)
             self._animation_state = None
             self._new_value = None
+            self._new_uid = None
             self._animation_progress = 0.0
     
     def complete_delete_animation(self):
@@ -275,6 +298,7 @@ class SequentialListModel(BaseStructure):
         elements = list(self.data.to_list())
         return {
             "elements": elements,
+            "uids": list(self.data.iter_uids()),
             "capacity": self.data.capacity,
         }
 
@@ -283,10 +307,12 @@ class SequentialListModel(BaseStructure):
         capacity = int(data.get("capacity", 100) or 100)
         self.data = self.SequentialArray(capacity)
         elements = data.get("elements", []) or []
-        for v in elements:
-            self.data.append(v)
+        uids = data.get("uids") or []
+        for i, v in enumerate(elements):
+            self.data.append(v, restore_uid(uids[i] if i < len(uids) else None))
         # 清理动画状态
         self._animation_state = None
         self._new_value = None
+        self._new_uid = None
         self._animation_progress = 0.0
         self._insert_position = 0
\ No newline at end of file
@@ -2,18 +2,19 @@
 """
 栈数据结构：纯业务逻辑实现
 """
-from .base import BaseStructure
+from .base import BaseStructure, TrackedObject, next_uid, restore_uid
 from .linked_list import CustomList
 
 class StackModel(BaseStructure):
     """栈模型类"""
     
     
-    class SequentialStack:
+    class SequentialStack(TrackedObject):
         """顺序栈实现，使用数组存储"""
         def __init__(self, capacity=100):
             self._capacity = capacity
             self._data = [None] * capacity  # 固定大小数组
+            self._uids = [None] * capacity  # 各元素的标识
             self._top = -1  # 栈顶索引，-1表示空栈
 
         def _ensure_capacity(self, min_capacity):
@@ -22,17 +23,21 @@ class StackModel(BaseStructure):
                 return
             new_capacity = max(min_capacity, self._capacity * 2)
             new_data = [None] * new_capacity
+            new_uids = [None] * new_capacity
             for i in range(self._top + 1):
                 new_data[i] = self._data[i]
+                new_uids[i] = self._uids[i]
             self._data = new_data
+            self._uids = new_uids
             self._capacity = new_capacity
         
-        def push(self, v):
+        def push(self, v, uid=None):
             if self.is_full():
                 # 自动扩容后再插入
                 self._ensure_capacity(self._capacity + 1)
             self._top += 1
             self._data[self._top] = v
+            self._uids[self._top] = uid if uid is not None else next_uid()
             return True
         
         def pop(self):
@@ -40,6 +45,7 @@ class StackModel(BaseStructure):
                 return None
             v = self._data[self._top]
             self._data[self._top] = None
+            self._uids[self._top] = None
             self._top -= 1
             return v
         
@@ -68,12 +74,17 @@ class StackModel(BaseStructure):
             """转换为数组形式（从栈底到栈顶的顺序）"""
             return [self._data[i] for i in range(self._top + 1)]
         
+        def uid_array(self):
+            """各元素的标识（从栈底到栈顶）"""
+            return [self._uids[i] for i in range(self._top + 1)]
+        
         def clear(self):
             """清空栈"""
             self._top = -1
             # 清空数组内容
             for i in range(self._capacity):
                 self._data[i] = None
+                self._uids[i] = None
 
     def __init__(self):
         '''初始化栈'''
@@ -81,6 +92,7 @@ class StackModel(BaseStructure):
         self.data = self.SequentialStack()
         self._animation_state = None  # 动画状态：None, 'pushing', 'popping'
         self._new_value = None  # 新值（用于动画显示）
+        self._new_uid = None  # 新元素预先领取的标识（动画中与入栈后一致）
         self._animation_progress = 0.0  # 动画进度：0.0-1.0
         self._start_x = 0  # 动画起始x坐标
         self._start_y = 0  # 动画起始y坐标
@@ -95,6 +107,7 @@ class StackModel(BaseStructure):
         # 设置动画状态
         self._animation_state = 'pushing'
         self._new_value = value
+        self._new_uid = next_uid()
         self._animation_progress = 0.0  # 开始动画
         
         # 设置动画起始位置（屏幕正上方）
@@ -172,6 +185,7 @@ class StackModel(BaseStructure):
         # 设置构建动画状态
         self._animation_state = 'building'
         self._build_values = values_list  # 转换为列表
+        self._build_uids = [next_uid() for _ in values_list]
         self._build_index = 0  # 当前构建到的索引
         self._animation_progress = 0.0
     
@@ -179,24 +193,27 @@ class StackModel(BaseStructure):
         """完成构建动画"""
         if self._animation_state == 'building':
             # 将所有值推入栈中
-            for value in self._build_values:
-                self.data.push(value)
+            uids = getattr(self, '_build_uids', [])
+            for i, value in enumerate(self._build_values):
+                self.data.push(value, uids[i] if i < len(uids) else None)
             
             self._animation_state = None
             self._build_values = []
+            self._build_uids = []
             self._build_index = 0
             self._animation_progress = 0.0
     
     def complete_push_animation(self):
         """完成入栈动画"""
         if self._animation_state == 'pushing' and self._new_value is not None:
-            success = self.data.push(self._new_value)
+            success = self.data.push(self._new_value, self._new_uid)
             if not success:
                 # 如果入栈失败（栈满），设置栈满状态
                 self._animation_state = 'stack_full'
             else:
                 self._animation_state = None
             self._new_value = None
+            self._new_uid = None
             self._animation_progress = 0.0
     
     def complete_pop_animation(self):
@@ -228,6 +245,7 @@ class StackModel(BaseStructure):
     def to_dict(self) -> dict:
         return {
             "elements": self.data.to_array(),
+            "uids": self.data.uid_array(),
             "capacity": self.data._capacity,
         }
 
@@ -235,8 +253,9 @@ class StackModel(BaseStructure):
         capacity = int(data.get("capacity", 100) or 100)
         self.data = self.SequentialStack(capacity)
         elements = data.get("elements", []) or []
-        for v in elements:
-            self.data.push(v)
+        uids = data.get("uids") or []
+        for i, v in enumerate(elements):
+            self.data.push(v, restore_uid(uids[i] if i < len(uids) else None))
         # 清理动画状态
         self._animation_state = None
         self._new_value = None
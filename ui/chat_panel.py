@@ -1,10 +1,10 @@
 import os
 from pathlib import Path
-from PyQt5.QtCore import Qt, QSize, pyqtSignal
+from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSignal
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QListWidget, QListWidgetItem, QTextEdit, QLabel,
-    QFrame, QComboBox
+    QFrame, QComboBox, QCheckBox
 )
 from PyQt5.QtGui import QIcon
 
@@ -13,6 +13,12 @@ class ChatPanel(QWidget):
     """右侧常驻的 LLM 对话面板"""
     sendMessage = pyqtSignal(str)
     modelChanged = pyqtSignal(str)
+    # 预取：输入停顿后发出当前草稿；草稿每次变化都发出 draftChanged，便于取消过期的预取
+    draftPaused = pyqtSignal(str)
+    draftChanged = pyqtSignal(str)
+    prefetchToggled = pyqtSignal(bool)
+    PREFETCH_DELAY_MS = 600
+    PREFETCH_MIN_LENGTH = 4
     _DEFAULT_MODELS = [
         # 保留 gpt-3.5 作为基础选项，其余换成更智能的新模型
         "openai/gpt-3.5-turbo",
@@ -22,6 +28,8 @@ class ChatPanel(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        # 正在流式更新的助手消息（列表项, 文本标签, 容器）
+        self._stream_message = None
         self._build_ui()
         # 初始触发一次当前模型，确保外部状态同步
         self.modelChanged.emit(self.current_model())
@@ -42,8 +50,18 @@ class ChatPanel(QWidget):
         top_bar.addWidget(self.btn_new)
         top_bar.addWidget(self.btn_clear)
         top_bar.addStretch(1)
+        # 预取（默认关闭）：输入停顿时提前请求 LLM，发送时直接复用结果
+        self.chk_prefetch = QCheckBox("输入时预取")
+        self.chk_prefetch.setToolTip("停止输入片刻后提前请求LLM，发送时复用结果（会额外消耗API调用）")
+        self.chk_prefetch.toggled.connect(self.prefetchToggled.emit)
+        top_bar.addWidget(self.chk_prefetch)
         layout.addLayout(top_bar)
 
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(self.PREFETCH_DELAY_MS)
+        self._prefetch_timer.timeout.connect(self._on_typing_paused)
+
         # 消息列表
         self.list_widget = QListWidget()
         self.list_widget.setObjectName("ChatPanelList")
@@ -58,6 +76,7 @@ class ChatPanel(QWidget):
         self.input_edit.installEventFilter(self)
         self.input_edit.setAcceptRichText(False)
         self.input_edit.setObjectName("ChatPanelInput")
+        self.input_edit.textChanged.connect(self._on_draft_changed)
         self.btn_send = QPushButton("发送")
         self.btn_send.clicked.connect(self._on_send_clicked)
         self.btn_send.setObjectName("ChatPanelSend")
@@ -95,16 +114,55 @@ class ChatPanel(QWidget):
         text = self.input_edit.toPlainText().strip()
         if not text:
             return
+        self._prefetch_timer.stop()
         self.sendMessage.emit(text)
         self.input_edit.clear()
 
+    # —— 输入停顿预取 —— #
+    def is_prefetch_enabled(self) -> bool:
+        return self.chk_prefetch.isChecked()
+
+    def set_prefetch_enabled(self, enabled: bool):
+        self.chk_prefetch.setChecked(bool(enabled))
+
+    def _on_draft_changed(self):
+        if not self.is_prefetch_enabled():
+            return
+        self.draftChanged.emit(self.input_edit.toPlainText().strip())
+        # 每次输入都重新计时，停顿 PREFETCH_DELAY_MS 后才触发
+        self._prefetch_timer.start()
+
+    def _on_typing_paused(self):
+        text = self.input_edit.toPlainText().strip()
+        if self.is_prefetch_enabled() and len(text) >= self.PREFETCH_MIN_LENGTH:
+            self.draftPaused.emit(text)
+
     def append_user(self, text: str):
         self._add_message(text, role="user")
 
     def append_assistant(self, text: str):
         self._add_message(text, role="assistant")
 
+    # —— 流式回复：先放一个气泡，随文本到达不断刷新 —— #
+    def begin_assistant_stream(self, placeholder: str = "…"):
+        self._stream_message = self._add_message(placeholder, role="assistant")
+
+    def update_assistant_stream(self, text: str):
+        if self._stream_message is None:
+            self.begin_assistant_stream()
+        item, label, container = self._stream_message
+        label.setText(text)
+        item.setSizeHint(container.sizeHint())
+        self.list_widget.scrollToBottom()
+
+    def end_assistant_stream(self):
+        self._stream_message = None
+
+    def is_streaming(self) -> bool:
+        return self._stream_message is not None
+
     def clear_history(self):
+        self._stream_message = None
         self.list_widget.clear()
 
     def current_model(self) -> str:
@@ -146,6 +204,7 @@ class ChatPanel(QWidget):
         self.list_widget.addItem(item)
         self.list_widget.setItemWidget(item, container)
         self.list_widget.scrollToBottom()
+        return item, label, container
 
     def _init_model_combo(self):
         """初始化模型选项"""
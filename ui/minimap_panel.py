@@ -0,0 +1,132 @@
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import pyqtSignal, Qt, QPointF, QRectF
+from PyQt5.QtGui import QPainter, QPixmap, QColor, QPen, QTransform
+
+
+class MinimapPanel(QWidget):
+    """概览小地图：整份快照的低分辨率缓存图 + 可拖动的视口框
+
+    缓存图只在结构版本（元素 id 集合 + 粗粒度包围盒）变化时重画；
+    滚动主视图只移动视口框，不触发重画。点击/拖动时发出 navigateRequested(场景坐标)。
+    """
+
+    navigateRequested = pyqtSignal(QPointF)
+
+    PADDING = 6
+    BACKGROUND = QColor("#f7f9fc")
+    VIEWPORT_FILL = QColor(37, 99, 235, 40)
+    VIEWPORT_BORDER = QColor("#2563EB")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(180, 120)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setCursor(Qt.PointingHandCursor)
+        self._snapshot = None
+        self._version = None
+        self._pixmap = None
+        self._pixmap_size = None
+        # 快照坐标 -> 小地图像素 的缩放变换
+        self._to_minimap = QTransform()
+        # 主视图的 快照坐标 -> 场景坐标 变换（Canvas 的视图变换）
+        self._content_transform = QTransform()
+        self._viewport_scene_rect = QRectF()
+
+    # ====== 外部接口 ======
+    def set_snapshot(self, snapshot, content_transform: QTransform):
+        """主画布渲染了新快照；结构版本不变时只更新变换"""
+        self._snapshot = snapshot
+        self._content_transform = QTransform(content_transform)
+        version = self._structure_version(snapshot)
+        if version != self._version:
+            self._version = version
+            self._pixmap = None
+        self.update()
+
+    def set_viewport_rect(self, scene_rect: QRectF):
+        """主视图可视区域（场景坐标）变化"""
+        self._viewport_scene_rect = QRectF(scene_rect)
+        self.update()
+
+    @staticmethod
+    def _structure_version(snapshot):
+        if snapshot is None:
+            return None
+        bounds = snapshot.geometry().bounds()
+        coarse = None
+        if bounds is not None:
+            # 包围盒按内容尺寸的 1/50 量化：动画中的细微移动不触发重画
+            step = max(1.0, max(bounds[2] - bounds[0], bounds[3] - bounds[1]) / 50.0)
+            coarse = tuple(int(v // step) for v in bounds)
+        ids = hash(tuple(n.id for n in snapshot.nodes) + tuple(b.id for b in snapshot.boxes))
+        return getattr(snapshot, "kind", ""), len(snapshot.edges), ids, coarse
+
+    # ====== 绘制 ======
+    def _rebuild_pixmap(self):
+        size = self.size()
+        self._pixmap = QPixmap(size)
+        self._pixmap.fill(self.BACKGROUND)
+        self._pixmap_size = size
+        self._to_minimap = QTransform()
+        snapshot = self._snapshot
+        bounds = snapshot.geometry().bounds() if snapshot is not None else None
+        if bounds is None:
+            return
+        min_x, min_y, max_x, max_y = bounds
+        avail_w = max(1.0, size.width() - 2 * self.PADDING)
+        avail_h = max(1.0, size.height() - 2 * self.PADDING)
+        scale = min(avail_w / max(1.0, max_x - min_x), avail_h / max(1.0, max_y - min_y))
+        off_x = self.PADDING + (avail_w - (max_x - min_x) * scale) / 2.0
+        off_y = self.PADDING + (avail_h - (max_y - min_y) * scale) / 2.0
+        self._to_minimap = QTransform(scale, 0, 0, scale, off_x - min_x * scale, off_y - min_y * scale)
+
+        painter = QPainter(self._pixmap)
+        painter.setTransform(self._to_minimap)
+        painter.setPen(QPen(QColor("#94A3B8"), 0))
+        for edge in snapshot.edges:
+            if getattr(edge, "from_x", None) is not None and getattr(edge, "to_x", None) is not None:
+                painter.drawLine(QPointF(edge.from_x, edge.from_y), QPointF(edge.to_x, edge.to_y))
+        for box in snapshot.boxes:
+            painter.fillRect(QRectF(box.x, box.y, box.width, box.height), QColor(box.color))
+        for node in snapshot.nodes:
+            w = node.width if node.width is not None else 40
+            h = node.height if node.height is not None else 40
+            painter.fillRect(QRectF(node.x - w / 2, node.y - h / 2, w, h), QColor(node.color))
+        painter.end()
+
+    def _viewport_minimap_rect(self) -> QRectF:
+        """主视图可视区域映射到小地图像素坐标"""
+        if self._viewport_scene_rect.isNull():
+            return QRectF()
+        inverse, ok = self._content_transform.inverted()
+        if not ok:
+            return QRectF()
+        return self._to_minimap.mapRect(inverse.mapRect(self._viewport_scene_rect))
+
+    def paintEvent(self, event):
+        if self._pixmap is None or self._pixmap_size != self.size():
+            self._rebuild_pixmap()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+        rect = self._viewport_minimap_rect()
+        if not rect.isNull():
+            painter.setPen(QPen(self.VIEWPORT_BORDER, 1.5))
+            painter.setBrush(self.VIEWPORT_FILL)
+            painter.drawRect(rect.intersected(QRectF(self.rect())))
+        painter.end()
+
+    # ====== 交互：点击跳转 / 拖动视口框 ======
+    def _navigate_to(self, pos):
+        inverse, ok = self._to_minimap.inverted()
+        if not ok or self._snapshot is None:
+            return
+        content_point = inverse.map(QPointF(pos))
+        self.navigateRequested.emit(self._content_transform.map(content_point))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._navigate_to(event.pos())
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton:
+            self._navigate_to(event.pos())